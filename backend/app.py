@@ -5,6 +5,7 @@ import logging
 import os
 import traceback
 
+from battle_analytics import get_analytics_index
 from game import GachaManager  # noqa: F401  # re-export for tests
 from game import _apply_player_customization  # noqa: F401
 from game import _assign_damage_type  # noqa: F401
@@ -24,11 +25,13 @@ from game import save_party  # noqa: F401
 
 # Import torch checker early to perform the one-time check
 from llms.torch_checker import is_torch_available
+from log_retention import get_retention_manager
 from logging_config import configure_logging
 from quart import Quart
 from quart import Response
 from quart import jsonify
 from quart import request
+from routes.analytics import bp as analytics_bp
 from routes.assets import bp as assets_bp
 from routes.catalog import bp as catalog_bp
 from routes.config import bp as config_bp
@@ -56,6 +59,7 @@ app.register_blueprint(catalog_bp)
 app.register_blueprint(ui_bp)
 app.register_blueprint(performance_bp, url_prefix='/performance')
 app.register_blueprint(guidebook_bp, url_prefix='/guidebook')
+app.register_blueprint(analytics_bp)
 
 BACKEND_FLAVOR = os.getenv("UV_EXTRA", "default")
 
@@ -100,6 +104,24 @@ async def _cleanup_loop() -> None:
 @app.before_serving
 async def start_background_tasks() -> None:
     asyncio.create_task(_cleanup_loop())
+    asyncio.create_task(get_retention_manager().run_forever())
+    # Open the analytics index once; requests and battle logs share it
+    try:
+        await asyncio.to_thread(get_analytics_index().open)
+    except Exception:
+        log.exception("Failed to open the battle analytics index")
+
+
+@app.after_serving
+async def close_save_manager() -> None:
+    import game
+
+    if game.SAVE_MANAGER is not None:
+        try:
+            game.flush_run()
+        except Exception:
+            log.exception("Failed to flush run state on shutdown")
+        game.SAVE_MANAGER.close()
 
 
 if __name__ == "__main__":
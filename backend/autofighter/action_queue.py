@@ -1,9 +1,14 @@
-"""Simple action queue based on Speed (SPD) stats."""
+"""Action-value timeline deciding turn order from Speed (SPD) stats."""
 
 from __future__ import annotations
 
+from collections.abc import Callable
 from dataclasses import dataclass
 from dataclasses import field
+import heapq
+from itertools import count
+from typing import Any
+import weakref
 
 from .stats import GAUGE_START
 from .stats import Stats
@@ -14,85 +19,179 @@ class ActionQueue:
     """Maintain turn order using an Action Gauge system.
 
     Each combatant starts with an action gauge of ``GAUGE_START``.  A combatant's
-    base action value (AV) is ``GAUGE_START / SPD``.  During each step the actor
-    with the lowest current AV takes a turn.  The amount of AV spent is deducted
-    from every other combatant's AV, and the actor's AV is reset to its base
-    value.
+    base action value (AV) is ``GAUGE_START / SPD``.  The combatant whose AV
+    runs out first takes a turn, the elapsed AV is spent by everyone, and the
+    actor waits its base AV again.
+
+    Instead of subtracting the spent AV from every combatant on each step, the
+    queue keeps a single timeline clock and a heap of absolute "due" times: a
+    combatant's current AV is ``due - now``.  Picking the next actor, changing
+    a combatant's SPD or ``action_value`` and adding or removing combatants
+    are all ``O(log n)``.  Superseded heap entries are dropped lazily and the
+    heap is rebuilt once they outnumber the live ones.  Combatants read their
+    ``action_value`` through the queue while they are enrolled; the battle
+    loop removes them when they die.
     """
 
     combatants: list[Stats] = field(default_factory=list)
     bonus_actors: list[Stats] = field(default_factory=list)
+    deferred_bonus: list[Stats] = field(default_factory=list)
 
     def __post_init__(self) -> None:
-        for c in self.combatants:
-            c.action_gauge = GAUGE_START
-            base = GAUGE_START / max(c.spd, 1)
-            c.base_action_value = base
-            c.action_value = base
+        self._now = 0.0
+        self._heap: list[list[Any]] = []
+        self._entries: dict[int, list[Any]] = {}
+        self._stale = 0
+        self._seq = count()
+        members, self.combatants = list(self.combatants), []
+        for c in members:
+            self.add(c)
+
+    def __contains__(self, combatant: object) -> bool:
+        return id(combatant) in self._entries
+
+    def _retire(self, entry: list[Any]) -> None:
+        entry[2] = None  # lazily dropped when it reaches the top
+        self._stale += 1
+        if self._stale > len(self._entries):
+            self._heap = [e for e in self._heap if e[2] is not None]
+            heapq.heapify(self._heap)
+            self._stale = 0
+
+    def _push(self, combatant: Stats, due: float) -> None:
+        entry = [due, next(self._seq), combatant]
+        old = self._entries.get(id(combatant))
+        self._entries[id(combatant)] = entry
+        if old is not None:
+            self._retire(old)
+        heapq.heappush(self._heap, entry)
+
+    def add(self, combatant: Stats) -> None:
+        """Enrol ``combatant`` with a full action gauge."""
+        if combatant in self:
+            return
+        combatant.action_gauge = GAUGE_START
+        base = GAUGE_START / max(combatant.spd, 1)
+        combatant.base_action_value = base
+        self.combatants.append(combatant)
+        self._push(combatant, self._now + base)
+        combatant._action_queue = weakref.ref(self)
+
+    def remove(self, combatant: Stats) -> None:
+        """Take ``combatant`` off the timeline, keeping its last AV."""
+        entry = self._entries.pop(id(combatant), None)
+        if entry is None:
+            return
+        self._retire(entry)
+        combatant.__dict__.pop("_action_queue", None)
+        combatant.action_value = max(0.0, entry[0] - self._now)
+        self.combatants.remove(combatant)
+        self.bonus_actors = [c for c in self.bonus_actors if c is not combatant]
+        self.deferred_bonus = [c for c in self.deferred_bonus if c is not combatant]
+
+    def close(self) -> None:
+        """Detach every combatant, e.g. when the battle ends."""
+        self._heap.clear()
+        for c in list(self.combatants):
+            self.remove(c)
+        self._stale = 0
+        self.bonus_actors.clear()
+        self.deferred_bonus.clear()
+
+    def action_value_of(self, combatant: Stats) -> float | None:
+        """Return the AV left before ``combatant`` acts, or ``None`` if not queued."""
+        entry = self._entries.get(id(combatant))
+        if entry is None:
+            return None
+        return max(0.0, entry[0] - self._now)
+
+    def set_action_value(self, combatant: Stats, value: float) -> bool:
+        """Reschedule ``combatant`` to act after ``value`` AV."""
+        if combatant not in self:
+            return False
+        self._push(combatant, self._now + max(0.0, float(value)))
+        return True
+
+    def reschedule(self, combatant: Stats) -> None:
+        """Apply a SPD change, keeping the fraction of the gauge already filled."""
+        entry = self._entries.get(id(combatant))
+        if entry is None:
+            return
+        base = GAUGE_START / max(combatant.spd, 1)
+        old_base = combatant.base_action_value
+        if base == old_base:
+            return
+        remaining = max(0.0, entry[0] - self._now)
+        if old_base > 0:
+            remaining *= base / old_base
+        combatant.base_action_value = base
+        self._push(combatant, self._now + remaining)
 
     def grant_extra_turn(self, actor: Stats) -> None:
-        """Queue ``actor`` for an immediate bonus turn."""
-        if actor not in self.bonus_actors:
-            self.bonus_actors.append(actor)
+        """Queue ``actor`` for an immediate bonus turn; grants stack."""
+        self.bonus_actors.append(actor)
+
+    def defer_bonus_turns(self, actor: Stats) -> int:
+        """Hold ``actor`` and every queued bonus turn until after the next normal turn.
+
+        Returns how many bonus turns were held back.
+        """
+        self.deferred_bonus.append(actor)
+        self.deferred_bonus.extend(self.bonus_actors)
+        self.bonus_actors.clear()
+        return len(self.deferred_bonus)
+
+    def next_turn(self) -> tuple[Stats, bool]:
+        """Return the next actor and whether it is taking a bonus turn.
+
+        Bonus turns do not advance the timeline.  Otherwise the clock moves
+        to the actor's due time and the actor is rescheduled one base AV
+        later; bonus turns held by :meth:`defer_bonus_turns` run right after
+        that turn.
+        """
+        if self.bonus_actors:
+            return self.bonus_actors.pop(0), True
+        while self._heap:
+            due, _, actor = self._heap[0]
+            if actor is None:
+                heapq.heappop(self._heap)
+                self._stale -= 1
+                continue
+            self._now = due
+            entry = [due + actor.base_action_value, next(self._seq), actor]
+            self._entries[id(actor)] = entry
+            heapq.heapreplace(self._heap, entry)
+            if self.deferred_bonus:
+                self.bonus_actors[:0] = self.deferred_bonus
+                self.deferred_bonus = []
+            return actor, False
+        raise IndexError("action queue is empty")
 
     def next_actor(self) -> Stats:
         """Return the combatant with the lowest action value and advance time."""
-        if self.bonus_actors:
-            return self.bonus_actors.pop(0)
-
-        actor_index = min(
-            range(len(self.combatants)),
-            key=lambda i: self.combatants[i].action_value,
-        )
-        actor = self.combatants[actor_index]
-        spent = actor.action_value
-        for c in self.combatants:
-            c.action_value -= spent
-        actor.action_value = actor.base_action_value
-        self.combatants.append(self.combatants.pop(actor_index))
-        return actor
-
-    def snapshot(self) -> list[dict[str, float]]:
-        """Return queue state for serialization."""
-        ordered = sorted(self.combatants, key=lambda c: c.action_value)
-        extras = [
-            {
-                "id": getattr(c, "id", ""),
-                "action_gauge": c.action_gauge,
-                "action_value": c.action_value,
-                "base_action_value": c.base_action_value,
-                "bonus": True,
-            }
-            for c in self.bonus_actors
-        ]
-        return extras + [
-            {
+        return self.next_turn()[0]
+
+    def ordered(self) -> list[Stats]:
+        """Return enrolled combatants in the order they will act."""
+        live = sorted(self._entries.values(), key=lambda e: (e[0], e[1]))
+        return [entry[2] for entry in live]
+
+    def snapshot(
+        self, visible: Callable[[Stats], bool] | None = None
+    ) -> list[dict[str, float]]:
+        """Return queue state for serialization.
+
+        ``visible`` filters which combatants appear, e.g. to hide summons.
+        """
+
+        def _entry(c: Stats) -> dict[str, Any]:
+            return {
                 "id": getattr(c, "id", ""),
                 "action_gauge": c.action_gauge,
                 "action_value": c.action_value,
                 "base_action_value": c.base_action_value,
             }
-            for c in ordered
-        ]
-
-    def advance_with_actor(self, actor: Stats) -> None:
-        """Advance the queue math using the provided actor.
 
-        This mirrors ``next_actor`` time advancement but does not select the
-        actor by min action value. It allows external battle loops to drive the
-        visual/action gauge independently while preserving consistent queue
-        dynamics for snapshots.
-        """
-        if actor not in self.combatants:
-            return
-        try:
-            spent = getattr(actor, "action_value", getattr(actor, "base_action_value", GAUGE_START))
-            for c in self.combatants:
-                c.action_value = max(0.0, getattr(c, "action_value", 0.0) - spent)
-            actor.action_value = getattr(actor, "base_action_value", GAUGE_START)
-            # Rotate actor to end to reflect moving to the back of the line
-            idx = self.combatants.index(actor)
-            self.combatants.append(self.combatants.pop(idx))
-        except Exception:
-            # Best-effort; never let UI queue progression break battle logic
-            pass
+        shown = visible or (lambda _c: True)
+        extras = [{**_entry(c), "bonus": True} for c in self.bonus_actors if shown(c)]
+        return extras + [_entry(c) for c in self.ordered() if shown(c)]
@@ -0,0 +1,104 @@
+"""Per-battle combat state carried through a context variable.
+
+Enrage, the battle-active flag, queued extra turns, summon tracking and event
+subscriptions used to live in module globals, which limited a process to one
+battle at a time. Each battle now runs inside its own :class:`BattleContext`;
+code outside any battle (tests, tools) falls back to a shared default context
+and the process-wide event bus.
+
+The context also carries the battle clock. Pacing sleeps go through
+:func:`battle_sleep` so a context built with a
+:class:`~autofighter.clock.SimulatedClock` resolves without waiting, and
+the battle's :class:`~autofighter.action_queue.ActionQueue` so extra turns
+granted over the event bus land on the timeline.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from dataclasses import field
+from typing import TYPE_CHECKING
+
+from autofighter.clock import REAL_CLOCK
+from autofighter.clock import BattleClock
+from plugins.event_bus import _Bus
+from plugins.event_bus import enter_scope
+from plugins.event_bus import exit_scope
+from plugins.event_bus import new_scope
+
+if TYPE_CHECKING:  # pragma: no cover - type checking only
+    from autofighter.action_queue import ActionQueue
+    from autofighter.stats import Stats
+    from autofighter.summons.base import Summon
+
+
+@dataclass
+class BattleContext:
+    """Mutable state owned by a single battle."""
+
+    run_id: str | None = None
+    enrage_percent: float = 0.0
+    active: bool = False
+    extra_turns: dict[int, int] = field(default_factory=dict)
+    action_queue: ActionQueue | None = field(default=None, repr=False)
+    summons: dict[str, list[Summon]] = field(default_factory=dict)
+    summon_limits: dict[str, int] = field(default_factory=dict)
+    summoner_refs: dict[str, Stats] = field(default_factory=dict)
+    wind_players: list[Stats] = field(default_factory=list)
+    wind_foes: list[Stats] = field(default_factory=list)
+    wind_pending: list[Stats] = field(default_factory=list)
+    bus: _Bus | None = field(default=None, repr=False)
+    clock: BattleClock = field(default=REAL_CLOCK, repr=False)
+
+    @contextmanager
+    def activate(self) -> Iterator[BattleContext]:
+        """Make this the current context for the running task.
+
+        Event subscriptions made while active land on the context's own bus
+        scope and disappear with it.
+        """
+
+        if self.bus is None:
+            self.bus = new_scope(sleep=self.clock.sleep)
+        token = _CURRENT.set(self)
+        bus_token = enter_scope(self.bus)
+        try:
+            yield self
+        finally:
+            exit_scope(bus_token)
+            _CURRENT.reset(token)
+
+
+_DEFAULT = BattleContext()
+_CURRENT: ContextVar[BattleContext] = ContextVar("battle_context", default=_DEFAULT)
+
+
+def current_battle_context() -> BattleContext:
+    """Return the battle context for the running task."""
+
+    return _CURRENT.get()
+
+
+def in_battle_context() -> bool:
+    """Return ``True`` when a dedicated battle context is active."""
+
+    return _CURRENT.get() is not _DEFAULT
+
+
+async def battle_sleep(seconds: float) -> None:
+    """Sleep on the current battle's clock."""
+
+    await _CURRENT.get().clock.sleep(seconds)
+
+
+@contextmanager
+def battle_context(
+    run_id: str | None = None, clock: BattleClock = REAL_CLOCK
+) -> Iterator[BattleContext]:
+    """Run the enclosed block inside a fresh :class:`BattleContext`."""
+
+    with BattleContext(run_id=run_id, clock=clock).activate() as ctx:
+        yield ctx
@@ -1,3 +1,4 @@
+from collections.abc import Collection
 from pathlib import Path
 import random
 
@@ -16,12 +17,48 @@ def _registry() -> dict[str, type[CardBase]]:
         _loader.discover(str(plugin_dir))
     return _loader.get_plugins("card")
 
-def card_choices(party: Party, stars: int, count: int = 3) -> list[CardBase]:
-    cards = [cls() for cls in _registry().values()]
-    available = [c for c in cards if c.stars == stars and c.id not in party.cards]
-    if not available:
-        return []
-    return random.sample(available, k=min(count, len(available)))
+_pools: tuple[object, dict[int, tuple[str, ...]]] | None = None
+
+
+def _star_pools() -> dict[int, tuple[str, ...]]:
+    """Card ids grouped by star tier, built once from registry metadata."""
+    global _pools
+    registry = _registry()
+    if _pools is None or _pools[0] is not registry:
+        by_stars: dict[int, list[str]] = {}
+        for cid in registry:
+            stars = registry.metadata(cid).get("stars")
+            if stars is None:
+                stars = registry[cid]().stars
+            by_stars.setdefault(stars, []).append(cid)
+        _pools = (registry, {s: tuple(sorted(ids)) for s, ids in by_stars.items()})
+    return _pools[1]
+
+
+def card_pool(stars: int) -> tuple[str, ...]:
+    """Return the ids of every card with ``stars`` stars."""
+    return _star_pools().get(stars, ())
+
+
+def sample_card_ids(stars: int, count: int, exclude: Collection[str] = ()) -> list[str]:
+    """Pick up to ``count`` unique card ids of a star tier, skipping ``exclude``."""
+    excluded = exclude if isinstance(exclude, (set, frozenset)) else set(exclude)
+    pool = [cid for cid in card_pool(stars) if cid not in excluded]
+    return random.sample(pool, k=min(count, len(pool)))
+
+
+def card_choices(
+    party: Party, stars: int, count: int = 3, exclude: Collection[str] = ()
+) -> list[CardBase]:
+    """Return up to ``count`` unowned cards of a star tier.
+
+    Only the sampled cards are instantiated. ``exclude`` removes further ids,
+    such as options already offered in the same reward.
+    """
+    excluded = set(party.cards)
+    excluded.update(exclude)
+    registry = _registry()
+    return [registry[cid]() for cid in sample_card_ids(stars, count, excluded)]
 
 def award_card(party: Party, card_id: str) -> CardBase | None:
     card_cls = _registry().get(card_id)
@@ -0,0 +1,49 @@
+"""Clocks that drive battle pacing.
+
+The battle loop, passives, damage types and the event bus never call
+``asyncio.sleep`` directly for pacing; they ask the active battle clock
+instead. :class:`BattleClock` keeps real wall-clock pacing for the UI while
+:class:`SimulatedClock` advances a virtual timer and only yields to the event
+loop, letting headless simulations resolve fights as fast as the CPU allows.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+
+class BattleClock:
+    """Real-time clock used when a player is watching the battle."""
+
+    simulated = False
+
+    def now(self) -> float:
+        return time.monotonic()
+
+    async def sleep(self, seconds: float) -> None:
+        await asyncio.sleep(seconds)
+
+
+class SimulatedClock(BattleClock):
+    """Virtual clock that never blocks.
+
+    ``sleep`` records the requested delay and yields once so pending tasks
+    (batched events, spawned damage-type hooks) still get to run.
+    """
+
+    simulated = True
+
+    def __init__(self, start: float = 0.0) -> None:
+        self._now = start
+
+    def now(self) -> float:
+        return self._now
+
+    async def sleep(self, seconds: float) -> None:
+        if seconds > 0:
+            self._now += seconds
+        await asyncio.sleep(0)
+
+
+REAL_CLOCK = BattleClock()
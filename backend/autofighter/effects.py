@@ -1,4 +1,5 @@
 import asyncio
+from collections import Counter
 from dataclasses import dataclass
 from dataclasses import field
 import random
@@ -7,6 +8,7 @@ from typing import Union
 
 from rich.console import Console
 
+from autofighter.battle_context import current_battle_context
 from autofighter.stats import StatEffect
 from autofighter.stats import Stats
 
@@ -228,13 +230,18 @@ class DamageOverTime:
     id: str
     source: Stats | None = None
 
-    async def tick(self, target: Stats, *_: object) -> bool:
-        from autofighter.stats import BUS  # Import here to avoid circular imports
+    _HOOKS = ("on_dot_damage_taken", "on_party_dot_damage_taken")
 
+    def _hook_types(self, target: Stats) -> tuple[Stats, object, object]:
         attacker = self.source or target
         dtype = getattr(self, "damage_type", None)
         if dtype is None:
             dtype = getattr(attacker, "damage_type", target.damage_type)
+        return attacker, dtype, getattr(attacker, "damage_type", None)
+
+    def _hooked(self, target: Stats) -> tuple[Stats, float]:
+        """Return the attacker and this stack's damage after damage type hooks."""
+        attacker, dtype, source_type = self._hook_types(target)
         dmg = dtype.on_dot_damage_taken(
             self.damage,
             attacker,
@@ -245,9 +252,16 @@ class DamageOverTime:
             attacker,
             target,
         )
-        source_type = getattr(attacker, "damage_type", None)
         if source_type is not dtype:
             dmg = source_type.on_party_dot_damage_taken(dmg, attacker, target)
+        return attacker, dmg
+
+    async def tick(self, target: Stats, *_: object) -> bool:
+        attacker, dmg = self._hooked(target)
+        return await self._deliver(target, attacker, dmg)
+
+    async def _deliver(self, target: Stats, attacker: Stats, dmg: float) -> bool:
+        from autofighter.stats import BUS  # Import here to avoid circular imports
 
         # Emit DoT tick event before applying damage - async for better performance
         await BUS.emit_async("dot_tick", attacker, target, int(dmg), self.name, {
@@ -282,18 +296,30 @@ class HealingOverTime:
     id: str
     source: Stats | None = None
 
-    async def tick(self, target: Stats, *_: object) -> bool:
-        from autofighter.stats import BUS  # Import here to avoid circular imports
+    _HOOKS = ("on_hot_heal_received", "on_party_hot_heal_received")
 
+    def _hook_types(self, target: Stats) -> tuple[Stats, object, object]:
         healer = self.source or target
         dtype = getattr(self, "damage_type", None)
         if dtype is None:
             dtype = getattr(healer, "damage_type", target.damage_type)
+        return healer, dtype, getattr(healer, "damage_type", None)
+
+    def _hooked(self, target: Stats) -> tuple[Stats, float]:
+        """Return the healer and this stack's healing after damage type hooks."""
+        healer, dtype, source_type = self._hook_types(target)
         heal = dtype.on_hot_heal_received(self.healing, healer, target)
         heal = dtype.on_party_hot_heal_received(heal, healer, target)
-        source_type = getattr(healer, "damage_type", None)
         if source_type is not dtype:
             heal = source_type.on_party_hot_heal_received(heal, healer, target)
+        return healer, heal
+
+    async def tick(self, target: Stats, *_: object) -> bool:
+        healer, heal = self._hooked(target)
+        return await self._deliver(target, healer, heal)
+
+    async def _deliver(self, target: Stats, healer: Stats, heal: float) -> bool:
+        from autofighter.stats import BUS  # Import here to avoid circular imports
 
         # Emit HoT tick event before applying healing - async for better performance
         await BUS.emit_async("hot_tick", healer, target, int(heal), self.name, {
@@ -307,21 +333,176 @@ class HealingOverTime:
         return self.turns > 0
 
 
+def _group_key(effect) -> tuple[str | None, int]:
+    return getattr(effect, "id", None), id(getattr(effect, "source", None))
+
+
+class EffectStacks(list):
+    """List of DoT/HoT instances grouped by effect id and source.
+
+    Behaves like a plain list, so plugins can still iterate, remove or clear
+    stacks directly. Alongside the list it keeps a running stack count per id,
+    so :meth:`stacks` answers "how many copies of this effect are attached"
+    without scanning, and an index of stacks by ``(effect id, source)`` that
+    :meth:`groups` returns. Appends extend the index in place; other
+    mutations drop it and the next :meth:`groups` call rebuilds it. Every
+    mutation also bumps ``version`` so snapshot caches can tell when the
+    stacks changed.
+    """
+
+    def __init__(self, effects=()) -> None:
+        super().__init__(effects)
+        self._recount()
+
+    def _recount(self) -> None:
+        self._counts = Counter(getattr(e, "id", None) for e in self)
+        self._groups: dict[tuple[str | None, int], list] | None = None
+        self.version = getattr(self, "version", 0) + 1
+
+    def stacks(self, effect_id: str) -> int:
+        return self._counts[effect_id]
+
+    def groups(self) -> dict[tuple[str | None, int], list]:
+        """Return stacks keyed by ``(effect id, id(source))`` in applied order."""
+        if self._groups is None:
+            groups: dict[tuple[str | None, int], list] = {}
+            for effect in self:
+                groups.setdefault(_group_key(effect), []).append(effect)
+            self._groups = groups
+        return self._groups
+
+    def append(self, effect) -> None:
+        super().append(effect)
+        self.version += 1
+        self._counts[getattr(effect, "id", None)] += 1
+        if self._groups is not None:
+            self._groups.setdefault(_group_key(effect), []).append(effect)
+
+    def insert(self, index, effect) -> None:
+        super().insert(index, effect)
+        self.version += 1
+        self._counts[getattr(effect, "id", None)] += 1
+        self._groups = None
+
+    def extend(self, effects) -> None:
+        super().extend(effects)
+        self._recount()
+
+    def remove(self, effect) -> None:
+        super().remove(effect)
+        self.version += 1
+        self._counts[getattr(effect, "id", None)] -= 1
+        self._groups = None
+
+    def pop(self, index=-1):
+        effect = super().pop(index)
+        self.version += 1
+        self._counts[getattr(effect, "id", None)] -= 1
+        self._groups = None
+        return effect
+
+    def clear(self) -> None:
+        super().clear()
+        self.version += 1
+        self._counts.clear()
+        self._groups = None
+
+    def __setitem__(self, index, value) -> None:
+        super().__setitem__(index, value)
+        self._recount()
+
+    def __delitem__(self, index) -> None:
+        super().__delitem__(index)
+        self._recount()
+
+    def __iadd__(self, effects):
+        self.extend(effects)
+        return self
+
+    def __reduce__(self):
+        return type(self), (list(self),)
+
+
+_STOCK_TICKS = {DamageOverTime: DamageOverTime.tick, HealingOverTime: HealingOverTime.tick}
+_PURE_HOOKS: dict[tuple[type, str], bool] = {}
+
+
+def _pure_hook(dtype: object, name: str) -> bool:
+    """Whether ``dtype`` keeps the base class's side-effect free ``name`` hook."""
+    key = (type(dtype), name)
+    pure = _PURE_HOOKS.get(key)
+    if pure is None:
+        from plugins.damage_types._base import DamageTypeBase
+
+        pure = _PURE_HOOKS[key] = getattr(type(dtype), name, None) is getattr(
+            DamageTypeBase, name
+        )
+    return pure
+
+
+def _shared_amount(eff, target: Stats, shared: dict) -> tuple[Stats, float] | None:
+    """Return ``eff``'s hooked amount, computed once per group and base value.
+
+    Stacks qualify when they keep the stock tick and every damage type hook
+    they would call is the base implementation, which only logs. Returns
+    ``None`` for stacks that must run their own ``tick``; ``shared`` caches
+    that answer per group too.
+    """
+    cls = type(eff)
+    base = next((b for b in _STOCK_TICKS if isinstance(eff, b)), None)
+    if base is None or cls.tick is not _STOCK_TICKS[base] or cls._hooked is not base._hooked:
+        return None
+    amount = eff.damage if base is DamageOverTime else eff.healing
+    key = (cls, *_group_key(eff), id(getattr(eff, "damage_type", None)), amount)
+    if key not in shared:
+        _source, dtype, source_type = eff._hook_types(target)
+        types = (dtype,) if source_type is dtype else (dtype, source_type)
+        pure = all(_pure_hook(t, name) for t in types for name in base._HOOKS)
+        shared[key] = eff._hooked(target) if pure else None
+    return shared[key]
+
+
+class _SilentConsole:
+    """Stand-in for ``Console`` in headless battles; tick traces are dropped."""
+
+    def log(self, *_args, **_kwargs) -> None:
+        pass
+
+
 class EffectManager:
     """Manage DoT and HoT effects on a Stats object."""
 
     def __init__(self, stats: Stats) -> None:
         self.stats = stats
-        self.dots: list[DamageOverTime] = []
-        self.hots: list[HealingOverTime] = []
+        self.dots = EffectStacks()
+        self.hots = EffectStacks()
         self.mods: list[StatModifier] = []
-        self._console = Console()
+        if current_battle_context().clock.simulated:
+            self._console = _SilentConsole()
+        else:
+            self._console = Console()
         for eff in getattr(stats, "_pending_mods", []):
             self.mods.append(eff)
             self.stats.mods.append(eff.id)
         if hasattr(stats, "_pending_mods"):
             delattr(stats, "_pending_mods")
 
+    @property
+    def dots(self) -> EffectStacks:
+        return self._dots
+
+    @dots.setter
+    def dots(self, effects: list[DamageOverTime]) -> None:
+        self._dots = effects if isinstance(effects, EffectStacks) else EffectStacks(effects)
+
+    @property
+    def hots(self) -> EffectStacks:
+        return self._hots
+
+    @hots.setter
+    def hots(self, effects: list[HealingOverTime]) -> None:
+        self._hots = effects if isinstance(effects, EffectStacks) else EffectStacks(effects)
+
     def add_dot(self, effect: DamageOverTime, max_stacks: int | None = None) -> None:
         """Attach a DoT instance to the tracked stats.
 
@@ -336,8 +517,7 @@ class EffectManager:
             return
 
         if max_stacks is not None:
-            current = len([d for d in self.dots if d.id == effect.id])
-            if current >= max_stacks:
+            if self.dots.stacks(effect.id) >= max_stacks:
                 return
         self.dots.append(effect)
         self.stats.dots.append(effect.id)
@@ -348,7 +528,7 @@ class EffectManager:
             "effect_id": effect.id,
             "damage": effect.damage,
             "turns": effect.turns,
-            "current_stacks": len([d for d in self.dots if d.id == effect.id])
+            "current_stacks": self.dots.stacks(effect.id)
         })
 
     def add_hot(self, effect: HealingOverTime) -> None:
@@ -372,7 +552,7 @@ class EffectManager:
             "effect_id": effect.id,
             "healing": effect.healing,
             "turns": effect.turns,
-            "current_stacks": len([h for h in self.hots if h.id == effect.id])
+            "current_stacks": self.hots.stacks(effect.id)
         })
 
     def add_modifier(self, effect: StatModifier) -> None:
@@ -430,63 +610,41 @@ class EffectManager:
             remaining -= 1.0
 
     async def tick(self, others: Optional["EffectManager"] = None) -> None:
-        for collection, names in (
-            (self.hots, self.stats.hots),
-            (self.dots, self.stats.dots),
-        ):
+        for kind in ("hots", "dots"):
+            collection = getattr(self, kind)
             expired: list[object] = []
+            if collection:
+                # Remaining turns change in place on the stacks below
+                collection.version += 1
 
             # Batch logging for performance when many effects are present
             if len(collection) > 10:
-                effect_type = "HoT" if (collection and isinstance(collection[0], HealingOverTime)) else "DoT"
+                effect_type = "HoT" if kind == "hots" else "DoT"
                 color = "green" if effect_type == "HoT" else "light_red"
                 self._console.log(f"[{color}]{self.stats.id} processing {len(collection)} {effect_type} effects[/]")
 
-            # Process effects in parallel for better async performance when many are present
-            if len(collection) > 20:
-                # Parallel processing for large collections
-                async def tick_effect(eff):
-                    if len(collection) <= 10:
-                        color = "green" if isinstance(eff, HealingOverTime) else "light_red"
-                        self._console.log(f"[{color}]{self.stats.id} {eff.name} tick[/]")
-                    return await eff.tick(self.stats), eff
-
-                # Process in batches to avoid overwhelming the event loop
-                batch_size = 50
-                for i in range(0, len(collection), batch_size):
-                    batch = collection[i:i + batch_size]
-                    results = await asyncio.gather(*[tick_effect(eff) for eff in batch])
-                    for still_active, eff in results:
-                        if not still_active:
-                            expired.append(eff)
-                    # Early termination: if target dies, stop processing remaining effects
-                    if self.stats.hp <= 0:
-                        break
-            else:
-                # Sequential processing for smaller collections
-                for eff in collection:
-                    # Only log individual effects if there are few of them
-                    if len(collection) <= 10:
-                        color = "green" if isinstance(eff, HealingOverTime) else "light_red"
-                        self._console.log(f"[{color}]{self.stats.id} {eff.name} tick[/]")
-                    if not await eff.tick(self.stats):
-                        expired.append(eff)
-                    # Early termination: if target dies, stop processing remaining effects
-                    if self.stats.hp <= 0:
-                        break
-
-            for eff in expired:
-                # Emit effect expired event - async for better performance
-                from autofighter.stats import BUS
-                await BUS.emit_async("effect_expired", eff.name, self.stats, {
-                    "effect_type": "hot" if isinstance(eff, HealingOverTime) else "dot",
-                    "effect_id": eff.id,
-                    "expired_naturally": True
-                })
-
-                collection.remove(eff)
-                if eff.id in names:
-                    names.remove(eff.id)
+            # Stacks tick one at a time, in the order they were applied, so
+            # interleaved effects and sources resolve exactly as before. Hooks
+            # run once per (class, id, source, base amount) group per tick.
+            shared: dict[tuple, tuple[Stats, float] | None] = {}
+            for eff in collection:
+                # Only log individual effects if there are few of them
+                if len(collection) <= 10:
+                    color = "green" if isinstance(eff, HealingOverTime) else "light_red"
+                    self._console.log(f"[{color}]{self.stats.id} {eff.name} tick[/]")
+                hooked = _shared_amount(eff, self.stats, shared)
+                if hooked is None:
+                    alive = await eff.tick(self.stats)
+                else:
+                    alive = await eff._deliver(self.stats, *hooked)
+                if not alive:
+                    expired.append(eff)
+                # Early termination: if target dies, stop processing remaining effects
+                if self.stats.hp <= 0:
+                    break
+
+            if expired:
+                await self._expire(kind, expired)
 
         # Enhanced stat modifier processing with parallelization
         expired_mods: list[StatModifier] = []
@@ -542,6 +700,35 @@ class EffectManager:
         # Process passive abilities if available
         await self._tick_passives(others)
 
+    async def _expire(self, kind: str, expired: list[object]) -> None:
+        """Detach expired stacks in one pass over the effect and name lists."""
+        from autofighter.stats import BUS
+
+        for eff in expired:
+            # Emit effect expired event - async for better performance
+            await BUS.emit_async("effect_expired", eff.name, self.stats, {
+                "effect_type": "hot" if isinstance(eff, HealingOverTime) else "dot",
+                "effect_id": eff.id,
+                "expired_naturally": True
+            })
+
+        # Filter in place so references to the EffectStacks stay valid;
+        # slice assignment recounts the stacks
+        gone = {id(eff) for eff in expired}
+        stacks = getattr(self, kind)
+        stacks[:] = [eff for eff in stacks if id(eff) not in gone]
+
+        # Drop one name per expired stack, earliest first, as list.remove would
+        drop = Counter(eff.id for eff in expired)
+        names = getattr(self.stats, kind)
+        kept = []
+        for name in names:
+            if drop[name] > 0:
+                drop[name] -= 1
+            else:
+                kept.append(name)
+        names[:] = kept
+
     async def _tick_passives(self, others: Optional["EffectManager"] = None) -> None:
         """
         Enhanced passive processing with parallelization when beneficial.
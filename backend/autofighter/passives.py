@@ -1,12 +1,13 @@
 from __future__ import annotations
 
-import asyncio
 from collections import Counter
+import inspect
 import logging
 from pathlib import Path
 from typing import Any
 from typing import Optional
 
+from autofighter.battle_context import battle_sleep
 from plugins import PluginLoader
 
 log = logging.getLogger(__name__)
@@ -14,6 +15,22 @@ log = logging.getLogger(__name__)
 PASSIVE_LOADER: PluginLoader | None = None
 PASSIVE_REGISTRY: dict[str, type] | None = None
 
+# Dispatch keys used by the trigger helpers, mapped to the predicate that
+# decides whether a passive class takes part. ``trigger(event)`` uses
+# ``"event:<name>"`` keys checked against the class ``trigger`` attribute.
+_DISPATCH_RULES = {
+    "damage_taken": lambda cls: hasattr(cls, "on_damage_taken") or _supports_event(cls, "damage_taken"),
+    "turn_end": lambda cls: hasattr(cls, "on_turn_end"),
+    "defeat": lambda cls: hasattr(cls, "on_defeat"),
+    "summon_defeat": lambda cls: hasattr(cls, "on_summon_defeat"),
+    "hit_landed": lambda cls: _supports_event(cls, "hit_landed"),
+    "turn_start": lambda cls: hasattr(cls, "on_turn_start") or _supports_event(cls, "turn_start"),
+    "level_up": lambda cls: _supports_event(cls, "level_up"),
+}
+
+# (function, call shapes) -> index of the first shape the signature accepts
+_CALL_SHAPES: dict[tuple[Any, tuple], int] = {}
+
 
 def _supports_event(cls, event: str) -> bool:
     """Return True if the passive class declares support for the event."""
@@ -37,10 +54,85 @@ def discover() -> dict[str, type]:
     return PASSIVE_REGISTRY
 
 
+def _handles(cls, key: str) -> bool:
+    if key.startswith("event:"):
+        return _supports_event(cls, key[6:])
+    return _DISPATCH_RULES[key](cls)
+
+
+def _pick_variant(func, variants: tuple[tuple[tuple, dict], ...]) -> int:
+    """Return the index of the first ``(args, kwargs)`` variant ``func`` accepts.
+
+    Binding is resolved once per function and argument shape, replacing the
+    old pattern of calling and retrying on ``TypeError``. Returns the last
+    index when nothing binds so the call fails as it always did.
+    """
+    shape = tuple((len(args), tuple(kwargs)) for args, kwargs in variants)
+    key = (getattr(func, "__func__", func), shape)
+    index = _CALL_SHAPES.get(key)
+    if index is None:
+        index = len(variants) - 1
+        try:
+            sig = inspect.signature(func)
+        except (TypeError, ValueError):
+            sig = None
+        if sig is not None:
+            for i, (args, kwargs) in enumerate(variants):
+                try:
+                    sig.bind(*args, **kwargs)
+                except TypeError:
+                    continue
+                index = i
+                break
+        _CALL_SHAPES[key] = index
+    return index
+
+
+async def _call(func, *variants: tuple[tuple, dict]) -> Any:
+    args, kwargs = variants[_pick_variant(func, variants)]
+    return await func(*args, **kwargs)
+
+
 class PassiveRegistry:
     def __init__(self) -> None:
         self._registry = discover()
 
+    def _handlers(self, owner, key: str) -> list[tuple[str, type, list[Any]]]:
+        """Return ``(pid, cls, stacks)`` for passives handling ``key``.
+
+        ``stacks`` holds one passive instance per active stack (capped at the
+        class's ``max_stacks``), so stateful passives keep per-stack state as
+        they did when every call built fresh instances. The list is compiled
+        once per owner and key and cached on the owner's passive list, which
+        drops the cache whenever it is mutated; instances are shared between
+        keys for the same owner and therefore keep their state between
+        triggers until the passive list changes.
+        """
+        passives = getattr(owner, "passives", None) or []
+        cache = getattr(passives, "_dispatch", None)
+        if cache is None or cache["registry"] is not self._registry:
+            cache = {"registry": self._registry, "instances": {}, "keys": {}}
+            try:
+                passives._dispatch = cache
+            except AttributeError:
+                pass  # plain list: compile per call
+        entries = cache["keys"].get(key)
+        if entries is None:
+            instances = cache["instances"]
+            entries = []
+            for pid, count in Counter(passives).items():
+                cls = self._registry.get(pid)
+                if cls is None or not _handles(cls, key):
+                    continue
+                stacks = instances.get(pid)
+                if stacks is None:
+                    size = min(count, getattr(cls, "max_stacks", count))
+                    stacks = instances[pid] = [cls() for _ in range(size)]
+                if stacks:
+                    entries.append((pid, cls, stacks))
+            cache["keys"][key] = entries
+        return entries
+
     async def trigger(self, event: str, owner, **kwargs) -> None:
         """Trigger passives for a given event with optional context.
 
@@ -52,211 +144,126 @@ class PassiveRegistry:
         """
         if event == "battle_start" and hasattr(owner, "_recalculate_passive_aggro"):
             owner._recalculate_passive_aggro()
-        counts = Counter(owner.passives)
-        for pid, count in counts.items():
-            cls = self._registry.get(pid)
-            if cls is None or not _supports_event(cls, event):
-                continue
-            stacks = min(count, getattr(cls, "max_stacks", count))
-            for stack_idx in range(stacks):
-                passive_instance = cls()
-                # Try to call apply with context, fall back to simple apply for compatibility
-                try:
-                    await passive_instance.apply(owner, stack_index=stack_idx, event=event, **kwargs)
-                except TypeError:
-                    # Fall back to simple apply for existing passives that don't accept kwargs
-                    try:
-                        await passive_instance.apply(owner, stack_index=stack_idx)
-                    except TypeError:
-                        await passive_instance.apply(owner)
-                await asyncio.sleep(0.002)
+        for _pid, _cls, stacks in self._handlers(owner, f"event:{event}"):
+            for stack_idx, passive in enumerate(stacks):
+                # Pass the full context when the passive accepts it
+                await _call(
+                    passive.apply,
+                    ((owner,), {"stack_index": stack_idx, "event": event, **kwargs}),
+                    ((owner,), {"stack_index": stack_idx}),
+                    ((owner,), {}),
+                )
 
                 # If this passive provides an event-specific handler, call it too.
                 # This enables richer behaviors (e.g., on_action_taken) while
                 # preserving backward compatibility with apply-only passives.
-                if event == "action_taken" and hasattr(passive_instance, "on_action_taken"):
-                    try:
-                        await passive_instance.on_action_taken(owner, **kwargs)
-                    except TypeError:
-                        await passive_instance.on_action_taken(owner)
-                    await asyncio.sleep(0.002)
+                if event == "action_taken" and hasattr(passive, "on_action_taken"):
+                    await _call(passive.on_action_taken, ((owner,), kwargs), ((owner,), {}))
+            await battle_sleep(0.002)
 
     async def trigger_damage_taken(self, target, attacker: Optional[Any] = None, damage: int = 0) -> None:
         """Trigger passives specifically for damage taken events."""
-        counts = Counter(target.passives)
-        for pid, count in counts.items():
-            cls = self._registry.get(pid)
-            if cls is None:
-                continue
-
-            passive_instance = cls()
-
+        for _pid, cls, stacks in self._handlers(target, "damage_taken"):
             # Check if passive has on_damage_taken method (regardless of trigger type)
-            if hasattr(passive_instance, "on_damage_taken"):
-                stacks = min(count, getattr(cls, "max_stacks", count))
-                for _ in range(stacks):
-                    await passive_instance.on_damage_taken(target, attacker, damage)
-                    await asyncio.sleep(0.002)
+            if hasattr(cls, "on_damage_taken"):
+                for passive in stacks:
+                    await passive.on_damage_taken(target, attacker, damage)
 
             # Also trigger passives with explicit damage_taken trigger
             if _supports_event(cls, "damage_taken"):
-                stacks = min(count, getattr(cls, "max_stacks", count))
-                for _ in range(stacks):
-                    try:
-                        await passive_instance.apply(target, attacker=attacker, damage=damage, event="damage_taken")
-                    except TypeError:
-                        try:
-                            await passive_instance.apply(target, attacker=attacker, damage=damage)
-                        except TypeError:
-                            await passive_instance.apply(target)
-                    await asyncio.sleep(0.002)
+                for passive in stacks:
+                    await _call(
+                        passive.apply,
+                        ((target,), {"attacker": attacker, "damage": damage, "event": "damage_taken"}),
+                        ((target,), {"attacker": attacker, "damage": damage}),
+                        ((target,), {}),
+                    )
+            await battle_sleep(0.002)
 
     async def trigger_turn_end(self, target) -> None:
         """Trigger turn end events for passives that need end-of-turn processing."""
-        counts = Counter(target.passives)
-        for pid, count in counts.items():
-            cls = self._registry.get(pid)
-            if cls is None:
-                continue
-            passive_instance = cls()
-
-            # Check if passive has turn end handling
-            if hasattr(passive_instance, "on_turn_end"):
-                stacks = min(count, getattr(cls, "max_stacks", count))
-                for _ in range(stacks):
-                    await passive_instance.on_turn_end(target)
-                    await asyncio.sleep(0.002)
+        for _pid, _cls, stacks in self._handlers(target, "turn_end"):
+            for passive in stacks:
+                await passive.on_turn_end(target)
+            await battle_sleep(0.002)
 
     async def trigger_defeat(self, target) -> None:
         """Trigger defeat events for passives that need cleanup on defeat."""
-        counts = Counter(target.passives)
-        for pid, count in counts.items():
-            cls = self._registry.get(pid)
-            if cls is None:
-                continue
-            passive_instance = cls()
-
-            # Check if passive has defeat handling
-            if hasattr(passive_instance, "on_defeat"):
-                stacks = min(count, getattr(cls, "max_stacks", count))
-                for _ in range(stacks):
-                    await passive_instance.on_defeat(target)
-                    await asyncio.sleep(0.002)
+        for _pid, _cls, stacks in self._handlers(target, "defeat"):
+            for passive in stacks:
+                await passive.on_defeat(target)
+            await battle_sleep(0.002)
 
     async def trigger_summon_defeat(self, target, **kwargs) -> None:
         """Trigger summon defeat events for relevant passives."""
-        counts = Counter(target.passives)
-        for pid, count in counts.items():
-            cls = self._registry.get(pid)
-            if cls is None:
-                continue
-            passive_instance = cls()
-            if hasattr(passive_instance, "on_summon_defeat"):
-                stacks = min(count, getattr(cls, "max_stacks", count))
-                for _ in range(stacks):
-                    try:
-                        await passive_instance.on_summon_defeat(target, **kwargs)
-                    except TypeError:
-                        await passive_instance.on_summon_defeat(target)
-                    await asyncio.sleep(0.002)
+        for _pid, _cls, stacks in self._handlers(target, "summon_defeat"):
+            for passive in stacks:
+                await _call(passive.on_summon_defeat, ((target,), kwargs), ((target,), {}))
+            await battle_sleep(0.002)
 
     async def trigger_hit_landed(self, attacker, target, damage: int = 0, action_type: str = "attack", **kwargs) -> None:
         """Trigger passives when a hit successfully lands."""
-        counts = Counter(attacker.passives)
-        for pid, count in counts.items():
-            cls = self._registry.get(pid)
-            if cls is None or not _supports_event(cls, "hit_landed"):
-                continue
-
-            passive_instance = cls()
-
+        for _pid, cls, stacks in self._handlers(attacker, "hit_landed"):
             # Special handling for hit-based passives
-            if hasattr(passive_instance, "on_hit_landed"):
-                stacks = min(count, getattr(cls, "max_stacks", count))
-                for _ in range(stacks):
-                    await passive_instance.on_hit_landed(attacker, target, damage, action_type, **kwargs)
-                    await asyncio.sleep(0.002)
+            if hasattr(cls, "on_hit_landed"):
+                for passive in stacks:
+                    await passive.on_hit_landed(attacker, target, damage, action_type, **kwargs)
 
             # Regular passive application with enhanced context
-            stacks = min(count, getattr(cls, "max_stacks", count))
-            for _ in range(stacks):
-                try:
-                    await passive_instance.apply(attacker, hit_target=target, damage=damage, action_type=action_type, event="hit_landed", **kwargs)
-                except TypeError:
-                    try:
-                        await passive_instance.apply(attacker, hit_target=target, damage=damage, action_type=action_type)
-                    except TypeError:
-                        # Fall back to simple apply for existing passives
-                        await passive_instance.apply(attacker)
-                await asyncio.sleep(0.002)
+            for passive in stacks:
+                await _call(
+                    passive.apply,
+                    (
+                        (attacker,),
+                        {"hit_target": target, "damage": damage, "action_type": action_type, "event": "hit_landed", **kwargs},
+                    ),
+                    ((attacker,), {"hit_target": target, "damage": damage, "action_type": action_type}),
+                    # Fall back to simple apply for existing passives
+                    ((attacker,), {}),
+                )
+            await battle_sleep(0.002)
 
     async def trigger_turn_start(self, target, **kwargs) -> None:
         """Trigger turn start events for passives that need turn initialization."""
-        counts = Counter(target.passives)
-        for pid, count in counts.items():
-            cls = self._registry.get(pid)
-            if cls is None:
-                continue
-
-            passive_instance = cls()
-            supports_turn_start = _supports_event(cls, "turn_start")
-
-            if not supports_turn_start and not hasattr(passive_instance, "on_turn_start"):
-                continue
-
+        for _pid, cls, stacks in self._handlers(target, "turn_start"):
             # Special handling for turn start passives
-            if hasattr(passive_instance, "on_turn_start"):
-                stacks = min(count, getattr(cls, "max_stacks", count))
-                for _ in range(stacks):
-                    await passive_instance.on_turn_start(target, **kwargs)
-                    await asyncio.sleep(0.002)
+            if hasattr(cls, "on_turn_start"):
+                for passive in stacks:
+                    await passive.on_turn_start(target, **kwargs)
 
             # Regular passive application only for turn_start passives; be lenient with kwargs
-            if supports_turn_start:
-                stacks = min(count, getattr(cls, "max_stacks", count))
-                for _ in range(stacks):
-                    try:
-                        await passive_instance.apply(target, event="turn_start", **kwargs)
-                    except TypeError:
-                        try:
-                            await passive_instance.apply(target, **kwargs)
-                        except TypeError:
-                            await passive_instance.apply(target)
-                    await asyncio.sleep(0.002)
+            if _supports_event(cls, "turn_start"):
+                for passive in stacks:
+                    await _call(
+                        passive.apply,
+                        ((target,), {"event": "turn_start", **kwargs}),
+                        ((target,), kwargs),
+                        ((target,), {}),
+                    )
+            await battle_sleep(0.002)
 
     async def trigger_level_up(self, target, **kwargs) -> None:
         """Trigger level up events for passives that respond to leveling."""
-        counts = Counter(target.passives)
-        for pid, count in counts.items():
-            cls = self._registry.get(pid)
-            if cls is None or not _supports_event(cls, "level_up"):
-                continue
-
-            passive_instance = cls()
-
+        for pid, cls, stacks in self._handlers(target, "level_up"):
             # Special handling for level up passives
-            if hasattr(passive_instance, "on_level_up"):
-                stacks = min(count, getattr(cls, "max_stacks", count))
-                for _ in range(stacks):
-                    await passive_instance.on_level_up(target, **kwargs)
-                    await asyncio.sleep(0.002)
+            if hasattr(cls, "on_level_up"):
+                for passive in stacks:
+                    await passive.on_level_up(target, **kwargs)
 
             # Regular passive application
-            stacks = min(count, getattr(cls, "max_stacks", count))
-            for _ in range(stacks):
+            for passive in stacks:
                 try:
-                    await passive_instance.apply(target, event="level_up", **kwargs)
+                    await _call(
+                        passive.apply,
+                        ((target,), {"event": "level_up", **kwargs}),
+                        ((target,), kwargs),
+                        ((target,), {}),
+                    )
                 except TypeError:
-                    try:
-                        await passive_instance.apply(target, **kwargs)
-                    except TypeError:
-                        try:
-                            await passive_instance.apply(target)
-                        except TypeError:
-                            log.warning(
-                                "Passive %s incompatible with level_up kwargs", pid
-                            )
-                await asyncio.sleep(0.002)
+                    log.warning(
+                        "Passive %s incompatible with level_up kwargs", pid
+                    )
+            await battle_sleep(0.002)
 
     def describe(self, target) -> list[dict[str, Any]]:
         """Return structured information for a target's passives."""
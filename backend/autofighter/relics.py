@@ -1,3 +1,4 @@
+from collections.abc import Collection
 from pathlib import Path
 import random
 
@@ -24,23 +25,55 @@ def award_relic(party: Party, relic_id: str) -> RelicBase | None:
     return relic_cls()
 
 
-def relic_choices(party: Party, stars: int, count: int = 3) -> list[RelicBase]:
+_pools: tuple[object, dict[int, tuple[str, ...]]] | None = None
+
+# Injected by battle logic only when no card options exist
+FALLBACK_RELIC_ID = "fallback_essence"
+
+
+def _star_pools() -> dict[int, tuple[str, ...]]:
+    """Relic ids grouped by star tier, built once from registry metadata."""
+    global _pools
+    registry = _registry()
+    if _pools is None or _pools[0] is not registry:
+        by_stars: dict[int, list[str]] = {}
+        for rid in registry:
+            if rid == FALLBACK_RELIC_ID:
+                continue
+            stars = registry.metadata(rid).get("stars")
+            if stars is None:
+                stars = registry[rid]().stars
+            by_stars.setdefault(stars, []).append(rid)
+        _pools = (registry, {s: tuple(sorted(ids)) for s, ids in by_stars.items()})
+    return _pools[1]
+
+
+def relic_pool(stars: int) -> tuple[str, ...]:
+    """Return the ids of every regular relic with ``stars`` stars."""
+    return _star_pools().get(stars, ())
+
+
+def sample_relic_ids(stars: int, count: int, exclude: Collection[str] = ()) -> list[str]:
+    """Pick up to ``count`` unique relic ids of a star tier, skipping ``exclude``."""
+    excluded = exclude if isinstance(exclude, (set, frozenset)) else set(exclude)
+    pool = [rid for rid in relic_pool(stars) if rid not in excluded]
+    return random.sample(pool, k=min(count, len(pool)))
+
+
+def relic_choices(
+    party: Party, stars: int, count: int = 3, exclude: Collection[str] = ()
+) -> list[RelicBase]:
     """Return up to `count` unique relic options for the given star level.
 
     Ownership is NOT considered here (relics may be offered even if already
     owned). The function avoids duplicate options within a single selection
     batch but may include relics already present in `party.relics`. The special
     fallback relic is excluded here and injected by battle logic only when no
-    card options exist.
+    card options exist. ``exclude`` removes ids already offered elsewhere.
+    Only the sampled relics are instantiated.
     """
-    relics = [cls() for cls in _registry().values()]
-    # Exclude only the fallback essence from normal pools; allow owned relics
-    available = [r for r in relics if r.stars == stars and r.id != "fallback_essence"]
-    if not available:
-        return []
-    # Ensure uniqueness within this call
-    k = min(count, len(available))
-    return random.sample(available, k=k)
+    registry = _registry()
+    return [registry[rid]() for rid in sample_relic_ids(stars, count, exclude)]
 
 def apply_relics(party: Party) -> None:
     registry = _registry()
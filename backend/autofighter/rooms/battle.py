@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import asyncio
 from collections.abc import Awaitable
 from collections.abc import Callable
 import copy
@@ -16,6 +15,9 @@ from battle_logging import start_battle_logging
 from services.user_level_service import gain_user_exp
 from services.user_level_service import get_user_level
 
+from autofighter.battle_context import BattleContext
+from autofighter.battle_context import current_battle_context
+from autofighter.battle_context import in_battle_context
 from autofighter.cards import apply_cards
 from autofighter.cards import card_choices
 from autofighter.effects import EffectManager
@@ -36,6 +38,7 @@ from ..stats import Stats
 from ..stats import calc_animation_time
 from ..stats import set_enrage_percent
 from . import Room
+from .utils import SerializeCache
 from .utils import _build_foes
 from .utils import _scale_stats
 from .utils import _serialize
@@ -48,16 +51,26 @@ ENRAGE_TURNS_BOSS = 500
 # Explicit pacing between combat actions (seconds)
 TURN_PACING = 0.5
 
-_EXTRA_TURNS: dict[int, int] = {}
+# Bonus turns one after another before the timeline must advance
+MAX_CHAINED_BONUS_TURNS = 9
 
 
 def _grant_extra_turn(entity: Stats) -> None:
+    ctx = current_battle_context()
+    queue = ctx.action_queue
+    if queue is not None and entity in queue:
+        queue.grant_extra_turn(entity)
+        return
     ident = id(entity)
-    _EXTRA_TURNS[ident] = _EXTRA_TURNS.get(ident, 0) + 1
+    ctx.extra_turns[ident] = ctx.extra_turns.get(ident, 0) + 1
 
 
 def _clear_extra_turns(_entity: Stats) -> None:
-    _EXTRA_TURNS.clear()
+    ctx = current_battle_context()
+    ctx.extra_turns.clear()
+    if ctx.action_queue is not None:
+        ctx.action_queue.bonus_actors.clear()
+        ctx.action_queue.deferred_bonus.clear()
 
 
 BUS.subscribe("extra_turn", _grant_extra_turn)
@@ -166,10 +179,27 @@ class BattleRoom(Room):
         foe: Stats | list[Stats] | None = None,
         run_id: str | None = None,
     ) -> dict[str, Any]:
-        from game import battle_snapshots
-        from game import battle_tasks
+        """Fight the battle inside its own :class:`BattleContext`.
 
+        A context that is already active (for example one set up by a caller
+        that wants to inspect it afterwards) is reused.
+        """
+        if in_battle_context():
+            return await self._resolve(party, data, progress, foe, run_id)
+        with BattleContext(run_id=run_id).activate():
+            return await self._resolve(party, data, progress, foe, run_id)
+
+    async def _resolve(
+        self,
+        party: Party,
+        data: dict[str, Any],
+        progress: Callable[[dict[str, Any]], Awaitable[None]] | None,
+        foe: Stats | list[Stats] | None,
+        run_id: str | None,
+    ) -> dict[str, Any]:
         registry = PassiveRegistry()
+        ctx = current_battle_context()
+        clock = ctx.clock
         start_gold = party.gold
         if foe is None:
             foes = _build_foes(self.node, party)
@@ -208,18 +238,17 @@ class BattleRoom(Room):
             member.effect_manager = mgr
             party_effects.append(mgr)
 
-        # Initialize a visual action queue for UI snapshots (mid-left action bar)
-        try:
-            q_entities = [
-                e for e in list(combat_party.members) + list(foes)
-                if not isinstance(e, Summon)
-            ]
-            _visual_queue = ActionQueue(q_entities)
-        except Exception:
-            _visual_queue = None
+        # Turn order comes from one action-value timeline shared with the UI
+        queue = ActionQueue(list(combat_party.members) + list(foes))
+        ctx.action_queue = queue
+        party_ids = {id(m) for m in combat_party.members}
+        # Extra turns granted before the timeline existed
+        for c in queue.combatants:
+            for _ in range(ctx.extra_turns.pop(id(c), 0)):
+                queue.grant_extra_turn(c)
 
         # Start battle logging once before emitting any events so participants are captured
-        battle_logger = start_battle_logging()
+        battle_logger = start_battle_logging(ctx.run_id)
         try:
             if battle_logger is not None:
                 battle_logger.summary.party_members = [m.id for m in combat_party.members]
@@ -229,6 +258,10 @@ class BattleRoom(Room):
                 for rid in combat_party.relics:
                     relic_counts[rid] = relic_counts.get(rid, 0) + 1
                 battle_logger.summary.party_relics = relic_counts
+                battle_logger.summary.floor = self.node.floor
+                battle_logger.summary.room_index = self.node.index
+                battle_logger.summary.loop = self.node.loop
+                battle_logger.summary.room_type = self.node.room_type
         except Exception:
             pass
 
@@ -254,6 +287,9 @@ class BattleRoom(Room):
         exp_reward = 0
         credited_foe_ids: set[str] = set()
 
+        # Combatants are only re-serialized after they change
+        serialize = SerializeCache()
+
         def _collect_summons(
             entities: list[Stats],
         ) -> dict[str, list[dict[str, Any]]]:
@@ -261,69 +297,34 @@ class BattleRoom(Room):
             for ent in entities:
                 sid = getattr(ent, "id", str(id(ent)))
                 for summon in SummonManager.get_summons(sid):
-                    snap = _serialize(summon)
+                    snap = dict(serialize(summon))
                     snap["owner_id"] = sid
                     snapshots.setdefault(sid, []).append(snap)
             return snapshots
 
         def _queue_snapshot() -> list[dict[str, Any]]:
-            ordered = sorted(
-                [
-                    c
-                    for c in combat_party.members + foes
-                    if not isinstance(c, Summon)
-                ],
-                key=lambda c: getattr(c, "action_value", 0.0),
-            )
-            extras: list[dict[str, Any]] = []
-            for ent in ordered:
-                turns = _EXTRA_TURNS.get(id(ent), 0)
-                for _ in range(turns):
-                    extras.append(
-                        {
-                            "id": getattr(ent, "id", ""),
-                            "action_gauge": getattr(ent, "action_gauge", 0),
-                            "action_value": getattr(ent, "action_value", 0.0),
-                            "base_action_value": getattr(ent, "base_action_value", 0.0),
-                            "bonus": True,
-                        }
-                    )
-            return extras + [
-                {
-                    "id": getattr(c, "id", ""),
-                    "action_gauge": getattr(c, "action_gauge", 0),
-                    "action_value": getattr(c, "action_value", 0.0),
-                    "base_action_value": getattr(c, "base_action_value", 0.0),
-                }
-                for c in ordered
-            ]
+            return queue.snapshot(lambda c: not isinstance(c, Summon))
 
-        def _advance_queue(actor: Stats) -> None:
-            """Advance the visual action queue using the provided actor."""
-            try:
-                if _visual_queue is None:
-                    return
-                _visual_queue.advance_with_actor(actor)
-            except Exception:
-                pass
-
-        def _abort(other_id: str) -> None:
-            msg = "concurrent battle detected"
-            snap = {
-                "result": "error",
-                "error": msg,
-                "ended": True,
-                "party": [],
-                "foes": [],
-                "awaiting_next": False,
-                "awaiting_card": False,
-                "awaiting_relic": False,
-                "awaiting_loot": False,
+        def _progress_update(active_id: str | None) -> dict[str, Any]:
+            return {
+                "result": "battle",
+                "party": [
+                    serialize(m)
+                    for m in combat_party.members
+                    if not isinstance(m, Summon)
+                ],
+                "foes": [
+                    serialize(f)
+                    for f in foes
+                    if not isinstance(f, Summon)
+                ],
+                "party_summons": _collect_summons(combat_party.members),
+                "foe_summons": _collect_summons(foes),
+                "enrage": {"active": enrage_active, "stacks": enrage_stacks, "turns": enrage_stacks},
+                "rdr": temp_rdr,
+                "action_queue": _queue_snapshot(),
+                "active_id": active_id,
             }
-            if run_id is not None:
-                battle_snapshots[run_id] = snap
-            battle_snapshots[other_id] = snap
-            raise RuntimeError(msg)
 
         async def _credit_if_dead(foe_obj) -> None:
             nonlocal exp_reward, temp_rdr
@@ -349,12 +350,52 @@ class BattleRoom(Room):
                 # Never let EXP crediting break battle flow
                 pass
 
-        def _remove_dead_foes() -> None:
+        def _remove_dead() -> None:
+            """Drop dead foes and take fallen party members off the timeline."""
             for i in range(len(foes) - 1, -1, -1):
                 if getattr(foes[i], "hp", 1) <= 0:
+                    queue.remove(foes[i])
                     foes.pop(i)
                     foe_effects.pop(i)
                     enrage_mods.pop(i)
+            for m in combat_party.members:
+                if m.hp <= 0:
+                    queue.remove(m)
+                elif m not in queue and not _dismissed(m):
+                    # Revived mid-battle; rejoin with a full gauge
+                    queue.add(m)
+
+        def _sync_summons() -> None:
+            """Enrol summons created during the last action so they take turns."""
+            try:
+                # Add party-side summons
+                SummonManager.add_summons_to_party(combat_party)
+                for s in combat_party.members[len(party_effects):]:
+                    mgr = getattr(s, "effect_manager", None) or EffectManager(s)
+                    s.effect_manager = mgr
+                    party_effects.append(mgr)
+                    party_ids.add(id(s))
+                    queue.add(s)
+                # Add foe-side summons to foes list with effect managers
+                for foe_owner in list(foes):
+                    owner_id = getattr(foe_owner, 'id', str(id(foe_owner)))
+                    for s in SummonManager.get_summons(owner_id):
+                        if s not in foes:
+                            foes.append(s)
+                            mgr = EffectManager(s)
+                            s.effect_manager = mgr
+                            foe_effects.append(mgr)
+                            enrage_mods.append(None)
+                            queue.add(s)
+            except Exception:
+                pass
+
+        def _dismissed(actor: Stats) -> bool:
+            """Whether ``actor`` is a summon that has expired or been removed."""
+            if not isinstance(actor, Summon):
+                return False
+            return actor not in SummonManager.get_summons(actor.summoner_id)
+
         turn = 0
         temp_rdr = party.rdr
         if progress is not None:
@@ -362,11 +403,11 @@ class BattleRoom(Room):
                 {
                     "result": "battle",
                     "party": [
-                        _serialize(m)
+                        serialize(m)
                         for m in combat_party.members
                         if not isinstance(m, Summon)
                     ],
-                    "foes": [_serialize(f) for f in foes],
+                    "foes": [serialize(f) for f in foes],
                     "party_summons": _collect_summons(combat_party.members),
                     "foe_summons": _collect_summons(foes),
                     "enrage": {"active": False, "stacks": 0, "turns": 0},
@@ -378,7 +419,7 @@ class BattleRoom(Room):
         # Helper to pace actions: dynamic pacing based on combatant count
         async def _pace(start_time: float) -> None:
             try:
-                elapsed = asyncio.get_event_loop().time() - start_time
+                elapsed = clock.now() - start_time
             except Exception:
                 elapsed = 0.0
 
@@ -387,519 +428,368 @@ class BattleRoom(Room):
             wait = base_wait - elapsed
             if wait > 0:
                 try:
-                    await asyncio.sleep(wait)
+                    await clock.sleep(wait)
                 except Exception:
                     pass
 
             # Always pause an additional half-second between turns
             try:
-                await asyncio.sleep(TURN_PACING)
+                await clock.sleep(TURN_PACING)
             except Exception:
                 pass
 
-        while any(f.hp > 0 for f in foes) and any(
-            m.hp > 0 for m in combat_party.members
-        ):
-            for member_effect, member in zip(party_effects, combat_party.members, strict=False):
-                safety = 0
-                while True:
-                    safety += 1
-                    if safety > 10:
-                        break
-                    action_start = asyncio.get_event_loop().time()
-                    if member.hp <= 0:
-                        await asyncio.sleep(0.001)
-                        break
-                    turn += 1
-                    if turn > threshold:
-                        if not enrage_active:
-                            enrage_active = True
-                            for f in foes:
-                                f.passives.append("Enraged")
-                            log.info("Enrage activated")
-                        new_stacks = turn - threshold
-                        # Make enrage much stronger: each stack adds +135% damage taken
-                        # and massive damage dealt bonuses.
-                        set_enrage_percent(1.35 * max(new_stacks, 0))
-                        mult = 1 + 2.0 * new_stacks
-                        for i, (f, mgr) in enumerate(zip(foes, foe_effects, strict=False)):
-                            if enrage_mods[i] is not None:
-                                enrage_mods[i].remove()
-                                try:
-                                    mgr.mods.remove(enrage_mods[i])
-                                    if enrage_mods[i].id in f.mods:
-                                        f.mods.remove(enrage_mods[i].id)
-                                except ValueError:
-                                    pass
-                            mod = create_stat_buff(f, name="enrage_atk", atk_mult=mult, turns=9999)
-                            mgr.add_modifier(mod)
-                            enrage_mods[i] = mod
-                        enrage_stacks = new_stacks
-                        if turn > 1000:
-                            turns_in_enrage = max(enrage_stacks, 0)
-                            extra_damage = 100 * turns_in_enrage
-                            for m in combat_party.members:
-                                if m.hp > 0 and extra_damage > 0:
-                                    await m.apply_damage(extra_damage)
-                            for f in foes:
-                                if f.hp > 0 and extra_damage > 0:
-                                    await f.apply_damage(extra_damage)
-                    else:
-                        # Not enraged yet; ensure percent is zero
-                        set_enrage_percent(0.0)
-                    await registry.trigger("turn_start", member)
-                    if run_id is not None:
-                        for other_id, task in list(battle_tasks.items()):
-                            if other_id != run_id and not task.done():
-                                other_task = battle_tasks.pop(other_id, None)
-                                current_task = battle_tasks.pop(run_id, None)
-                                if other_task:
-                                    other_task.cancel()
-                                if current_task and not current_task.done():
-                                    current_task.cancel()
-                                _abort(other_id)
-                    # Also trigger the enhanced turn_start method with battle context
-                    await registry.trigger_turn_start(member, turn=turn, party=combat_party.members, foes=foes, enrage_active=enrage_active)
-                    # Emit BUS event for relics that subscribe to turn_start - async for better performance
-                    await BUS.emit_async("turn_start", member)
-                    log.debug("%s turn start", member.id)
-                    await member.maybe_regain(turn)
-                    # If all foes died earlier in this round, stop taking actions
-                    if not any(f.hp > 0 for f in foes):
-                        break
-                    alive_targets = [
-                        (i, f) for i, f in enumerate(foes) if f.hp > 0
-                    ]
-                    if not alive_targets:
-                        break
-                    weights = [max(f.aggro, 0.0) for _, f in alive_targets]
-                    if sum(weights) > 0:
-                        tgt_idx, tgt_foe = random.choices(
-                            alive_targets, weights=weights
-                        )[0]
-                    else:
-                        tgt_idx, tgt_foe = random.choice(alive_targets)
-                    tgt_mgr = foe_effects[tgt_idx]
-                    dt = getattr(member, "damage_type", None)
-                    await member_effect.tick(tgt_mgr)
-                    # Credit any foes that died due to DoT/HoT ticks
+        async def _party_turn(member: Stats) -> None:
+            nonlocal turn, enrage_active, enrage_stacks, enrage_bleed_applies
+            member_effect = member.effect_manager
+            action_start = clock.now()
+            turn += 1
+            if battle_logger is not None:
+                battle_logger.turn = turn
+            if turn > threshold:
+                if not enrage_active:
+                    enrage_active = True
                     for f in foes:
-                        await _credit_if_dead(f)
-                    _remove_dead_foes()
-                    if not foes:
-                        break
-                    if member.hp <= 0:
-                        await registry.trigger("turn_end", member, party=combat_party.members, foes=foes)
-                        await asyncio.sleep(0.001)
-                        break
-                    proceed = await member_effect.on_action()
-                    if proceed is None:
-                        proceed = True
-                    if proceed and hasattr(dt, "on_action"):
-                        res = await dt.on_action(
-                            member,
-                            combat_party.members,
-                            foes,
-                        )
-                        proceed = True if res is None else bool(res)
-                    if getattr(member, "ultimate_ready", False) and hasattr(dt, "ultimate"):
-                        if hasattr(member, "use_ultimate") and member.use_ultimate():
-                            try:
-                                # Emit ultimate start event
-                                await BUS.emit_async("ultimate_used", member, None, 0, "ultimate", {"ultimate_type": getattr(member.damage_type, 'id', 'generic')})
-                                await dt.ultimate(member, combat_party.members, foes)
-                                # Emit ultimate end event
-                                await BUS.emit_async("ultimate_completed", member, None, 0, "ultimate", {"ultimate_type": getattr(member.damage_type, 'id', 'generic')})
-                            except Exception as e:
-                                # Emit ultimate failed event
-                                await BUS.emit_async("ultimate_failed", member, None, 0, "ultimate", {"ultimate_type": getattr(member.damage_type, 'id', 'generic'), "error": str(e)})
-                                pass
-                    if not proceed:
-                        await BUS.emit_async("action_used", member, member, 0)
-                        await registry.trigger("turn_end", member, party=combat_party.members, foes=foes)
-                        if _EXTRA_TURNS.get(id(member), 0) > 0 and member.hp > 0:
-                            _EXTRA_TURNS[id(member)] -= 1
-                            await _pace(action_start)
-                            continue
-                        if progress is not None:
-                            await progress(
-                                {
-                                    "result": "battle",
-                                    "party": [
-                                        _serialize(m)
-                                        for m in combat_party.members
-                                        if not isinstance(m, Summon)
-                                    ],
-                                    "foes": [_serialize(f) for f in foes],
-                                    "party_summons": _collect_summons(combat_party.members),
-                                    "foe_summons": _collect_summons(foes),
-                                    "enrage": {
-                                        "active": enrage_active,
-                                        "stacks": enrage_stacks,
-                                        "turns": enrage_stacks,
-                                    },
-                                    "rdr": temp_rdr,
-                                    "action_queue": _queue_snapshot(),
-                                    "active_id": member.id,
-                                }
-                            )
-                        await _pace(action_start)
-                        await asyncio.sleep(0.001)
-                        break
-                    dmg = await tgt_foe.apply_damage(member.atk, attacker=member, action_name="Normal Attack")
-                    if dmg <= 0:
-                        log.info("%s's attack was dodged by %s", member.id, tgt_foe.id)
-                    else:
-                        log.info("%s hits %s for %s", member.id, tgt_foe.id, dmg)
-                        damage_type = getattr(member.damage_type, 'id', 'generic') if hasattr(member, 'damage_type') else 'generic'
-                        await BUS.emit_async("hit_landed", member, tgt_foe, dmg, "attack", f"{damage_type}_attack")
-                        # Trigger hit_landed passives for the attacker
-                        await registry.trigger_hit_landed(member, tgt_foe, dmg, "attack",
-                                                        damage_type=damage_type,
-                                                        party=combat_party.members,
-                                                        foes=foes)
-                    tgt_mgr.maybe_inflict_dot(member, dmg)
-                    targets_hit = 1
-                    if getattr(member.damage_type, "id", "").lower() == "wind":
-                        # Compute dynamic scaling based on number of living targets.
-                        # Example mapping from N targets -> scale = 1 / (2N):
-                        # 4 targets => 1/8, 5 targets => 1/10, etc.
-                        try:
-                            living_targets = sum(1 for f in foes if getattr(f, "hp", 0) > 0)
-                        except Exception:
-                            living_targets = len(foes) if isinstance(foes, list) else 1
-                        living_targets = max(1, int(living_targets))
-                        scale = 1.0 / (2.0 * living_targets)
-                        scaled_atk = member.atk * scale
-                        for extra_idx, extra_foe in enumerate(foes):
-                            if extra_idx == tgt_idx or extra_foe.hp <= 0:
-                                await asyncio.sleep(0.001)
-                                continue
-                            extra_dmg = await extra_foe.apply_damage(
-                                scaled_atk, attacker=member, action_name="Wind Spread"
-                            )
-                            targets_hit += 1
-                            if extra_dmg <= 0:
-                                log.info(
-                                    "%s's attack was dodged by %s",
-                                    member.id,
-                                    extra_foe.id,
-                                )
-                            else:
-                                log.info(
-                                    "%s hits %s for %s",
-                                    member.id,
-                                    extra_foe.id,
-                                    extra_dmg,
-                                )
-                                await BUS.emit_async("hit_landed", member, extra_foe, extra_dmg, "attack", "wind_multi_attack")
-                                # Trigger hit_landed passives for wind multi-attack
-                                await registry.trigger_hit_landed(member, extra_foe, extra_dmg, "wind_multi_attack",
-                                                                damage_type="wind",
-                                                                party=combat_party.members,
-                                                                foes=foes)
-                            foe_effects[extra_idx].maybe_inflict_dot(member, extra_dmg)
-                            await _credit_if_dead(extra_foe)
-                            _remove_dead_foes()
-                            if not foes:
-                                break
-                        if not foes:
-                            break
-                    await BUS.emit_async("action_used", member, tgt_foe, dmg)
-                    duration = calc_animation_time(member, targets_hit)
-                    if duration > 0:
-                        await BUS.emit_async(
-                            "animation_start", member, targets_hit, duration
-                        )
+                        f.passives.append("Enraged")
+                    log.info("Enrage activated")
+                new_stacks = turn - threshold
+                # Make enrage much stronger: each stack adds +135% damage taken
+                # and massive damage dealt bonuses.
+                set_enrage_percent(1.35 * max(new_stacks, 0))
+                mult = 1 + 2.0 * new_stacks
+                for i, (f, mgr) in enumerate(zip(foes, foe_effects, strict=False)):
+                    if enrage_mods[i] is not None:
+                        enrage_mods[i].remove()
                         try:
-                            await asyncio.sleep(duration)
-                        finally:
-                            await BUS.emit_async(
-                                "animation_end", member, targets_hit, duration
-                            )
-                    # Trigger action_taken passives for the acting member
-                    await registry.trigger("action_taken", member, target=tgt_foe, damage=dmg, party=combat_party.members, foes=foes)
-                    # Sync any new summons into party/foes so they can act this round
+                            mgr.mods.remove(enrage_mods[i])
+                            if enrage_mods[i].id in f.mods:
+                                f.mods.remove(enrage_mods[i].id)
+                        except ValueError:
+                            pass
+                    mod = create_stat_buff(f, name="enrage_atk", atk_mult=mult, turns=9999)
+                    mgr.add_modifier(mod)
+                    enrage_mods[i] = mod
+                enrage_stacks = new_stacks
+                if turn > 1000:
+                    turns_in_enrage = max(enrage_stacks, 0)
+                    extra_damage = 100 * turns_in_enrage
+                    for m in combat_party.members:
+                        if m.hp > 0 and extra_damage > 0:
+                            await m.apply_damage(extra_damage)
+                    for f in foes:
+                        if f.hp > 0 and extra_damage > 0:
+                            await f.apply_damage(extra_damage)
+            else:
+                # Not enraged yet; ensure percent is zero
+                set_enrage_percent(0.0)
+            await registry.trigger("turn_start", member)
+            # Also trigger the enhanced turn_start method with battle context
+            await registry.trigger_turn_start(member, turn=turn, party=combat_party.members, foes=foes, enrage_active=enrage_active)
+            # Emit BUS event for relics that subscribe to turn_start - async for better performance
+            await BUS.emit_async("turn_start", member)
+            log.debug("%s turn start", member.id)
+            await member.maybe_regain(turn)
+            # If all foes died earlier, stop taking actions
+            if not any(f.hp > 0 for f in foes):
+                return
+            alive_targets = [
+                (i, f) for i, f in enumerate(foes) if f.hp > 0
+            ]
+            if not alive_targets:
+                return
+            weights = [max(f.aggro, 0.0) for _, f in alive_targets]
+            if sum(weights) > 0:
+                tgt_idx, tgt_foe = random.choices(
+                    alive_targets, weights=weights
+                )[0]
+            else:
+                tgt_idx, tgt_foe = random.choice(alive_targets)
+            tgt_mgr = foe_effects[tgt_idx]
+            dt = getattr(member, "damage_type", None)
+            await member_effect.tick(tgt_mgr)
+            # Credit any foes that died due to DoT/HoT ticks
+            for f in foes:
+                await _credit_if_dead(f)
+            _remove_dead()
+            if not foes:
+                return
+            if member.hp <= 0:
+                await registry.trigger("turn_end", member, party=combat_party.members, foes=foes)
+                await clock.sleep(0.001)
+                return
+            proceed = await member_effect.on_action()
+            if proceed is None:
+                proceed = True
+            if proceed and hasattr(dt, "on_action"):
+                res = await dt.on_action(
+                    member,
+                    combat_party.members,
+                    foes,
+                )
+                proceed = True if res is None else bool(res)
+            if getattr(member, "ultimate_ready", False) and hasattr(dt, "ultimate"):
+                if hasattr(member, "use_ultimate") and member.use_ultimate():
                     try:
-                        # Add party-side summons
-                        SummonManager.add_summons_to_party(combat_party)
-                        # Add foe-side summons to foes list with effect managers
-                        for foe_owner in list(foes):
-                            owner_id = getattr(foe_owner, 'id', str(id(foe_owner)))
-                            for s in SummonManager.get_summons(owner_id):
-                                if s not in foes:
-                                    foes.append(s)
-                                    mgr = EffectManager(s)
-                                    s.effect_manager = mgr
-                                    foe_effects.append(mgr)
-                                    enrage_mods.append(None)
-                    except Exception:
+                        # Emit ultimate start event
+                        await BUS.emit_async("ultimate_used", member, None, 0, "ultimate", {"ultimate_type": getattr(member.damage_type, 'id', 'generic')})
+                        await dt.ultimate(member, combat_party.members, foes)
+                        # Emit ultimate end event
+                        await BUS.emit_async("ultimate_completed", member, None, 0, "ultimate", {"ultimate_type": getattr(member.damage_type, 'id', 'generic')})
+                    except Exception as e:
+                        # Emit ultimate failed event
+                        await BUS.emit_async("ultimate_failed", member, None, 0, "ultimate", {"ultimate_type": getattr(member.damage_type, 'id', 'generic'), "error": str(e)})
                         pass
-                    member.add_ultimate_charge(member.actions_per_turn)
-                    for ally in combat_party.members:
-                        ally.handle_ally_action(member)
-                    if enrage_active:
-                        turns_since_enrage = max(enrage_stacks, 0)
-                        next_trigger = (enrage_bleed_applies + 1) * 10
-                        if turns_since_enrage >= next_trigger:
-                            stacks_to_add = 1 + enrage_bleed_applies
-                            from autofighter.effects import DamageOverTime
-                            for mgr in party_effects:
-                                for _ in range(stacks_to_add):
-                                    dmg_per_tick = int(max(mgr.stats.max_hp, 1) * 0.10)
-                                    mgr.add_dot(
-                                        DamageOverTime(
-                                            "Enrage Bleed", dmg_per_tick, 10, "enrage_bleed"
-                                        )
-                                    )
-                            for mgr, foe_obj in zip(foe_effects, foes, strict=False):
-                                for _ in range(stacks_to_add):
-                                    dmg_per_tick = int(max(foe_obj.max_hp, 1) * 0.10)
-                                    mgr.add_dot(
-                                        DamageOverTime(
-                                            "Enrage Bleed", dmg_per_tick, 10, "enrage_bleed"
-                                        )
-                                    )
-                            enrage_bleed_applies += 1
-                    await registry.trigger("turn_end", member, party=combat_party.members, foes=foes)
-                    await registry.trigger_turn_end(member)
-                    if _EXTRA_TURNS.get(id(member), 0) > 0 and member.hp > 0:
-                        _EXTRA_TURNS[id(member)] -= 1
-                        await _pace(action_start)
-                        await asyncio.sleep(0.001)
+            if not proceed:
+                await BUS.emit_async("action_used", member, member, 0)
+                await registry.trigger("turn_end", member, party=combat_party.members, foes=foes)
+                if progress is not None:
+                    await progress(_progress_update(member.id))
+                await _pace(action_start)
+                await clock.sleep(0.001)
+                return
+            dmg = await tgt_foe.apply_damage(member.atk, attacker=member, action_name="Normal Attack")
+            if dmg <= 0:
+                log.info("%s's attack was dodged by %s", member.id, tgt_foe.id)
+            else:
+                log.info("%s hits %s for %s", member.id, tgt_foe.id, dmg)
+                damage_type = getattr(member.damage_type, 'id', 'generic') if hasattr(member, 'damage_type') else 'generic'
+                await BUS.emit_async("hit_landed", member, tgt_foe, dmg, "attack", f"{damage_type}_attack")
+                # Trigger hit_landed passives for the attacker
+                await registry.trigger_hit_landed(member, tgt_foe, dmg, "attack",
+                                                damage_type=damage_type,
+                                                party=combat_party.members,
+                                                foes=foes)
+            tgt_mgr.maybe_inflict_dot(member, dmg)
+            targets_hit = 1
+            if getattr(member.damage_type, "id", "").lower() == "wind":
+                # Compute dynamic scaling based on number of living targets.
+                # Example mapping from N targets -> scale = 1 / (2N):
+                # 4 targets => 1/8, 5 targets => 1/10, etc.
+                try:
+                    living_targets = sum(1 for f in foes if getattr(f, "hp", 0) > 0)
+                except Exception:
+                    living_targets = len(foes) if isinstance(foes, list) else 1
+                living_targets = max(1, int(living_targets))
+                scale = 1.0 / (2.0 * living_targets)
+                scaled_atk = member.atk * scale
+                for extra_idx, extra_foe in enumerate(foes):
+                    if extra_idx == tgt_idx or extra_foe.hp <= 0:
+                        await clock.sleep(0.001)
                         continue
-                    if progress is not None:
-                        _advance_queue(member)
-                        await progress(
-                            {
-                                "result": "battle",
-                                "party": [
-                                    _serialize(m)
-                                    for m in combat_party.members
-                                    if not isinstance(m, Summon)
-                                ],
-                                "foes": [
-                                    _serialize(f)
-                                    for f in foes
-                                    if not isinstance(f, Summon)
-                                ],
-                                "party_summons": _collect_summons(combat_party.members),
-                                "foe_summons": _collect_summons(foes),
-                                "enrage": {"active": enrage_active, "stacks": enrage_stacks, "turns": enrage_stacks},
-                                "rdr": temp_rdr,
-                                "action_queue": _queue_snapshot(),
-                                "active_id": member.id,
-                            }
+                    extra_dmg = await extra_foe.apply_damage(
+                        scaled_atk, attacker=member, action_name="Wind Spread"
+                    )
+                    targets_hit += 1
+                    if extra_dmg <= 0:
+                        log.info(
+                            "%s's attack was dodged by %s",
+                            member.id,
+                            extra_foe.id,
                         )
-                    await _pace(action_start)
-                    if tgt_foe.hp <= 0:
-                        await _credit_if_dead(tgt_foe)
-                        _remove_dead_foes()
-                        await asyncio.sleep(0.001)
-                        if not foes:
-                            break
-                        await asyncio.sleep(0.001)
-                        continue
-                    await asyncio.sleep(0.001)
-                    break
-            # End of party member loop
-            if not foes:
-                break
-            # If party wiped during this round, stop taking actions
-            if not any(m.hp > 0 for m in combat_party.members):
-                break
-            # Foes: each living foe takes exactly one action per round
-            # Iterate over a snapshot to avoid mutating while iterating
-            for foe_idx, acting_foe in enumerate(list(foes)):
-                safety = 0
-                while True:
-                    safety += 1
-                    if safety > 10:
-                        break
-                    action_start = asyncio.get_event_loop().time()
-                    if acting_foe.hp <= 0:
-                        await asyncio.sleep(0.001)
-                        break
-                    alive_targets = [
-                        (idx, m)
-                        for idx, m in enumerate(combat_party.members)
-                        if m.hp > 0
-                    ]
-                    if not alive_targets:
-                        break
-                    weights = [max(m.aggro, 0.0) for _, m in alive_targets]
-                    if sum(weights) > 0:
-                        pidx, target = random.choices(
-                            alive_targets, weights=weights
-                        )[0]
                     else:
-                        pidx, target = random.choice(alive_targets)
-                    target_effect = party_effects[pidx]
-                    foe_mgr = foe_effects[foe_idx]
-                    await registry.trigger("turn_start", acting_foe)
-                    if run_id is not None:
-                        for other_id, task in list(battle_tasks.items()):
-                            if other_id != run_id and not task.done():
-                                other_task = battle_tasks.pop(other_id, None)
-                                current_task = battle_tasks.pop(run_id, None)
-                                if other_task:
-                                    other_task.cancel()
-                                if current_task and not current_task.done():
-                                    current_task.cancel()
-                                _abort(other_id)
-                    # Emit BUS event for relics that subscribe to turn_start - async for better performance
-                    await BUS.emit_async("turn_start", acting_foe)
-                    log.debug("%s turn start targeting %s", acting_foe.id, target.id)
-                    await acting_foe.maybe_regain(turn)
-                    dt = getattr(acting_foe, "damage_type", None)
-                    await foe_mgr.tick(target_effect)
-                    # Credit any foes that died from effects applied by foes (e.g., bleed)
-                    for f in foes:
-                        await _credit_if_dead(f)
-                    # Deferring foe removal until after the loop preserves turn order
-                    if all(f.hp <= 0 for f in foes):
-                        break
-                    if acting_foe.hp <= 0:
-                        await registry.trigger("turn_end", acting_foe, party=combat_party.members, foes=foes)
-                        await asyncio.sleep(0.001)
+                        log.info(
+                            "%s hits %s for %s",
+                            member.id,
+                            extra_foe.id,
+                            extra_dmg,
+                        )
+                        await BUS.emit_async("hit_landed", member, extra_foe, extra_dmg, "attack", "wind_multi_attack")
+                        # Trigger hit_landed passives for wind multi-attack
+                        await registry.trigger_hit_landed(member, extra_foe, extra_dmg, "wind_multi_attack",
+                                                        damage_type="wind",
+                                                        party=combat_party.members,
+                                                        foes=foes)
+                    foe_effects[extra_idx].maybe_inflict_dot(member, extra_dmg)
+                    await _credit_if_dead(extra_foe)
+                    _remove_dead()
+                    if not foes:
                         break
-                    proceed = await foe_mgr.on_action()
-                    if proceed is None:
-                        proceed = True
-                    if proceed and hasattr(dt, "on_action"):
-                        res = await dt.on_action(acting_foe, foes, combat_party.members)
-                        proceed = True if res is None else bool(res)
-                    if getattr(acting_foe, "ultimate_ready", False) and hasattr(dt, "ultimate"):
-                        if hasattr(acting_foe, "use_ultimate") and acting_foe.use_ultimate():
-                            try:
-                                # Emit ultimate start event for foes
-                                await BUS.emit_async("ultimate_used", acting_foe, None, 0, "ultimate", {"ultimate_type": getattr(acting_foe.damage_type, 'id', 'generic'), "caster_type": "foe"})
-                                await dt.ultimate(acting_foe, foes, combat_party.members)
-                                # Emit ultimate end event for foes
-                                await BUS.emit_async("ultimate_completed", acting_foe, None, 0, "ultimate", {"ultimate_type": getattr(acting_foe.damage_type, 'id', 'generic'), "caster_type": "foe"})
-                            except Exception as e:
-                                # Emit ultimate failed event for foes
-                                await BUS.emit_async("ultimate_failed", acting_foe, None, 0, "ultimate", {"ultimate_type": getattr(acting_foe.damage_type, 'id', 'generic'), "caster_type": "foe", "error": str(e)})
-                                pass
-                    if not proceed:
-                        await BUS.emit_async("action_used", acting_foe, acting_foe, 0)
-                        acting_foe.add_ultimate_charge(acting_foe.actions_per_turn)
-                        await registry.trigger("turn_end", acting_foe, party=combat_party.members, foes=foes)
-                        if _EXTRA_TURNS.get(id(acting_foe), 0) > 0 and acting_foe.hp > 0:
-                            _EXTRA_TURNS[id(acting_foe)] -= 1
-                            await _pace(action_start)
-                            continue
-                        if progress is not None:
-                            _advance_queue(acting_foe)
-                            await progress(
-                                {
-                                    "result": "battle",
-                                    "party": [
-                                        _serialize(m)
-                                        for m in combat_party.members
-                                        if not isinstance(m, Summon)
-                                    ],
-                                    "foes": [
-                                        _serialize(f)
-                                        for f in foes
-                                        if not isinstance(f, Summon)
-                                    ],
-                                    "party_summons": _collect_summons(combat_party.members),
-                                    "foe_summons": _collect_summons(foes),
-                                    "enrage": {
-                                        "active": enrage_active,
-                                        "stacks": enrage_stacks,
-                                        "turns": enrage_stacks,
-                                    },
-                                    "rdr": temp_rdr,
-                                    "action_queue": _queue_snapshot(),
-                                    "active_id": acting_foe.id,
-                                }
+                if not foes:
+                    return
+            await BUS.emit_async("action_used", member, tgt_foe, dmg)
+            duration = calc_animation_time(member, targets_hit)
+            if duration > 0:
+                await BUS.emit_async(
+                    "animation_start", member, targets_hit, duration
+                )
+                try:
+                    await clock.sleep(duration)
+                finally:
+                    await BUS.emit_async(
+                        "animation_end", member, targets_hit, duration
+                    )
+            # Trigger action_taken passives for the acting member
+            await registry.trigger("action_taken", member, target=tgt_foe, damage=dmg, party=combat_party.members, foes=foes)
+            # Sync any new summons into party/foes so they join the timeline
+            _sync_summons()
+            member.add_ultimate_charge(member.actions_per_turn)
+            for ally in combat_party.members:
+                ally.handle_ally_action(member)
+            if enrage_active:
+                turns_since_enrage = max(enrage_stacks, 0)
+                next_trigger = (enrage_bleed_applies + 1) * 10
+                if turns_since_enrage >= next_trigger:
+                    stacks_to_add = 1 + enrage_bleed_applies
+                    from autofighter.effects import DamageOverTime
+                    for mgr in party_effects:
+                        for _ in range(stacks_to_add):
+                            dmg_per_tick = int(max(mgr.stats.max_hp, 1) * 0.10)
+                            mgr.add_dot(
+                                DamageOverTime(
+                                    "Enrage Bleed", dmg_per_tick, 10, "enrage_bleed"
+                                )
                             )
-                        await _pace(action_start)
-                        await asyncio.sleep(0.001)
-                        break
-                    dmg = await target.apply_damage(acting_foe.atk, attacker=acting_foe)
-                    if dmg <= 0:
-                        log.info("%s's attack was dodged by %s", acting_foe.id, target.id)
-                    else:
-                        log.info("%s hits %s for %s", acting_foe.id, target.id, dmg)
-                        damage_type = getattr(acting_foe.damage_type, 'id', 'generic') if hasattr(acting_foe, 'damage_type') else 'generic'
-                        await BUS.emit_async("hit_landed", acting_foe, target, dmg, "attack", f"foe_{damage_type}_attack")
-                    target_effect.maybe_inflict_dot(acting_foe, dmg)
-                    targets_hit = 1
-                    await BUS.emit_async("action_used", acting_foe, target, dmg)
-                    duration = calc_animation_time(acting_foe, targets_hit)
-                    if duration > 0:
-                        await BUS.emit_async(
-                            "animation_start", acting_foe, targets_hit, duration
-                        )
-                        try:
-                            await asyncio.sleep(duration)
-                        finally:
-                            await BUS.emit_async(
-                                "animation_end", acting_foe, targets_hit, duration
+                    for mgr, foe_obj in zip(foe_effects, foes, strict=False):
+                        for _ in range(stacks_to_add):
+                            dmg_per_tick = int(max(foe_obj.max_hp, 1) * 0.10)
+                            mgr.add_dot(
+                                DamageOverTime(
+                                    "Enrage Bleed", dmg_per_tick, 10, "enrage_bleed"
+                                )
                             )
-                    # Trigger action_taken passives for the acting foe
-                    await registry.trigger("action_taken", acting_foe)
-                    # Sync any new summons created by foes
+                    enrage_bleed_applies += 1
+            await registry.trigger("turn_end", member, party=combat_party.members, foes=foes)
+            await registry.trigger_turn_end(member)
+            if progress is not None:
+                await progress(_progress_update(member.id))
+            await _pace(action_start)
+            if tgt_foe.hp <= 0:
+                # Felling the target earns an immediate follow-up action
+                await _credit_if_dead(tgt_foe)
+                _remove_dead()
+                if foes and member.hp > 0:
+                    queue.grant_extra_turn(member)
+            await clock.sleep(0.001)
+
+        async def _foe_turn(acting_foe: Stats) -> None:
+            action_start = clock.now()
+            alive_targets = [
+                (idx, m)
+                for idx, m in enumerate(combat_party.members)
+                if m.hp > 0
+            ]
+            if not alive_targets:
+                return
+            weights = [max(m.aggro, 0.0) for _, m in alive_targets]
+            if sum(weights) > 0:
+                pidx, target = random.choices(
+                    alive_targets, weights=weights
+                )[0]
+            else:
+                pidx, target = random.choice(alive_targets)
+            target_effect = party_effects[pidx]
+            foe_mgr = acting_foe.effect_manager
+            await registry.trigger("turn_start", acting_foe)
+            # Emit BUS event for relics that subscribe to turn_start - async for better performance
+            await BUS.emit_async("turn_start", acting_foe)
+            log.debug("%s turn start targeting %s", acting_foe.id, target.id)
+            await acting_foe.maybe_regain(turn)
+            dt = getattr(acting_foe, "damage_type", None)
+            await foe_mgr.tick(target_effect)
+            # Credit any foes that died from effects applied by foes (e.g., bleed)
+            for f in foes:
+                await _credit_if_dead(f)
+            if all(f.hp <= 0 for f in foes):
+                return
+            if acting_foe.hp <= 0:
+                await registry.trigger("turn_end", acting_foe, party=combat_party.members, foes=foes)
+                await clock.sleep(0.001)
+                return
+            proceed = await foe_mgr.on_action()
+            if proceed is None:
+                proceed = True
+            if proceed and hasattr(dt, "on_action"):
+                res = await dt.on_action(acting_foe, foes, combat_party.members)
+                proceed = True if res is None else bool(res)
+            if getattr(acting_foe, "ultimate_ready", False) and hasattr(dt, "ultimate"):
+                if hasattr(acting_foe, "use_ultimate") and acting_foe.use_ultimate():
                     try:
-                        SummonManager.add_summons_to_party(combat_party)
-                        for foe_owner in list(foes):
-                            owner_id = getattr(foe_owner, 'id', str(id(foe_owner)))
-                            for s in SummonManager.get_summons(owner_id):
-                                if s not in foes:
-                                    foes.append(s)
-                                    mgr = EffectManager(s)
-                                    s.effect_manager = mgr
-                                    foe_effects.append(mgr)
-                                    enrage_mods.append(None)
-                    except Exception:
+                        # Emit ultimate start event for foes
+                        await BUS.emit_async("ultimate_used", acting_foe, None, 0, "ultimate", {"ultimate_type": getattr(acting_foe.damage_type, 'id', 'generic'), "caster_type": "foe"})
+                        await dt.ultimate(acting_foe, foes, combat_party.members)
+                        # Emit ultimate end event for foes
+                        await BUS.emit_async("ultimate_completed", acting_foe, None, 0, "ultimate", {"ultimate_type": getattr(acting_foe.damage_type, 'id', 'generic'), "caster_type": "foe"})
+                    except Exception as e:
+                        # Emit ultimate failed event for foes
+                        await BUS.emit_async("ultimate_failed", acting_foe, None, 0, "ultimate", {"ultimate_type": getattr(acting_foe.damage_type, 'id', 'generic'), "caster_type": "foe", "error": str(e)})
                         pass
-                    acting_foe.add_ultimate_charge(acting_foe.actions_per_turn)
-                    # Wind-aligned foes gain charge from ally actions too
-                    for ally in foes:
-                        ally.handle_ally_action(acting_foe)
-                    await registry.trigger("turn_end", acting_foe, party=combat_party.members, foes=foes)
-                    await registry.trigger_turn_end(acting_foe)
-                    if _EXTRA_TURNS.get(id(acting_foe), 0) > 0 and acting_foe.hp > 0:
-                        _EXTRA_TURNS[id(acting_foe)] -= 1
-                        await _pace(action_start)
-                        await asyncio.sleep(0.001)
-                        continue
-                    if progress is not None:
-                        _advance_queue(acting_foe)
-                        await progress(
-                            {
-                                "result": "battle",
-                                "party": [
-                                    _serialize(m)
-                                    for m in combat_party.members
-                                    if not isinstance(m, Summon)
-                                ],
-                                "foes": [
-                                    _serialize(f)
-                                    for f in foes
-                                    if not isinstance(f, Summon)
-                                ],
-                                "party_summons": _collect_summons(combat_party.members),
-                                "foe_summons": _collect_summons(foes),
-                                "enrage": {
-                                    "active": enrage_active,
-                                    "stacks": enrage_stacks,
-                                    "turns": enrage_stacks,
-                                },
-                                "rdr": temp_rdr,
-                                "action_queue": _queue_snapshot(),
-                                "active_id": acting_foe.id,
-                            }
-                        )
-                    await _pace(action_start)
-                    await asyncio.sleep(0.001)
-                    break
-            _remove_dead_foes()
+            if not proceed:
+                await BUS.emit_async("action_used", acting_foe, acting_foe, 0)
+                acting_foe.add_ultimate_charge(acting_foe.actions_per_turn)
+                await registry.trigger("turn_end", acting_foe, party=combat_party.members, foes=foes)
+                if progress is not None:
+                    await progress(_progress_update(acting_foe.id))
+                await _pace(action_start)
+                await clock.sleep(0.001)
+                return
+            dmg = await target.apply_damage(acting_foe.atk, attacker=acting_foe)
+            if dmg <= 0:
+                log.info("%s's attack was dodged by %s", acting_foe.id, target.id)
+            else:
+                log.info("%s hits %s for %s", acting_foe.id, target.id, dmg)
+                damage_type = getattr(acting_foe.damage_type, 'id', 'generic') if hasattr(acting_foe, 'damage_type') else 'generic'
+                await BUS.emit_async("hit_landed", acting_foe, target, dmg, "attack", f"foe_{damage_type}_attack")
+            target_effect.maybe_inflict_dot(acting_foe, dmg)
+            targets_hit = 1
+            await BUS.emit_async("action_used", acting_foe, target, dmg)
+            duration = calc_animation_time(acting_foe, targets_hit)
+            if duration > 0:
+                await BUS.emit_async(
+                    "animation_start", acting_foe, targets_hit, duration
+                )
+                try:
+                    await clock.sleep(duration)
+                finally:
+                    await BUS.emit_async(
+                        "animation_end", acting_foe, targets_hit, duration
+                    )
+            # Trigger action_taken passives for the acting foe
+            await registry.trigger("action_taken", acting_foe)
+            # Sync any new summons created by foes
+            _sync_summons()
+            acting_foe.add_ultimate_charge(acting_foe.actions_per_turn)
+            # Wind-aligned foes gain charge from ally actions too
+            for ally in foes:
+                ally.handle_ally_action(acting_foe)
+            await registry.trigger("turn_end", acting_foe, party=combat_party.members, foes=foes)
+            await registry.trigger_turn_end(acting_foe)
+            if progress is not None:
+                await progress(_progress_update(acting_foe.id))
+            await _pace(action_start)
+            await clock.sleep(0.001)
+
+        # Whoever's action value runs out first acts next; bonus turns (extra
+        # turns, kills) jump the queue without advancing the timeline
+        bonus_chain = 0
+        while any(f.hp > 0 for f in foes) and any(
+            m.hp > 0 for m in combat_party.members
+        ):
+            actor, bonus = queue.next_turn()
+            if bonus:
+                bonus_chain += 1
+                if bonus_chain > MAX_CHAINED_BONUS_TURNS:
+                    held = queue.defer_bonus_turns(actor)
+                    log.info(
+                        "Bonus turn cap reached; %d bonus turns wait for the next turn",
+                        held,
+                    )
+                    continue
+            else:
+                bonus_chain = 0
+            if actor.hp <= 0:
+                queue.remove(actor)
+                await clock.sleep(0.001)
+                continue
+            if _dismissed(actor):
+                queue.remove(actor)
+                continue
+            if id(actor) in party_ids:
+                await _party_turn(actor)
+            else:
+                await _foe_turn(actor)
+            _remove_dead()
             if not foes:
                 break
+
         # Signal completion as soon as the loop ends to help UIs stop polling
         # immediately, even before rewards are fully computed.
         if progress is not None:
@@ -908,12 +798,12 @@ class BattleRoom(Room):
                     {
                         "result": "battle",
                         "party": [
-                            _serialize(m)
+                            serialize(m)
                             for m in combat_party.members
                             if not isinstance(m, Summon)
                         ],
                         "foes": [
-                            _serialize(f)
+                            serialize(f)
                             for f in foes
                             if not isinstance(f, Summon)
                         ],
@@ -935,10 +825,14 @@ class BattleRoom(Room):
                 await BUS.emit_async("battle_end", foe_obj)
         except Exception:
             pass
+        queue.close()
+        ctx.action_queue = None
 
         # End battle logging
         battle_result = "defeat" if all(m.hp <= 0 for m in combat_party.members) else "victory"
-        end_battle_logging(battle_result)
+        if battle_logger is not None:
+            battle_logger.summary.turns = turn
+        end_battle_logging(battle_result, ctx.run_id)
 
         for mod in enrage_mods:
             if mod is not None:
@@ -972,12 +866,14 @@ class BattleRoom(Room):
                 except Exception:
                     # Do not let EXP calculation break battle resolution
                     pass
-            try:
-                level = get_user_level()
-                gain_user_exp(int(exp_reward / max(1, level)))
-                # Do not reapply global level buffs mid-run; buffs are fixed at run start.
-            except Exception:
-                pass
+            # Headless simulations never touch the player's save.
+            if not clock.simulated:
+                try:
+                    level = get_user_level()
+                    gain_user_exp(int(exp_reward / max(1, level)))
+                    # Do not reapply global level buffs mid-run; buffs are fixed at run start.
+                except Exception:
+                    pass
         party_data = [_serialize(p) for p in party.members]
         foes_data = [_serialize(f) for f in foes]
         party_summons = _collect_summons(party.members)
@@ -1020,7 +916,9 @@ class BattleRoom(Room):
             base_stars = _pick_card_stars(self)
             cstars = _apply_rdr_to_stars(base_stars, temp_rdr)
             log.debug("Card selection attempt %d: base_stars=%d, rdr_stars=%d", attempts, base_stars, cstars)
-            one = card_choices(combat_party, cstars, count=1)
+            one = card_choices(
+                combat_party, cstars, count=1, exclude={x.id for x in selected_cards}
+            )
             log.debug("  card_choices returned %d options", len(one))
             if not one:
                 log.debug("  No cards available for star level %d", cstars)
@@ -1049,7 +947,9 @@ class BattleRoom(Room):
             while len(picked) < 3 and tries < 30:
                 tries += 1
                 rstars = _apply_rdr_to_stars(_pick_relic_stars(self), temp_rdr)
-                one = relic_choices(combat_party, rstars, count=1)
+                one = relic_choices(
+                    combat_party, rstars, count=1, exclude={x.id for x in picked}
+                )
                 if not one:
                     continue
                 r = one[0]
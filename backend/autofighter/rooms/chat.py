@@ -1,13 +1,17 @@
 from __future__ import annotations
 
+from collections.abc import AsyncIterator
+from contextlib import aclosing
 from dataclasses import dataclass
 import json
 from typing import Any
 
 from llms.loader import ModelName
-from llms.loader import load_llm
+from llms.registry import get_llm
+from llms.scheduler import Priority
+from llms.scheduler import get_scheduler
 from options import get_option
-from tts import generate_voice
+from tts import voice_path
 
 from ..party import Party
 from ..passives import PassiveRegistry
@@ -20,8 +24,11 @@ class ChatRoom(Room):
     """Chat rooms forward a single message to an LLM character."""
 
     async def resolve(self, party: Party, data: dict[str, Any]) -> dict[str, Any]:
-        import asyncio
+        reply = "".join([chunk async for chunk in self.stream_reply(party, data)])
+        return await self.finish(party, data, reply)
 
+    async def stream_reply(self, party: Party, data: dict[str, Any]) -> AsyncIterator[str]:
+        """Yield the character's reply chunk by chunk as the model generates it."""
         registry = PassiveRegistry()
         for member in party.members:
             await registry.trigger("room_enter", member)
@@ -29,32 +36,28 @@ class ChatRoom(Room):
         party_data = [_serialize(p) for p in party.members]
         model = get_option("lrm_model", ModelName.DEEPSEEK.value)
 
-        # Load LLM in thread pool to avoid blocking the event loop
-        llm = await asyncio.to_thread(load_llm, model)
+        # Resident models are reused; the first load runs in a worker thread
+        llm = await get_llm(model)
         payload = {"party": party_data, "message": message}
         prompt = json.dumps(payload)
-        reply = ""
-        async for chunk in llm.generate_stream(prompt):
-            reply += chunk
+        chunks = get_scheduler().stream(llm, prompt, priority=Priority.CHAT)
+        async with aclosing(chunks):
+            async for chunk in chunks:
+                yield chunk
 
-        voice_path: str | None = None
+    async def finish(self, party: Party, data: dict[str, Any], reply: str) -> dict[str, Any]:
+        """Voice the full reply and build the room result."""
+        message = data.get("message", "")
+        party_data = [_serialize(p) for p in party.members]
         sample = None
         if party.members:
             sample = getattr(party.members[0], "voice_sample", None)
-        audio = await asyncio.to_thread(generate_voice, reply, sample)
-        if audio:
-            from pathlib import Path
-
-            voices = Path("assets/voices")
-            voices.mkdir(parents=True, exist_ok=True)
-            fname = "chat.wav"
-            (voices / fname).write_bytes(audio)
-            voice_path = f"/assets/voices/{fname}"
+        voice = await voice_path(reply, sample)
         return {
             "result": "chat",
             "message": message,
             "response": reply,
-            "voice": voice_path,
+            "voice": voice,
             "party": party_data,
             "gold": party.gold,
             "relics": party.relics,
@@ -8,6 +8,7 @@ from ..cards import card_choices
 from ..party import Party
 from ..passives import PassiveRegistry
 from ..relics import _registry as relic_registry
+from ..relics import relic_choices
 from . import Room
 from .utils import _serialize
 
@@ -45,11 +46,13 @@ def _pick_shop_stars() -> int:
 
 def _generate_stock(party: Party, pressure: int) -> list[dict[str, Any]]:
     stock: list[dict[str, Any]] = []
+    seen_cards: set[str] = set()
     for _ in range(2):
         stars = _apply_rdr_to_stars(_pick_shop_stars(), party.rdr)
-        choice = card_choices(party, stars, count=1)
+        choice = card_choices(party, stars, count=1, exclude=seen_cards)
         if choice:
             card = choice[0]
+            seen_cards.add(card.id)
             base = PRICE_BY_STARS.get(card.stars, 0)
             cost = _pressure_cost(base, pressure)
             stock.append(
@@ -64,15 +67,14 @@ def _generate_stock(party: Party, pressure: int) -> list[dict[str, Any]]:
             )
     # Offer up to 6 relics at the selected star tier; entries are unique
     # Shop relics: roll star rank per slot; allow owned, ensure uniqueness within this stock
-    all_relics = [cls() for cls in relic_registry().values()]
     seen_relics: set[str] = set()
     relic_list = []
     for _ in range(6):
         stars = _apply_rdr_to_stars(_pick_shop_stars(), party.rdr)
-        pool = [r for r in all_relics if r.stars == stars and r.id != "fallback_essence" and r.id not in seen_relics]
-        if not pool:
+        picked = relic_choices(party, stars, count=1, exclude=seen_relics)
+        if not picked:
             continue
-        relic = random.choice(pool)
+        relic = picked[0]
         seen_relics.add(relic.id)
         relic_list.append(relic)
     for relic in relic_list:
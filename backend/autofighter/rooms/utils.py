@@ -12,6 +12,7 @@ from plugins.foes._base import FoeBase
 from ..mapgen import MapNode
 from ..party import Party
 from ..passives import PassiveRegistry
+from ..snapshots import CachedEntity
 from ..stats import GAUGE_START
 from ..stats import Stats
 
@@ -347,29 +348,30 @@ def _serialize(obj: Stats) -> dict[str, Any]:
     if mgr is not None:
         def pack(effects, key):
             grouped: dict[str, dict[str, Any]] = {}
-            for eff in effects:
-                # Determine the elemental type for this effect from its source or attached type
-                elem = "Generic"
-                try:
-                    src = getattr(eff, "source", None)
-                    dtype = getattr(eff, "damage_type", None) or getattr(src, "damage_type", None)
-                    elem = _normalize_damage_type(dtype)
-                except Exception:
-                    pass
-                entry = grouped.setdefault(
-                    eff.id,
-                    {
-                        "id": eff.id,
+            # One pass per (id, source) group rather than per stack
+            for (eid, _src), stacks in effects.groups().items():
+                entry = grouped.get(eid)
+                if entry is None:
+                    eff = stacks[0]
+                    # Determine the elemental type for this effect from its source or attached type
+                    elem = "Generic"
+                    try:
+                        src = getattr(eff, "source", None)
+                        dtype = getattr(eff, "damage_type", None) or getattr(src, "damage_type", None)
+                        elem = _normalize_damage_type(dtype)
+                    except Exception:
+                        pass
+                    entry = grouped[eid] = {
+                        "id": eid,
                         "name": eff.name,
                         key: getattr(eff, key),
                         "turns": eff.turns,
                         "source": getattr(getattr(eff, "source", None), "id", None),
                         "element": elem,
                         "stacks": 0,
-                    },
-                )
-                entry["turns"] = max(entry["turns"], eff.turns)
-                entry["stacks"] += 1
+                    }
+                entry["turns"] = max(entry["turns"], *(e.turns for e in stacks))
+                entry["stacks"] += len(stacks)
             return list(grouped.values())
 
         dots = pack(mgr.dots, "damage")
@@ -437,6 +439,51 @@ def _serialize(obj: Stats) -> dict[str, Any]:
     return data
 
 
+class SerializeCache:
+    """Serialize combatants once per change instead of once per action.
+
+    The battle loop reports every combatant after every action, but most of
+    them did not change. A combatant is rebuilt only when its ``_rev``
+    (bumped by :class:`~autofighter.stats.Stats` writes and effect changes),
+    its DoT/HoT stacks, or its passive stacks moved; otherwise the previous
+    :class:`~autofighter.snapshots.CachedEntity` is returned as-is, which
+    also lets :class:`~autofighter.snapshots.SnapshotLog` skip re-encoding it.
+    """
+
+    def __init__(self) -> None:
+        self._entries: dict[int, tuple[Stats, tuple, CachedEntity]] = {}
+
+    @staticmethod
+    def _marker(obj: Stats) -> tuple | None:
+        rev = getattr(obj, "__dict__", {}).get("_rev")
+        if rev is None:
+            return None
+        mgr = getattr(obj, "effect_manager", None)
+        return (
+            rev,
+            getattr(getattr(mgr, "dots", None), "version", None),
+            getattr(getattr(mgr, "hots", None), "version", None),
+            len(getattr(obj, "mods", ()) or ()),
+        )
+
+    def __call__(self, obj: Stats) -> CachedEntity:
+        marker = self._marker(obj)
+        entry = self._entries.get(id(obj))
+        if marker is not None and entry is not None and entry[0] is obj and entry[1] == marker:
+            data = entry[2]
+            # Passive stacks can live on the passive classes, outside ``_rev``
+            passives = PassiveRegistry().describe(obj)
+            if passives == data.get("passives"):
+                return data
+            data = CachedEntity(data)
+            data["passives"] = passives
+        else:
+            data = CachedEntity(_serialize(obj))
+        if marker is not None:
+            self._entries[id(obj)] = (obj, marker, data)
+        return data
+
+
 def _choose_foe(party: Party) -> FoeBase:
     """Select a foe class not already in the party."""
     party_ids = {p.id for p in party.members}
@@ -0,0 +1,234 @@
+"""Write-behind cache for the ``runs.map`` and ``runs.party`` JSON blobs.
+
+Room and reward handlers used to rewrite both blobs on every step, often
+several times per request. :class:`RunStateStore` keeps each run's decoded
+``map`` state and ``party`` data in memory instead. Saving only replaces the
+cached value and marks it dirty, and :meth:`RunStateStore.flush` writes every
+dirty blob in a single transaction. Callers flush at checkpoints (battle
+resolution, shop and rest actions, reward picks, room transitions and
+shutdown), so a crash rolls a run back to its last checkpoint with its map and
+party still in agreement.
+
+Handlers on the event loop mutate the cached dicts in place, so blobs are
+serialized on the loop by :meth:`RunStateStore.checkpoint` and only the
+database write runs in a worker thread. Entries are dropped when their run is
+discarded or when a write finds the ``runs`` row gone.
+
+The cache belongs to one database: when the save manager changes, pending
+writes go to the old database and the cache starts over.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+from dataclasses import dataclass
+import itertools
+import json
+import logging
+import threading
+from typing import Any
+
+from .save_manager import SaveManager
+
+log = logging.getLogger(__name__)
+
+# ``(column, json, run_id, seq)``; ``seq`` orders checkpoints of the same blob
+_Row = tuple[str, str, str, int]
+
+
+@dataclass
+class _RunEntry:
+    map: dict[str, Any] | None = None
+    party: dict[str, Any] | None = None
+    map_dirty: bool = False
+    party_dirty: bool = False
+
+
+class RunStateStore:
+    """Live per-run ``map`` and ``party`` blobs with dirty tracking."""
+
+    def __init__(self, manager: Callable[[], SaveManager]) -> None:
+        self._manager = manager
+        self._bound: SaveManager | None = None
+        self._entries: dict[str, _RunEntry] = {}
+        self._lock = threading.RLock()
+        # Serializes database writes; ``_written`` keeps a slower, older
+        # checkpoint from overwriting a newer one for the same blob
+        self._write_lock = threading.Lock()
+        self._written: dict[tuple[str, str], int] = {}
+        self._seq = itertools.count()
+
+    def _bind(self) -> SaveManager:
+        manager = self._manager()
+        if manager is not self._bound:
+            if self._bound is not None:
+                try:
+                    self._write(self._bound, self._take_dirty(None))
+                except Exception:
+                    log.exception("Failed to flush run state before switching databases")
+            self._entries.clear()
+            self._written.clear()
+            self._bound = manager
+        return manager
+
+    def _entry(self, run_id: str) -> _RunEntry | None:
+        manager = self._bind()
+        entry = self._entries.get(run_id)
+        if entry is not None and entry.map is not None and entry.party is not None:
+            return entry
+        with manager.connection() as conn:
+            row = conn.execute(
+                "SELECT party, map FROM runs WHERE id = ?", (run_id,)
+            ).fetchone()
+        if row is None:
+            return entry
+        if entry is None:
+            entry = self._entries[run_id] = _RunEntry()
+        if entry.party is None:
+            entry.party = json.loads(row[0]) if row[0] else {}
+        if entry.map is None:
+            entry.map = json.loads(row[1]) if row[1] else {}
+        return entry
+
+    def map(self, run_id: str) -> dict[str, Any] | None:
+        """Return the live map state, or ``None`` when the run does not exist.
+
+        The returned dict is shared; pass it back to :meth:`set_map` after
+        changing it so the change is persisted.
+        """
+        with self._lock:
+            entry = self._entry(run_id)
+            return None if entry is None else entry.map
+
+    def party(self, run_id: str) -> dict[str, Any] | None:
+        """Return the stored party data, or ``None`` when the run does not exist."""
+        with self._lock:
+            entry = self._entry(run_id)
+            return None if entry is None else entry.party
+
+    def set_map(self, run_id: str, state: dict[str, Any]) -> None:
+        with self._lock:
+            self._bind()
+            entry = self._entries.setdefault(run_id, _RunEntry())
+            entry.map = state
+            entry.map_dirty = True
+
+    def set_party(self, run_id: str, data: dict[str, Any]) -> None:
+        with self._lock:
+            self._bind()
+            entry = self._entries.setdefault(run_id, _RunEntry())
+            entry.party = data
+            entry.party_dirty = True
+
+    def is_dirty(self, run_id: str) -> bool:
+        with self._lock:
+            entry = self._entries.get(run_id)
+            return entry is not None and (entry.map_dirty or entry.party_dirty)
+
+    def _take_dirty(self, run_id: str | None) -> list[_Row]:
+        """Serialize dirty blobs as rows and clear the flags.
+
+        Call with ``_lock`` held, on the thread that mutates the blobs.
+        """
+        run_ids = list(self._entries) if run_id is None else [run_id]
+        rows: list[_Row] = []
+        for rid in run_ids:
+            entry = self._entries.get(rid)
+            if entry is None:
+                continue
+            if entry.map_dirty:
+                rows.append(("map", json.dumps(entry.map), rid, next(self._seq)))
+                entry.map_dirty = False
+            if entry.party_dirty:
+                rows.append(("party", json.dumps(entry.party), rid, next(self._seq)))
+                entry.party_dirty = False
+        return rows
+
+    @staticmethod
+    def _write(manager: SaveManager, rows: list[_Row]) -> set[str]:
+        """Write ``rows`` in one transaction; return run ids with no ``runs`` row."""
+        missing: set[str] = set()
+        if not rows:
+            return missing
+        with manager.connection() as conn:
+            for column, payload, rid, _seq in rows:
+                # ``column`` is always "map" or "party", never caller input
+                cur = conn.execute(
+                    f"UPDATE runs SET {column} = ? WHERE id = ?", (payload, rid)
+                )
+                if cur.rowcount == 0:
+                    missing.add(rid)
+        return missing
+
+    def _commit(self, manager: SaveManager, rows: list[_Row]) -> None:
+        with self._write_lock:
+            rows = [
+                row for row in rows if self._written.get((row[2], row[0]), -1) < row[3]
+            ]
+            missing = self._write(manager, rows)
+            for column, _payload, rid, seq in rows:
+                self._written[(rid, column)] = seq
+        for rid in missing:
+            # The run was deleted underneath us; nothing left to save
+            with self._lock:
+                entry = self._entries.get(rid)
+                if entry is not None and not (entry.map_dirty or entry.party_dirty):
+                    self._forget(rid)
+
+    def _restore(self, rows: list[_Row]) -> None:
+        with self._lock:
+            for column, _payload, rid, _seq in rows:
+                entry = self._entries.get(rid)
+                if entry is not None:
+                    setattr(entry, f"{column}_dirty", True)
+
+    def flush(self, run_id: str | None = None) -> int:
+        """Write dirty blobs for ``run_id`` (or every run) in one transaction.
+
+        Returns the number of blobs written. If the write fails the blobs stay
+        dirty so the next checkpoint retries them. Call this where no handler
+        can be mutating the blobs (shutdown, worker threads); event loop code
+        uses :meth:`checkpoint`.
+        """
+        with self._lock:
+            manager = self._bind()
+            rows = self._take_dirty(run_id)
+            try:
+                self._commit(manager, rows)
+            except BaseException:
+                self._restore(rows)
+                raise
+            return len(rows)
+
+    async def checkpoint(self, run_id: str | None = None) -> int:
+        """Serialize dirty blobs on the loop, then write them in a worker thread.
+
+        Serializing here means no handler can change a blob while it is being
+        encoded. Returns the number of blobs written.
+        """
+        with self._lock:
+            manager = self._bind()
+            rows = self._take_dirty(run_id)
+        if not rows:
+            return 0
+        try:
+            await asyncio.to_thread(self._commit, manager, rows)
+        except BaseException:
+            self._restore(rows)
+            raise
+        return len(rows)
+
+    def _forget(self, run_id: str) -> None:
+        self._entries.pop(run_id, None)
+        self._written.pop((run_id, "map"), None)
+        self._written.pop((run_id, "party"), None)
+
+    def discard(self, run_id: str | None = None) -> None:
+        """Forget cached state without writing it, e.g. after deleting runs."""
+        with self._lock:
+            if run_id is None:
+                self._entries.clear()
+                self._written.clear()
+            else:
+                self._forget(run_id)
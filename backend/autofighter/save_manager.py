@@ -6,6 +6,7 @@ import hashlib
 import os
 from pathlib import Path
 import sys
+import threading
 
 # Handle platform-specific SQLite encryption imports
 if sys.platform == 'win32':
@@ -20,14 +21,24 @@ else:
 
 
 class SaveManager:
-    """Wrapper around SQLCipher connections.
+    """Wrapper around a pool of SQLCipher connections.
 
     Keys are read from ``AF_DB_KEY`` or derived from ``AF_DB_PASSWORD``.
+
+    Connections are keyed once when opened and then reused, so callers do not
+    pay SQLCipher's key derivation on every ``connection()``. Up to
+    ``pool_size`` idle connections are kept; checkouts beyond that open a
+    transient connection which is closed when returned.
     """
 
-    def __init__(self, db_path: Path, key: str) -> None:
+    def __init__(self, db_path: Path, key: str, pool_size: int = 4) -> None:
         self.db_path = Path(db_path)
         self.key = key
+        self.pool_size = max(0, int(pool_size))
+        self._idle: list[sqlcipher3.Connection] = []
+        self._owners: dict[int, int] = {}
+        self._generation = 0
+        self._lock = threading.Lock()
 
     @classmethod
     def from_env(cls) -> SaveManager:
@@ -38,25 +49,86 @@ class SaveManager:
         password = os.getenv("AF_DB_PASSWORD")
         if not key and password:
             key = hashlib.sha256(password.encode()).hexdigest()
+        pool_size = os.getenv("AF_DB_POOL_SIZE", "")
+        if pool_size.isdigit():
+            return cls(db_path, key or "", pool_size=int(pool_size))
         return cls(db_path, key or "")
 
+    def _open(self) -> sqlcipher3.Connection:
+        conn = sqlcipher3.connect(self.db_path, check_same_thread=False)
+        try:
+            if self.key and hasattr(conn, 'set_key'):
+                conn.set_key(self.key)
+            elif self.key and sys.platform == 'win32':
+                # For pysqlcipher3, use execute to set key
+                try:
+                    conn.execute(f"PRAGMA key = '{self.key}'")
+                except Exception:
+                    # If encryption fails, continue without it
+                    pass
+            # Reading the journal mode touches the database header, so a wrong
+            # key fails here instead of leaking a broken connection into the pool.
+            conn.execute("PRAGMA journal_mode=WAL").fetchone()
+        except BaseException:
+            conn.close()
+            raise
+        return conn
+
+    def checkout(self) -> sqlcipher3.Connection:
+        """Borrow a keyed connection; hand it back with :meth:`checkin`."""
+
+        with self._lock:
+            conn = self._idle.pop() if self._idle else None
+            generation = self._generation
+        if conn is None:
+            conn = self._open()
+        with self._lock:
+            self._owners[id(conn)] = generation
+        return conn
+
+    def checkin(self, conn: sqlcipher3.Connection, discard: bool = False) -> None:
+        """Return ``conn`` to the pool, closing it if the pool is full."""
+
+        with self._lock:
+            generation = self._owners.pop(id(conn), None)
+            keep = (
+                not discard
+                and generation == self._generation
+                and len(self._idle) < self.pool_size
+            )
+            if keep:
+                self._idle.append(conn)
+        if not keep:
+            conn.close()
+
+    def close(self) -> None:
+        """Close idle connections and retire any that are checked out.
+
+        The manager stays usable; the next checkout opens a fresh connection.
+        Call this before replacing or deleting the database file.
+        """
+
+        with self._lock:
+            idle, self._idle = self._idle, []
+            self._generation += 1
+        for conn in idle:
+            conn.close()
+
     @contextmanager
     def connection(self) -> Iterator[sqlcipher3.Connection]:
-        conn = sqlcipher3.connect(self.db_path)
-        if self.key and hasattr(conn, 'set_key'):
-            conn.set_key(self.key)
-        elif self.key and sys.platform == 'win32':
-            # For pysqlcipher3, use execute to set key
-            try:
-                conn.execute(f"PRAGMA key = '{self.key}'")
-            except Exception:
-                # If encryption fails, continue without it
-                pass
+        conn = self.checkout()
         try:
             yield conn
             conn.commit()
-        finally:
-            conn.close()
+        except BaseException:
+            try:
+                conn.rollback()
+            except Exception:
+                self.checkin(conn, discard=True)
+                raise
+            self.checkin(conn)
+            raise
+        self.checkin(conn)
 
     def migrate(self, migrations_dir: Path) -> None:
         migrations = sorted(migrations_dir.glob("*.sql"))
@@ -0,0 +1,344 @@
+"""Monte Carlo balance simulator.
+
+Runs many battles headlessly through the real ``BattleRoom.resolve`` path
+(foe selection, scaling, passives, relics and cards) using a
+:class:`~autofighter.clock.SimulatedClock`, spread across a process pool::
+
+    python -m autofighter.sim --party player ally --relics null_lantern \\
+        --floor 2 --pressure 5 --seeds 0:1000 --format csv --output sims.csv
+
+Each seed drives one battle, so any run can be reproduced exactly.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+import contextlib
+import csv
+from dataclasses import asdict
+from dataclasses import dataclass
+from dataclasses import field
+import io
+import json
+import logging
+import math
+import os
+import random
+import sys
+from typing import Any
+
+from autofighter.battle_context import BattleContext
+from autofighter.cards import _registry as _card_registry
+from autofighter.clock import SimulatedClock
+from autofighter.mapgen import MapNode
+from autofighter.party import Party
+from autofighter.relics import _registry as _relic_registry
+from autofighter.rooms.battle import BattleRoom
+from autofighter.rooms.boss import BossRoom
+from autofighter.stats import BUS
+from plugins import players as player_plugins
+
+ROOM_TYPES = ("battle-weak", "battle-normal", "battle-boss-floor")
+
+
+@dataclass
+class SimConfig:
+    """Everything needed to rebuild the same encounter in a worker process."""
+
+    party: list[str]
+    relics: list[str] = field(default_factory=list)
+    cards: list[str] = field(default_factory=list)
+    floor: int = 1
+    index: int = 1
+    loop: int = 1
+    pressure: int = 0
+    room_type: str = "battle-normal"
+
+
+@dataclass
+class BattleOutcome:
+    seed: int
+    won: bool
+    turns: int
+    enraged: bool
+    enrage_stacks: int
+    sim_seconds: float
+    damage_by_type: dict[str, int]
+    foes: list[str]
+
+
+def _player_classes() -> dict[str, type]:
+    classes = {}
+    for name in getattr(player_plugins, "__all__", []):
+        cls = getattr(player_plugins, name)
+        classes[cls.id] = cls
+    return classes
+
+
+def _build_party(config: SimConfig) -> Party:
+    classes = _player_classes()
+    return Party(
+        members=[classes[pid]() for pid in config.party],
+        relics=list(config.relics),
+        cards=list(config.cards),
+    )
+
+
+def _build_room(config: SimConfig) -> BattleRoom:
+    node = MapNode(
+        room_id=config.index,
+        room_type=config.room_type,
+        floor=config.floor,
+        index=config.index,
+        loop=config.loop,
+        pressure=config.pressure,
+    )
+    room_cls = BossRoom if "boss" in config.room_type else BattleRoom
+    return room_cls(node)
+
+
+async def _simulate(config: SimConfig, seed: int) -> BattleOutcome:
+    random.seed(seed)
+    clock = SimulatedClock()
+    turns = 0
+    damage: Counter[str] = Counter()
+    party_ids: set[str] = set()
+
+    def _count_turn(*_args: Any) -> None:
+        nonlocal turns
+        turns += 1
+
+    def _count_damage(
+        attacker: Any,
+        _target: Any,
+        amount: int,
+        _source_type: str = "attack",
+        _source_name: str | None = None,
+        damage_type: str | None = None,
+        *_rest: Any,
+    ) -> None:
+        # The room fights with copies of the members, so match on ids
+        if getattr(attacker, "id", None) not in party_ids or not amount:
+            return
+        if damage_type is None:
+            element = getattr(attacker, "damage_type", None)
+            damage_type = getattr(element, "id", str(element))
+        damage[damage_type] += int(amount)
+
+    with BattleContext(run_id=f"sim-{seed}", clock=clock).activate():
+        BUS.subscribe("turn_start", _count_turn)
+        BUS.subscribe("damage_dealt", _count_damage)
+        party = _build_party(config)
+        party_ids.update(member.id for member in party.members)
+        result = await _build_room(config).resolve(party, {})
+        # Hits are emitted batched; count the ones still queued
+        await BUS.drain_batched()
+    enrage = result.get("enrage", {})
+    return BattleOutcome(
+        seed=seed,
+        won=result.get("result") != "defeat",
+        turns=turns,
+        enraged=bool(enrage.get("active")),
+        enrage_stacks=int(enrage.get("stacks", 0)),
+        sim_seconds=round(clock.now(), 3),
+        damage_by_type=dict(damage),
+        foes=[foe.get("id", "") for foe in result.get("foes", [])],
+    )
+
+
+def _run_chunk(config: SimConfig, seeds: list[int]) -> list[BattleOutcome]:
+    """Worker entry point: resolve ``seeds`` on one event loop."""
+
+    async def _run() -> list[BattleOutcome]:
+        return [await _simulate(config, seed) for seed in seeds]
+
+    # Effect managers print tick traces to stdout; keep the report clean.
+    with open(os.devnull, "w") as sink, contextlib.redirect_stdout(sink):
+        return asyncio.run(_run())
+
+
+def _init_worker() -> None:
+    logging.disable(logging.INFO)
+
+
+def _chunks(seeds: list[int], count: int) -> list[list[int]]:
+    size = max(1, math.ceil(len(seeds) / count))
+    return [seeds[i : i + size] for i in range(0, len(seeds), size)]
+
+
+def run_simulations(
+    config: SimConfig, seeds: list[int], workers: int | None = None
+) -> list[BattleOutcome]:
+    """Resolve one battle per seed, in seed order.
+
+    ``workers=0`` runs everything in the calling process, which keeps tests
+    and debuggers simple.
+    """
+
+    if workers == 0:
+        return _run_chunk(config, seeds)
+    workers = workers or os.cpu_count() or 1
+    # Several chunks per worker keep cores busy when battle lengths vary.
+    chunks = _chunks(seeds, workers * 4)
+    outcomes: list[BattleOutcome] = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        for chunk_result in pool.map(_run_chunk, [config] * len(chunks), chunks):
+            outcomes.extend(chunk_result)
+    return outcomes
+
+
+def _percentile(values: list[int], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct
+    low = math.floor(rank)
+    high = math.ceil(rank)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def _distribution(values: list[int]) -> dict[str, Any]:
+    if not values:
+        return {"mean": 0.0, "min": 0, "max": 0, "p50": 0.0, "p90": 0.0, "p99": 0.0, "histogram": {}}
+    return {
+        "mean": sum(values) / len(values),
+        "min": min(values),
+        "max": max(values),
+        "p50": _percentile(values, 0.5),
+        "p90": _percentile(values, 0.9),
+        "p99": _percentile(values, 0.99),
+        "histogram": dict(sorted(Counter(values).items())),
+    }
+
+
+def summarize(outcomes: list[BattleOutcome]) -> dict[str, Any]:
+    """Aggregate per-battle outcomes into balance statistics."""
+
+    total = len(outcomes)
+    wins = [o for o in outcomes if o.won]
+    damage: Counter[str] = Counter()
+    for outcome in outcomes:
+        damage.update(outcome.damage_by_type)
+    all_damage = sum(damage.values())
+    return {
+        "battles": total,
+        "wins": len(wins),
+        "win_rate": len(wins) / total if total else 0.0,
+        "turns": _distribution([o.turns for o in outcomes]),
+        "turns_to_kill": _distribution([o.turns for o in wins]),
+        "enrage_rate": sum(o.enraged for o in outcomes) / total if total else 0.0,
+        "enrage_stacks": _distribution([o.enrage_stacks for o in outcomes]),
+        "damage_by_type": {
+            type_id: {
+                "total": amount,
+                "per_battle": amount / total if total else 0.0,
+                "share": amount / all_damage if all_damage else 0.0,
+            }
+            for type_id, amount in sorted(damage.items())
+        },
+    }
+
+
+def to_csv(outcomes: list[BattleOutcome]) -> str:
+    """Render one row per battle, with a damage column per damage type."""
+
+    types = sorted({t for o in outcomes for t in o.damage_by_type})
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(
+        ["seed", "won", "turns", "enraged", "enrage_stacks", "sim_seconds", "foes"]
+        + [f"damage_{t.lower()}" for t in types]
+    )
+    for o in outcomes:
+        writer.writerow(
+            [o.seed, int(o.won), o.turns, int(o.enraged), o.enrage_stacks, o.sim_seconds, " ".join(o.foes)]
+            + [o.damage_by_type.get(t, 0) for t in types]
+        )
+    return buffer.getvalue()
+
+
+def _parse_seeds(text: str) -> list[int]:
+    start, sep, stop = text.partition(":")
+    try:
+        if sep:
+            return list(range(int(start), int(stop)))
+        return list(range(int(start)))
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(f"invalid seed range: {text!r}") from exc
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m autofighter.sim",
+        description="Run headless Monte Carlo battles for balance testing.",
+    )
+    parser.add_argument("--party", nargs="+", required=True, help="player ids")
+    parser.add_argument("--relics", nargs="*", default=[], help="relic ids (repeat for stacks)")
+    parser.add_argument("--cards", nargs="*", default=[], help="card ids")
+    parser.add_argument("--floor", type=int, default=1)
+    parser.add_argument("--room", type=int, default=1, help="room index on the floor")
+    parser.add_argument("--loop", type=int, default=1)
+    parser.add_argument("--pressure", type=int, default=0)
+    parser.add_argument("--room-type", choices=ROOM_TYPES, default="battle-normal")
+    parser.add_argument(
+        "--seeds",
+        type=_parse_seeds,
+        default=list(range(100)),
+        help="N or START:STOP (default 100 battles)",
+    )
+    parser.add_argument("--workers", type=int, default=None, help="processes (0 = in-process)")
+    parser.add_argument("--format", choices=("json", "csv"), default="json")
+    parser.add_argument("--battles", action="store_true", help="include per-battle rows in JSON")
+    parser.add_argument("--output", help="write to this file instead of stdout")
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = _parser()
+    args = parser.parse_args(argv)
+
+    known_players = _player_classes()
+    unknown = [pid for pid in args.party if pid not in known_players]
+    if unknown:
+        parser.error(f"unknown player id(s): {', '.join(unknown)}")
+    unknown = [rid for rid in args.relics if rid not in _relic_registry()]
+    if unknown:
+        parser.error(f"unknown relic id(s): {', '.join(unknown)}")
+    unknown = [cid for cid in args.cards if cid not in _card_registry()]
+    if unknown:
+        parser.error(f"unknown card id(s): {', '.join(unknown)}")
+
+    config = SimConfig(
+        party=args.party,
+        relics=args.relics,
+        cards=args.cards,
+        floor=args.floor,
+        index=args.room,
+        loop=args.loop,
+        pressure=args.pressure,
+        room_type=args.room_type,
+    )
+    outcomes = run_simulations(config, args.seeds, args.workers)
+
+    if args.format == "csv":
+        text = to_csv(outcomes)
+    else:
+        report: dict[str, Any] = {"config": asdict(config), "summary": summarize(outcomes)}
+        if args.battles:
+            report["battles"] = [asdict(o) for o in outcomes]
+        text = json.dumps(report, indent=2) + "\n"
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8", newline="") as fh:
+            fh.write(text)
+    else:
+        sys.stdout.write(text)
+    return 0
+
+
+if __name__ == "__main__":
+    _init_worker()
+    raise SystemExit(main())
@@ -0,0 +1,196 @@
+"""Versioned battle snapshots with per-entity deltas.
+
+The battle loop still reports a complete payload through its ``progress``
+callback, but clients no longer need to download it every poll.
+:class:`SnapshotLog` keeps the latest payload, stamps every change with a
+monotonically increasing sequence number and remembers the sequence at which
+each top-level key and each party member or foe last changed. A client that
+already holds ``seq`` asks for :meth:`SnapshotLog.since` and receives only the
+entities and keys that changed after it.
+
+Changes are detected against a frozen JSON encoding of what was last recorded
+for each key and combatant, not against the live objects, so dicts and lists
+that callers mutate in place are still noticed on the next record. The one
+exception is :class:`CachedEntity`: producers that only rebuild a combatant
+when it changed pass the same instance again, and the log skips encoding it.
+All of the work happens in :meth:`SnapshotLog.record`; reading a delta only
+filters the stored sequence numbers.
+"""
+
+from __future__ import annotations
+
+import json
+import time
+from typing import Any
+
+# Payload keys holding lists of combatants addressed by ``id``
+ENTITY_KEYS = ("party", "foes")
+
+
+def _freeze(value: Any) -> str:
+    """Return a comparable copy of ``value`` that in-place edits cannot change."""
+    return json.dumps(value, separators=(",", ":"), default=str)
+
+
+class CachedEntity(dict):
+    """Combatant payload that is rebuilt, never edited, when it changes.
+
+    Recording the same instance again counts as unchanged, so never mutate
+    one in place.
+    """
+
+
+def _index(items: Any) -> dict[str, dict[str, Any]] | None:
+    """Map combatants by id, or ``None`` when ids are missing or repeated."""
+    if not isinstance(items, list):
+        return None
+    index: dict[str, dict[str, Any]] = {}
+    for item in items:
+        if not isinstance(item, dict):
+            return None
+        eid = item.get("id")
+        if not isinstance(eid, str) or eid in index:
+            return None
+        index[eid] = item
+    return index
+
+
+class SnapshotLog:
+    """Latest battle payload plus the sequence at which each part changed."""
+
+    def __init__(self) -> None:
+        # Start from wall-clock milliseconds so sequence numbers handed out by
+        # an earlier log (or backend process) are never mistaken for ours.
+        self._floor = time.time_ns() // 1_000_000
+        self.seq = self._floor
+        self._state: dict[str, Any] = {}
+        self._key_seq: dict[str, int] = {}
+        self._frozen: dict[str, str] = {}
+        self._entities: dict[str, dict[str, dict[str, Any]]] = {}
+        self._entity_seq: dict[str, dict[str, int]] = {}
+        self._entity_frozen: dict[str, dict[str, str]] = {}
+        self._removed: dict[str, dict[str, int]] = {}
+
+    def record(self, snapshot: dict[str, Any]) -> int:
+        """Fold ``snapshot`` into the log and return the current sequence.
+
+        The sequence only advances when something actually changed, so
+        recording the same payload twice is cheap and idempotent.
+        """
+        next_seq = self.seq + 1
+        changed = False
+
+        for key in self._state.keys() - snapshot.keys():
+            del self._state[key]
+            self._frozen.pop(key, None)
+            self._key_seq[key] = next_seq
+            changed = True
+
+        for key, value in snapshot.items():
+            index = _index(value) if key in ENTITY_KEYS else None
+            if index is not None:
+                changed |= self._record_entities(key, index, next_seq)
+                order = list(index)
+                if self._state.get(key) != order:
+                    self._state[key] = order
+                    self._key_seq[key] = next_seq
+                    changed = True
+                continue
+            # Groups that lose their ids fall back to whole-value updates
+            if self._entities.pop(key, None) is not None:
+                self._entity_seq.pop(key, None)
+                self._entity_frozen.pop(key, None)
+                self._removed.pop(key, None)
+            frozen = _freeze(value)
+            self._state[key] = value
+            if self._frozen.get(key) != frozen:
+                self._frozen[key] = frozen
+                self._key_seq[key] = next_seq
+                changed = True
+
+        if changed:
+            self.seq = next_seq
+        return self.seq
+
+    def _record_entities(
+        self, key: str, index: dict[str, dict[str, Any]], seq: int
+    ) -> bool:
+        entities = self._entities.setdefault(key, {})
+        entity_seq = self._entity_seq.setdefault(key, {})
+        frozen_group = self._entity_frozen.setdefault(key, {})
+        removed = self._removed.setdefault(key, {})
+        changed = False
+        for eid in entities.keys() - index.keys():
+            del entities[eid]
+            entity_seq.pop(eid, None)
+            frozen_group.pop(eid, None)
+            removed[eid] = seq
+            changed = True
+        for eid, entity in index.items():
+            previous = entities.get(eid)
+            entities[eid] = entity
+            if previous is entity and isinstance(entity, CachedEntity):
+                continue
+            frozen = _freeze(entity)
+            if frozen_group.get(eid) == frozen:
+                continue
+            frozen_group[eid] = frozen
+            entity_seq[eid] = seq
+            removed.pop(eid, None)
+            changed = True
+        return changed
+
+    def full(self) -> dict[str, Any]:
+        """Return the latest payload in its original shape."""
+        payload: dict[str, Any] = {}
+        for key, value in self._state.items():
+            if key in self._entities:
+                entities = self._entities[key]
+                value = [entities[eid] for eid in value]
+            payload[key] = value
+        payload["seq"] = self.seq
+        payload["full"] = True
+        return payload
+
+    def since(self, seq: int | None) -> dict[str, Any]:
+        """Return everything that changed after ``seq``.
+
+        Sequence numbers this log did not hand out (``None``, ``0``, or from
+        a previous log or backend process) get the full payload instead.
+        """
+        if seq is None or seq <= self._floor or seq > self.seq:
+            return self.full()
+
+        changes = {
+            key: self._state[key]
+            for key, key_seq in self._key_seq.items()
+            if key_seq > seq and key in self._state and key not in self._entities
+        }
+        removed_keys = [
+            key
+            for key, key_seq in self._key_seq.items()
+            if key_seq > seq and key not in self._state
+        ]
+        entities = {
+            key: [
+                group[eid]
+                for eid, entity_seq in self._entity_seq[key].items()
+                if entity_seq > seq
+            ]
+            for key, group in self._entities.items()
+        }
+        removed = {
+            key: [eid for eid, removed_seq in ids.items() if removed_seq > seq]
+            for key, ids in self._removed.items()
+            if key in self._entities
+        }
+        return {
+            "seq": self.seq,
+            "since": seq,
+            "full": False,
+            "changes": changes,
+            "removed_keys": removed_keys,
+            "entities": entities,
+            "removed": removed,
+            "order": {key: self._state[key] for key in self._entities},
+        }
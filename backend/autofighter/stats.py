@@ -1,4 +1,5 @@
 from collections.abc import Callable
+from collections.abc import Iterable
 from dataclasses import dataclass
 from dataclasses import field
 import importlib
@@ -8,17 +9,13 @@ from typing import Dict
 from typing import Optional
 from typing import Union
 
+from autofighter.battle_context import current_battle_context
 from plugins.damage_types._base import DamageTypeBase
 from plugins.damage_types.generic import Generic
 from plugins.event_bus import EventBus
 
 log = logging.getLogger(__name__)
 
-# Global enrage percentage applied during battles.
-# Set by battle rooms when enrage is active, used in damage/heal calculations.
-_ENRAGE_PERCENT: float = 0.0
-_BATTLE_ACTIVE: bool = False
-
 # Starting value for action gauges.
 GAUGE_START: int = 10_000
 
@@ -42,20 +39,27 @@ class StatEffect:
 
 
 class _PassiveList(list):
-    """List subclass that triggers passive aggro recalculation on modification."""
+    """List subclass that triggers passive aggro recalculation on modification.
+
+    It also carries the owner's compiled passive dispatch table (see
+    ``PassiveRegistry._handlers``), which is dropped on every mutation.
+    """
 
     def __init__(self, owner: "Stats", iterable: Optional[list[str]] = None):
         super().__init__(iterable or [])
         self._owner = owner
+        self._dispatch: Optional[dict] = None
 
     def _update(self) -> None:
-        """Notify owner to recalc aggro when safe.
+        """Drop the dispatch cache and notify owner to recalc aggro when safe.
 
         During deepcopy of Player/Stats instances, attributes may be set
         before runtime-only fields (like `_aggro_passives`) exist. Guard
         against triggering recalculation until the owner is fully
         initialized to avoid AttributeError.
         """
+        self._dispatch = None
+        self._owner.__dict__["_rev"] = self._owner.__dict__.get("_rev", 0) + 1
         if not hasattr(self._owner, "_recalculate_passive_aggro"):
             return
         if not hasattr(self._owner, "_aggro_passives"):
@@ -75,6 +79,15 @@ class _PassiveList(list):
         super().extend(iterable)
         self._update()
 
+    def insert(self, index, item):  # type: ignore[override]
+        super().insert(index, item)
+        self._update()
+
+    def __iadd__(self, iterable):  # type: ignore[override]
+        result = super().__iadd__(iterable)
+        self._update()
+        return result
+
     def remove(self, item):  # type: ignore[override]
         super().remove(item)
         self._update()
@@ -96,38 +109,45 @@ class _PassiveList(list):
         super().__delitem__(index)
         self._update()
 
+    def __getstate__(self):
+        # Copies rebuild their own dispatch table
+        state = self.__dict__.copy()
+        state["_dispatch"] = None
+        return state
+
 
 def set_enrage_percent(value: float) -> None:
-    """Set global enrage percent (e.g., 0.15 for +15% damage taken, -15% healing).
+    """Set the battle's enrage percent (e.g., 0.15 for +15% damage taken, -15% healing).
 
-    This is applied uniformly to all entities during damage/heal resolution.
+    This is applied uniformly to all entities of the current battle during
+    damage/heal resolution.
     """
-    global _ENRAGE_PERCENT
+    ctx = current_battle_context()
     try:
-        _ENRAGE_PERCENT = max(float(value), 0.0)
+        ctx.enrage_percent = max(float(value), 0.0)
     except Exception:
-        _ENRAGE_PERCENT = 0.0
+        ctx.enrage_percent = 0.0
 
 
 def get_enrage_percent() -> float:
-    return _ENRAGE_PERCENT
+    return current_battle_context().enrage_percent
 
 
 def set_battle_active(active: bool) -> None:
-    """Mark whether a battle is currently active.
+    """Mark whether the current battle is active.
 
     Used to ignore stray async damage/heal pings after battles conclude,
     preventing post-battle loops from background tasks.
     """
-    global _BATTLE_ACTIVE
+    ctx = current_battle_context()
     try:
-        _BATTLE_ACTIVE = bool(active)
+        ctx.active = bool(active)
     except Exception:
-        _BATTLE_ACTIVE = False
+        ctx.active = False
 
 
 def is_battle_active() -> bool:
-    return _BATTLE_ACTIVE
+    return current_battle_context().active
 
 @dataclass
 class Stats:
@@ -168,9 +188,9 @@ class Stats:
     base_aggro: float = 0.1
     aggro_modifier: float = 0.0
 
-    # Action queue
+    # Action queue; ``action_value`` is read through the battle's ActionQueue
     action_gauge: int = GAUGE_START
-    action_value: float = 0.0
+    _action_value: float = field(default=0.0, init=False, repr=False)
     base_action_value: float = field(default=0.0, init=False)
 
     # Animation timing
@@ -194,6 +214,8 @@ class Stats:
 
     # Effects system
     _active_effects: list[StatEffect] = field(default_factory=list, init=False)
+    # Per-stat sum of ``_active_effects`` modifiers, kept in step with the list
+    _effect_totals: dict[str, float] = field(default_factory=dict, init=False, repr=False)
 
     level_up_gains: dict[str, float] = field(
         default_factory=lambda: {
@@ -248,10 +270,20 @@ class Stats:
         self._recalculate_passive_aggro()
 
     def __setattr__(self, name, value):
+        # Any write counts as a change for cached battle snapshots
+        state = self.__dict__
+        state["_rev"] = state.get("_rev", 0) + 1
         if name == "passives" and not isinstance(value, _PassiveList):
             object.__setattr__(self, name, _PassiveList(self, value))
             if "_aggro_passives" in self.__dict__:
                 self._recalculate_passive_aggro()
+        elif name == "_base_spd":
+            object.__setattr__(self, name, value)
+            self._speed_changed()
+        elif name == "_active_effects":
+            # Plugins replace the list wholesale; keep the totals in sync.
+            object.__setattr__(self, name, value)
+            self._rebuild_effect_totals()
         else:
             object.__setattr__(self, name, value)
 
@@ -352,13 +384,66 @@ class Stats:
         )
         return self.base_aggro * (1 + modifier + defense_term)
 
+    def _timeline(self):
+        ref = self.__dict__.get("_action_queue")
+        return ref() if ref is not None else None
+
+    @property
+    def action_value(self) -> float:
+        """Action value left before this combatant's next turn."""
+        queue = self._timeline()
+        if queue is not None:
+            value = queue.action_value_of(self)
+            if value is not None:
+                return value
+        return self._action_value
+
+    @action_value.setter
+    def action_value(self, value: float) -> None:
+        queue = self._timeline()
+        if queue is None or not queue.set_action_value(self, value):
+            self._action_value = value
+
+    def _speed_changed(self) -> None:
+        """Let the battle's action queue rescale this combatant's wait."""
+        queue = self._timeline()
+        if queue is not None:
+            queue.reschedule(self)
+
     def _calculate_stat_modifier(self, stat_name: str) -> Union[int, float]:
-        """Calculate the total modifier for a stat from all active effects."""
-        total: float = 0.0
-        for effect in self._active_effects:
-            if stat_name in effect.stat_modifiers:
-                total += effect.stat_modifiers[stat_name]
-        return total
+        """Return the total modifier for a stat from all active effects."""
+        return self._effect_totals.get(stat_name, 0.0)
+
+    def _rebuild_effect_totals(self, stat_names: Optional[Iterable[str]] = None) -> None:
+        """Recompute cached modifier totals from ``_active_effects``.
+
+        Sums run in list order so results match a fresh walk exactly. Pass
+        ``stat_names`` to refresh only the stats touched by a removal.
+        """
+        effects = self.__dict__.get("_active_effects", [])
+        self._mark_changed()
+        if stat_names is None:
+            totals: dict[str, float] = {}
+            for effect in effects:
+                for stat, value in effect.stat_modifiers.items():
+                    totals[stat] = totals.get(stat, 0.0) + value
+            object.__setattr__(self, "_effect_totals", totals)
+            self._speed_changed()
+            return
+        totals = self._effect_totals
+        for stat in stat_names:
+            total = 0.0
+            found = False
+            for effect in effects:
+                if stat in effect.stat_modifiers:
+                    total += effect.stat_modifiers[stat]
+                    found = True
+            if found:
+                totals[stat] = total
+            else:
+                totals.pop(stat, None)
+            if stat == "spd":
+                self._speed_changed()
 
     # Base stat access methods (for permanent changes like leveling)
     def set_base_stat(self, stat_name: str, value: Union[int, float]) -> None:
@@ -444,42 +529,83 @@ class Stats:
             if applied:
                 self._aggro_passives.append(pid)
 
+    def _mark_changed(self) -> None:
+        """Bump ``_rev`` for changes that bypass ``__setattr__``.
+
+        :class:`~autofighter.rooms.utils.SerializeCache` only re-serializes a
+        combatant whose ``_rev`` moved since its last snapshot.
+        """
+        self.__dict__["_rev"] = self.__dict__.get("_rev", 0) + 1
+
     # Effect management methods
     def add_effect(self, effect: StatEffect) -> None:
         """Add a stat effect."""
         # Remove any existing effect with the same name to prevent stacking
         self.remove_effect_by_name(effect.name)
         self._active_effects.append(effect)
+        self._mark_changed()
+        totals = self._effect_totals
+        for stat, value in effect.stat_modifiers.items():
+            totals[stat] = totals.get(stat, 0.0) + value
+        if "spd" in effect.stat_modifiers:
+            self._speed_changed()
         log.debug(f"Added effect {effect.name} with modifiers {effect.stat_modifiers}")
 
     def remove_effect_by_name(self, effect_name: str) -> bool:
         """Remove an effect by name. Returns True if an effect was removed."""
-        initial_count = len(self._active_effects)
-        self._active_effects = [e for e in self._active_effects if e.name != effect_name]
-        removed = len(self._active_effects) < initial_count
+        kept = []
+        touched: set[str] = set()
+        for effect in self._active_effects:
+            if effect.name == effect_name:
+                touched.update(effect.stat_modifiers)
+            else:
+                kept.append(effect)
+        removed = len(kept) < len(self._active_effects)
         if removed:
+            object.__setattr__(self, "_active_effects", kept)
+            self._rebuild_effect_totals(touched)
             log.debug(f"Removed effect {effect_name}")
         return removed
 
     def remove_effect_by_source(self, source: str) -> int:
         """Remove all effects from a specific source. Returns number of effects removed."""
-        initial_count = len(self._active_effects)
-        self._active_effects = [e for e in self._active_effects if e.source != source]
-        removed_count = initial_count - len(self._active_effects)
+        kept = []
+        touched: set[str] = set()
+        for effect in self._active_effects:
+            if effect.source == source:
+                touched.update(effect.stat_modifiers)
+            else:
+                kept.append(effect)
+        removed_count = len(self._active_effects) - len(kept)
         if removed_count > 0:
+            object.__setattr__(self, "_active_effects", kept)
+            self._rebuild_effect_totals(touched)
             log.debug(f"Removed {removed_count} effects from source {source}")
         return removed_count
 
     def tick_effects(self) -> None:
         """Update all temporary effects, removing expired ones."""
-        expired_effects = []
+        expired_names: set[str] = set()
+        if self._active_effects:
+            self._mark_changed()
         for effect in self._active_effects:
             effect.tick()
             if effect.is_expired():
-                expired_effects.append(effect.name)
+                expired_names.add(effect.name)
+        if not expired_names:
+            return
 
-        for effect_name in expired_effects:
-            self.remove_effect_by_name(effect_name)
+        kept = []
+        touched: set[str] = set()
+        for effect in self._active_effects:
+            if effect.name in expired_names:
+                touched.update(effect.stat_modifiers)
+            else:
+                kept.append(effect)
+        object.__setattr__(self, "_active_effects", kept)
+        self._rebuild_effect_totals(touched)
+        for effect_name in expired_names:
+            log.debug(f"Removed effect {effect_name}")
 
     def get_active_effects(self) -> list[StatEffect]:
         """Get a copy of all active effects."""
@@ -488,6 +614,9 @@ class Stats:
     def clear_all_effects(self) -> None:
         """Remove all active effects."""
         self._active_effects.clear()
+        self._effect_totals.clear()
+        self._mark_changed()
+        self._speed_changed()
         log.debug("Cleared all stat effects")
 
     @property
@@ -683,7 +812,9 @@ class Stats:
         BUS.emit_batched("damage_taken", self, attacker, original_amount)
         if attacker is not None:
             attacker.damage_dealt += original_amount
-            BUS.emit_batched("damage_dealt", attacker, self, original_amount, "attack", None, None, action_name)
+            # Record the element now; batched delivery may see a later one
+            element = getattr(attacker.damage_type, "id", str(attacker.damage_type))
+            BUS.emit_batched("damage_dealt", attacker, self, original_amount, "attack", None, element, action_name)
         return original_amount
 
     async def apply_healing(self, amount: int, healer: Optional["Stats"] = None, source_type: str = "heal", source_name: Optional[str] = None) -> int:
@@ -7,6 +7,7 @@ from typing import Dict
 from typing import List
 from typing import Optional
 
+from autofighter.battle_context import current_battle_context
 from autofighter.stats import BUS
 from autofighter.stats import Stats
 from plugins.damage_types._base import DamageTypeBase
@@ -20,23 +21,36 @@ if TYPE_CHECKING:  # pragma: no cover - type checking only
 
 
 class SummonManager:
-    """Track and control active summons."""
+    """Track and control active summons.
+
+    Summon tracking lives on the current :class:`BattleContext`, so each
+    battle sees only its own summons.
+    """
 
-    _active_summons: ClassVar[Dict[str, List[Summon]]] = {}
-    _summon_limits: ClassVar[Dict[str, int]] = {}
-    _summoner_refs: ClassVar[Dict[str, Stats]] = {}
     _initialized: ClassVar[bool] = False
 
+    @staticmethod
+    def _active() -> Dict[str, List[Summon]]:
+        return current_battle_context().summons
+
+    @staticmethod
+    def _limits() -> Dict[str, int]:
+        return current_battle_context().summon_limits
+
+    @staticmethod
+    def _refs() -> Dict[str, Stats]:
+        return current_battle_context().summoner_refs
+
     @classmethod
     def initialize(cls) -> None:
-        """Register event handlers once."""
+        """Register event handlers once, on the process-wide bus."""
         if cls._initialized:
             return
-        BUS.subscribe("battle_start", cls._on_battle_start)
-        BUS.subscribe("battle_end", cls._on_battle_end)
-        BUS.subscribe("turn_start", cls._on_turn_start)
-        BUS.subscribe("entity_defeat", cls._on_entity_defeat)
-        BUS.subscribe("entity_killed", cls._on_entity_killed)
+        BUS.subscribe_global("battle_start", cls._on_battle_start)
+        BUS.subscribe_global("battle_end", cls._on_battle_end)
+        BUS.subscribe_global("turn_start", cls._on_turn_start)
+        BUS.subscribe_global("entity_defeat", cls._on_entity_defeat)
+        BUS.subscribe_global("entity_killed", cls._on_entity_killed)
         cls._initialized = True
         log.debug("SummonManager initialized")
 
@@ -63,12 +77,13 @@ class SummonManager:
             return None
 
         summoner_id = getattr(summoner, "id", str(id(summoner)))
-        if summoner_id not in cls._active_summons:
-            cls._active_summons[summoner_id] = []
-            cls._summon_limits[summoner_id] = max_summons
-        cls._summoner_refs[summoner_id] = summoner
+        active = cls._active()
+        if summoner_id not in active:
+            active[summoner_id] = []
+            cls._limits()[summoner_id] = max_summons
+        cls._refs()[summoner_id] = summoner
 
-        if len(cls._active_summons[summoner_id]) >= max_summons:
+        if len(active[summoner_id]) >= max_summons:
             log.debug("Summon limit (%s) reached for %s", max_summons, summoner_id)
             if not force_create:
                 decision = cls.should_resummon(summoner_id, min_health_threshold)
@@ -83,7 +98,7 @@ class SummonManager:
                     )
                     cls.remove_summon(worst, "replaced_by_healthier_summon")
             else:
-                existing = cls._active_summons[summoner_id]
+                existing = active[summoner_id]
                 if existing:
                     cls.remove_summon(existing[0], "forced_replacement")
                 else:
@@ -97,14 +112,14 @@ class SummonManager:
             turns_remaining,
             override_damage_type,
         )
-        cls._active_summons[summoner_id].append(summon)
+        active[summoner_id].append(summon)
         BUS.emit_batched("summon_created", summoner, summon, source)
         log.info("Created %s summon for %s from %s", summon_type, summoner_id, source)
         return summon
 
     @classmethod
     def get_summons(cls, summoner_id: str) -> List[Summon]:
-        return cls._active_summons.get(summoner_id, []).copy()
+        return cls._active().get(summoner_id, []).copy()
 
     @classmethod
     def evaluate_summon_viability(
@@ -193,13 +208,14 @@ class SummonManager:
     @classmethod
     def remove_summon(cls, summon: Summon, reason: str = "unknown") -> bool:
         sid = summon.summoner_id
-        if sid in cls._active_summons and summon in cls._active_summons[sid]:
-            cls._active_summons[sid].remove(summon)
+        active = cls._active()
+        if sid in active and summon in active[sid]:
+            active[sid].remove(summon)
             BUS.emit_batched("summon_removed", summon, reason)
-            if not cls._active_summons[sid]:
-                del cls._active_summons[sid]
-                cls._summon_limits.pop(sid, None)
-                cls._summoner_refs.pop(sid, None)
+            if not active[sid]:
+                del active[sid]
+                cls._limits().pop(sid, None)
+                cls._refs().pop(sid, None)
             log.debug("Removed summon %s due to %s", summon.id, reason)
             return True
         return False
@@ -207,8 +223,9 @@ class SummonManager:
     @classmethod
     def remove_all_summons(cls, summoner_id: str, reason: str = "cleanup") -> int:
         count = 0
-        if summoner_id in cls._active_summons:
-            for summon in cls._active_summons[summoner_id].copy():
+        active = cls._active()
+        if summoner_id in active:
+            for summon in active[summoner_id].copy():
                 if cls.remove_summon(summon, reason):
                     count += 1
         return count
@@ -216,7 +233,7 @@ class SummonManager:
     @classmethod
     def get_all_summons(cls) -> List[Summon]:
         all_summons: List[Summon] = []
-        for summons in cls._active_summons.values():
+        for summons in cls._active().values():
             all_summons.extend(summons)
         return all_summons
 
@@ -227,8 +244,9 @@ class SummonManager:
     @classmethod
     def _on_battle_end(cls, *_, **__):
         total_removed = 0
-        for sid in list(cls._active_summons.keys()):
-            for summon in cls._active_summons[sid].copy():
+        active = cls._active()
+        for sid in list(active.keys()):
+            for summon in active[sid].copy():
                 if summon.is_temporary:
                     cls.remove_summon(summon, "battle_end")
                     total_removed += 1
@@ -239,8 +257,9 @@ class SummonManager:
     @classmethod
     def _on_turn_start(cls, entity, **__):
         eid = getattr(entity, "id", str(id(entity)))
-        if eid in cls._active_summons:
-            for summon in cls._active_summons[eid].copy():
+        active = cls._active()
+        if eid in active:
+            for summon in active[eid].copy():
                 if not summon.tick_turn():
                     cls.remove_summon(summon, "expired")
 
@@ -254,7 +273,7 @@ class SummonManager:
     @classmethod
     async def _on_entity_killed(cls, victim, *_, **__):
         if isinstance(victim, Summon):
-            summoner = cls._summoner_refs.get(victim.summoner_id)
+            summoner = cls._refs().get(victim.summoner_id)
             cls.remove_summon(victim, "defeated")
             if summoner is not None:
                 await BUS.emit_async("summon_defeated", summoner, victim)
@@ -283,9 +302,9 @@ class SummonManager:
 
     @classmethod
     def cleanup(cls) -> None:
-        cls._active_summons.clear()
-        cls._summon_limits.clear()
-        cls._summoner_refs.clear()
+        cls._active().clear()
+        cls._limits().clear()
+        cls._refs().clear()
         log.debug("SummonManager cleaned up")
 
     @classmethod
@@ -295,11 +314,12 @@ class SummonManager:
 
     @classmethod
     def _cleanup_empty_entries(cls) -> None:
-        empty = [sid for sid, summons in cls._active_summons.items() if not summons]
+        active = cls._active()
+        empty = [sid for sid, summons in active.items() if not summons]
         for sid in empty:
-            del cls._active_summons[sid]
-            cls._summon_limits.pop(sid, None)
-            cls._summoner_refs.pop(sid, None)
+            del active[sid]
+            cls._limits().pop(sid, None)
+            cls._refs().pop(sid, None)
         if empty:
             log.debug("Cleaned up %s empty summon entries", len(empty))
 
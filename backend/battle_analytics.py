@@ -0,0 +1,378 @@
+"""Cross-run battle analytics index.
+
+Every finished battle writes ``summary/battle_summary.json`` under
+``logs/runs/<run_id>/battles/<index>/``; log retention later moves idle
+battles into the run's ``battles*.zip`` archives. This module loads those summaries
+into a local SQLite database so questions such as "win rate by relic" or
+"average turns per floor" are answered with indexed queries instead of
+reparsing every file.
+
+The server opens one index per database at startup (:func:`get_analytics_index`)
+and reuses it for every request. Battles are ingested by
+:class:`battle_logging.BattleLogger` when they are finalized. Existing logs,
+live or archived, can be loaded with::
+
+    python -m battle_analytics backfill [--logs PATH]
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import json
+import logging
+import os
+from pathlib import Path
+import sqlite3
+import threading
+import time
+from typing import Any
+from typing import Iterator
+import zipfile
+
+from log_retention import run_archives
+
+log = logging.getLogger(__name__)
+
+DEFAULT_LOGS_PATH = Path(__file__).resolve().parent / "logs"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS battles (
+    battle_id TEXT PRIMARY KEY,
+    run_id TEXT NOT NULL,
+    battle_index INTEGER NOT NULL,
+    result TEXT,
+    won INTEGER NOT NULL DEFAULT 0,
+    start_time TEXT,
+    end_time TEXT,
+    duration_seconds REAL,
+    event_count INTEGER,
+    turns INTEGER,
+    floor INTEGER,
+    room_index INTEGER,
+    loop INTEGER,
+    room_type TEXT,
+    source_mtime REAL
+);
+CREATE INDEX IF NOT EXISTS idx_battles_run ON battles(run_id, battle_index);
+CREATE INDEX IF NOT EXISTS idx_battles_floor ON battles(floor);
+CREATE INDEX IF NOT EXISTS idx_battles_result ON battles(result);
+
+CREATE TABLE IF NOT EXISTS battle_relics (
+    battle_id TEXT NOT NULL,
+    relic_id TEXT NOT NULL,
+    stacks INTEGER NOT NULL,
+    PRIMARY KEY (battle_id, relic_id)
+);
+CREATE INDEX IF NOT EXISTS idx_battle_relics_relic ON battle_relics(relic_id);
+
+CREATE TABLE IF NOT EXISTS battle_damage (
+    battle_id TEXT NOT NULL,
+    entity_id TEXT NOT NULL,
+    damage_type TEXT NOT NULL,
+    amount INTEGER NOT NULL,
+    PRIMARY KEY (battle_id, entity_id, damage_type)
+);
+CREATE INDEX IF NOT EXISTS idx_battle_damage_type ON battle_damage(damage_type);
+
+CREATE TABLE IF NOT EXISTS battle_damage_sources (
+    battle_id TEXT NOT NULL,
+    source_type TEXT NOT NULL,
+    entity_id TEXT NOT NULL,
+    amount INTEGER NOT NULL,
+    PRIMARY KEY (battle_id, source_type, entity_id)
+);
+CREATE INDEX IF NOT EXISTS idx_battle_damage_sources_source
+    ON battle_damage_sources(source_type);
+"""
+
+_CHILD_TABLES = ("battle_relics", "battle_damage", "battle_damage_sources")
+
+_SUMMARY_MEMBER = "summary/battle_summary.json"
+
+_INDEXES: dict[Path, AnalyticsIndex] = {}
+_INDEXES_LOCK = threading.Lock()
+
+
+def _int_or_none(value: Any) -> int | None:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class AnalyticsIndex:
+    """SQLite index of battle summaries for one logs directory."""
+
+    def __init__(self, db_path: Path | str):
+        self.db_path = Path(db_path)
+        self._schema_ready = False
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_logs(cls, logs_path: Path | None = None) -> AnalyticsIndex:
+        """Return the shared index for ``logs_path``, honouring ``AF_ANALYTICS_DB``.
+
+        Instances are cached per database file, so the schema is only set up
+        once per process.
+        """
+        override = os.getenv("AF_ANALYTICS_DB")
+        db_path = Path(override) if override else (logs_path or DEFAULT_LOGS_PATH) / "analytics.db"
+        with _INDEXES_LOCK:
+            index = _INDEXES.get(db_path)
+            if index is None:
+                index = _INDEXES[db_path] = cls(db_path)
+            return index
+
+    def open(self) -> None:
+        """Create the database and schema now rather than on first use."""
+        with self.connection():
+            pass
+
+    @contextlib.contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            if not self._schema_ready:
+                with self._lock:
+                    conn.execute("PRAGMA journal_mode=WAL")
+                    conn.executescript(_SCHEMA)
+                    self._schema_ready = True
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    # -- ingestion -------------------------------------------------------
+
+    def ingest_summary(
+        self,
+        summary: dict[str, Any],
+        run_id: str,
+        battle_index: int,
+        source_mtime: float | None = None,
+    ) -> None:
+        """Insert or replace one battle summary."""
+        battle_id = summary.get("battle_id") or f"{run_id}_battle_{battle_index}"
+        result = summary.get("result")
+        with self.connection() as conn:
+            for table in _CHILD_TABLES:
+                conn.execute(f"DELETE FROM {table} WHERE battle_id = ?", (battle_id,))
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO battles (
+                    battle_id, run_id, battle_index, result, won, start_time,
+                    end_time, duration_seconds, event_count, turns, floor,
+                    room_index, loop, room_type, source_mtime
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    battle_id,
+                    run_id,
+                    battle_index,
+                    result,
+                    int(result == "victory"),
+                    summary.get("start_time"),
+                    summary.get("end_time"),
+                    summary.get("duration_seconds"),
+                    _int_or_none(summary.get("event_count")),
+                    _int_or_none(summary.get("turns")),
+                    _int_or_none(summary.get("floor")),
+                    _int_or_none(summary.get("room_index")),
+                    _int_or_none(summary.get("loop")),
+                    summary.get("room_type"),
+                    source_mtime,
+                ),
+            )
+            conn.executemany(
+                "INSERT INTO battle_relics VALUES (?, ?, ?)",
+                [
+                    (battle_id, str(relic), int(stacks))
+                    for relic, stacks in (summary.get("party_relics") or {}).items()
+                ],
+            )
+            conn.executemany(
+                "INSERT INTO battle_damage VALUES (?, ?, ?, ?)",
+                [
+                    (battle_id, str(entity), str(damage_type), int(amount))
+                    for entity, types in (summary.get("damage_by_type") or {}).items()
+                    for damage_type, amount in types.items()
+                ],
+            )
+            conn.executemany(
+                "INSERT INTO battle_damage_sources VALUES (?, ?, ?, ?)",
+                [
+                    (battle_id, str(source), str(entity), int(amount))
+                    for source, entities in (summary.get("damage_by_source") or {}).items()
+                    for entity, amount in entities.items()
+                ],
+            )
+
+    def ingest_file(self, path: Path, run_id: str, battle_index: int) -> None:
+        summary = json.loads(path.read_text())
+        self.ingest_summary(summary, run_id, battle_index, path.stat().st_mtime)
+
+    @staticmethod
+    def _find_summaries(
+        runs_root: Path, counts: dict[str, int]
+    ) -> dict[tuple[str, int], tuple[Path | zipfile.Path, float]]:
+        """Map ``(run_id, index)`` to each battle's summary and its mtime.
+
+        Archives are read oldest first and live directories last, so when a
+        battle exists in more than one place the most recent copy wins.
+        """
+        found: dict[tuple[str, int], tuple[Path | zipfile.Path, float]] = {}
+        if not runs_root.is_dir():
+            return found
+        for run_path in sorted(runs_root.iterdir()):
+            if not run_path.is_dir():
+                continue
+            for archive in run_archives(run_path):
+                try:
+                    with zipfile.ZipFile(archive) as zf:
+                        members = zf.infolist()
+                except (OSError, zipfile.BadZipFile):
+                    log.exception("Failed to read battle archive %s", archive)
+                    counts["failed"] += 1
+                    continue
+                for info in members:
+                    head, _, rest = info.filename.partition("/")
+                    if rest == _SUMMARY_MEMBER and head.isdigit():
+                        mtime = time.mktime(info.date_time + (0, 0, -1))
+                        source = zipfile.Path(archive, info.filename)
+                        found[(run_path.name, int(head))] = (source, mtime)
+            for path in run_path.glob(f"battles/*/{_SUMMARY_MEMBER}"):
+                battle_dir = path.parent.parent
+                if battle_dir.name.isdigit():
+                    found[(run_path.name, int(battle_dir.name))] = (path, path.stat().st_mtime)
+        return found
+
+    def backfill(self, logs_path: Path | None = None) -> dict[str, int]:
+        """Ingest every live or archived summary under ``logs_path`` that is new or changed."""
+        runs_root = (logs_path or DEFAULT_LOGS_PATH) / "runs"
+        with self.connection() as conn:
+            known = {
+                row["battle_id"]: row["source_mtime"]
+                for row in conn.execute("SELECT battle_id, source_mtime FROM battles")
+            }
+        counts = {"ingested": 0, "skipped": 0, "failed": 0}
+        summaries = self._find_summaries(runs_root, counts)
+        for (run_id, battle_index), (source, mtime) in sorted(summaries.items()):
+            battle_id = f"{run_id}_battle_{battle_index}"
+            if known.get(battle_id) == mtime:
+                counts["skipped"] += 1
+                continue
+            try:
+                summary = json.loads(source.read_text())
+                self.ingest_summary(summary, run_id, battle_index, mtime)
+                counts["ingested"] += 1
+            except Exception:
+                log.exception("Failed to ingest battle summary %s", source)
+                counts["failed"] += 1
+        return counts
+
+    # -- queries ---------------------------------------------------------
+
+    def win_rate_by_relic(self, min_battles: int = 1) -> list[dict[str, Any]]:
+        with self.connection() as conn:
+            rows = conn.execute(
+                """
+                SELECT r.relic_id AS relic_id,
+                       COUNT(*) AS battles,
+                       SUM(b.won) AS wins,
+                       AVG(b.won) AS win_rate,
+                       AVG(r.stacks) AS avg_stacks
+                FROM battle_relics r
+                JOIN battles b ON b.battle_id = r.battle_id
+                GROUP BY r.relic_id
+                HAVING COUNT(*) >= ?
+                ORDER BY win_rate DESC, battles DESC
+                """,
+                (min_battles,),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def turns_by_floor(self) -> list[dict[str, Any]]:
+        with self.connection() as conn:
+            rows = conn.execute(
+                """
+                SELECT floor,
+                       COUNT(*) AS battles,
+                       AVG(turns) AS avg_turns,
+                       AVG(duration_seconds) AS avg_duration_seconds,
+                       AVG(won) AS win_rate
+                FROM battles
+                WHERE floor IS NOT NULL
+                GROUP BY floor
+                ORDER BY floor
+                """
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def top_damage_sources(self, by: str = "source", limit: int = 10) -> list[dict[str, Any]]:
+        """Rank damage by ``source`` type, ``damage_type`` or ``entity``."""
+        queries = {
+            "source": (
+                "SELECT source_type AS name, SUM(amount) AS total, "
+                "COUNT(DISTINCT battle_id) AS battles "
+                "FROM battle_damage_sources GROUP BY source_type"
+            ),
+            "damage_type": (
+                "SELECT damage_type AS name, SUM(amount) AS total, "
+                "COUNT(DISTINCT battle_id) AS battles "
+                "FROM battle_damage GROUP BY damage_type"
+            ),
+            "entity": (
+                "SELECT entity_id AS name, SUM(amount) AS total, "
+                "COUNT(DISTINCT battle_id) AS battles "
+                "FROM battle_damage GROUP BY entity_id"
+            ),
+        }
+        if by not in queries:
+            raise ValueError(f"unknown grouping: {by}")
+        with self.connection() as conn:
+            rows = conn.execute(
+                f"{queries[by]} ORDER BY total DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def overview(self) -> dict[str, Any]:
+        with self.connection() as conn:
+            row = conn.execute(
+                """
+                SELECT COUNT(*) AS battles,
+                       COUNT(DISTINCT run_id) AS runs,
+                       COALESCE(AVG(won), 0) AS win_rate,
+                       AVG(turns) AS avg_turns,
+                       AVG(duration_seconds) AS avg_duration_seconds
+                FROM battles
+                """
+            ).fetchone()
+        return dict(row)
+
+
+def get_analytics_index() -> AnalyticsIndex:
+    """Return the process-wide index for the default logs directory."""
+    return AnalyticsIndex.for_logs()
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m battle_analytics",
+        description="Maintain the cross-run battle analytics index.",
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+    backfill = sub.add_parser("backfill", help="ingest existing battle summaries")
+    backfill.add_argument("--logs", type=Path, default=None, help="logs directory")
+    args = parser.parse_args(argv)
+
+    index = AnalyticsIndex.for_logs(args.logs)
+    counts = index.backfill(args.logs)
+    print(json.dumps({"db": str(index.db_path), **counts}))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,350 @@
+"""On-disk battle event log: NDJSON records plus a per-battle offset index.
+
+``BattleEventWriter`` appends one compact JSON record per event to
+``summary/events.ndjson`` (optionally ``.gz``/``.zst``) from a background
+thread. Next to it, ``events.idx`` stores one fixed-size entry per event:
+the record's byte offset in the uncompressed stream and its turn number.
+Readers use the index to jump straight to a cursor or to the first event of
+a turn range instead of parsing the log from the start.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from bisect import bisect_right
+from collections.abc import Iterator
+from collections.abc import Sequence
+import contextlib
+import gzip
+import io
+import json
+import logging
+import os
+from pathlib import Path
+import queue
+import struct
+import threading
+from typing import IO
+from typing import Any
+from typing import Optional
+from typing import Union
+import zipfile
+
+try:
+    import zstandard
+except Exception:  # pragma: no cover - optional dependency
+    zstandard = None
+
+log = logging.getLogger(__name__)
+
+EVENTS_FILENAME = "events.ndjson"
+INDEX_FILENAME = "events.idx"
+LEGACY_EVENTS_FILENAME = "events.json"
+COMPRESSION_SUFFIXES = {None: "", "gzip": ".gz", "zstd": ".zst"}
+
+# Battle summary directory: on disk, or inside a run's log archive
+BattlePath = Union[Path, zipfile.Path]
+
+# Index entry: uncompressed byte offset (u64) and turn number (u32)
+_INDEX_ENTRY = struct.Struct("<QI")
+
+
+def event_record(event: Any, turn: int = 0) -> dict[str, Any]:
+    return {
+        "timestamp": event.timestamp.isoformat(),
+        "turn": turn,
+        "event_type": event.event_type,
+        "attacker_id": event.attacker_id,
+        "target_id": event.target_id,
+        "amount": event.amount,
+        "details": event.details,
+        "source_type": event.source_type,
+        "source_name": event.source_name,
+        "damage_type": event.damage_type,
+        "effect_details": event.effect_details,
+    }
+
+
+def raw_line(event: Any) -> str:
+    details_str = ""
+    if event.source_type:
+        details_str += f" [source_type: {event.source_type}]"
+    if event.source_name:
+        details_str += f" [source_name: {event.source_name}]"
+    if event.damage_type:
+        details_str += f" [damage_type: {event.damage_type}]"
+    if event.effect_details:
+        details_str += f" [effect: {event.effect_details}]"
+    if event.details:
+        details_str += f" [details: {event.details}]"
+    return (
+        f"{event.event_type}: {event.attacker_id or 'N/A'} -> {event.target_id or 'N/A'} "
+        f"(amount: {event.amount or 'N/A'}){details_str}"
+    )
+
+
+def resolve_compression(compression: Optional[str]) -> Optional[str]:
+    if compression is None:
+        compression = os.getenv("AF_BATTLE_LOG_COMPRESSION", "")
+    compression = (compression or "").strip().lower() or None
+    if compression in {"none", "off"}:
+        return None
+    if compression == "zstd" and zstandard is None:
+        log.warning("zstandard is not installed; battle events will use gzip")
+        return "gzip"
+    if compression not in COMPRESSION_SUFFIXES:
+        log.warning("Unknown battle log compression %r; writing plain NDJSON", compression)
+        return None
+    return compression
+
+
+def events_path(directory: BattlePath, compression: Optional[str] = None) -> BattlePath:
+    """Return the events file name for ``compression`` inside ``directory``."""
+    return directory / f"{EVENTS_FILENAME}{COMPRESSION_SUFFIXES[compression]}"
+
+
+def find_events_file(directory: BattlePath) -> Optional[BattlePath]:
+    """Return the events file stored in ``directory``, whatever its format."""
+    for compression in COMPRESSION_SUFFIXES:
+        path = events_path(directory, compression)
+        if path.exists():
+            return path
+    legacy = directory / LEGACY_EVENTS_FILENAME
+    return legacy if legacy.exists() else None
+
+
+@contextlib.contextmanager
+def open_events(path: BattlePath) -> Iterator[IO[bytes]]:
+    """Open an events file for binary reading, handling compression.
+
+    ``path`` may be a filesystem path or a ``zipfile.Path`` member of a run
+    archive (see ``log_retention``).
+    """
+    with path.open("rb") as raw:
+        if path.suffix == ".gz":
+            with gzip.GzipFile(fileobj=raw, mode="rb") as fh:
+                yield fh
+        elif path.suffix == ".zst":
+            if zstandard is None:
+                raise RuntimeError("zstandard is required to read .zst battle logs")
+            yield io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(raw))
+        else:
+            yield raw
+
+
+def _open_writer(path: Path) -> IO[bytes]:
+    if path.suffix == ".gz":
+        return gzip.open(path, "wb")
+    if path.suffix == ".zst":
+        return zstandard.ZstdCompressor().stream_writer(open(path, "wb"), closefd=True)
+    return open(path, "wb")
+
+
+class EventIndex(Sequence):
+    """Read-only view over an ``events.idx`` file."""
+
+    def __init__(self, data: bytes):
+        self._data = data
+        self._count = len(data) // _INDEX_ENTRY.size
+
+    @classmethod
+    def load(cls, directory: BattlePath) -> Optional[EventIndex]:
+        path = directory / INDEX_FILENAME
+        if not path.exists():
+            return None
+        return cls(path.read_bytes())
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, i):  # type: ignore[override]
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self._count))]
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError(i)
+        return _INDEX_ENTRY.unpack_from(self._data, i * _INDEX_ENTRY.size)
+
+    def offset(self, i: int) -> int:
+        return self[i][0]
+
+    def first_at_turn(self, turn: int) -> int:
+        """Position of the first event whose turn is ``>= turn``."""
+        return bisect_left(self, turn, key=lambda entry: entry[1])
+
+    def end_of_turn(self, turn: int) -> int:
+        """Position just past the last event whose turn is ``<= turn``."""
+        return bisect_right(self, turn, key=lambda entry: entry[1])
+
+
+_STOP = object()
+
+
+class BattleEventWriter:
+    """Append battle events to an NDJSON file from a background thread.
+
+    ``write`` only enqueues the event; encoding, compression, the raw
+    ``battle.log`` line, the offset index and disk I/O all happen on the
+    writer thread, so the event loop never blocks on logging and nothing
+    accumulates in memory beyond the events still queued.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        compression: Optional[str] = None,
+        raw_logger: Optional[logging.Logger] = None,
+    ):
+        self.compression = resolve_compression(compression)
+        self.path = events_path(directory, self.compression)
+        self.index_path = directory / INDEX_FILENAME
+        self._raw_logger = raw_logger
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread = threading.Thread(
+            target=self._run, name=f"battle-events-{directory.parent.name}", daemon=True
+        )
+        self._closed = False
+        self._thread.start()
+
+    def write(self, event: Any, turn: int = 0) -> None:
+        if not self._closed:
+            self._queue.put((event, turn))
+
+    def close(self) -> None:
+        """Stop accepting events; the thread drains the queue and exits."""
+        if not self._closed:
+            self._closed = True
+            self._queue.put(_STOP)
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        self._thread.join(timeout)
+
+    def _run(self) -> None:
+        try:
+            fh = _open_writer(self.path)
+            index = open(self.index_path, "wb")
+        except Exception:
+            log.exception("Could not open battle event log %s", self.path)
+            while self._queue.get() is not _STOP:
+                pass
+            return
+        offset = 0
+        with fh, index:
+            while True:
+                item = self._queue.get()
+                if item is _STOP:
+                    break
+                event, turn = item
+                try:
+                    line = json.dumps(
+                        event_record(event, turn), separators=(",", ":"), default=str
+                    ).encode("utf-8") + b"\n"
+                    fh.write(line)
+                    index.write(_INDEX_ENTRY.pack(offset, turn))
+                    offset += len(line)
+                    if self._raw_logger is not None:
+                        self._raw_logger.info(raw_line(event))
+                except Exception:
+                    log.exception("Failed to write battle event")
+                if self._queue.empty():
+                    fh.flush()
+                    index.flush()
+
+
+def _skip(fh, count: int) -> None:
+    """Advance a forward-only stream by ``count`` bytes."""
+    while count > 0:
+        chunk = fh.read(min(count, 1 << 16))
+        if not chunk:
+            return
+        count -= len(chunk)
+
+
+def iter_battle_events(
+    directory: BattlePath, start: int = 0
+) -> Iterator[tuple[int, dict[str, Any]]]:
+    """Yield ``(position, event)`` from ``directory`` starting at ``start``.
+
+    Uses the offset index to seek when one is present (plain files seek
+    directly, compressed ones skip forward without parsing). Falls back to
+    a sequential scan, and to the legacy ``events.json`` array for older
+    logs. A partially written trailing line, left by a writer that is still
+    draining, ends the iteration.
+    """
+    path = find_events_file(directory)
+    if path is None:
+        return
+    if path.name == LEGACY_EVENTS_FILENAME:
+        events = json.loads(path.read_text())
+        for position in range(start, len(events)):
+            yield position, events[position]
+        return
+    index = EventIndex.load(directory) if start else None
+    with open_events(path) as fh:
+        position = 0
+        if index is not None and start < len(index):
+            offset = index.offset(start)
+            if fh.seekable() and path.suffix != ".zst":
+                fh.seek(offset)
+            else:
+                _skip(fh, offset)
+            position = start
+        elif index is not None:
+            return
+        for line in fh:
+            if position >= start:
+                try:
+                    yield position, json.loads(line)
+                except json.JSONDecodeError:
+                    return
+            position += 1
+
+
+def read_battle_events(directory: BattlePath) -> Optional[list[dict[str, Any]]]:
+    """Return all events in ``directory`` or ``None`` when none were logged."""
+    if find_events_file(directory) is None:
+        return None
+    return [event for _, event in iter_battle_events(directory)]
+
+
+def query_battle_events(
+    directory: BattlePath,
+    cursor: int = 0,
+    limit: Optional[int] = 100,
+    event_type: Optional[set[str]] = None,
+    attacker_id: Optional[str] = None,
+    target_id: Optional[str] = None,
+    turn_min: Optional[int] = None,
+    turn_max: Optional[int] = None,
+) -> Iterator[tuple[int, dict[str, Any]]]:
+    """Yield ``(position, event)`` for events matching the filters.
+
+    ``cursor`` is the position to resume from (the ``next_cursor`` of the
+    previous page). At most ``limit`` matches are yielded; ``None`` means no
+    limit. Turn bounds are resolved through the offset index when available.
+    """
+    start = max(cursor, 0)
+    index = EventIndex.load(directory)
+    if index is not None:
+        if turn_min is not None:
+            start = max(start, index.first_at_turn(turn_min))
+        if turn_max is not None and start >= index.end_of_turn(turn_max):
+            return
+    matched = 0
+    for position, event in iter_battle_events(directory, start):
+        turn = event.get("turn", 0)
+        if turn_max is not None and turn > turn_max:
+            return
+        if turn_min is not None and turn < turn_min:
+            continue
+        if event_type and event.get("event_type") not in event_type:
+            continue
+        if attacker_id is not None and event.get("attacker_id") != attacker_id:
+            continue
+        if target_id is not None and event.get("target_id") != target_id:
+            continue
+        yield position, event
+        matched += 1
+        if limit is not None and matched >= limit:
+            return
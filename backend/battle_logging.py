@@ -21,8 +21,17 @@ from typing import Dict
 from typing import List
 from typing import Optional
 
+from battle_analytics import AnalyticsIndex
+from battle_event_log import BattleEventWriter
+from battle_event_log import iter_battle_events  # noqa: F401 - re-exported
+from battle_event_log import read_battle_events  # noqa: F401 - re-exported
+from log_retention import archived_battle_indices
+
+from autofighter.battle_context import current_battle_context
 from autofighter.stats import BUS
 
+log = logging.getLogger(__name__)
+
 
 class TimedMemoryHandler(MemoryHandler):
     """Memory handler that flushes to a target on a timed interval."""
@@ -93,7 +102,8 @@ class BattleSummary:
     total_damage_taken: Dict[str, int] = field(default_factory=dict)
     total_healing_done: Dict[str, int] = field(default_factory=dict)
     total_hits_landed: Dict[str, int] = field(default_factory=dict)
-    events: List[BattleEvent] = field(default_factory=list)
+    # Events are streamed to disk by BattleEventWriter; only the count is kept
+    event_count: int = 0
 
     # Enhanced tracking
     damage_by_type: Dict[str, Dict[str, int]] = field(default_factory=dict)  # entity -> damage_type -> amount
@@ -108,6 +118,13 @@ class BattleSummary:
     # Snapshot of party relics present during this battle (id -> count)
     party_relics: Dict[str, int] = field(default_factory=dict)
 
+    # Map position and length of the fight, filled in by the battle room
+    floor: Optional[int] = None
+    room_index: Optional[int] = None
+    loop: Optional[int] = None
+    room_type: Optional[str] = None
+    turns: int = 0
+
     # Extended healing tracking
     shield_absorbed: Dict[str, int] = field(default_factory=dict)  # entity -> total shield absorption
     temporary_hp_granted: Dict[str, int] = field(default_factory=dict)  # entity -> total temp HP granted
@@ -133,7 +150,13 @@ class BattleSummary:
 class BattleLogger:
     """Manages logging for individual battles."""
 
-    def __init__(self, run_id: str, battle_index: int, base_logs_path: Optional[Path] = None):
+    def __init__(
+        self,
+        run_id: str,
+        battle_index: int,
+        base_logs_path: Optional[Path] = None,
+        compression: Optional[str] = None,
+    ):
         self.run_id = run_id
         self.battle_index = battle_index
         self.summary = BattleSummary(
@@ -148,6 +171,7 @@ class BattleLogger:
         # Create folder structure
         if base_logs_path is None:
             base_logs_path = Path(__file__).resolve().parent / "logs"
+        self.logs_root = base_logs_path
         self.base_path = base_logs_path / "runs" / run_id / "battles" / str(battle_index)
         self.raw_path = self.base_path / "raw"
         self.summary_path = self.base_path / "summary"
@@ -178,7 +202,11 @@ class BattleLogger:
 
         self.raw_logger.propagate = False
 
-        # Event tracking
+        self._writer = BattleEventWriter(self.summary_path, compression, self.raw_logger)
+
+        # Event tracking; ``turn`` is advanced by the battle loop and stored
+        # with each event so readers can filter and seek by turn range.
+        self.turn = 0
         self._lock = threading.Lock()
         self._active = True
 
@@ -255,8 +283,8 @@ class BattleLogger:
             return
 
         with self._lock:
-            # Add to summary
-            self.summary.events.append(event)
+            self.summary.event_count += 1
+            self._writer.write(event, self.turn)
 
             # Track per-entity damage by element
             if (
@@ -267,24 +295,6 @@ class BattleLogger:
                 types = self.summary.damage_by_type.setdefault(event.attacker_id, {})
                 types[event.damage_type] = types.get(event.damage_type, 0) + event.amount
 
-            # Log to raw file with enhanced details
-            details_str = ""
-            if event.source_type:
-                details_str += f" [source_type: {event.source_type}]"
-            if event.source_name:
-                details_str += f" [source_name: {event.source_name}]"
-            if event.damage_type:
-                details_str += f" [damage_type: {event.damage_type}]"
-            if event.effect_details:
-                details_str += f" [effect: {event.effect_details}]"
-            if event.details:
-                details_str += f" [details: {event.details}]"
-
-            self.raw_logger.info(
-                f"{event.event_type}: {event.attacker_id or 'N/A'} -> {event.target_id or 'N/A'} "
-                f"(amount: {event.amount or 'N/A'}){details_str}"
-            )
-
     def _on_battle_start(self, entity):
         """Handle battle start event."""
         entity_id = getattr(entity, 'id', str(entity))
@@ -748,12 +758,17 @@ class BattleLogger:
                 "total_hits_landed": self.summary.total_hits_landed,
                 "self_damage": self.summary.self_damage,
                 "friendly_fire": self.summary.friendly_fire,
-                "event_count": len(self.summary.events),
+                "event_count": self.summary.event_count,
                 "duration_seconds": (
                     (self.summary.end_time - self.summary.start_time).total_seconds()
                     if self.summary.end_time else None
                 ),
                 "party_relics": self.summary.party_relics,
+                "floor": self.summary.floor,
+                "room_index": self.summary.room_index,
+                "loop": self.summary.loop,
+                "room_type": self.summary.room_type,
+                "turns": self.summary.turns,
                 # Enhanced tracking data
                 "damage_by_type": self.summary.damage_by_type,
                 "damage_by_source": self.summary.damage_by_source,
@@ -785,25 +800,8 @@ class BattleLogger:
             with open(self.summary_path / "battle_summary.json", "w") as f:
                 json.dump(summary_data, f, indent=2)
 
-            # Write detailed events
-            events_data = [
-                {
-                    "timestamp": event.timestamp.isoformat(),
-                    "event_type": event.event_type,
-                    "attacker_id": event.attacker_id,
-                    "target_id": event.target_id,
-                    "amount": event.amount,
-                    "details": event.details,
-                    "source_type": event.source_type,
-                    "source_name": event.source_name,
-                    "damage_type": event.damage_type,
-                    "effect_details": event.effect_details
-                }
-                for event in self.summary.events
-            ]
-
-            with open(self.summary_path / "events.json", "w") as f:
-                json.dump(events_data, f, indent=2)
+            # Events were streamed as they arrived; let the writer drain
+            self._writer.close()
 
             # Write human-readable summary
             self._write_human_summary()
@@ -814,6 +812,7 @@ class BattleLogger:
 
         async def _flush_async() -> None:
             await asyncio.to_thread(self._shutdown_handlers)
+            await asyncio.to_thread(self._index_summary, summary_data)
 
         try:
             loop = asyncio.get_running_loop()
@@ -822,8 +821,19 @@ class BattleLogger:
         else:
             loop.create_task(_flush_async())
 
+    def _index_summary(self, summary_data: dict[str, Any]) -> None:
+        """Add the finished battle to the cross-run analytics index."""
+        try:
+            mtime = (self.summary_path / "battle_summary.json").stat().st_mtime
+            AnalyticsIndex.for_logs(self.logs_root).ingest_summary(
+                summary_data, self.run_id, self.battle_index, mtime
+            )
+        except Exception:
+            log.exception("Failed to index battle %s", self.summary.battle_id)
+
     def _shutdown_handlers(self) -> None:
         """Flush and close logging handlers."""
+        self._writer.join()
         self._listener.stop()
         self._memory_handler.flush()
         self._memory_handler.close()
@@ -1017,7 +1027,7 @@ class BattleLogger:
 
         lines.extend([
             "",
-            f"Total Events: {len(self.summary.events)}",
+            f"Total Events: {self.summary.event_count}",
         ])
 
         with open(self.summary_path / "human_summary.txt", "w") as f:
@@ -1137,7 +1147,8 @@ class RunLogger:
         battles_root = self.run_path / "battles"
         battles_root.mkdir(parents=True, exist_ok=True)
         try:
-            existing = [int(p.name) for p in battles_root.iterdir() if p.is_dir() and p.name.isdigit()]
+            existing = {int(p.name) for p in battles_root.iterdir() if p.is_dir() and p.name.isdigit()}
+            existing |= archived_battle_indices(self.run_path)
             self.battle_count = max(existing) if existing else 0
         except Exception:
             self.battle_count = 0
@@ -1164,43 +1175,90 @@ class RunLogger:
             self.current_battle_logger = None
 
 
-# Global run logger instance
+# Run loggers by run id, so concurrent runs never finalize or mix each
+# other's logs. ``_current_run_logger`` is the most recently started one and
+# serves callers that have no run id.
+_run_loggers: Dict[str, RunLogger] = {}
 _current_run_logger: Optional[RunLogger] = None
 _run_logger_lock = threading.Lock()
 
 
 def start_run_logging(run_id: str) -> RunLogger:
-    """Start logging for a new run."""
+    """Start logging for ``run_id``, replacing only that run's logger."""
     global _current_run_logger
     with _run_logger_lock:
-        if _current_run_logger:
-            _current_run_logger.finalize_run()
-        _current_run_logger = RunLogger(run_id)
+        previous = _run_loggers.pop(run_id, None)
+        if previous:
+            previous.finalize_run()
+        logger = RunLogger(run_id)
+        _run_loggers[run_id] = logger
+        _current_run_logger = logger
+        return logger
+
+
+def get_run_logger(run_id: Optional[str] = None) -> Optional[RunLogger]:
+    """Return the logger for ``run_id``.
+
+    Without a run id, the current battle's run is used, falling back to the
+    most recently started logger.
+    """
+    if run_id is None:
+        run_id = current_battle_context().run_id
+    if run_id is None:
+        return _current_run_logger
+    logger = _run_loggers.get(run_id)
+    if logger is None and _current_run_logger is not None and _current_run_logger.run_id == run_id:
         return _current_run_logger
+    return logger
 
 
 def get_current_run_logger() -> Optional[RunLogger]:
-    """Get the current run logger."""
-    return _current_run_logger
+    """Get the run logger for the current battle, or the latest one."""
+    return get_run_logger()
 
 
-def end_run_logging():
-    """End logging for the current run."""
-    global _current_run_logger
+def active_run_loggers() -> List[RunLogger]:
+    """Return every run logger that has not been ended."""
     with _run_logger_lock:
-        if _current_run_logger:
-            _current_run_logger.finalize_run()
-            _current_run_logger = None
+        loggers = list(_run_loggers.values())
+        if _current_run_logger is not None and _current_run_logger not in loggers:
+            loggers.append(_current_run_logger)
+        return loggers
 
 
-def start_battle_logging() -> Optional[BattleLogger]:
-    """Start logging for a new battle."""
-    if _current_run_logger:
-        return _current_run_logger.start_battle()
+def end_run_logging(run_id: Optional[str] = None):
+    """End logging for ``run_id``, or for every run when omitted."""
+    global _current_run_logger
+    with _run_logger_lock:
+        if run_id is None:
+            ended = list(_run_loggers.values())
+            if _current_run_logger is not None and _current_run_logger not in ended:
+                ended.append(_current_run_logger)
+            _run_loggers.clear()
+            _current_run_logger = None
+        else:
+            ended = []
+            logger = _run_loggers.pop(run_id, None)
+            if logger is not None:
+                ended.append(logger)
+            if _current_run_logger is not None and _current_run_logger.run_id == run_id:
+                if _current_run_logger not in ended:
+                    ended.append(_current_run_logger)
+                _current_run_logger = None
+        for logger in ended:
+            logger.finalize_run()
+
+
+def start_battle_logging(run_id: Optional[str] = None) -> Optional[BattleLogger]:
+    """Start logging a new battle for ``run_id`` (default: the current battle's run)."""
+    run_logger = get_run_logger(run_id)
+    if run_logger:
+        return run_logger.start_battle()
     return None
 
 
-def end_battle_logging(result: str = "completed"):
-    """End logging for the current battle."""
-    if _current_run_logger:
-        _current_run_logger.end_battle(result)
+def end_battle_logging(result: str = "completed", run_id: Optional[str] = None):
+    """End logging for the current battle of ``run_id``."""
+    run_logger = get_run_logger(run_id)
+    if run_logger:
+        run_logger.end_battle(result)
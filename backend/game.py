@@ -25,7 +25,9 @@ from autofighter.rooms import BattleRoom
 from autofighter.rooms import _build_foes  # noqa: F401
 from autofighter.rooms import _scale_stats  # noqa: F401
 from autofighter.rooms import _serialize  # noqa: F401
+from autofighter.run_state import RunStateStore
 from autofighter.save_manager import SaveManager
+from autofighter.snapshots import SnapshotLog
 from autofighter.stats import Stats
 from autofighter.stats import apply_status_hooks
 from plugins import players as player_plugins
@@ -70,8 +72,29 @@ def get_fernet() -> Fernet:
     assert FERNET is not None
     return FERNET
 
+
+# Live run state; ``checkpoint_run`` persists it at checkpoints
+RUN_STATE = RunStateStore(lambda: get_save_manager())
+
+
+def flush_run(run_id: str | None = None) -> int:
+    """Persist pending map/party changes for ``run_id`` (or every run)."""
+    return RUN_STATE.flush(run_id)
+
+
+async def checkpoint_run(run_id: str | None = None) -> int:
+    """``flush_run`` for event loop code: serializes on the loop, writes off it."""
+    return await RUN_STATE.checkpoint(run_id)
+
+
+def discard_run(run_id: str | None = None) -> None:
+    """Drop cached state for runs deleted from the database."""
+    RUN_STATE.discard(run_id)
+
 battle_tasks: dict[str, asyncio.Task] = {}
 battle_snapshots: dict[str, dict[str, Any]] = {}
+battle_snapshot_logs: dict[str, SnapshotLog] = {}
+battle_snapshot_waiters: dict[str, set[asyncio.Event]] = {}
 battle_locks: dict[str, asyncio.Lock] = {}
 
 
@@ -89,6 +112,7 @@ async def cleanup_battle_state() -> None:
             tasks_removed += 1
         if battle_snapshots.pop(run_id, None) is not None:
             snapshots_removed += 1
+        battle_snapshot_logs.pop(run_id, None)
         if battle_locks.pop(run_id, None) is not None:
             locks_removed += 1
 
@@ -108,12 +132,51 @@ async def cleanup_battle_state() -> None:
     gc.collect()
 
 
+def publish_snapshot(run_id: str, snapshot: dict[str, Any]) -> int:
+    """Store ``snapshot`` as the run's latest battle state and return its seq."""
+
+    battle_snapshots[run_id] = snapshot
+    log = battle_snapshot_logs.get(run_id)
+    if log is None:
+        log = battle_snapshot_logs[run_id] = SnapshotLog()
+    previous = log.seq
+    seq = log.record(snapshot)
+    if seq != previous:
+        wake_snapshot_waiters(run_id)
+    return seq
+
+
+def wake_snapshot_waiters(run_id: str) -> None:
+    """Wake stream clients following ``run_id``'s battle."""
+
+    for event in battle_snapshot_waiters.get(run_id, ()):
+        event.set()
+
+
+def snapshot_since(run_id: str, since: int | None) -> dict[str, Any] | None:
+    """Return what changed in ``run_id``'s battle snapshot after ``since``.
+
+    Every writer goes through :func:`publish_snapshot`, so reads only consult
+    the log and never diff the snapshot again.
+    """
+
+    snap = battle_snapshots.get(run_id)
+    if snap is None:
+        return None
+    log = battle_snapshot_logs.get(run_id)
+    if log is None:
+        publish_snapshot(run_id, snap)
+        log = battle_snapshot_logs[run_id]
+    return log.since(since)
+
+
 def get_battle_state_sizes() -> dict[str, int]:
     """Return the current sizes of battle state dictionaries."""
 
     return {
         "tasks": len(battle_tasks),
         "snapshots": len(battle_snapshots),
+        "snapshot_logs": len(battle_snapshot_logs),
         "locks": len(battle_locks),
     }
 
@@ -167,10 +230,17 @@ def _load_player_customization() -> tuple[str, dict[str, int]]:
     return pronouns, stats
 
 
-def _apply_character_customization(player: PlayerBase, pid: str) -> None:
-    """Apply saved customization multipliers to any character."""
+def _apply_character_customization(
+    player: PlayerBase, pid: str, loaded: dict[str, int] | None = None
+) -> None:
+    """Apply saved customization multipliers to any character.
+
+    ``loaded`` may carry allocations already fetched by the caller; otherwise
+    they are read from the save database.
+    """
 
-    loaded = _load_character_customization(pid)
+    if loaded is None:
+        loaded = _load_character_customization(pid)
     multipliers = {
         "max_hp_mult": 1 + loaded.get("hp", 0) * 0.01,
         "atk_mult": 1 + loaded.get("attack", 0) * 0.01,
@@ -244,12 +314,16 @@ def _load_individual_stat_upgrades(pid: str) -> dict[str, float]:
         return {row[0]: float(row[1]) for row in cur.fetchall()}
 
 
-def _apply_player_upgrades(player: PlayerBase) -> None:
+def _apply_player_upgrades(
+    player: PlayerBase, stat_upgrades: dict[str, float] | None = None
+) -> None:
     """Apply individual stat upgrades as a persistent, non-diminished effect.
 
     Keeps base stats unchanged so UI can show deltas (e.g., 5% (+2%)).
+    ``stat_upgrades`` may carry sums already fetched by the caller.
     """
-    stat_upgrades = _load_individual_stat_upgrades(player.id)
+    if stat_upgrades is None:
+        stat_upgrades = _load_individual_stat_upgrades(player.id)
     if not stat_upgrades:
         return
 
@@ -297,74 +371,209 @@ def _assign_damage_type(player: PlayerBase) -> None:
                 (player.id, player.element_id),
             )
 
-def load_party(run_id: str) -> Party:
-    with get_save_manager().connection() as conn:
-        cur = conn.execute("SELECT party FROM runs WHERE id = ?", (run_id,))
-        row = cur.fetchone()
-    data = json.loads(row[0]) if row else {}
+_PLAYER_CLASSES: dict[str, type[PlayerBase]] = {}
+
+_LEVEL_UP_STATS = (
+    "max_hp",
+    "atk",
+    "defense",
+    "crit_rate",
+    "crit_damage",
+    "effect_hit_rate",
+    "mitigation",
+    "regain",
+    "dodge_odds",
+    "effect_resistance",
+    "vitality",
+)
+
+def get_player_class(pid: str) -> type[PlayerBase] | None:
+    """Return the player plugin class registered under ``pid``."""
+
+    if not _PLAYER_CLASSES:
+        for name in player_plugins.__all__:
+            cls = getattr(player_plugins, name)
+            _PLAYER_CLASSES.setdefault(cls.id, cls)
+    return _PLAYER_CLASSES.get(pid)
+
+
+def _apply_level_ups(inst: PlayerBase, target_level: int) -> None:
+    """Bring a freshly constructed member's base stats up to ``target_level``.
+
+    Matches calling ``_on_level_up`` ``target_level - 1`` times, random rolls
+    included, but works on plain floats instead of a method call and a dozen
+    attribute lookups per level. Classes that override ``_on_level_up`` are
+    replayed as-is.
+    """
+
+    if target_level <= 1:
+        return
+    if type(inst)._on_level_up is not Stats._on_level_up:
+        for _ in range(target_level - 1):
+            inst._on_level_up()
+        return
+    level = inst.level
+    gains = {
+        stat: base * level
+        for stat, base in inst.level_up_gains.items()
+        if hasattr(inst, f"_base_{stat}")
+    }
+    values = {stat: inst.get_base_stat(stat) for stat in (*_LEVEL_UP_STATS, *gains)}
+    for _ in range(target_level - 1):
+        # Drawn per load, exactly as ``_on_level_up`` does
+        inc = random.uniform(0.003 * level, 0.008 * level)
+        for stat in _LEVEL_UP_STATS:
+            value = values[stat]
+            if isinstance(value, (int, float)) and value > 0:
+                values[stat] = value * (1 + inc)
+        for stat, gain in gains.items():
+            values[stat] += gain
+    for stat, value in values.items():
+        inst.set_base_stat(stat, value)
+    inst.hp = inst.max_hp
+
+
+def _load_member_rows(
+    conn: Any, members: list[PlayerBase]
+) -> tuple[dict[str, str], dict[str, dict[str, int]], dict[str, dict[str, float]]]:
+    """Fetch every per-member row for ``members`` with batched queries.
+
+    Returns damage types, stat allocations and summed stat upgrades keyed by
+    member id. Members without a stored damage type get their current element
+    recorded, matching ``_assign_damage_type``.
+    """
+
+    ids = [m.id for m in members]
+    damage_types: dict[str, str] = {}
+    customization: dict[str, dict[str, int]] = {}
+    upgrades: dict[str, dict[str, float]] = {pid: {} for pid in ids}
+    if not ids:
+        return damage_types, customization, upgrades
+    marks = ",".join("?" * len(ids))
+    option_keys = {
+        (f"player_stats_{pid}" if pid != "player" else "player_stats"): pid
+        for pid in ids
+    }
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS damage_types (id TEXT PRIMARY KEY, type TEXT)"
+    )
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS options (key TEXT PRIMARY KEY, value TEXT)"
+    )
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS player_stat_upgrades (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            player_id TEXT NOT NULL,
+            stat_name TEXT NOT NULL,
+            upgrade_percent REAL NOT NULL,
+            source_star INTEGER NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    cur = conn.execute(f"SELECT id, type FROM damage_types WHERE id IN ({marks})", ids)
+    damage_types = dict(cur.fetchall())
+    missing = [
+        (m.id, m.element_id)
+        for m in members
+        if m.id != "player" and m.id not in damage_types
+    ]
+    if missing:
+        conn.executemany("INSERT INTO damage_types (id, type) VALUES (?, ?)", missing)
+    cur = conn.execute(
+        f"SELECT key, value FROM options WHERE key IN ({marks})", list(option_keys)
+    )
+    for key, value in cur.fetchall():
+        try:
+            loaded = json.loads(value)
+        except (TypeError, ValueError, json.JSONDecodeError):
+            continue
+        if isinstance(loaded, dict):
+            customization[option_keys[key]] = loaded
+    cur = conn.execute(f"""
+        SELECT player_id, stat_name, SUM(upgrade_percent)
+        FROM player_stat_upgrades
+        WHERE player_id IN ({marks})
+        GROUP BY player_id, stat_name
+    """, ids)
+    for pid, stat_name, total in cur.fetchall():
+        upgrades[pid][stat_name] = float(total)
+    return damage_types, customization, upgrades
+
+
+def load_party_data(run_id: str) -> dict[str, Any]:
+    """Return the run's stored party data without building the members."""
+    data = RUN_STATE.party(run_id) or {}
     if isinstance(data, list):
         data = {"members": data, "gold": 0, "relics": [], "cards": []}
+    return data
+
+def load_party(run_id: str) -> Party:
+    members: list[PlayerBase] = []
+    data = load_party_data(run_id)
+    with get_save_manager().connection() as conn:
+        for pid in data.get("members", []):
+            cls = get_player_class(pid)
+            if cls is not None:
+                members.append(cls())
+        damage_types, customization, upgrades = _load_member_rows(conn, members)
     snapshot = data.get("player", {})
     exp_map: dict[str, int] = data.get("exp", {})
     level_map: dict[str, int] = data.get("level", {})
     exp_mult_map: dict[str, float] = data.get("exp_multiplier", {})
-    members: list[PlayerBase] = []
     # Freeze-in user level captured at run start (default 1 for legacy runs)
     try:
         run_user_level = int(data.get("user_level", 1) or 1)
     except Exception:
         run_user_level = 1
-    for pid in data.get("members", []):
-        for name in player_plugins.__all__:
-            cls = getattr(player_plugins, name)
-            if cls.id == pid:
-                inst = cls()
-                if inst.id == "player":
-                    with get_save_manager().connection() as conn:
-                        row = conn.execute(
-                            "SELECT type FROM damage_types WHERE id = ?", ("player",)
-                        ).fetchone()
-                    if row and row[0]:
-                        inst.damage_type = load_damage_type(row[0])
-                    else:
-                        inst.damage_type = load_damage_type(
-                            snapshot.get("damage_type", inst.element_id)
-                        )
-                else:
-                    _assign_damage_type(inst)
-                _apply_character_customization(inst, inst.id)
-                _apply_player_upgrades(inst)
-                target_level = int(level_map.get(pid, 1) or 1)
-                if target_level > 1:
-                    for _ in range(target_level - 1):
-                        inst._on_level_up()
-                inst.level = target_level
-                inst.exp = int(exp_map.get(pid, 0) or 0)
-                try:
-                    inst.exp_multiplier = float(
-                        exp_mult_map.get(pid, inst.exp_multiplier)
-                    )
-                except Exception:
-                    pass
-                # Apply the run-frozen user level buff to base stats exactly once per load
-                try:
-                    mult = 1.0 + float(run_user_level) * 0.01
-                    inst._base_max_hp = int(inst._base_max_hp * mult)
-                    inst._base_atk = int(inst._base_atk * mult)
-                    inst._base_defense = int(inst._base_defense * mult)
-                    inst._base_crit_rate *= mult
-                    inst._base_crit_damage *= mult
-                    inst._base_effect_hit_rate *= mult
-                    inst._base_mitigation *= mult
-                    inst._base_regain = int(inst._base_regain * mult)
-                    inst._base_dodge_odds *= mult
-                    inst._base_effect_resistance *= mult
-                    inst._base_vitality *= mult
-                except Exception:
-                    pass
-                apply_status_hooks(inst)
-                members.append(inst)
-                break
+    for inst in members:
+        pid = inst.id
+        if pid == "player":
+            stored = damage_types.get("player")
+            if stored:
+                inst.damage_type = load_damage_type(stored)
+            else:
+                inst.damage_type = load_damage_type(
+                    snapshot.get("damage_type", inst.element_id)
+                )
+        elif pid in damage_types:
+            inst.damage_type = load_damage_type(damage_types[pid])
+        loaded = {
+            "hp": 0,
+            "attack": 0,
+            "defense": 0,
+            "crit_rate": 0,
+            "crit_damage": 0,
+            **customization.get(pid, {}),
+        }
+        _apply_character_customization(inst, pid, loaded)
+        _apply_player_upgrades(inst, upgrades.get(pid, {}))
+        target_level = int(level_map.get(pid, 1) or 1)
+        _apply_level_ups(inst, target_level)
+        inst.level = target_level
+        inst.exp = int(exp_map.get(pid, 0) or 0)
+        try:
+            inst.exp_multiplier = float(
+                exp_mult_map.get(pid, inst.exp_multiplier)
+            )
+        except Exception:
+            pass
+        # Apply the run-frozen user level buff to base stats exactly once per load
+        try:
+            mult = 1.0 + float(run_user_level) * 0.01
+            inst._base_max_hp = int(inst._base_max_hp * mult)
+            inst._base_atk = int(inst._base_atk * mult)
+            inst._base_defense = int(inst._base_defense * mult)
+            inst._base_crit_rate *= mult
+            inst._base_crit_damage *= mult
+            inst._base_effect_hit_rate *= mult
+            inst._base_mitigation *= mult
+            inst._base_regain = int(inst._base_regain * mult)
+            inst._base_dodge_odds *= mult
+            inst._base_effect_resistance *= mult
+            inst._base_vitality *= mult
+        except Exception:
+            pass
+        apply_status_hooks(inst)
     party = Party(
         members=members,
         gold=data.get("gold", 0),
@@ -375,49 +584,37 @@ def load_party(run_id: str) -> Party:
     return party
 
 def load_map(run_id: str) -> tuple[dict, list[MapNode]]:
-    with get_save_manager().connection() as conn:
-        cur = conn.execute("SELECT map FROM runs WHERE id = ?", (run_id,))
-        row = cur.fetchone()
-    if row is None:
+    state = RUN_STATE.map(run_id)
+    if state is None:
         return {"rooms": [], "current": 0, "battle": False}, []
-    state = json.loads(row[0])
     rooms = [MapNode.from_dict(n) for n in state.get("rooms", [])]
     return state, rooms
 
 def save_map(run_id: str, state: dict) -> None:
-    with get_save_manager().connection() as conn:
-        conn.execute(
-            "UPDATE runs SET map = ? WHERE id = ?",
-            (json.dumps(state), run_id),
-        )
+    """Record ``state`` as the run's map; written at the next checkpoint."""
+    RUN_STATE.set_map(run_id, state)
 
 def save_party(run_id: str, party: Party) -> None:
-    with get_save_manager().connection() as conn:
-        cur = conn.execute("SELECT party FROM runs WHERE id = ?", (run_id,))
-        row = cur.fetchone()
-    existing = json.loads(row[0]) if row else {}
+    """Record ``party`` for the run; written at the next checkpoint."""
+    existing = load_party_data(run_id)
     snapshot = existing.get("player", {})
     for member in party.members:
         if member.id == "player":
             # Persist the player's chosen damage type
             snapshot = {**snapshot, "damage_type": member.element_id}
             break
-    with get_save_manager().connection() as conn:
-        data = {
-            "members": [m.id for m in party.members],
-            "gold": party.gold,
-            "relics": party.relics,
-            "cards": party.cards,
-            "exp": {m.id: m.exp for m in party.members},
-            "level": {m.id: m.level for m in party.members},
-            "exp_multiplier": {m.id: m.exp_multiplier for m in party.members},
-            "rdr": party.rdr,
-            "player": snapshot,
-        }
-        conn.execute(
-            "UPDATE runs SET party = ? WHERE id = ?",
-            (json.dumps(data), run_id),
-        )
+    data = {
+        "members": [m.id for m in party.members],
+        "gold": party.gold,
+        "relics": party.relics,
+        "cards": party.cards,
+        "exp": {m.id: m.exp for m in party.members},
+        "level": {m.id: m.level for m in party.members},
+        "exp_multiplier": {m.id: m.exp_multiplier for m in party.members},
+        "rdr": party.rdr,
+        "player": snapshot,
+    }
+    RUN_STATE.set_party(run_id, data)
 
 async def _run_battle(
     run_id: str,
@@ -436,7 +633,7 @@ async def _run_battle(
             state["battle"] = False
             log.exception("Battle resolution failed for %s", run_id)
             if run_id not in battle_snapshots:
-                battle_snapshots[run_id] = {
+                publish_snapshot(run_id, {
                     "result": "error",
                     "error": str(exc),
                     "ended": True,
@@ -446,10 +643,11 @@ async def _run_battle(
                     "awaiting_card": False,
                     "awaiting_relic": False,
                     "awaiting_loot": False,
-                }
+                })
             try:
                 await asyncio.to_thread(save_map, run_id, state)
                 await asyncio.to_thread(save_party, run_id, party)
+                await checkpoint_run(run_id)
             except Exception:
                 pass
             return
@@ -488,13 +686,14 @@ async def _run_battle(
                             "ended": True,
                         }
                     )
-                    battle_snapshots[run_id] = result
+                    publish_snapshot(run_id, result)
                 finally:
                     try:
                         # End run logging when run is deleted due to defeat
-                        end_run_logging()
+                        end_run_logging(run_id)
                         with get_save_manager().connection() as conn:
                             conn.execute("DELETE FROM runs WHERE id = ?", (run_id,))
+                        discard_run(run_id)
                     except Exception:
                         pass
                 return
@@ -555,6 +754,8 @@ async def _run_battle(
                 )
             await asyncio.to_thread(save_map, run_id, state)
             await asyncio.to_thread(save_party, run_id, party)
+            # Battle resolution is a checkpoint: map and party land together
+            await checkpoint_run(run_id)
             result.update(
                 {
                     "run_id": run_id,
@@ -568,10 +769,10 @@ async def _run_battle(
                     "awaiting_next": state.get("awaiting_next", False),
                 }
             )
-            battle_snapshots[run_id] = result
+            publish_snapshot(run_id, result)
         except Exception as exc:
             log.exception("Battle processing failed for %s", run_id)
-            battle_snapshots[run_id] = {
+            publish_snapshot(run_id, {
                 "result": "error",
                 "loot": result.get("loot"),
                 "error": str(exc),
@@ -582,6 +783,7 @@ async def _run_battle(
                 "awaiting_card": False,
                 "awaiting_relic": False,
                 "awaiting_loot": False,
-            }
+            })
     finally:
         battle_tasks.pop(run_id, None)
+        wake_snapshot_waiters(run_id)
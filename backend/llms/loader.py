@@ -1,9 +1,14 @@
 import asyncio
 from collections.abc import AsyncIterator
+from collections.abc import Callable
+from contextlib import aclosing
 from enum import Enum
 import os
+import threading
+from typing import Any
 from typing import Protocol
 
+from .streaming import iterate_in_thread
 from .torch_checker import is_torch_available
 from .torch_checker import require_torch
 
@@ -36,13 +41,122 @@ class ModelName(str, Enum):
     GGUF = "gguf"
 
 
+def _pipeline_limit(max_tokens: int) -> dict[str, Any]:
+    return {"pipeline_kwargs": {"max_new_tokens": max_tokens}}
+
+
+def _llamacpp_limit(max_tokens: int) -> dict[str, Any]:
+    return {"max_tokens": max_tokens}
+
+
+def _pipeline_stop(pipe) -> Callable[[threading.Event], dict[str, Any]]:
+    """Build stop kwargs that end a pipeline's generation once ``stop`` is set.
+
+    LangChain runs ``model.generate`` on its own thread and passes its own
+    ``stopping_criteria``, so the stop signal goes in as a logits processor
+    that forces the end-of-sequence token.
+    """
+    from transformers import LogitsProcessor
+    from transformers import LogitsProcessorList
+
+    eos = pipe.tokenizer.eos_token_id
+    eos_ids = list(eos) if isinstance(eos, (list, tuple)) else [eos]
+
+    class _StopOnEvent(LogitsProcessor):
+        def __init__(self, stop: threading.Event) -> None:
+            self._stop = stop
+
+        def __call__(self, input_ids, scores):
+            if self._stop.is_set():
+                scores[:, :] = -float("inf")
+                scores[:, eos_ids] = 0
+            return scores
+
+    def kwargs(stop: threading.Event) -> dict[str, Any]:
+        processors = LogitsProcessorList([_StopOnEvent(stop)])
+        return {"pipeline_kwargs": {"logits_processor": processors}}
+
+    return kwargs
+
+
+def _llamacpp_stop(stop: threading.Event) -> dict[str, Any]:
+    from llama_cpp import StoppingCriteriaList
+
+    return {"stopping_criteria": StoppingCriteriaList([lambda *_: stop.is_set()])}
+
+
+def _merge_kwargs(base: dict[str, Any], extra: dict[str, Any]) -> dict[str, Any]:
+    merged = dict(base)
+    for key, value in extra.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = {**merged[key], **value}
+        else:
+            merged[key] = value
+    return merged
+
+
 class _LangChainWrapper:
-    def __init__(self, llm) -> None:
+    def __init__(
+        self,
+        llm,
+        *,
+        supports_batch: bool = False,
+        token_limit: Callable[[int], dict[str, Any]] | None = None,
+        stop_signal: Callable[[threading.Event], dict[str, Any]] | None = None,
+    ) -> None:
         self._llm = llm
+        # Hugging Face pipelines run a list of prompts as one padded batch
+        self.supports_batch = supports_batch
+        # Maps a token budget to the backend's own generation-limit kwargs
+        self._token_limit = token_limit
+        self.supports_max_tokens = token_limit is not None
+        # Maps a stop event to kwargs that make the backend end generation
+        self._stop_signal = stop_signal
 
-    async def generate_stream(self, text: str) -> AsyncIterator[str]:
-        result = await asyncio.to_thread(self._llm.invoke, text)
-        yield result
+    def _limit(self, max_tokens: int | None) -> dict[str, Any]:
+        if max_tokens and self._token_limit is not None:
+            return self._token_limit(max_tokens)
+        return {}
+
+    async def generate_stream(
+        self, text: str, *, max_tokens: int | None = None
+    ) -> AsyncIterator[str]:
+        """Yield generated text as the backend produces it.
+
+        LangChain's ``stream`` drives transformers' ``TextIteratorStreamer``
+        for Hugging Face pipelines and llama.cpp's streaming completion for
+        GGUF models; both are bridged from a worker thread. Backends without
+        ``stream`` fall back to a single ``invoke`` chunk. ``max_tokens`` is
+        passed on as the backend's generation limit. When the caller stops
+        reading, the backend is told to stop generating as well.
+        """
+        kwargs = self._limit(max_tokens)
+        stream = getattr(self._llm, "stream", None)
+        if stream is None:
+            yield await asyncio.to_thread(self._llm.invoke, text, **kwargs)
+            return
+        stop = threading.Event()
+        if self._stop_signal is not None:
+            kwargs = _merge_kwargs(kwargs, self._stop_signal(stop))
+        # Close the bridge with us so the stop event fires on disconnect
+        chunks = iterate_in_thread(lambda: stream(text, **kwargs), stop=stop)
+        async with aclosing(chunks):
+            async for chunk in chunks:
+                if chunk:
+                    yield chunk
+
+    async def generate_batch(
+        self, texts: list[str], *, max_tokens: int | None = None
+    ) -> list[str]:
+        """Generate replies for several prompts in one backend call."""
+        kwargs = self._limit(max_tokens)
+        batch = getattr(self._llm, "batch", None)
+        if batch is None:
+            return [
+                await asyncio.to_thread(self._llm.invoke, text, **kwargs)
+                for text in texts
+            ]
+        return list(await asyncio.to_thread(batch, texts, **kwargs))
 
 
 def load_llm(model: str | None = None, *, gguf_path: str | None = None) -> SupportsStream:
@@ -73,7 +187,12 @@ def load_llm(model: str | None = None, *, gguf_path: str | None = None) -> Suppo
                 device=device,
                 model_kwargs=model_kwargs,
             )
-        return _LangChainWrapper(HuggingFacePipeline(pipeline=pipe))
+        return _LangChainWrapper(
+            HuggingFacePipeline(pipeline=pipe),
+            supports_batch=True,
+            token_limit=_pipeline_limit,
+            stop_signal=_pipeline_stop(pipe),
+        )
     if name == ModelName.GEMMA.value:
         min_ram, _ = model_memory_requirements(name)
         ensure_ram(min_ram)
@@ -99,14 +218,23 @@ def load_llm(model: str | None = None, *, gguf_path: str | None = None) -> Suppo
                 device=device,
                 model_kwargs=model_kwargs,
             )
-        return _LangChainWrapper(HuggingFacePipeline(pipeline=pipe))
+        return _LangChainWrapper(
+            HuggingFacePipeline(pipeline=pipe),
+            supports_batch=True,
+            token_limit=_pipeline_limit,
+            stop_signal=_pipeline_stop(pipe),
+        )
     if name == ModelName.GGUF.value:
         path = gguf_path or os.getenv("AF_GGUF_PATH")
         if path is None:
             msg = "GGUF model path must be provided via argument or AF_GGUF_PATH"
             raise ValueError(msg)
         kwargs = gguf_strategy(path)
-        return _LangChainWrapper(LlamaCpp(model_path=path, **kwargs))
+        return _LangChainWrapper(
+            LlamaCpp(model_path=path, **kwargs),
+            token_limit=_llamacpp_limit,
+            stop_signal=_llamacpp_stop,
+        )
     msg = f"Unsupported model: {name}"
     raise ValueError(msg)
 
@@ -0,0 +1,220 @@
+"""Conversation memory for player and foe LRM messages.
+
+Memories are created on first use, not when a character is instantiated, so
+building foes, listing the roster and deep-copying combatants never touch the
+embedding model. When the LLM dependencies are installed every character
+shares one persistent Chroma collection; each (run, entity) pair gets its own
+namespace inside it, stored in the document metadata. Without them an
+in-process :class:`SimpleConversationMemory` is used.
+
+History is bounded: ``AF_LRM_MEMORY_TURNS`` (default 64) exchanges are kept
+per namespace, the newest ``AF_LRM_MEMORY_RECENT`` (default 8) are always
+included in the prompt, and older ones are recalled by similarity to the
+incoming message.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+import logging
+import os
+from pathlib import Path
+import threading
+from typing import Any
+import uuid
+import weakref
+
+log = logging.getLogger(__name__)
+
+COLLECTION_NAME = "lrm_memory"
+DEFAULT_MEMORY_DIR = Path(__file__).resolve().parent.parent / "lrm_memory"
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+def _format(turns) -> str:
+    lines: list[str] = []
+    for human, ai in turns:
+        if human:
+            lines.append(f"Human: {human}")
+        if ai:
+            lines.append(f"AI: {ai}")
+    return "\n".join(lines)
+
+
+class SimpleConversationMemory:
+    """Lightweight, dependency-free memory used as a safe default."""
+
+    def __init__(self, max_turns: int | None = None) -> None:
+        if max_turns is None:
+            max_turns = _env_int("AF_LRM_MEMORY_TURNS", 64)
+        self._history: deque[tuple[str, str]] = deque(maxlen=max(1, max_turns))
+
+    def save_context(self, inputs: dict[str, str], outputs: dict[str, str]) -> None:
+        self._history.append((inputs.get("input", ""), outputs.get("output", "")))
+
+    def load_memory_variables(self, _: dict[str, str]) -> dict[str, str]:
+        return {"history": _format(self._history)}
+
+
+class VectorConversationMemory:
+    """One namespace of the shared vector store."""
+
+    def __init__(
+        self,
+        store: Any,
+        namespace: str,
+        max_turns: int | None = None,
+        recent: int | None = None,
+        recall: int = 4,
+    ) -> None:
+        self._store = store
+        self.namespace = namespace
+        self.max_turns = max(1, max_turns or _env_int("AF_LRM_MEMORY_TURNS", 64))
+        self.recent = max(1, recent or _env_int("AF_LRM_MEMORY_RECENT", 8))
+        self.recall = recall
+        self._lock = threading.Lock()
+        # (id, human, ai) oldest first; hydrated from the store on first use
+        self._turns: deque[tuple[str, str, str]] | None = None
+        self._seq = 0
+
+    def _load(self) -> deque[tuple[str, str, str]]:
+        if self._turns is None:
+            rows: list[tuple[int, str, str, str]] = []
+            try:
+                found = self._store.get(
+                    where={"namespace": self.namespace}, include=["metadatas"]
+                )
+                for doc_id, meta in zip(found.get("ids", []), found.get("metadatas", [])):
+                    meta = meta or {}
+                    rows.append(
+                        (int(meta.get("seq", 0)), doc_id, meta.get("human", ""), meta.get("ai", ""))
+                    )
+            except Exception:
+                log.exception("Failed to read memory for %s", self.namespace)
+            rows.sort()
+            self._seq = rows[-1][0] + 1 if rows else 0
+            self._turns = deque((doc_id, human, ai) for _, doc_id, human, ai in rows)
+            self._trim()
+        return self._turns
+
+    def _trim(self) -> None:
+        turns = self._turns
+        stale = []
+        while turns is not None and len(turns) > self.max_turns:
+            stale.append(turns.popleft()[0])
+        if stale:
+            try:
+                self._store.delete(ids=stale)
+            except Exception:
+                log.exception("Failed to trim memory for %s", self.namespace)
+
+    def save_context(self, inputs: dict[str, str], outputs: dict[str, str]) -> None:
+        human = inputs.get("input", "")
+        ai = outputs.get("output", "")
+        with self._lock:
+            turns = self._load()
+            doc_id = uuid.uuid4().hex
+            metadata = {"namespace": self.namespace, "seq": self._seq, "human": human, "ai": ai}
+            self._store.add_texts([_format([(human, ai)])], metadatas=[metadata], ids=[doc_id])
+            self._seq += 1
+            turns.append((doc_id, human, ai))
+            self._trim()
+
+    def load_memory_variables(self, inputs: dict[str, str]) -> dict[str, str]:
+        with self._lock:
+            turns = list(self._load())
+        recent = turns[-self.recent :]
+        older = turns[: -self.recent] if len(turns) > self.recent else []
+        query = (inputs or {}).get("input", "")
+        recalled: list[str] = []
+        if query and older:
+            recent_ids = {doc_id for doc_id, _, _ in recent}
+            try:
+                docs = self._store.similarity_search(
+                    query, k=self.recall, filter={"namespace": self.namespace}
+                )
+                recalled = [
+                    doc.page_content
+                    for doc in docs
+                    if getattr(doc, "id", None) not in recent_ids
+                ]
+            except Exception:
+                log.exception("Memory recall failed for %s", self.namespace)
+        parts = recalled + [_format([(human, ai)]) for _, human, ai in recent]
+        return {"history": "\n".join(part for part in parts if part)}
+
+
+_STORE: Any = None
+_STORE_FAILED = False
+_STORE_LOCK = threading.Lock()
+
+
+def get_shared_store() -> Any | None:
+    """Return the shared Chroma collection, creating it on first call.
+
+    Returns ``None`` when the LLM dependencies are missing or the store
+    cannot be opened; the failure is remembered for the process lifetime.
+    """
+    global _STORE, _STORE_FAILED
+    with _STORE_LOCK:
+        if _STORE is not None or _STORE_FAILED:
+            return _STORE
+        from llms.torch_checker import is_torch_available
+
+        if not is_torch_available():
+            _STORE_FAILED = True
+            return None
+        try:
+            from langchain_chroma import Chroma
+            from langchain_huggingface import HuggingFaceEmbeddings
+
+            directory = Path(os.getenv("AF_LRM_MEMORY_DIR", DEFAULT_MEMORY_DIR))
+            directory.mkdir(parents=True, exist_ok=True)
+            _STORE = Chroma(
+                collection_name=COLLECTION_NAME,
+                embedding_function=HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL),
+                persist_directory=str(directory),
+            )
+        except Exception:
+            log.exception("Vector memory unavailable; using in-process memory")
+            _STORE_FAILED = True
+        return _STORE
+
+
+# Live vector memories by namespace, so copies of a character share one
+# sequence counter and trim instead of overwriting each other's rows
+_NAMESPACES: weakref.WeakValueDictionary[str, VectorConversationMemory] = (
+    weakref.WeakValueDictionary()
+)
+
+
+def memory_for(run_id: str, entity_id: str) -> SimpleConversationMemory | VectorConversationMemory:
+    """Return conversation memory for ``entity_id`` in ``run_id``.
+
+    Vector memories are shared per namespace while any holder is alive.
+    """
+    store = get_shared_store()
+    if store is None:
+        return SimpleConversationMemory()
+    namespace = f"{run_id}:{entity_id}"
+    with _STORE_LOCK:
+        memory = _NAMESPACES.get(namespace)
+        if memory is None or memory._store is not store:
+            memory = VectorConversationMemory(store, namespace)
+            _NAMESPACES[namespace] = memory
+    return memory
+
+
+__all__ = [
+    "SimpleConversationMemory",
+    "VectorConversationMemory",
+    "get_shared_store",
+    "memory_for",
+]
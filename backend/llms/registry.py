@@ -0,0 +1,235 @@
+"""Resident model registry.
+
+Building a transformers ``pipeline`` or a ``LlamaCpp`` instance takes seconds
+to minutes, so loaded models are kept in memory and shared by every caller.
+Entries are keyed by model name, device and load arguments and evicted in
+least-recently-used order when ``ensure_ram`` reports that a new model does
+not fit, or when more than ``max_resident`` models are loaded.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+from dataclasses import dataclass
+from dataclasses import field
+import gc
+import logging
+import os
+import threading
+import time
+from typing import Any
+from typing import Callable
+
+from . import loader
+from .safety import ensure_ram
+from .safety import model_memory_requirements
+from .safety import pick_device
+
+log = logging.getLogger(__name__)
+
+ModelKey = tuple[str, int, tuple[tuple[str, Any], ...]]
+
+
+@dataclass
+class ResidentModel:
+    key: ModelKey
+    llm: loader.SupportsStream
+    required_ram: int
+    load_seconds: float
+    loaded_at: float = field(default_factory=time.time)
+    last_used: float = field(default_factory=time.time)
+    hits: int = 0
+
+
+def _required_ram(name: str, gguf_path: str | None) -> int:
+    if name == loader.ModelName.GGUF.value:
+        try:
+            return os.path.getsize(gguf_path or "")
+        except OSError:
+            return 0
+    return model_memory_requirements(name)[0]
+
+
+def _release_memory() -> None:
+    gc.collect()
+    torch = loader.torch
+    if torch is not None and torch.cuda.is_available():  # pragma: no cover - GPU only
+        torch.cuda.empty_cache()
+
+
+class ModelRegistry:
+    """Keep loaded LLMs resident and evict them in LRU order."""
+
+    def __init__(
+        self,
+        max_resident: int | None = None,
+        load: Callable[..., loader.SupportsStream] | None = None,
+    ) -> None:
+        if max_resident is None:
+            max_resident = int(os.getenv("AF_LLM_MAX_RESIDENT", "2"))
+        self.max_resident = max(1, max_resident)
+        self._load = load
+        self._models: OrderedDict[ModelKey, ResidentModel] = OrderedDict()
+        self._lock = threading.Lock()
+        self._key_locks: dict[ModelKey, threading.Lock] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def resolve(model: str | None = None, *, gguf_path: str | None = None) -> tuple[str, str | None]:
+        name = model or os.getenv("AF_LLM_MODEL", loader.ModelName.DEEPSEEK.value)
+        if name == loader.ModelName.GGUF.value:
+            gguf_path = gguf_path or os.getenv("AF_GGUF_PATH")
+        else:
+            gguf_path = None
+        return name, gguf_path
+
+    def key_for(self, model: str | None = None, *, gguf_path: str | None = None) -> ModelKey:
+        name, gguf_path = self.resolve(model, gguf_path=gguf_path)
+        kwargs = (("gguf_path", gguf_path),) if gguf_path else ()
+        return name, pick_device(), kwargs
+
+    def peek(self, key: ModelKey) -> loader.SupportsStream | None:
+        """Return a resident model and mark it used, without loading."""
+        with self._lock:
+            entry = self._models.get(key)
+            if entry is None:
+                return None
+            self._touch(entry)
+            return entry.llm
+
+    def get(self, model: str | None = None, *, gguf_path: str | None = None) -> loader.SupportsStream:
+        """Return the resident model, loading it first if needed (blocking)."""
+        key = self.key_for(model, gguf_path=gguf_path)
+        llm = self.peek(key)
+        if llm is not None:
+            return llm
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        # Concurrent requests for the same model wait for one load
+        with key_lock:
+            llm = self.peek(key)
+            if llm is not None:
+                return llm
+            return self._load_resident(key)
+
+    async def aget(self, model: str | None = None, *, gguf_path: str | None = None) -> loader.SupportsStream:
+        """Async variant of :meth:`get`; loads run in a worker thread."""
+        key = self.key_for(model, gguf_path=gguf_path)
+        llm = self.peek(key)
+        if llm is not None:
+            return llm
+        return await asyncio.to_thread(self.get, model, gguf_path=gguf_path)
+
+    def _touch(self, entry: ResidentModel) -> None:
+        entry.hits += 1
+        entry.last_used = time.time()
+        self._models.move_to_end(entry.key)
+        self.hits += 1
+
+    def _load_resident(self, key: ModelKey) -> loader.SupportsStream:
+        name, _, kwargs = key
+        gguf_path = dict(kwargs).get("gguf_path")
+        required = _required_ram(name, gguf_path)
+        self._make_room(required)
+        start = time.perf_counter()
+        load = self._load or loader.load_llm
+        llm = load(name, gguf_path=gguf_path) if gguf_path else load(name)
+        entry = ResidentModel(key, llm, required, time.perf_counter() - start)
+        with self._lock:
+            self.misses += 1
+            self._models[key] = entry
+            self._models.move_to_end(key)
+        log.info("Loaded %s on device %s in %.1fs", name, key[1], entry.load_seconds)
+        return llm
+
+    def _make_room(self, required: int) -> None:
+        """Evict LRU models until ``required`` bytes fit and a slot is free."""
+        while True:
+            with self._lock:
+                over_count = len(self._models) >= self.max_resident
+                empty = not self._models
+            if not over_count:
+                try:
+                    ensure_ram(required)
+                    return
+                except RuntimeError:
+                    if empty:
+                        raise
+            if not self._evict_lru():
+                ensure_ram(required)
+                return
+
+    def _evict_lru(self) -> bool:
+        with self._lock:
+            if not self._models:
+                return False
+            key, entry = self._models.popitem(last=False)
+            self._key_locks.pop(key, None)
+            self.evictions += 1
+        log.info("Evicting resident model %s (device %s)", key[0], key[1])
+        del entry
+        _release_memory()
+        return True
+
+    def evict(self, model: str | None = None, *, gguf_path: str | None = None) -> bool:
+        key = self.key_for(model, gguf_path=gguf_path)
+        with self._lock:
+            entry = self._models.pop(key, None)
+        if entry is None:
+            return False
+        del entry
+        _release_memory()
+        return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._models.clear()
+            self._key_locks.clear()
+        _release_memory()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            resident = [
+                {
+                    "model": entry.key[0],
+                    "device": entry.key[1],
+                    "options": dict(entry.key[2]),
+                    "required_ram": entry.required_ram,
+                    "load_seconds": entry.load_seconds,
+                    "loaded_at": entry.loaded_at,
+                    "last_used": entry.last_used,
+                    "hits": entry.hits,
+                }
+                for entry in self._models.values()
+            ]
+        return {
+            "max_resident": self.max_resident,
+            "resident": resident,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+_REGISTRY: ModelRegistry | None = None
+_REGISTRY_LOCK = threading.Lock()
+
+
+def get_registry() -> ModelRegistry:
+    """Return the process-wide model registry."""
+    global _REGISTRY
+    with _REGISTRY_LOCK:
+        if _REGISTRY is None:
+            _REGISTRY = ModelRegistry()
+        return _REGISTRY
+
+
+async def get_llm(model: str | None = None, *, gguf_path: str | None = None) -> loader.SupportsStream:
+    """Return a resident LLM, loading it on first use."""
+    return await get_registry().aget(model, gguf_path=gguf_path)
+
+
+__all__ = ["ModelRegistry", "ResidentModel", "get_llm", "get_registry"]
@@ -1,4 +1,7 @@
+import json
 import os
+from pathlib import Path
+import threading
 from typing import Any
 
 from .torch_checker import is_torch_available
@@ -68,8 +71,54 @@ def pick_device(min_vram: int | None = None) -> int:
     return -1
 
 
+_REQUIREMENTS_LOCK = threading.Lock()
+_REQUIREMENTS: dict[str, tuple[int, int]] | None = None
+
+
+def _requirements_cache_path() -> Path:
+    override = os.getenv("AF_LLM_REQUIREMENTS_CACHE")
+    if override:
+        return Path(override)
+    return Path.home() / ".cache" / "autofighter" / "model_requirements.json"
+
+
+def _load_requirements() -> dict[str, tuple[int, int]]:
+    global _REQUIREMENTS
+    if _REQUIREMENTS is None:
+        try:
+            raw = json.loads(_requirements_cache_path().read_text())
+            _REQUIREMENTS = {name: (int(ram), int(vram)) for name, (ram, vram) in raw.items()}
+        except Exception:
+            _REQUIREMENTS = {}
+    return _REQUIREMENTS
+
+
 def model_memory_requirements(model: str) -> tuple[int, int]:
-    """Estimate RAM and VRAM requirements in bytes for a Hugging Face model."""
+    """Estimate RAM and VRAM requirements in bytes for a Hugging Face model.
+
+    Results are cached on disk (``AF_LLM_REQUIREMENTS_CACHE``) so the Hub is
+    queried once per model rather than on every load. Failed lookups are not
+    cached.
+    """
+    with _REQUIREMENTS_LOCK:
+        cached = _load_requirements().get(model)
+    if cached is not None:
+        return cached
+    result = _query_memory_requirements(model)
+    if result != (0, 0):
+        with _REQUIREMENTS_LOCK:
+            cache = _load_requirements()
+            cache[model] = result
+            path = _requirements_cache_path()
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                path.write_text(json.dumps(cache))
+            except OSError:
+                pass
+    return result
+
+
+def _query_memory_requirements(model: str) -> tuple[int, int]:
     if HfApi is None:
         return 0, 0
     api = HfApi()
@@ -0,0 +1,360 @@
+"""Priority scheduling for local LLM inference.
+
+Every request for a model goes through one worker per loaded model, so a
+model never runs two generations at once, and a process-wide semaphore caps
+how many models generate concurrently (``AF_LLM_MAX_CONCURRENCY``, default
+1, which suits CPU-only hosts). Pending requests are served by priority:
+player chat first, party chatter next, foe chatter last. Non-streaming
+requests queued behind each other are batched into one pipeline call when
+the backend supports it.
+
+Budgets:
+
+* ``AF_LLM_MAX_TOKENS`` caps the tokens generated for one request. Backends
+  with ``supports_max_tokens`` receive it as their generation limit; for the
+  rest the scheduler stops the stream once the estimated tokens reach it.
+* ``AF_LLM_MAX_BACKGROUND_TOKENS`` caps the estimated prompt tokens of
+  pending background requests; past it new background requests raise
+  :class:`SchedulerBusy` instead of queueing behind interactive traffic.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from dataclasses import field
+from enum import IntEnum
+import itertools
+import logging
+import os
+import time
+from typing import Any
+import weakref
+
+log = logging.getLogger(__name__)
+
+_END = object()
+
+
+class Priority(IntEnum):
+    """Lower values are served first."""
+
+    CHAT = 0
+    PARTY = 10
+    BACKGROUND = 20
+
+
+class SchedulerBusy(RuntimeError):
+    """Raised when a background request would exceed the queue budget."""
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (about four characters per token)."""
+    return max(1, len(text) // 4)
+
+
+@dataclass(order=True)
+class _Job:
+    priority: int
+    seq: int
+    llm: Any = field(compare=False)
+    prompt: str = field(compare=False)
+    stream: bool = field(compare=False)
+    max_tokens: int | None = field(compare=False)
+    out: asyncio.Queue = field(compare=False, default_factory=asyncio.Queue)
+    enqueued: float = field(compare=False, default_factory=time.perf_counter)
+    cancelled: bool = field(compare=False, default=False)
+
+    @property
+    def tokens(self) -> int:
+        return estimate_tokens(self.prompt)
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+class InferenceScheduler:
+    """Queue LLM requests per model and run them in priority order."""
+
+    def __init__(
+        self,
+        max_concurrency: int | None = None,
+        max_batch: int | None = None,
+        max_tokens: int | None = None,
+        max_background_tokens: int | None = None,
+    ) -> None:
+        self.max_concurrency = max(1, max_concurrency or _env_int("AF_LLM_MAX_CONCURRENCY", 1))
+        self.max_batch = max(1, max_batch or _env_int("AF_LLM_MAX_BATCH", 4))
+        self.max_tokens = max_tokens if max_tokens is not None else _env_int("AF_LLM_MAX_TOKENS", 512)
+        self.max_background_tokens = (
+            max_background_tokens
+            if max_background_tokens is not None
+            else _env_int("AF_LLM_MAX_BACKGROUND_TOKENS", 4096)
+        )
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._queues: dict[int, asyncio.PriorityQueue] = {}
+        self._workers: dict[int, asyncio.Task] = {}
+        self._seq = itertools.count()
+        self._background_tokens = 0
+        self._running = 0
+        self._counters = {
+            "completed": 0,
+            "failed": 0,
+            "cancelled": 0,
+            "rejected": 0,
+            "truncated": 0,
+            "batches": 0,
+            "batched_requests": 0,
+            "chunks": 0,
+            "tokens": 0,
+        }
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    # -- public API ------------------------------------------------------
+
+    async def stream(
+        self,
+        llm: Any,
+        prompt: str,
+        *,
+        priority: Priority = Priority.CHAT,
+        max_tokens: int | None = None,
+    ) -> AsyncIterator[str]:
+        """Yield ``llm``'s reply to ``prompt`` once the request is scheduled."""
+        job = self._submit(llm, prompt, priority, max_tokens, stream=True)
+        try:
+            while True:
+                item = await job.out.get()
+                if item is _END:
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            job.cancelled = True
+
+    async def complete(
+        self,
+        llm: Any,
+        prompt: str,
+        *,
+        priority: Priority = Priority.BACKGROUND,
+        max_tokens: int | None = None,
+    ) -> str:
+        """Return the full reply; eligible for batching with queued requests."""
+        job = self._submit(llm, prompt, priority, max_tokens, stream=False)
+        chunks: list[str] = []
+        try:
+            while True:
+                item = await job.out.get()
+                if item is _END:
+                    return "".join(chunks)
+                if isinstance(item, BaseException):
+                    raise item
+                chunks.append(item)
+        finally:
+            job.cancelled = True
+
+    def stats(self) -> dict[str, Any]:
+        pending: dict[str, int] = {p.name.lower(): 0 for p in Priority}
+        for queue in self._queues.values():
+            for job in queue._queue:  # heap contents; read-only snapshot
+                if not job.cancelled:
+                    name = Priority(job.priority).name.lower()
+                    pending[name] = pending.get(name, 0) + 1
+        started = self._counters["completed"] + self._counters["failed"]
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_batch": self.max_batch,
+            "max_tokens": self.max_tokens,
+            "max_background_tokens": self.max_background_tokens,
+            "running": self._running,
+            "models": len(self._workers),
+            "pending": pending,
+            "background_tokens": self._background_tokens,
+            "avg_wait_seconds": self._wait_total / started if started else 0.0,
+            "max_wait_seconds": self._wait_max,
+            **self._counters,
+        }
+
+    # -- queueing --------------------------------------------------------
+
+    def _submit(
+        self,
+        llm: Any,
+        prompt: str,
+        priority: Priority,
+        max_tokens: int | None,
+        *,
+        stream: bool,
+    ) -> _Job:
+        job = _Job(
+            int(priority),
+            next(self._seq),
+            llm,
+            prompt,
+            stream,
+            max_tokens if max_tokens is not None else self.max_tokens or None,
+        )
+        if priority >= Priority.BACKGROUND and self.max_background_tokens:
+            if self._background_tokens + job.tokens > self.max_background_tokens:
+                self._counters["rejected"] += 1
+                raise SchedulerBusy("LLM queue is full; background request dropped")
+            self._background_tokens += job.tokens
+        key = id(llm)
+        queue = self._queues.get(key)
+        if queue is None:
+            queue = self._queues[key] = asyncio.PriorityQueue()
+        queue.put_nowait(job)
+        if key not in self._workers:
+            self._workers[key] = asyncio.create_task(self._worker(key, queue))
+        return job
+
+    def _dequeued(self, job: _Job) -> None:
+        if job.priority >= Priority.BACKGROUND:
+            self._background_tokens -= job.tokens
+        if job.cancelled:
+            self._counters["cancelled"] += 1
+
+    def _take_batch(self, first: _Job, queue: asyncio.PriorityQueue) -> list[_Job]:
+        batch = [first]
+        if first.stream or not getattr(first.llm, "supports_batch", False):
+            return batch
+        held: list[_Job] = []
+        while len(batch) < self.max_batch and not queue.empty():
+            job = queue.get_nowait()
+            if job.cancelled:
+                self._dequeued(job)
+            elif job.stream or job.max_tokens != first.max_tokens:
+                held.append(job)
+            else:
+                batch.append(job)
+        for job in held:
+            queue.put_nowait(job)
+        return batch
+
+    def _next_job(self, queue: asyncio.PriorityQueue) -> _Job | None:
+        while not queue.empty():
+            job = queue.get_nowait()
+            if not job.cancelled:
+                return job
+            self._dequeued(job)
+        return None
+
+    async def _worker(self, key: int, queue: asyncio.PriorityQueue) -> None:
+        """Drain one model's queue; exits when it is empty."""
+        try:
+            while not queue.empty():
+                # Pick the job only once a slot is free, so requests that
+                # arrive while waiting are still ordered by priority
+                async with self._semaphore:
+                    job = self._next_job(queue)
+                    if job is None:
+                        break
+                    batch = self._take_batch(job, queue)
+                    now = time.perf_counter()
+                    for item in batch:
+                        self._dequeued(item)
+                        wait = now - item.enqueued
+                        self._wait_total += wait
+                        self._wait_max = max(self._wait_max, wait)
+                    self._running += 1
+                    try:
+                        if len(batch) > 1:
+                            await self._run_batch(batch)
+                        else:
+                            await self._run_one(job)
+                    finally:
+                        self._running -= 1
+        finally:
+            self._workers.pop(key, None)
+            if queue.empty():
+                self._queues.pop(key, None)
+
+    # -- execution -------------------------------------------------------
+
+    @staticmethod
+    def _limit(job: _Job) -> dict[str, Any]:
+        """Keyword arguments passing ``job``'s token budget to its backend."""
+        if job.max_tokens and getattr(job.llm, "supports_max_tokens", False):
+            return {"max_tokens": job.max_tokens}
+        return {}
+
+    async def _run_one(self, job: _Job) -> None:
+        produced = 0
+        tokens = 0
+        stream = job.llm.generate_stream(job.prompt, **self._limit(job))
+        try:
+            async for chunk in stream:
+                if job.cancelled:
+                    break
+                job.out.put_nowait(chunk)
+                produced += 1
+                tokens += estimate_tokens(chunk)
+                if job.max_tokens and tokens >= job.max_tokens:
+                    self._counters["truncated"] += 1
+                    break
+        except Exception as exc:
+            log.exception("LLM generation failed")
+            self._counters["failed"] += 1
+            job.out.put_nowait(exc)
+            return
+        finally:
+            # Closing waits for the backend's generation thread to stop, so
+            # the concurrency slot is only released once it is idle
+            aclose = getattr(stream, "aclose", None)
+            if aclose is not None:
+                await aclose()
+        self._counters["chunks"] += produced
+        self._counters["tokens"] += tokens
+        self._counters["completed"] += 1
+        job.out.put_nowait(_END)
+
+    async def _run_batch(self, batch: list[_Job]) -> None:
+        try:
+            replies = await batch[0].llm.generate_batch(
+                [job.prompt for job in batch], **self._limit(batch[0])
+            )
+        except Exception as exc:
+            log.exception("Batched LLM generation failed")
+            self._counters["failed"] += len(batch)
+            for job in batch:
+                job.out.put_nowait(exc)
+            return
+        self._counters["batches"] += 1
+        self._counters["batched_requests"] += len(batch)
+        self._counters["completed"] += len(batch)
+        self._counters["chunks"] += len(batch)
+        self._counters["tokens"] += sum(estimate_tokens(reply) for reply in replies)
+        for job, reply in zip(batch, replies, strict=True):
+            job.out.put_nowait(reply)
+            job.out.put_nowait(_END)
+
+
+_SCHEDULERS: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, InferenceScheduler] = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_scheduler() -> InferenceScheduler:
+    """Return the scheduler for the running event loop."""
+    loop = asyncio.get_running_loop()
+    scheduler = _SCHEDULERS.get(loop)
+    if scheduler is None:
+        scheduler = _SCHEDULERS[loop] = InferenceScheduler()
+    return scheduler
+
+
+__all__ = [
+    "InferenceScheduler",
+    "Priority",
+    "SchedulerBusy",
+    "estimate_tokens",
+    "get_scheduler",
+]
@@ -0,0 +1,83 @@
+"""Bridge blocking token iterators into async iterators."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator
+from collections.abc import Callable
+from collections.abc import Iterable
+import threading
+from typing import TypeVar
+
+T = TypeVar("T")
+
+_DONE = object()
+
+
+async def iterate_in_thread(
+    make_iter: Callable[[], Iterable[T]],
+    *,
+    maxsize: int = 256,
+    stop: threading.Event | None = None,
+) -> AsyncIterator[T]:
+    """Run ``make_iter()`` in a worker thread and yield its items as they arrive.
+
+    Model backends expose token streams as blocking iterators (LangChain's
+    ``stream`` on top of transformers' ``TextIteratorStreamer`` or llama.cpp's
+    streaming completion). Each item is handed to the event loop as soon as it
+    is produced, so the first token reaches the caller without waiting for the
+    whole generation. Exceptions raised by the iterator are re-raised here.
+    When the consumer stops early the worker stops after the current item,
+    and closing the iterator waits for it so callers know the backend is idle.
+
+    ``stop`` is set as soon as the consumer goes away. Pass the same event to
+    backends that generate on their own thread (see ``llms.loader``) so they
+    stop too, rather than running on to their token limit.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+    if stop is None:
+        stop = threading.Event()
+
+    def put(item) -> bool:
+        # Blocks the worker, not the loop, when the consumer falls behind
+        if stop.is_set():
+            return False
+        try:
+            asyncio.run_coroutine_threadsafe(queue.put(item), loop).result()
+        except RuntimeError:  # event loop closed underneath us
+            return False
+        return True
+
+    def produce() -> None:
+        items = None
+        try:
+            items = iter(make_iter())
+            for item in items:
+                if not put(item):
+                    return
+        except BaseException as exc:  # forwarded to the consumer
+            put(exc)
+            return
+        finally:
+            # Finalize generator-based streams (llama.cpp) on this thread
+            close = getattr(items, "close", None)
+            if close is not None:
+                close()
+        put(_DONE)
+
+    worker = loop.run_in_executor(None, produce)
+    try:
+        while True:
+            item = await queue.get()
+            if item is _DONE:
+                break
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stop.set()
+        # Unblock a worker waiting on a full queue
+        while not queue.empty():
+            queue.get_nowait()
+        await worker
@@ -0,0 +1,361 @@
+"""Retention and compaction for the per-run battle log tree.
+
+``BattleLogger`` writes one directory per battle under
+``logs/runs/<run_id>/battles/<index>/``. :class:`LogRetentionManager` runs
+periodically in the background and
+
+* moves battles that have been idle for ``archive_after`` seconds into the
+  run's archives (``battles.zip``, then ``battles.1.zip`` and so on, one per
+  pass; members keep their relative layout, ``<index>/summary/...`` and
+  ``<index>/raw/...``),
+* deletes whole runs whose newest file is older than ``max_age_days``,
+* deletes the oldest runs until the tree fits in ``max_bytes``.
+
+Active runs and the battles currently being logged are never touched.
+Readers resolve a battle through :func:`battle_location`, which returns the
+on-disk directory or the matching ``zipfile.Path`` inside an archive; the
+functions in ``battle_event_log`` accept either, so archived battles stay
+readable through the same API. Aggregates survive deletion in the analytics
+index (``logs/analytics.db``), which lives outside ``runs/``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import asdict
+from dataclasses import dataclass
+import logging
+import os
+from pathlib import Path
+import re
+import shutil
+import threading
+import time
+from typing import Any
+from typing import Optional
+import zipfile
+
+from battle_event_log import BattlePath
+
+log = logging.getLogger(__name__)
+
+DEFAULT_LOGS_PATH = Path(__file__).resolve().parent / "logs"
+ARCHIVE_NAME = "battles.zip"
+# Later passes roll over to ``battles.<n>.zip`` instead of rewriting the first
+_ARCHIVE_RE = re.compile(r"battles(?:\.(\d+))?\.zip")
+
+# Already-compressed members are stored as-is inside the archive
+_STORED_SUFFIXES = {".gz", ".zst", ".zip"}
+
+
+def _env_number(name: str, default: float) -> float:
+    value = os.getenv(name)
+    if not value:
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        log.warning("Ignoring invalid %s=%r", name, value)
+        return default
+
+
+@dataclass
+class RetentionPolicy:
+    """Budgets for the log tree; a value of ``0`` disables that rule."""
+
+    archive_after: float = 600.0
+    max_age_days: float = 30.0
+    max_bytes: int = 1 << 30
+    interval: float = 600.0
+
+    @classmethod
+    def from_env(cls) -> RetentionPolicy:
+        default = cls()
+        return cls(
+            archive_after=_env_number("AF_LOG_ARCHIVE_AFTER", default.archive_after),
+            max_age_days=_env_number("AF_LOG_MAX_AGE_DAYS", default.max_age_days),
+            max_bytes=int(_env_number("AF_LOG_MAX_BYTES", default.max_bytes)),
+            interval=_env_number("AF_LOG_RETENTION_INTERVAL", default.interval),
+        )
+
+
+def run_archives(run_path: Path) -> list[Path]:
+    """Return ``run_path``'s battle archives, oldest first."""
+    found = []
+    try:
+        entries = list(run_path.iterdir())
+    except FileNotFoundError:
+        return []
+    for entry in entries:
+        match = _ARCHIVE_RE.fullmatch(entry.name)
+        if match and entry.is_file():
+            found.append((int(match.group(1) or 0), entry))
+    return [path for _, path in sorted(found)]
+
+
+def _next_archive(run_path: Path) -> Path:
+    archives = run_archives(run_path)
+    if not archives:
+        return run_path / ARCHIVE_NAME
+    last = _ARCHIVE_RE.fullmatch(archives[-1].name).group(1)
+    return run_path / f"battles.{int(last or 0) + 1}.zip"
+
+
+def battle_location(
+    logs_path: Path, run_id: str, index: int
+) -> Optional[BattlePath]:
+    """Return the directory holding battle ``index`` of ``run_id``.
+
+    Live battles resolve to their directory on disk, archived ones to a
+    ``zipfile.Path`` inside the run archive that holds them. ``None`` means
+    the battle was never logged or has been deleted.
+    """
+    run_path = logs_path / "runs" / run_id
+    battle_dir = run_path / "battles" / str(index)
+    if battle_dir.is_dir():
+        return battle_dir
+    for archive in reversed(run_archives(run_path)):
+        member = zipfile.Path(archive, f"{index}/")
+        if member.exists():
+            return member
+    return None
+
+
+def archived_battle_indices(run_path: Path) -> set[int]:
+    """Return the battle indices stored in ``run_path``'s archives."""
+    indices: set[int] = set()
+    for archive in run_archives(run_path):
+        with zipfile.ZipFile(archive) as zf:
+            indices.update(
+                int(head)
+                for head in (name.split("/", 1)[0] for name in zf.namelist())
+                if head.isdigit()
+            )
+    return indices
+
+
+def _tree_usage(path: Path) -> tuple[int, float]:
+    """Return total size and newest mtime of the files under ``path``."""
+    size = 0
+    newest = 0.0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                st = os.stat(os.path.join(root, name))
+            except FileNotFoundError:
+                continue
+            size += st.st_size
+            newest = max(newest, st.st_mtime)
+    return size, newest
+
+
+def _active_battles() -> dict[str, Optional[int]]:
+    """Map every run being logged to the index of its current battle, if any."""
+    # Imported lazily: battle_logging imports this module
+    from battle_logging import active_run_loggers
+
+    active: dict[str, Optional[int]] = {}
+    for run_logger in active_run_loggers():
+        battle = run_logger.current_battle_logger
+        active[run_logger.run_id] = battle.battle_index if battle is not None else None
+    return active
+
+
+class LogRetentionManager:
+    """Archive idle battles and keep ``logs/runs`` within its budgets."""
+
+    def __init__(
+        self,
+        logs_path: Optional[Path] = None,
+        policy: Optional[RetentionPolicy] = None,
+        clock=time.time,
+    ):
+        self.logs_path = logs_path or DEFAULT_LOGS_PATH
+        self.policy = policy or RetentionPolicy.from_env()
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._totals = {
+            "passes": 0,
+            "errors": 0,
+            "battles_archived": 0,
+            "runs_deleted": 0,
+            "bytes_reclaimed": 0,
+        }
+        self._last_pass: dict[str, Any] = {}
+        self._usage: dict[str, Any] = {}
+
+    @property
+    def runs_root(self) -> Path:
+        return self.logs_path / "runs"
+
+    # -- pass ------------------------------------------------------------
+
+    def run_once(self) -> dict[str, Any]:
+        """Run one archive and cleanup pass; returns what it changed."""
+        with self._lock:
+            started = self._clock()
+            active = _active_battles()
+            before = self._scan_usage(active)["total_bytes"]
+            archived = 0
+            if self.runs_root.is_dir():
+                for run_path in sorted(self.runs_root.iterdir()):
+                    if run_path.is_dir():
+                        skip = active.get(run_path.name)
+                        archived += self._archive_run(run_path, skip, started)
+            deleted = self._enforce_budgets(active, started)
+            usage = self._scan_usage(active)
+            self._totals["passes"] += 1
+            self._totals["battles_archived"] += archived
+            self._totals["runs_deleted"] += len(deleted)
+            self._totals["bytes_reclaimed"] += max(before - usage["total_bytes"], 0)
+            self._last_pass = {
+                "finished_at": self._clock(),
+                "duration_seconds": self._clock() - started,
+                "battles_archived": archived,
+                "runs_deleted": deleted,
+            }
+            return self._last_pass
+
+    def _archive_run(
+        self, run_path: Path, skip: Optional[int], now: float
+    ) -> int:
+        battles_root = run_path / "battles"
+        if not battles_root.is_dir():
+            return 0
+        ready: list[Path] = []
+        for battle_dir in sorted(battles_root.iterdir()):
+            if not battle_dir.is_dir() or not battle_dir.name.isdigit():
+                continue
+            if skip is not None and int(battle_dir.name) == skip:
+                continue
+            _, newest = _tree_usage(battle_dir)
+            if now - newest >= self.policy.archive_after:
+                ready.append(battle_dir)
+        if not ready:
+            return 0
+        try:
+            self._write_archive(_next_archive(run_path), ready)
+        except Exception:
+            log.exception("Failed to archive battles for %s", run_path.name)
+            self._totals["errors"] += 1
+            return 0
+        for battle_dir in ready:
+            shutil.rmtree(battle_dir, ignore_errors=True)
+        return len(ready)
+
+    @staticmethod
+    def _write_archive(archive: Path, battle_dirs: list[Path]) -> None:
+        """Write ``battle_dirs`` to the new archive ``archive`` atomically.
+
+        Each pass rolls over to a fresh archive, so its cost depends only on
+        the battles being archived and earlier archives are never rewritten.
+        The file is written under a temporary name and renamed once complete,
+        so a crash mid-write leaves no partial archive behind. Its mtime is
+        the newest mtime of its contents, so archiving does not make a run
+        look recent to the age budget.
+        """
+        tmp = archive.with_name(archive.name + ".tmp")
+        newest = max(_tree_usage(battle_dir)[1] for battle_dir in battle_dirs)
+        with zipfile.ZipFile(tmp, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+            for battle_dir in battle_dirs:
+                for file in sorted(p for p in battle_dir.rglob("*") if p.is_file()):
+                    name = f"{battle_dir.name}/{file.relative_to(battle_dir).as_posix()}"
+                    compress = (
+                        zipfile.ZIP_STORED
+                        if file.suffix in _STORED_SUFFIXES
+                        else zipfile.ZIP_DEFLATED
+                    )
+                    zf.write(file, name, compress_type=compress)
+        os.utime(tmp, (newest, newest))
+        os.replace(tmp, archive)
+
+    def _enforce_budgets(
+        self, active: dict[str, Optional[int]], now: float
+    ) -> list[str]:
+        if not self.runs_root.is_dir():
+            return []
+        runs = []
+        for run_path in self.runs_root.iterdir():
+            if run_path.is_dir() and run_path.name not in active:
+                size, newest = _tree_usage(run_path)
+                runs.append((newest, size, run_path))
+        runs.sort(key=lambda entry: entry[0])
+        total = _tree_usage(self.runs_root)[0]
+        deleted: list[str] = []
+        max_age = self.policy.max_age_days * 86400
+        for newest, size, run_path in runs:
+            too_old = max_age > 0 and now - newest >= max_age
+            too_big = self.policy.max_bytes > 0 and total > self.policy.max_bytes
+            if not (too_old or too_big):
+                continue
+            shutil.rmtree(run_path, ignore_errors=True)
+            total -= size
+            deleted.append(run_path.name)
+        if deleted:
+            log.info("Log retention removed %d run(s): %s", len(deleted), ", ".join(deleted))
+        return deleted
+
+    def _scan_usage(self, active: dict[str, Optional[int]]) -> dict[str, Any]:
+        usage = {
+            "runs": 0,
+            "live_battles": 0,
+            "archived_battles": 0,
+            "live_bytes": 0,
+            "archive_bytes": 0,
+            "total_bytes": 0,
+            "active_runs": sorted(active),
+        }
+        if self.runs_root.is_dir():
+            for run_path in self.runs_root.iterdir():
+                if not run_path.is_dir():
+                    continue
+                usage["runs"] += 1
+                battles_root = run_path / "battles"
+                if battles_root.is_dir():
+                    usage["live_battles"] += sum(
+                        1 for p in battles_root.iterdir() if p.is_dir() and p.name.isdigit()
+                    )
+                    usage["live_bytes"] += _tree_usage(battles_root)[0]
+                archives = run_archives(run_path)
+                if archives:
+                    usage["archived_battles"] += len(archived_battle_indices(run_path))
+                    usage["archive_bytes"] += sum(a.stat().st_size for a in archives)
+        usage["total_bytes"] = usage["live_bytes"] + usage["archive_bytes"]
+        self._usage = usage
+        return usage
+
+    # -- reporting -------------------------------------------------------
+
+    def get_stats(self) -> dict[str, Any]:
+        """Disk usage as of the last pass plus lifetime counters."""
+        return {
+            "disk": dict(self._usage),
+            "totals": dict(self._totals),
+            "last_pass": dict(self._last_pass),
+            "policy": asdict(self.policy),
+        }
+
+    # -- background task -------------------------------------------------
+
+    async def run_forever(self) -> None:
+        """Run :meth:`run_once` every ``policy.interval`` seconds."""
+        if self.policy.interval <= 0:
+            return
+        while True:
+            try:
+                await asyncio.to_thread(self.run_once)
+            except Exception:
+                log.exception("Log retention pass failed")
+                self._totals["errors"] += 1
+            await asyncio.sleep(self.policy.interval)
+
+
+_MANAGER: Optional[LogRetentionManager] = None
+
+
+def get_retention_manager() -> LogRetentionManager:
+    """Return the process-wide manager for the default logs directory."""
+    global _MANAGER
+    if _MANAGER is None:
+        _MANAGER = LogRetentionManager()
+    return _MANAGER
@@ -1,8 +1,8 @@
-import asyncio
 from dataclasses import dataclass
 from dataclasses import field
 import random
 
+from autofighter.battle_context import battle_sleep
 from autofighter.stats import BUS
 from autofighter.stats import Stats
 from plugins.cards._base import CardBase
@@ -45,7 +45,7 @@ class Overclock(CardBase):
                     dmg,
                     {"target": getattr(target, "id", str(target)), "damage": dmg},
                 )
-                await asyncio.sleep(0.002)
+                await battle_sleep(0.002)
 
         def _battle_start(entity: Stats) -> None:
             if entity in party.members:
@@ -1,6 +1,6 @@
-import asyncio
 from dataclasses import dataclass
 
+from autofighter.battle_context import battle_sleep
 from autofighter.effects import DamageOverTime
 from autofighter.effects import create_stat_buff
 from autofighter.stats import BUS
@@ -121,7 +121,7 @@ class Dark(DamageTypeBase):
         target = enemies[0]
         for _ in range(6):
             dealt = await target.apply_damage(dmg, attacker=actor, action_name="Dark Ultimate")
-            await asyncio.sleep(0.002)
+            await battle_sleep(0.002)
             await BUS.emit_async("damage", actor, target, dealt)
         return True
 
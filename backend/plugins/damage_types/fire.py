@@ -2,6 +2,7 @@ import asyncio
 from dataclasses import dataclass
 import math
 
+from autofighter.battle_context import battle_sleep
 from autofighter.effects import DamageOverTime
 from autofighter.effects import EffectManager
 from autofighter.stats import BUS
@@ -57,7 +58,7 @@ class Fire(DamageTypeBase):
                 mgr.maybe_inflict_dot(actor, dealt)
             except Exception:
                 pass
-            await asyncio.sleep(0.002)
+            await battle_sleep(0.002)
         return True
 
     def _on_ultimate_used(self, user: Stats) -> None:
@@ -1,6 +1,6 @@
-import asyncio
 from dataclasses import dataclass
 
+from autofighter.battle_context import battle_sleep
 from autofighter.passives import PassiveRegistry
 from plugins.damage_types._base import DamageTypeBase
 
@@ -57,7 +57,7 @@ class Generic(DamageTypeBase):
                 party=allies,
                 foes=enemies,
             )
-            await asyncio.sleep(0.002)
+            await battle_sleep(0.002)
         return True
 
     @classmethod
@@ -1,6 +1,6 @@
-import asyncio
 from dataclasses import dataclass
 
+from autofighter.battle_context import battle_sleep
 from autofighter.effects import DamageOverTime
 from autofighter.stats import Stats
 from plugins import damage_effects
@@ -27,9 +27,9 @@ class Ice(DamageTypeBase):
             for foe in foes:
                 dmg = int(base * bonus)
                 await foe.apply_damage(dmg, attacker=user, action_name="Ice Ultimate")
-                await asyncio.sleep(0.002)
+                await battle_sleep(0.002)
                 bonus += 0.3
-            await asyncio.sleep(0.002)
+            await battle_sleep(0.002)
         return True
 
     @classmethod
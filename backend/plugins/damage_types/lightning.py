@@ -2,6 +2,7 @@ import asyncio
 from dataclasses import dataclass
 import random
 
+from autofighter.battle_context import battle_sleep
 from autofighter.effects import DamageOverTime
 from autofighter.stats import BUS
 from plugins import damage_effects
@@ -43,7 +44,7 @@ class Lightning(DamageTypeBase):
         for enemy in enemies:
             if base_damage > 0:
                 await enemy.apply_damage(base_damage, attacker=actor, action_name="Lightning Ultimate")
-                await asyncio.sleep(0.002)
+                await battle_sleep(0.002)
 
             # Apply random DoTs to each enemy
             mgr = getattr(enemy, "effect_manager", None)
@@ -54,7 +55,7 @@ class Lightning(DamageTypeBase):
                     effect = damage_effects.create_dot(random.choice(types), dmg, actor)
                     if effect is not None:
                         mgr.add_dot(effect)
-                    await asyncio.sleep(0.002)
+                    await battle_sleep(0.002)
 
         # Set up aftertaste stacks
         stacks = getattr(actor, "_lightning_aftertaste_stacks", 0) + 1
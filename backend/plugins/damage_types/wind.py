@@ -1,7 +1,8 @@
-import asyncio
 from dataclasses import dataclass
 from typing import ClassVar
 
+from autofighter.battle_context import battle_sleep
+from autofighter.battle_context import current_battle_context
 from autofighter.effects import DamageOverTime
 from autofighter.effects import EffectManager
 from autofighter.effects import create_stat_buff
@@ -16,18 +17,27 @@ class Wind(DamageTypeBase):
     id: str = "Wind"
     weakness: str = "Lightning"
     color: tuple[int, int, int] = (0, 255, 0)
-    _players: ClassVar[list] = []
-    _foes: ClassVar[list] = []
-    _pending: ClassVar[list] = []
     _initialized: ClassVar[bool] = False
 
     def __post_init__(self) -> None:
-        # Ensure we only subscribe once at the class level
+        # Subscribe once, process-wide; the rosters live on each battle's context
         if not Wind._initialized:
-            BUS.subscribe("battle_start", Wind._on_battle_start)
-            BUS.subscribe("battle_end", Wind._on_battle_end)
+            BUS.subscribe_global("battle_start", Wind._on_battle_start)
+            BUS.subscribe_global("battle_end", Wind._on_battle_end)
             Wind._initialized = True
 
+    @staticmethod
+    def _players() -> list:
+        return current_battle_context().wind_players
+
+    @staticmethod
+    def _foes() -> list:
+        return current_battle_context().wind_foes
+
+    @staticmethod
+    def _pending() -> list:
+        return current_battle_context().wind_pending
+
     # Previous implementation scattered DoTs after an ultimate by moving
     # existing effects. The new design: when Wind uses its ultimate, strike
     # every living foe multiple times and temporarily increase the user's
@@ -45,10 +55,10 @@ class Wind(DamageTypeBase):
             return False
 
         actor_type = getattr(actor, "plugin_type", None)
-        if actor_type == "player" and actor not in Wind._players:
-            Wind._players.append(actor)
-        elif actor_type == "foe" and actor not in Wind._foes:
-            Wind._foes.append(actor)
+        if actor_type == "player" and actor not in Wind._players():
+            Wind._players().append(actor)
+        elif actor_type == "foe" and actor not in Wind._foes():
+            Wind._foes().append(actor)
 
         # Ensure the actor has an EffectManager so temporary buffs apply cleanly
         a_mgr = getattr(actor, "effect_manager", None)
@@ -111,7 +121,7 @@ class Wind(DamageTypeBase):
                 except Exception:
                     pass
                 # Yield briefly each hit to keep the event loop responsive
-                await asyncio.sleep(0.002)
+                await battle_sleep(0.002)
 
         # Clean up the temporary buff immediately after the sequence
         try:
@@ -140,15 +150,15 @@ class Wind(DamageTypeBase):
         # Determine actor type and add to appropriate registry
         actor_type = getattr(actor, "plugin_type", None)
         if actor_type == "player":
-            if actor not in cls._players:
-                cls._players.append(actor)
+            if actor not in cls._players():
+                cls._players().append(actor)
         elif actor_type == "foe":
-            if actor not in cls._foes:
-                cls._foes.append(actor)
+            if actor not in cls._foes():
+                cls._foes().append(actor)
 
     @classmethod
     def _on_battle_end(cls, *_: object) -> None:
-        """Clear all registries when battle ends."""
-        cls._players.clear()
-        cls._foes.clear()
-        cls._pending.clear()
+        """Clear this battle's registries when it ends."""
+        cls._players().clear()
+        cls._foes().clear()
+        cls._pending().clear()
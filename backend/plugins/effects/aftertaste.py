@@ -1,8 +1,8 @@
-import asyncio
 from dataclasses import dataclass
 from dataclasses import field
 import random
 
+from autofighter.battle_context import battle_sleep
 from autofighter.stats import Stats
 from plugins.damage_types.dark import Dark
 from plugins.damage_types.fire import Fire
@@ -95,5 +95,5 @@ class Aftertaste:
 
             dmg = await target.apply_damage(amount, temp_attacker, action_name="Aftertaste")
             results.append(dmg)
-            await asyncio.sleep(0.002)
+            await battle_sleep(0.002)
         return results
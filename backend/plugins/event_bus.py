@@ -1,9 +1,14 @@
 import asyncio
 from collections import defaultdict
+from collections import deque
+from collections.abc import Awaitable
 from collections.abc import Callable
 import contextlib
+from contextvars import ContextVar
+from contextvars import Token
 import inspect
 import logging
+import math
 import time
 from typing import Any
 import weakref
@@ -14,47 +19,215 @@ except Exception:  # pragma: no cover - fallback when Rich is missing
     RichHandler = logging.StreamHandler
 
 
-class EventMetrics:
-    """Track event bus performance metrics."""
+# Latency histogram buckets grow geometrically from 1µs, so any duration lands
+# in a bucket whose bounds are within 10% of each other.
+_HIST_MIN = 1e-6
+_HIST_GROWTH = 1.1
+_HIST_LOG_GROWTH = math.log(_HIST_GROWTH)
 
-    def __init__(self):
+
+def _bucket_index(duration: float) -> int:
+    if duration <= _HIST_MIN:
+        return 0
+    return int(math.log(duration / _HIST_MIN) / _HIST_LOG_GROWTH) + 1
+
+
+def _bucket_value(index: int) -> float:
+    """Geometric midpoint of bucket ``index``."""
+    if index == 0:
+        return _HIST_MIN
+    return _HIST_MIN * _HIST_GROWTH ** (index - 1) * math.sqrt(_HIST_GROWTH)
+
+
+class LatencyHistogram:
+    """Fixed-precision latency distribution in O(buckets) memory.
+
+    Durations are counted in log-scaled buckets rather than stored, so
+    percentiles are approximate (within one bucket) while count, total, min
+    and max stay exact.
+    """
+
+    __slots__ = ("buckets", "count", "total", "min", "max")
+
+    def __init__(self) -> None:
+        self.buckets: dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def record(self, duration: float) -> None:
+        index = _bucket_index(duration)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.total += duration
+        if duration < self.min:
+            self.min = duration
+        if duration > self.max:
+            self.max = duration
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def percentile(self, pct: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(self.count * pct))
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                return min(max(_bucket_value(index), self.min), self.max)
+        return self.max
+
+    def summary(self) -> dict:
+        if not self.count:
+            return {'count': 0, 'avg_time': 0.0, 'min_time': 0.0, 'max_time': 0.0,
+                    'p50': 0.0, 'p95': 0.0, 'p99': 0.0}
+        return {
+            'count': self.count,
+            'avg_time': self.total / self.count,
+            'min_time': self.min,
+            'max_time': self.max,
+            'p50': self.percentile(0.50),
+            'p95': self.percentile(0.95),
+            'p99': self.percentile(0.99),
+        }
+
+
+class EventMetrics:
+    """Track event bus performance metrics in bounded memory.
+
+    Each event keeps a lifetime :class:`LatencyHistogram` plus a ring of
+    per-slot histograms covering the last ``window`` seconds. Slow emissions
+    go to a ring buffer holding the most recent ``slow_capacity`` entries.
+    """
+
+    def __init__(
+        self,
+        window: float = 60.0,
+        slots: int = 6,
+        slow_capacity: int = 100,
+        slow_threshold: float = 0.016,  # One frame at 60fps
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.window = window
+        self.slots = slots
+        self.slot_width = window / slots
+        self.slow_threshold = slow_threshold
+        self._clock = clock
         self.event_counts = defaultdict(int)
-        self.event_timings = defaultdict(list)
-        self.slow_events = []  # Events that took >16ms (one frame at 60fps)
+        self.histograms: dict[str, LatencyHistogram] = defaultdict(LatencyHistogram)
+        self.recent: dict[str, deque] = defaultdict(lambda: deque(maxlen=slots))
+        self.slow_events = deque(maxlen=slow_capacity)
         self.error_counts = defaultdict(int)
 
+    def _slot(self) -> int:
+        return int(self._clock() // self.slot_width)
+
     def record_event(self, event: str, duration: float, error: bool = False):
         self.event_counts[event] += 1
-        self.event_timings[event].append(duration)
+        self.histograms[event].record(duration)
+
+        slot = self._slot()
+        ring = self.recent[event]
+        if not ring or ring[-1][0] != slot:
+            ring.append((slot, LatencyHistogram()))
+        ring[-1][1].record(duration)
 
         if error:
             self.error_counts[event] += 1
 
-        if duration > 0.016:  # >16ms may cause frame drops
+        if duration > self.slow_threshold:  # May cause frame drops
             self.slow_events.append((event, duration, time.time()))
 
+    def window_stats(self, event: str) -> dict:
+        """Summarise ``event`` over the rolling window only."""
+        merged = LatencyHistogram()
+        oldest = self._slot() - self.slots
+        for slot, hist in self.recent.get(event, ()):
+            if slot > oldest:
+                merged.merge(hist)
+        return merged.summary()
+
     def get_stats(self) -> dict:
         stats = {}
-        for event, timings in self.event_timings.items():
-            if timings:
+        for event, hist in self.histograms.items():
+            if hist.count:
                 stats[event] = {
-                    'count': len(timings),
-                    'avg_time': sum(timings) / len(timings),
-                    'max_time': max(timings),
-                    'errors': self.error_counts[event]
+                    **hist.summary(),
+                    'errors': self.error_counts[event],
+                    'window': self.window_stats(event),
                 }
         return stats
 
+    def get_slow_events(self) -> list[dict]:
+        return [
+            {'event': event, 'duration': duration, 'timestamp': timestamp}
+            for event, duration, timestamp in self.slow_events
+        ]
+
+
+class _Subscribers(defaultdict):
+    """Per-event subscriber lists that count mutations.
+
+    ``version`` lets buses cache their flattened subscriber tuples and notice
+    any change, including tests clearing ``bus._subs`` directly.
+    """
 
-class _Bus:
     def __init__(self) -> None:
-        self._subs: dict[str, list[tuple[object, Callable[..., Any]]]] = defaultdict(list)
+        super().__init__(list)
+        self.version = 0
+
+    def __setitem__(self, key, value) -> None:
+        super().__setitem__(key, value)
+        self.version += 1
+
+    def __delitem__(self, key) -> None:
+        super().__delitem__(key)
+        self.version += 1
+
+    def pop(self, *args):
+        self.version += 1
+        return super().pop(*args)
+
+    def clear(self) -> None:
+        super().clear()
+        self.version += 1
+
+
+class _Bus:
+    """Subscriber registry and dispatcher.
+
+    A bus created with a ``parent`` is a scope: it delivers to its own
+    subscribers after the parent's and reports metrics to the parent.
+    ``sleep`` replaces ``asyncio.sleep`` for batching and cooperative yields
+    so a simulated battle clock can skip them.
+    """
+
+    def __init__(
+        self,
+        parent: "_Bus | None" = None,
+        sleep: Callable[[float], Awaitable[None]] | None = None,
+    ) -> None:
+        self._parent = parent
+        self._sleep = sleep or asyncio.sleep
+        self._subs: _Subscribers = _Subscribers()
+        self._cache: dict[str, tuple[tuple, tuple]] = {}
         self._metrics = EventMetrics()
         self._high_frequency_events = {'damage_dealt', 'damage_taken', 'hit_landed', 'heal_received'}
         self._batched_events = defaultdict(list)
         self._batch_timer = None
         self._batch_interval = 0.016  # Batch events for one frame (16ms at 60fps)
         self._dynamic_batch_interval = True  # Enable adaptive batching
+        if parent is not None:
+            self._batch_interval = parent._batch_interval
+            self._dynamic_batch_interval = parent._dynamic_batch_interval
 
     def accept(self, event: str, obj, func: Callable[..., Any]) -> None:
         # Use weak references for objects to prevent memory leaks
@@ -63,8 +236,38 @@ class _Bus:
         else:
             obj_ref = None
         self._subs[event].append((obj_ref or obj, func))
+        self._subs.version += 1
+
+    def _stamp(self) -> tuple:
+        parent = self._parent._stamp() if self._parent is not None else None
+        return (self._subs.version, parent)
+
+    def _callbacks(self, event: str) -> tuple[tuple[object, Callable[..., Any], bool], ...]:
+        """Return ``(obj_ref, func, is_async)`` for every subscriber, parents first.
+
+        The tuple is cached per event until this bus or a parent changes.
+        """
+        stamp = self._stamp()
+        cached = self._cache.get(event)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        inherited = self._parent._callbacks(event) if self._parent is not None else ()
+        own = tuple(
+            (obj_ref, func, inspect.iscoroutinefunction(func))
+            for obj_ref, func in self._subs.get(event, ())
+        )
+        callbacks = inherited + own
+        self._cache[event] = (stamp, callbacks)
+        return callbacks
+
+    def _record(self, event: str, duration: float, error: bool) -> None:
+        if self._parent is not None:
+            self._parent._record(event, duration, error)
+        else:
+            self._metrics.record_event(event, duration, error)
 
     def ignore(self, event: str, obj) -> None:
+        # A scope only drops its own subscriptions; the parent's stay intact
         if obj is not None:
             # Use weak reference for comparison to handle object cleanup
             self._subs[event] = [
@@ -79,13 +282,13 @@ class _Bus:
     def send(self, event: str, args) -> None:
         """Synchronous send with performance monitoring and error isolation."""
         start_time = time.perf_counter()
-        callbacks = list(self._subs.get(event, []))
+        callbacks = self._callbacks(event)
 
         if not callbacks:
             return
 
         errors = 0
-        for obj_ref, func in callbacks:
+        for obj_ref, func, is_async in callbacks:
             try:
                 # Handle weak references
                 if callable(obj_ref):
@@ -95,7 +298,7 @@ class _Bus:
                 else:
                     obj = obj_ref
 
-                if inspect.iscoroutinefunction(func):
+                if is_async:
                     loop = None
                     with contextlib.suppress(RuntimeError):
                         loop = asyncio.get_running_loop()
@@ -113,7 +316,7 @@ class _Bus:
                 log.exception("Error in sync event callback for %s: %s", event, e)
 
         duration = time.perf_counter() - start_time
-        self._metrics.record_event(event, duration, errors > 0)
+        self._record(event, duration, errors > 0)
 
         # Log performance warnings for slow events
         if duration > 0.050:  # >50ms is definitely problematic
@@ -150,12 +353,12 @@ class _Bus:
 
     async def _process_batches_with_interval(self, interval: float):
         """Process batched events with adaptive interval."""
-        await asyncio.sleep(interval)
+        await self._sleep(interval)
         await self._process_batches_internal()
 
     async def _process_batches(self):
         """Process batched events with default interval."""
-        await asyncio.sleep(self._batch_interval)
+        await self._sleep(self._batch_interval)
         await self._process_batches_internal()
 
     async def _process_batches_internal(self):
@@ -173,7 +376,6 @@ class _Bus:
         for event, args_list in events_snapshot:
             for args in args_list:
                 all_events.append((event, args))
-                await asyncio.sleep(0.002)  # 2ms yield to avoid busy loop
 
         if all_events:
             # Process all events concurrently for much better performance
@@ -183,7 +385,6 @@ class _Bus:
                     await self.send_async(event, args)
                 except Exception as e:
                     log.exception("Error processing batched event %s: %s", event, e)
-                await asyncio.sleep(0.002)  # Maintain 2ms cooperative delay
 
             # Use gather with limited concurrency to avoid overwhelming the event loop
             batch_size = 100  # Process in chunks to manage memory and concurrency
@@ -193,7 +394,16 @@ class _Bus:
                     *[process_single_event(event_data) for event_data in batch],
                     return_exceptions=True,
                 )
-                await asyncio.sleep(0.002)  # Allow other tasks between batches
+                await asyncio.sleep(0)  # Let other tasks run between chunks
+
+    async def drain_batches(self) -> None:
+        """Deliver every batched event that is still waiting for its timer."""
+        while self._batched_events or isinstance(self._batch_timer, asyncio.Task):
+            timer = self._batch_timer
+            if isinstance(timer, asyncio.Task) and not timer.done():
+                await timer
+            else:
+                await self._process_batches_internal()
 
     def _process_batches_sync(self):
         """Fallback sync processing when no event loop is available."""
@@ -216,49 +426,57 @@ class _Bus:
             self._batch_timer = None
 
     async def send_async(self, event: str, args) -> None:
-        """Async version of send that executes callbacks concurrently with error isolation."""
-        start_time = time.perf_counter()
-        callbacks = list(self._subs.get(event, []))
-
+        """Deliver an event, awaiting async subscribers concurrently.
+
+        Sync subscribers run inline on the loop; async subscribers are
+        gathered afterwards with error isolation. Each delivery ends with a
+        bare yield to the loop rather than a timed sleep. Events without subscribers return before any
+        work is scheduled.
+        """
+        callbacks = self._callbacks(event)
         if not callbacks:
             return
 
-        async def _run_callback(obj_ref, func, args):
+        start_time = time.perf_counter()
+        errors = 0
+        pending = []
+        for obj_ref, func, is_async in callbacks:
+            # Handle weak references
+            if callable(obj_ref) and obj_ref() is None:
+                continue  # Object was garbage collected
             try:
-                # Handle weak references
-                if callable(obj_ref):
-                    obj = obj_ref()
-                    if obj is None:  # Object was garbage collected
-                        return False
+                if is_async:
+                    pending.append(func(*args))
                 else:
-                    obj = obj_ref
-
-                if inspect.iscoroutinefunction(func):
-                    await func(*args)
-                else:
-                    # Run sync functions in thread pool to avoid blocking
-                    loop = asyncio.get_running_loop()
-                    await loop.run_in_executor(None, lambda: func(*args))
-                await asyncio.sleep(0.002)  # Cooperative 2ms delay per repo rules
-                return True
+                    func(*args)
             except Exception as e:
+                errors += 1
                 log.exception("Error in async event callback for %s: %s", event, e)
-                return False
 
-        # Run all callbacks concurrently to avoid blocking
-        results = await asyncio.gather(
-            *[_run_callback(obj_ref, func, args) for obj_ref, func in callbacks],
-            return_exceptions=True
-        )
+        if pending:
+            results = await asyncio.gather(*pending, return_exceptions=True)
+            for result in results:
+                if isinstance(result, BaseException):
+                    errors += 1
+                    log.error(
+                        "Error in async event callback for %s: %s",
+                        event,
+                        result,
+                        exc_info=result,
+                    )
 
         duration = time.perf_counter() - start_time
-        errors = sum(1 for r in results if r is False or isinstance(r, Exception))
-        self._metrics.record_event(event, duration, errors > 0)
+        self._record(event, duration, errors > 0)
+        await asyncio.sleep(0)  # Yield once; no fixed delay per emission
 
     def get_metrics(self) -> dict:
         """Get performance metrics for monitoring."""
         return self._metrics.get_stats()
 
+    def get_slow_events(self) -> list[dict]:
+        """Most recent slow emissions, oldest first."""
+        return self._metrics.get_slow_events()
+
     def clear_metrics(self) -> None:
         """Clear metrics (useful for testing)."""
         self._metrics = EventMetrics()
@@ -266,64 +484,112 @@ class _Bus:
 
 bus = _Bus()
 
+# Bus scope for the current task; ``None`` means the process-wide ``bus``.
+_scope: ContextVar[_Bus | None] = ContextVar("event_bus_scope", default=None)
+
+
+def _active_bus() -> _Bus:
+    scoped = _scope.get()
+    return bus if scoped is None else scoped
+
+
+def new_scope(sleep: Callable[[float], Awaitable[None]] | None = None) -> _Bus:
+    """Create a bus scope layered over the process-wide bus."""
+    return _Bus(parent=bus, sleep=sleep)
+
+
+def enter_scope(scoped: _Bus) -> Token:
+    """Route subscriptions and emissions in this context through ``scoped``."""
+    return _scope.set(scoped)
+
+
+def exit_scope(token: Token) -> None:
+    _scope.reset(token)
+
+
 log = logging.getLogger(__name__)
 if not log.handlers:
     log.addHandler(RichHandler())
 
 
+def _pass_through(args: tuple) -> tuple:
+    return args
+
+
+def _compile_adapter(callback: Callable[..., Any]) -> Callable[[tuple], tuple]:
+    """Build a function that trims or pads emitted args to fit ``callback``.
+
+    The signature is inspected once at subscribe time rather than on every
+    delivery. Extra positional args are dropped and missing required ones are
+    filled with ``None``.
+    """
+    try:
+        sig = inspect.signature(callback)
+    except (TypeError, ValueError):
+        return _pass_through
+    params = [
+        p
+        for p in sig.parameters.values()
+        if p.kind
+        in (
+            inspect.Parameter.POSITIONAL_ONLY,
+            inspect.Parameter.POSITIONAL_OR_KEYWORD,
+        )
+    ]
+    if any(p.kind == inspect.Parameter.VAR_POSITIONAL for p in sig.parameters.values()):
+        return _pass_through
+    limit = len(params)
+    required = sum(1 for p in params if p.default is inspect.Parameter.empty)
+
+    def adapt(args: tuple) -> tuple:
+        if len(args) > limit:
+            return args[:limit]
+        if len(args) < required:
+            return args + (None,) * (required - len(args))
+        return args
+
+    return adapt
+
+
 class EventBus:
     def __init__(self):
         self._prefer_async = True  # Prefer async emission when possible
         self._performance_monitoring = True
 
     def subscribe(self, event: str, callback: Callable[..., Any]) -> None:
-        def _prepare_args(args: Any) -> list[Any]:
-            sig = inspect.signature(callback)
-            params = [
-                p
-                for p in sig.parameters.values()
-                if p.kind
-                in (
-                    inspect.Parameter.POSITIONAL_ONLY,
-                    inspect.Parameter.POSITIONAL_OR_KEYWORD,
-                )
-            ]
-            accepts_varargs = any(
-                p.kind == inspect.Parameter.VAR_POSITIONAL for p in sig.parameters.values()
-            )
-
-            call_args = list(args)
-            if not accepts_varargs:
-                if len(call_args) > len(params):
-                    call_args = call_args[: len(params)]
-                required = [
-                    p for p in params if p.default is inspect.Parameter.empty
-                ]
-                if len(call_args) < len(required):
-                    call_args.extend([None] * (len(required) - len(call_args)))
-
-            return call_args
+        _active_bus().accept(event, callback, self._wrap(event, callback))
+
+    def subscribe_global(self, event: str, callback: Callable[..., Any]) -> None:
+        """Subscribe on the process-wide bus, even inside a battle scope.
+
+        Use this for handlers registered once per process; every battle
+        scope delivers to them, while a scoped subscription ends with its
+        battle.
+        """
+        bus.accept(event, callback, self._wrap(event, callback))
+
+    @staticmethod
+    def _wrap(event: str, callback: Callable[..., Any]) -> Callable[..., Any]:
+        adapt = _compile_adapter(callback)
 
         if inspect.iscoroutinefunction(callback):
             async def wrapper(*args: Any) -> None:
                 try:
-                    call_args = _prepare_args(args)
-                    await callback(*call_args)
+                    await callback(*adapt(args))
                 except Exception:
                     log.exception("Error in '%s' subscriber %s", event, callback)
 
         else:
             def wrapper(*args: Any) -> None:
                 try:
-                    call_args = _prepare_args(args)
-                    callback(*call_args)
+                    callback(*adapt(args))
                 except Exception:
                     log.exception("Error in '%s' subscriber %s", event, callback)
 
-        bus.accept(event, callback, wrapper)
+        return wrapper
 
     def unsubscribe(self, event: str, callback: Callable[..., Any]) -> None:
-        bus.ignore(event, callback)
+        _active_bus().ignore(event, callback)
 
     def emit(self, event: str, *args: Any) -> None:
         """Emit event. Prefers async emission when enabled for better performance."""
@@ -332,26 +598,34 @@ class EventBus:
                 # Check if we're in an async context
                 asyncio.get_running_loop()
                 # When async is preferred and event loop is available, use batching for better performance
-                bus.send_batched(event, args)
+                _active_bus().send_batched(event, args)
             except RuntimeError:
                 # No event loop, fall back to sync emission
-                bus.send(event, args)
+                _active_bus().send(event, args)
         else:
             # Traditional sync emission
-            bus.send(event, args)
+            _active_bus().send(event, args)
 
     async def emit_async(self, event: str, *args: Any) -> None:
         """Async version of emit that executes callbacks concurrently"""
-        await bus.send_async(event, args)
+        await _active_bus().send_async(event, args)
 
     def emit_batched(self, event: str, *args: Any) -> None:
         """Emit high-frequency events in batches to reduce blocking."""
-        bus.send_batched(event, args)
+        _active_bus().send_batched(event, args)
+
+    async def drain_batched(self) -> None:
+        """Wait until batched events on the active bus have been delivered."""
+        await _active_bus().drain_batches()
 
     def get_performance_metrics(self) -> dict:
         """Get event bus performance metrics."""
         return bus.get_metrics()
 
+    def get_slow_events(self) -> list[dict]:
+        """Get the bounded list of recent slow emissions."""
+        return bus.get_slow_events()
+
     def clear_metrics(self) -> None:
         """Clear performance metrics."""
         bus.clear_metrics()
@@ -0,0 +1,184 @@
+"""Prebuilt index of plugin metadata.
+
+:class:`~plugins.plugin_loader.PluginLoader` normally imports every module
+under a plugin directory to find its classes. The manifest records what that
+scan found, per directory: each plugin's id, category, module, class name and
+cheap metadata (``name``, ``stars``, ``trigger``, ``max_stacks``, ...), plus
+the SHA-256 of every ``.py`` file in the directory. When the hashes still
+match, the loader registers plugins straight from the manifest and imports a
+module only when one of its plugins is first looked up.
+
+The manifest is written to ``plugins/plugin_manifest.json`` (override with
+``AF_PLUGIN_MANIFEST``). Build it ahead of time with
+``python -m plugins.manifest``; otherwise it is filled in on the first run.
+Frozen builds that ship without plugin sources trust the bundled manifest
+and import modules by name.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+import threading
+from typing import Any
+
+log = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 1
+PLUGINS_DIR = Path(__file__).resolve().parent
+DEFAULT_ROOTS = ("cards", "relics", "passives", "themedadj")
+
+# Class attributes copied into the manifest when they hold plain JSON values
+METADATA_FIELDS = ("name", "stars", "trigger", "max_stacks", "stack_display", "rank", "about")
+
+_LOCK = threading.Lock()
+
+
+def manifest_path() -> Path:
+    override = os.getenv("AF_PLUGIN_MANIFEST")
+    if override:
+        return Path(override)
+    return PLUGINS_DIR / "plugin_manifest.json"
+
+
+def root_key(base: Path) -> str:
+    """Identify a plugin directory independently of where the tree lives."""
+    parts = base.resolve().parts
+    if "plugins" in parts:
+        return "/".join(parts[len(parts) - 1 - parts[::-1].index("plugins") :])
+    return base.name
+
+
+def hash_tree(base: Path) -> dict[str, str]:
+    """Return ``{relative path: sha256}`` for the ``.py`` files under ``base``."""
+    hashes: dict[str, str] = {}
+    for path in sorted(base.rglob("*.py")):
+        hashes[path.relative_to(base).as_posix()] = hashlib.sha256(path.read_bytes()).hexdigest()
+    return hashes
+
+
+def _json_value(value: Any) -> Any:
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if isinstance(value, (list, tuple, set, frozenset)):
+        items = sorted(value) if isinstance(value, (set, frozenset)) else list(value)
+        if all(isinstance(item, (str, int, float, bool)) for item in items):
+            return items
+    raise TypeError
+
+
+def plugin_metadata(cls: type) -> dict[str, Any]:
+    """Return the manifest metadata for a plugin class."""
+    meta: dict[str, Any] = {}
+    for key in METADATA_FIELDS:
+        try:
+            value = _json_value(getattr(cls, key))
+        except (AttributeError, TypeError):
+            continue
+        if value is not None:
+            meta[key] = value
+    return meta
+
+
+def plugin_entry(cls: type, path: str) -> dict[str, Any]:
+    return {
+        "id": getattr(cls, "id", cls.__name__),
+        "category": cls.plugin_type,
+        "module": cls.__module__,
+        "class": cls.__name__,
+        "path": path,
+        **plugin_metadata(cls),
+    }
+
+
+_CACHE: tuple[Path, int, int, dict[str, Any]] | None = None
+
+
+def read_manifest() -> dict[str, Any]:
+    """Return the parsed manifest, reusing it while the file is unchanged."""
+    global _CACHE
+    path = manifest_path()
+    try:
+        st = path.stat()
+        cache = _CACHE
+        if cache is not None and cache[:3] == (path, st.st_mtime_ns, st.st_size):
+            return cache[3]
+        data = json.loads(path.read_text())
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != MANIFEST_VERSION:
+        return {}
+    _CACHE = (path, st.st_mtime_ns, st.st_size, data)
+    return data
+
+
+def cached_entries(base: Path) -> list[dict[str, Any]] | None:
+    """Return the manifest entries for ``base`` if they are still current."""
+    root = read_manifest().get("roots", {}).get(root_key(base))
+    if not root:
+        return None
+    if base.exists():
+        try:
+            if hash_tree(base) != root.get("files"):
+                return None
+        except OSError:
+            return None
+    return list(root.get("plugins", []))
+
+
+def store_entries(base: Path, files: dict[str, str], entries: list[dict[str, Any]]) -> None:
+    """Record ``entries`` for ``base``; failures only cost the next startup."""
+    path = manifest_path()
+    with _LOCK:
+        data = dict(read_manifest()) or {"version": MANIFEST_VERSION}
+        roots = dict(data.get("roots", {}))
+        roots[root_key(base)] = {
+            "files": files,
+            "plugins": sorted(entries, key=lambda e: (e["category"], e["id"])),
+        }
+        data["roots"] = roots
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp.write_text(json.dumps(data, indent=1, sort_keys=True))
+            os.replace(tmp, path)
+        except OSError as exc:
+            log.debug("Could not write plugin manifest %s: %s", path, exc)
+            tmp.unlink(missing_ok=True)
+
+
+def build_manifest(roots: list[Path]) -> dict[str, int]:
+    """Scan ``roots`` with imports and write their manifest entries."""
+    from plugins.plugin_loader import PluginLoader
+
+    counts: dict[str, int] = {}
+    for base in roots:
+        loader = PluginLoader(use_manifest=False)
+        loader.discover(str(base))
+        counts[root_key(base)] = loader.entry_count
+    return counts
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Generate the plugin manifest")
+    parser.add_argument(
+        "roots",
+        nargs="*",
+        help=f"plugin directories (default: {', '.join(DEFAULT_ROOTS)})",
+    )
+    parser.add_argument("--output", help="manifest path (default: plugins/plugin_manifest.json)")
+    args = parser.parse_args(argv)
+    if args.output:
+        os.environ["AF_PLUGIN_MANIFEST"] = args.output
+    roots = [Path(r) for r in args.roots] or [PLUGINS_DIR / name for name in DEFAULT_ROOTS]
+    for key, count in build_manifest(roots).items():
+        print(f"{key}: {count} plugin(s)")
+    print(f"Wrote {manifest_path()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 import copy
 from dataclasses import dataclass
 from dataclasses import field
@@ -12,35 +13,9 @@ from autofighter.stats import Stats
 from plugins.damage_types import random_damage_type
 from plugins.damage_types._base import DamageTypeBase
 
-# Module-level cache to avoid repeatedly loading SentenceTransformer
-_EMBEDDINGS: object | None = None
-
 log = logging.getLogger(__name__)
 
 
-class SimpleConversationMemory:
-    """Lightweight, dependency-free memory used as a safe default.
-
-    Provides the minimal interface expected by PlayerBase methods without
-    bringing in external dependencies that can break deepcopy/pickling.
-    """
-
-    def __init__(self) -> None:
-        self._history: list[tuple[str, str]] = []
-
-    def save_context(self, inputs: dict[str, str], outputs: dict[str, str]) -> None:
-        self._history.append((inputs.get("input", ""), outputs.get("output", "")))
-
-    def load_memory_variables(self, _: dict[str, str]) -> dict[str, str]:
-        lines: list[str] = []
-        for human, ai in self._history:
-            if human:
-                lines.append(f"Human: {human}")
-            if ai:
-                lines.append(f"AI: {ai}")
-        return {"history": "\n".join(lines)}
-
-
 @dataclass
 class PlayerBase(Stats):
     plugin_type = "player"
@@ -99,51 +74,28 @@ class PlayerBase(Stats):
         # Call parent post_init
         super().__post_init__()
 
-        # Use centralized torch checker instead of individual import attempts
-        from llms.torch_checker import is_torch_available
-
-        if not is_torch_available():
-            # Fall back to simple in-process memory without dependencies
-            self.lrm_memory = SimpleConversationMemory()
-            return
+    @property
+    def memory(self):
+        """Conversation memory, created on first use."""
+        if self.lrm_memory is None:
+            from llms.memory import memory_for
 
-        try:
-            from langchain.memory import VectorStoreRetrieverMemory
-            from langchain_chroma import Chroma
-            from langchain_huggingface import HuggingFaceEmbeddings
-        except (ImportError, ModuleNotFoundError):
-            # Fallback if imports still fail despite torch being available
-            self.lrm_memory = SimpleConversationMemory()
-            return
-
-        run = getattr(self, "run_id", "run")
-        ident = getattr(self, "id", type(self).__name__)
-        collection = f"{run}-{ident}"
-        global _EMBEDDINGS
-        if _EMBEDDINGS is None:
-            _EMBEDDINGS = HuggingFaceEmbeddings(
-                model_name="sentence-transformers/all-MiniLM-L6-v2",
-            )
-        embeddings = _EMBEDDINGS
-        try:
-            store = Chroma(
-                collection_name=collection,
-                embedding_function=embeddings,
-            )
-        except Exception:
-            # If vector store init fails, use simple memory
-            self.lrm_memory = SimpleConversationMemory()
-            return
+            run = getattr(self, "run_id", "run")
+            ident = getattr(self, "id", type(self).__name__)
+            self.lrm_memory = memory_for(run, ident)
+        return self.lrm_memory
 
-        self.lrm_memory = VectorStoreRetrieverMemory(
-            retriever=store.as_retriever()
-        )
+    async def _memory(self):
+        """Return :attr:`memory`, opening the shared store off the event loop."""
+        if self.lrm_memory is None:
+            await asyncio.to_thread(lambda: self.memory)
+        return self.lrm_memory
 
     def __deepcopy__(self, memo):  # type: ignore[override]
         """Custom deepcopy that skips copying non-serializable memory bindings.
 
         - Deep-copies all dataclass fields except `lrm_memory`.
-        - Replaces `lrm_memory` with a fresh SimpleConversationMemory instance.
+        - Leaves `lrm_memory` unset; the copy attaches to memory on first use.
         This avoids pydantic/langchain binding errors during deepcopy while
         ensuring lists/dicts are independently copied for battle simulation.
         """
@@ -153,10 +105,14 @@ class PlayerBase(Stats):
         for f in fields(cls):
             name = f.name
             if name == "lrm_memory":
-                setattr(result, name, SimpleConversationMemory())
+                setattr(result, name, None)
                 continue
             val = getattr(self, name)
             setattr(result, name, copy.deepcopy(val, memo))
+        # Keep the memory namespace so the copy shares the original's memory
+        for name in ("id", "run_id"):
+            if name in self.__dict__:
+                setattr(result, name, self.__dict__[name])
         return result
 
     def use_ultimate(self) -> bool:
@@ -170,20 +126,20 @@ class PlayerBase(Stats):
 
 
     async def send_lrm_message(self, message: str) -> dict[str, object]:
-        import asyncio
-        from pathlib import Path
-
         from llms.torch_checker import is_torch_available
-        from tts import generate_voice
+        from tts import voice_path
 
+        memory = await self._memory()
         if not is_torch_available():
             response = ""
-            self.lrm_memory.save_context({"input": message}, {"output": response})
+            await asyncio.to_thread(
+                memory.save_context, {"input": message}, {"output": response}
+            )
             return {"text": response, "voice": None}
 
         try:
-            from llms.loader import load_llm
-            llm = await asyncio.to_thread(load_llm)
+            from llms.registry import get_llm
+            llm = await get_llm()
         except Exception:
             class _LLM:
                 async def generate_stream(self, text: str):
@@ -191,26 +147,30 @@ class PlayerBase(Stats):
 
             llm = _LLM()
 
-        context = self.lrm_memory.load_memory_variables({}).get("history", "")
-        prompt = f"{context}\n{message}".strip()
-        chunks: list[str] = []
-        async for chunk in llm.generate_stream(prompt):
-            chunks.append(chunk)
-        response = "".join(chunks)
-
-        voice_path: str | None = None
-        audio = await asyncio.to_thread(
-            generate_voice, response, self.voice_sample
+        # Recall embeds the message, so keep it off the event loop
+        history = await asyncio.to_thread(
+            memory.load_memory_variables, {"input": message}
         )
-        if audio:
-            voices = Path("assets/voices")
-            voices.mkdir(parents=True, exist_ok=True)
-            fname = f"{getattr(self, 'id', type(self).__name__)}.wav"
-            (voices / fname).write_bytes(audio)
-            voice_path = f"/assets/voices/{fname}"
+        context = history.get("history", "")
+        prompt = f"{context}\n{message}".strip()
+        from llms.scheduler import Priority
+        from llms.scheduler import SchedulerBusy
+        from llms.scheduler import get_scheduler
 
-        self.lrm_memory.save_context({"input": message}, {"output": response})
-        return {"text": response, "voice": voice_path}
+        try:
+            response = await get_scheduler().complete(
+                llm, prompt, priority=Priority.PARTY
+            )
+        except SchedulerBusy:
+            response = ""
+
+        voice = await voice_path(response, self.voice_sample)
+
+        await asyncio.to_thread(
+            memory.save_context, {"input": message}, {"output": response}
+        )
+        return {"text": response, "voice": voice}
 
     async def receive_lrm_message(self, message: str) -> None:
-        self.lrm_memory.save_context({"input": ""}, {"output": message})
+        memory = await self._memory()
+        await asyncio.to_thread(memory.save_context, {"input": ""}, {"output": message})
@@ -1,12 +1,19 @@
 from __future__ import annotations
 
 from collections.abc import Iterable
+from collections.abc import Iterator
+from collections.abc import Mapping
+import importlib
 import importlib.util
 import logging
 from pathlib import Path
 import sys
+import threading
 from types import ModuleType
 from typing import TYPE_CHECKING
+from typing import Any
+
+from plugins import manifest
 
 if TYPE_CHECKING:
     from plugins.event_bus import EventBus
@@ -14,17 +21,105 @@ if TYPE_CHECKING:
 log = logging.getLogger(__name__)
 
 
+class PluginRegistry(Mapping[str, type]):
+    """Plugins of one category, keyed by id.
+
+    Ids and :meth:`metadata` come from the manifest without importing
+    anything; looking up a class imports its module on first access.
+    """
+
+    def __init__(self, loader: PluginLoader, category: str) -> None:
+        self._loader = loader
+        self.category = category
+        self._entries: dict[str, dict[str, Any]] = {}
+        self._classes: dict[str, type] = {}
+
+    def _add_entry(self, entry: dict[str, Any]) -> None:
+        self._entries[entry["id"]] = entry
+        self._classes.pop(entry["id"], None)
+
+    def _add_class(self, plugin_id: str, cls: type, entry: dict[str, Any]) -> None:
+        self._entries[plugin_id] = entry
+        self._classes[plugin_id] = cls
+
+    def __getitem__(self, plugin_id: str) -> type:
+        cls = self._classes.get(plugin_id)
+        if cls is not None:
+            return cls
+        entry = self._entries[plugin_id]
+        self._loader._load_entry(entry)
+        try:
+            return self._classes[plugin_id]
+        except KeyError:
+            raise KeyError(plugin_id) from None
+
+    def __contains__(self, plugin_id: object) -> bool:
+        return plugin_id in self._entries
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def metadata(self, plugin_id: str) -> dict[str, Any]:
+        """Return the manifest metadata for ``plugin_id`` without importing it."""
+        return self._entries[plugin_id]
+
+    def select(self, **criteria: Any) -> list[str]:
+        """Return ids whose metadata matches every ``key=value`` given."""
+        return [
+            pid
+            for pid, entry in self._entries.items()
+            if all(entry.get(key) == value for key, value in criteria.items())
+        ]
+
+    def is_loaded(self, plugin_id: str) -> bool:
+        return plugin_id in self._classes
+
+
 class PluginLoader:
     # never touch or load legacy code
-    def __init__(self, bus: EventBus | None = None, required: Iterable[str] | None = None) -> None:
+    def __init__(
+        self,
+        bus: EventBus | None = None,
+        required: Iterable[str] | None = None,
+        *,
+        use_manifest: bool = True,
+    ) -> None:
         self.bus = bus
         self.required = set(required or [])
-        self._registry: dict[str, dict[str, type]] = {}
+        self.use_manifest = use_manifest
+        self._registry: dict[str, PluginRegistry] = {}
+        self._roots: dict[str, Path] = {}
+        self._loaded: set[str] = set()
+        self._lock = threading.RLock()
+        self.entry_count = 0
 
     def discover(self, root: str) -> None:
         base = Path(root)
-        if not base.exists():
-            return
+        entries = manifest.cached_entries(base) if self.use_manifest else None
+        if entries is not None:
+            for entry in entries:
+                self._roots[entry["module"]] = base
+                self._category(entry["category"])._add_entry(entry)
+            self.entry_count += len(entries)
+        else:
+            if not base.exists():
+                return
+            self._scan(base)
+
+        missing = [c for c in self.required if c not in self._registry]
+        if missing:
+            raise RuntimeError(f"Missing plugin categories: {', '.join(missing)}")
+
+        for category, plugins in self._registry.items():
+            log.info("Loaded %d %s plugin(s)", len(plugins), category)
+
+    def _scan(self, base: Path) -> None:
+        """Import every module under ``base`` and refresh its manifest entry."""
+        files = manifest.hash_tree(base)
+        entries: list[dict[str, Any]] = []
         failures: list[tuple[Path, Exception]] = []
         for path in base.rglob("*.py"):
             if path.name == "__init__.py" or path.name.startswith("_"):
@@ -35,7 +130,8 @@ class PluginLoader:
                 log.exception("Failed to import plugin %s", path)
                 failures.append((path, exc))
                 continue
-            self._register_module(module)
+            self._loaded.add(module.__name__)
+            entries.extend(self._register_module(module, path.relative_to(base).as_posix()))
 
         if failures:
             details = ", ".join(
@@ -43,20 +139,37 @@ class PluginLoader:
             )
             raise ImportError(f"Failed to import plugin(s): {details}")
 
-        missing = [c for c in self.required if c not in self._registry]
-        if missing:
-            raise RuntimeError(f"Missing plugin categories: {', '.join(missing)}")
-
-        for category, plugins in self._registry.items():
-            log.info("Loaded %d %s plugin(s)", len(plugins), category)
+        self.entry_count += len(entries)
+        manifest.store_entries(base, files, entries)
 
-    def get_plugins(self, category: str) -> dict[str, type]:
+    def get_plugins(self, category: str) -> PluginRegistry:
         if category not in self._registry:
             raise RuntimeError(
                 f"No plugins registered for category '{category}'. Did you run discover?"
             )
         return self._registry[category]
 
+    def _category(self, category: str) -> PluginRegistry:
+        registry = self._registry.get(category)
+        if registry is None:
+            registry = self._registry[category] = PluginRegistry(self, category)
+        return registry
+
+    def _load_entry(self, entry: dict[str, Any]) -> None:
+        module_name = entry["module"]
+        with self._lock:
+            if module_name in self._loaded:
+                return
+            base = self._roots.get(module_name)
+            path = base / entry["path"] if base is not None else None
+            if path is not None and path.exists():
+                module = self._import_module(path)
+            else:
+                # Frozen builds ship modules without their source tree
+                module = importlib.import_module(module_name)
+            self._loaded.add(module_name)
+            self._register_module(module, entry["path"])
+
     def _import_module(self, path: Path) -> ModuleType:
         parts = path.with_suffix("").parts
         try:
@@ -85,7 +198,8 @@ class PluginLoader:
         spec.loader.exec_module(module)
         return module
 
-    def _register_module(self, module: ModuleType) -> None:
+    def _register_module(self, module: ModuleType, path: str) -> list[dict[str, Any]]:
+        entries = []
         for obj in module.__dict__.values():
             if not isinstance(obj, type):
                 continue
@@ -93,8 +207,9 @@ class PluginLoader:
                 continue
             if getattr(obj, "__module__", "") != module.__name__:
                 continue
-            category = obj.plugin_type
-            plugin_id = getattr(obj, "id", obj.__name__)
-            self._registry.setdefault(category, {})[plugin_id] = obj
+            entry = manifest.plugin_entry(obj, path)
+            self._category(entry["category"])._add_class(entry["id"], obj, entry)
+            entries.append(entry)
             if self.bus is not None:
                 obj.bus = self.bus
+        return entries
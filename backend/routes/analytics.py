@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+
+from battle_analytics import get_analytics_index
+from quart import Blueprint
+from quart import jsonify
+from quart import request
+
+bp = Blueprint("analytics", __name__, url_prefix="/analytics")
+
+
+@bp.get("/overview")
+async def overview() -> tuple[str, int, dict[str, Any]]:
+    return jsonify(await asyncio.to_thread(get_analytics_index().overview))
+
+
+@bp.get("/relics")
+async def win_rate_by_relic() -> tuple[str, int, dict[str, Any]]:
+    min_battles = request.args.get("min_battles", default=1, type=int)
+    rows = await asyncio.to_thread(get_analytics_index().win_rate_by_relic, min_battles)
+    return jsonify({"relics": rows})
+
+
+@bp.get("/floors")
+async def turns_by_floor() -> tuple[str, int, dict[str, Any]]:
+    rows = await asyncio.to_thread(get_analytics_index().turns_by_floor)
+    return jsonify({"floors": rows})
+
+
+@bp.get("/damage")
+async def top_damage_sources() -> tuple[str, int, dict[str, Any]]:
+    by = request.args.get("by", default="source")
+    limit = max(1, min(request.args.get("limit", default=10, type=int), 100))
+    try:
+        rows = await asyncio.to_thread(get_analytics_index().top_damage_sources, by, limit)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    return jsonify({"by": by, "sources": rows})
+
+
+@bp.post("/backfill")
+async def backfill() -> tuple[str, int, dict[str, Any]]:
+    counts = await asyncio.to_thread(get_analytics_index().backfill)
+    return jsonify(counts)
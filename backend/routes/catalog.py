@@ -10,42 +10,42 @@ from autofighter.relics import _registry as relic_registry
 bp = Blueprint("catalog", __name__, url_prefix="/catalog")
 
 
-@bp.get("/cards")
-async def list_cards():
-    reg = card_registry()
-    cards = []
-    for cls in reg.values():
+def _listing(reg) -> list[dict]:
+    """Describe plugins from manifest metadata, importing only when needed."""
+    items = []
+    for pid in reg:
+        meta = reg.metadata(pid)
+        if {"name", "stars"} <= meta.keys():
+            items.append({
+                "id": pid,
+                "name": meta["name"],
+                "stars": meta["stars"],
+                # Base about text; inventory display does not vary by stacks
+                "about": meta.get("about", ""),
+            })
+            continue
         try:
-            c = cls()
-            cards.append({
-                "id": c.id,
-                "name": c.name,
-                "stars": c.stars,
-                "about": getattr(c, "about", ""),
+            obj = reg[pid]()
+            items.append({
+                "id": obj.id,
+                "name": obj.name,
+                "stars": obj.stars,
+                "about": getattr(obj, "about", ""),
             })
         except Exception:
             # Skip malformed plugins rather than erroring the whole list
             continue
-    return jsonify({"cards": cards})
+    return items
+
+
+@bp.get("/cards")
+async def list_cards():
+    return jsonify({"cards": _listing(card_registry())})
 
 
 @bp.get("/relics")
 async def list_relics():
-    reg = relic_registry()
-    relics = []
-    for cls in reg.values():
-        try:
-            r = cls()
-            relics.append({
-                "id": r.id,
-                "name": r.name,
-                "stars": r.stars,
-                # Base about text; inventory display does not vary by stacks
-                "about": getattr(r, "about", ""),
-            })
-        except Exception:
-            continue
-    return jsonify({"relics": relics})
+    return jsonify({"relics": _listing(relic_registry())})
 
 
 @bp.get("/dots")
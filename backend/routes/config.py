@@ -31,17 +31,39 @@ async def set_lrm_model() -> tuple[str, int, dict[str, str]]:
 
 @bp.post("/lrm/test")
 async def test_lrm_model() -> tuple[str, int, dict[str, str]]:
-    import asyncio
-
-    from llms.loader import load_llm
+    from llms.registry import get_llm
+    from llms.scheduler import Priority
+    from llms.scheduler import get_scheduler
 
     data = await request.get_json()
     prompt = data.get("prompt", "")
     model = get_option(_OPTION_KEY, ModelName.DEEPSEEK.value)
 
-    # Load LLM in thread pool to avoid blocking the event loop
-    llm = await asyncio.to_thread(load_llm, model)
-    reply = ""
-    async for chunk in llm.generate_stream(prompt):
-        reply += chunk
+    llm = await get_llm(model)
+    reply = await get_scheduler().complete(llm, prompt, priority=Priority.CHAT)
     return jsonify({"response": reply})
+
+
+@bp.post("/lrm/warmup")
+async def warmup_lrm_model() -> tuple[str, int, dict[str, object]]:
+    """Load a model into the resident registry ahead of the first chat."""
+    from llms.registry import get_registry
+
+    data = await request.get_json(silent=True) or {}
+    model = data.get("model") or get_option(_OPTION_KEY, ModelName.DEEPSEEK.value)
+    if model not in [m.value for m in ModelName]:
+        return jsonify({"error": "invalid model"}), 400
+    registry = get_registry()
+    try:
+        await registry.aget(model)
+    except (RuntimeError, ValueError) as exc:
+        return jsonify({"error": str(exc), "model": model}), 503
+    return jsonify({"model": model, **registry.stats()})
+
+
+@bp.get("/lrm/resident")
+async def resident_lrm_models() -> tuple[str, int, dict[str, object]]:
+    from llms.registry import get_registry
+    from llms.scheduler import get_scheduler
+
+    return jsonify({**get_registry().stats(), "scheduler": get_scheduler().stats()})
@@ -2,13 +2,16 @@
 Event bus performance monitoring endpoint.
 Provides real-time metrics about event bus performance and health.
 """
+import asyncio
 import time
 import tracemalloc
 
 from game import cleanup_battle_state
 from game import get_battle_state_sizes
+from log_retention import get_retention_manager
 from quart import Blueprint
 from quart import jsonify
+from tts import get_tts_service
 
 from autofighter.stats import BUS
 
@@ -47,6 +50,7 @@ async def get_event_bus_metrics():
                 slow_events.append({
                     'event': event,
                     'avg_time_ms': stats['avg_time'] * 1000,
+                    'p95_ms': stats['p95'] * 1000,
                     'max_time_ms': stats['max_time'] * 1000,
                     'count': stats['count']
                 })
@@ -74,6 +78,7 @@ async def get_event_bus_metrics():
         return jsonify({
             'health': health_status,
             'metrics': metrics,
+            'recent_slow_events': BUS.get_slow_events(),
             'summary': {
                 'total_events': total_events,
                 'total_errors': total_errors,
@@ -82,6 +87,8 @@ async def get_event_bus_metrics():
             },
             'battle_state': state_sizes,
             'memory': memory,
+            'log_retention': get_retention_manager().get_stats(),
+            'tts': get_tts_service().stats(),
         })
 
     except Exception as e:
@@ -153,3 +160,17 @@ async def trigger_cleanup():
     """Trigger manual battle state cleanup."""
     await cleanup_battle_state()
     return jsonify({'status': 'ok'})
+
+
+@perf_bp.route('/logs', methods=['GET'])
+async def get_log_retention_stats():
+    """Get battle log disk usage and retention counters."""
+    return jsonify(get_retention_manager().get_stats())
+
+
+@perf_bp.route('/logs/compact', methods=['POST'])
+async def compact_logs():
+    """Run a log retention pass now instead of waiting for the next one."""
+    manager = get_retention_manager()
+    result = await asyncio.to_thread(manager.run_once)
+    return jsonify({'status': 'ok', 'pass': result, 'stats': manager.get_stats()})
@@ -1,32 +1,47 @@
 from __future__ import annotations
 
 import asyncio
+from contextlib import aclosing
 import json
+import logging
 import traceback
 from typing import Any
 
 from battle_logging import end_run_logging
+from game import battle_snapshot_logs
 from game import battle_snapshots
 from game import battle_tasks
+from game import discard_run
 from game import get_save_manager
 from game import load_map
+from game import load_party_data
 from game import save_map
+from game import snapshot_since
 from quart import Blueprint
 from quart import jsonify
+from quart import make_response
 from quart import request
+from quart import websocket
+from services.battle_stream import STREAM_RETRY_MS
+from services.battle_stream import follow_battle
 from services.reward_service import select_card
 from services.reward_service import select_relic
+from services.room_service import chat_room_stream
 from services.room_service import room_action
 from services.run_service import advance_room
 from services.run_service import backup_save
 from services.run_service import get_battle_events
+from services.run_service import get_battle_events_page
 from services.run_service import get_battle_summary
 from services.run_service import restore_save
 from services.run_service import start_run
+from services.run_service import stream_battle_events
 from services.run_service import wipe_save
 
 bp = Blueprint("ui", __name__)
 
+log = logging.getLogger(__name__)
+
 
 def create_error_response(message: str, status_code: int = 400, include_traceback: bool = False) -> tuple[str, int, dict[str, Any]]:
     """Create a consistent error response format."""
@@ -157,13 +172,7 @@ async def get_ui_state() -> tuple[str, int, dict[str, Any]]:
                 "available_actions": ["start_run"]
             })
 
-        def get_party_data():
-            with get_save_manager().connection() as conn:
-                cur = conn.execute("SELECT party FROM runs WHERE id = ?", (run_id,))
-                row = cur.fetchone()
-                return json.loads(row[0]) if row and row[0] else {}
-
-        party_state = await asyncio.to_thread(get_party_data)
+        party_state = await asyncio.to_thread(load_party_data, run_id)
 
         # Determine current room state and what the frontend should display
         current_index = int(state.get("current", 0))
@@ -388,6 +397,135 @@ async def handle_ui_action() -> tuple[str, int, dict[str, Any]]:
         return create_error_response(f"Action failed: {str(e)}", 500, include_traceback=True)
 
 
+@bp.get("/battle/snapshot")
+async def battle_snapshot_delta():
+    """Return the active battle's snapshot changes after ``?since=<seq>``.
+
+    Without ``since`` (or with a sequence the server no longer knows) the
+    response is the full snapshot with ``full: true``; either way ``seq`` is
+    the value to send next time.
+    """
+    run_id = get_default_active_run()
+    if not run_id:
+        return create_error_response("No active run", 404)
+
+    since = request.args.get("since", type=int)
+    data = snapshot_since(run_id, since)
+    if data is None:
+        return create_error_response("No battle snapshot", 404)
+
+    return jsonify(data)
+
+
+def _stream_since() -> int | None:
+    """Resume point from ``?since=`` or an SSE ``Last-Event-ID`` header."""
+    since = request.args.get("since", type=int)
+    if since is None:
+        try:
+            since = int(request.headers.get("Last-Event-ID", ""))
+        except ValueError:
+            since = None
+    return since
+
+
+@bp.get("/battle/stream")
+async def battle_stream_sse():
+    """Push battle snapshot deltas as Server-Sent Events.
+
+    Every event carries its snapshot ``seq`` as the SSE id, so a reconnecting
+    ``EventSource`` resumes from the last delta it applied. The stream opens
+    with a ``retry`` hint so clients that reconnect after ``end`` back off
+    instead of spinning.
+    """
+    run_id = get_default_active_run()
+    if not run_id:
+        return create_error_response("No active run", 404)
+    since = _stream_since()
+
+    async def events():
+        yield f"retry: {STREAM_RETRY_MS}\n\n".encode()
+        async for payload in follow_battle(run_id, since):
+            if payload is None:
+                yield b": keepalive\n\n"
+                continue
+            body = json.dumps(payload, separators=(",", ":"), default=str)
+            yield f"id: {payload['seq']}\nevent: snapshot\ndata: {body}\n\n".encode()
+        yield b"event: end\ndata: {}\n\n"
+
+    response = await make_response(
+        events(),
+        {
+            "Content-Type": "text/event-stream",
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+        },
+    )
+    response.timeout = None
+    return response
+
+
+@bp.websocket("/battle/ws")
+async def battle_stream_ws() -> None:
+    """Push battle snapshot deltas over a WebSocket, one JSON message each."""
+    run_id = get_default_active_run()
+    if not run_id:
+        await websocket.send_json({"error": "No active run", "status": "error"})
+        return
+    since = websocket.args.get("since", type=int)
+    async for payload in follow_battle(run_id, since):
+        # Sends wait for the client, so a slow reader gets merged deltas
+        await websocket.send(
+            json.dumps(payload or {"keepalive": True}, separators=(",", ":"), default=str)
+        )
+    await websocket.send_json({"end": True})
+
+
+@bp.post("/chat/stream")
+async def chat_stream():
+    """Resolve the current chat room, streaming the reply as Server-Sent Events.
+
+    Each generated chunk is sent as a ``token`` event (``{"delta": ...}``) as
+    soon as the model produces it; the final ``done`` event carries the same
+    payload as the ``room_action`` chat response.
+    """
+    run_id = get_default_active_run()
+    if not run_id:
+        return create_error_response("No active run", 404)
+    data = await request.get_json(silent=True) or {}
+    try:
+        stream = await chat_room_stream(run_id, data)
+    except LookupError as exc:
+        return create_error_response(str(exc), 404)
+    except ValueError as exc:
+        return create_error_response(str(exc), 400)
+
+    async def events():
+        try:
+            async with aclosing(stream):
+                async for kind, value in stream:
+                    if kind == "delta":
+                        body = json.dumps({"delta": value})
+                        yield f"event: token\ndata: {body}\n\n".encode()
+                    else:
+                        body = json.dumps(value, default=str)
+                        yield f"event: done\ndata: {body}\n\n".encode()
+        except Exception as exc:
+            log.exception("Chat stream failed")
+            body = json.dumps({"error": str(exc), "status": "error"})
+            yield f"event: error\ndata: {body}\n\n".encode()
+
+    response = await make_response(
+        events(),
+        {
+            "Content-Type": "text/event-stream",
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+        },
+    )
+    response.timeout = None
+    return response
+
+
 @bp.get("/battles/<int:index>/summary")
 async def battle_summary(index: int):
     run_id = get_default_active_run()
@@ -401,17 +539,69 @@ async def battle_summary(index: int):
     return jsonify(data)
 
 
+MAX_EVENTS_PAGE = 1000
+_EVENT_QUERY_PARAMS = (
+    "cursor", "limit", "tail", "format", "event_type", "attacker_id",
+    "target_id", "turn_min", "turn_max",
+)
+
+
+def _event_filters() -> dict[str, Any]:
+    args = request.args
+    event_types = {
+        name
+        for value in args.getlist("event_type")
+        for name in value.split(",")
+        if name
+    }
+    return {
+        "event_type": event_types or None,
+        "attacker_id": args.get("attacker_id") or None,
+        "target_id": args.get("target_id") or None,
+        "turn_min": args.get("turn_min", type=int),
+        "turn_max": args.get("turn_max", type=int),
+    }
+
+
 @bp.get("/battles/<int:index>/events")
 async def battle_events(index: int):
+    """Return logged events for a battle.
+
+    Without query parameters the full event list is returned. ``cursor`` and
+    ``limit`` select a page (``{"events", "cursor", "next_cursor"}``);
+    ``tail=1`` returns the last ``limit`` matches instead, with ``cursor`` set
+    to the first one's position. ``event_type`` (repeatable or comma separated), ``attacker_id``,
+    ``target_id``, ``turn_min`` and ``turn_max`` filter it. ``format=ndjson``
+    streams every matching event as newline-delimited JSON instead.
+    """
     run_id = get_default_active_run()
     if not run_id:
         return create_error_response("No active run", 404)
 
-    data = await get_battle_events(run_id, index)
-    if data is None:
+    if not any(key in request.args for key in _EVENT_QUERY_PARAMS):
+        data = await get_battle_events(run_id, index)
+        if data is None:
+            return create_error_response("Battle events not found", 404)
+        return jsonify(data)
+
+    filters = _event_filters()
+    if request.args.get("format") == "ndjson":
+        lines = await stream_battle_events(run_id, index, **filters)
+        if lines is None:
+            return create_error_response("Battle events not found", 404)
+        response = await make_response(lines, {"Content-Type": "application/x-ndjson"})
+        response.timeout = None
+        return response
+
+    cursor = max(request.args.get("cursor", 0, type=int), 0)
+    limit = min(max(request.args.get("limit", 100, type=int), 1), MAX_EVENTS_PAGE)
+    tail = request.args.get("tail", "").lower() in {"1", "true", "yes"}
+    page = await get_battle_events_page(
+        run_id, index, cursor, limit, tail=tail, **filters
+    )
+    if page is None:
         return create_error_response("Battle events not found", 404)
-
-    return jsonify(data)
+    return jsonify(page)
 
 
 @bp.post("/run/start")
@@ -445,11 +635,12 @@ async def end_run(run_id: str) -> tuple[str, int, dict[str, Any]]:
 
             # Delete the run
             conn.execute("DELETE FROM runs WHERE id = ?", (run_id,))
-            return True
+        discard_run(run_id)
+        return True
 
     try:
         # End run logging
-        end_run_logging()
+        end_run_logging(run_id)
 
         # Cancel battle task if it exists (same pattern as advance_room)
         task = battle_tasks.pop(run_id, None)
@@ -464,6 +655,7 @@ async def end_run(run_id: str) -> tuple[str, int, dict[str, Any]]:
         # Clean up battle snapshots if they exist
         if run_id in battle_snapshots:
             del battle_snapshots[run_id]
+        battle_snapshot_logs.pop(run_id, None)
 
         return jsonify({"message": "Run ended successfully"}), 200
 
@@ -482,7 +674,8 @@ async def end_all_runs() -> tuple[str, int, dict[str, Any]]:
 
             # Delete all runs
             conn.execute("DELETE FROM runs")
-            return count
+        discard_run()
+        return count
 
     try:
         # End run logging
@@ -499,6 +692,7 @@ async def end_all_runs() -> tuple[str, int, dict[str, Any]]:
 
         # Clean up all battle snapshots
         battle_snapshots.clear()
+        battle_snapshot_logs.clear()
 
         return jsonify({
             "message": f"Ended {deleted_count} run(s) successfully",
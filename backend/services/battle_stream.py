@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator
+from typing import Any
+
+from game import battle_snapshot_waiters
+from game import battle_snapshots
+from game import battle_tasks
+from game import snapshot_since
+
+KEEPALIVE_SECONDS = 15.0
+# How long a stream opened before its battle task exists waits for one
+BATTLE_START_TIMEOUT = 30.0
+# SSE reconnect delay suggested to clients, in milliseconds
+STREAM_RETRY_MS = 5000
+
+
+def _battle_over(run_id: str) -> bool:
+    snap = battle_snapshots.get(run_id)
+    return bool(snap) and bool(snap.get("ended"))
+
+
+async def follow_battle(
+    run_id: str,
+    since: int | None = None,
+    keepalive: float = KEEPALIVE_SECONDS,
+    start_timeout: float | None = None,
+) -> AsyncIterator[dict[str, Any] | None]:
+    """Yield battle snapshot deltas for ``run_id`` as the battle progresses.
+
+    The first item is everything after ``since`` (the full snapshot when
+    ``since`` is unknown). Each later item is the delta since the previous
+    one, so a client that falls behind receives one merged delta instead of
+    a backlog. ``None`` is yielded after ``keepalive`` idle seconds. The
+    stream ends once the battle task has finished and its final state has
+    been sent. A stream opened before the battle task exists waits up to
+    ``start_timeout`` seconds (``BATTLE_START_TIMEOUT`` by default) for one
+    instead of ending at once, unless the latest snapshot is already final.
+    """
+
+    if start_timeout is None:
+        start_timeout = BATTLE_START_TIMEOUT
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + start_timeout
+    seen_task = False
+    wake = asyncio.Event()
+    waiters = battle_snapshot_waiters.setdefault(run_id, set())
+    waiters.add(wake)
+    seq = since
+    try:
+        while True:
+            # Clear before reading so a publish during the send is not lost
+            wake.clear()
+            task = battle_tasks.get(run_id)
+            payload = snapshot_since(run_id, seq)
+            if payload is not None and (payload["full"] or payload["seq"] != seq):
+                seq = payload["seq"]
+                yield payload
+            if task is not None:
+                if task.done():
+                    return
+                seen_task = True
+                timeout = keepalive
+            else:
+                remaining = deadline - loop.time()
+                if seen_task or remaining <= 0 or _battle_over(run_id):
+                    return
+                timeout = min(keepalive, remaining)
+            try:
+                await asyncio.wait_for(wake.wait(), timeout)
+            except TimeoutError:
+                if timeout == keepalive:
+                    yield None
+    finally:
+        waiters.discard(wake)
+        if not waiters:
+            battle_snapshot_waiters.pop(run_id, None)
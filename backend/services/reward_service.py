@@ -4,8 +4,10 @@ import asyncio
 from typing import Any
 
 from game import battle_snapshots
+from game import checkpoint_run
 from game import load_map
 from game import load_party
+from game import publish_snapshot
 from game import save_map
 from game import save_party
 
@@ -47,12 +49,13 @@ async def select_card(run_id: str, card_id: str) -> dict[str, Any]:
     )
     await asyncio.to_thread(save_map, run_id, state)
     await asyncio.to_thread(save_party, run_id, party)
+    await checkpoint_run(run_id)
     try:
         snap = battle_snapshots.get(run_id)
         if isinstance(snap, dict):
             snap = dict(snap)
             snap["card_choices"] = []
-            battle_snapshots[run_id] = snap
+            publish_snapshot(run_id, snap)
     except Exception:
         pass
     card_data = {"id": card.id, "name": card.name, "stars": card.stars}
@@ -96,12 +99,13 @@ async def select_relic(run_id: str, relic_id: str) -> dict[str, Any]:
     )
     await asyncio.to_thread(save_map, run_id, state)
     await asyncio.to_thread(save_party, run_id, party)
+    await checkpoint_run(run_id)
     try:
         snap = battle_snapshots.get(run_id)
         if isinstance(snap, dict):
             snap = dict(snap)
             snap["relic_choices"] = []
-            battle_snapshots[run_id] = snap
+            publish_snapshot(run_id, snap)
     except Exception:
         pass
     relic_data = {"id": relic.id, "name": relic.name, "stars": relic.stars}
@@ -140,5 +144,5 @@ async def acknowledge_loot(run_id: str) -> dict[str, Any]:
         else None
     )
     await asyncio.to_thread(save_map, run_id, state)
-    await asyncio.to_thread(save_party, run_id, await asyncio.to_thread(load_party, run_id))
+    await checkpoint_run(run_id)
     return {"next_room": next_type} if next_type is not None else {"next_room": None}
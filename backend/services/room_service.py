@@ -1,20 +1,25 @@
 from __future__ import annotations
 
 import asyncio
+from collections.abc import AsyncIterator
+from contextlib import aclosing
 import copy
 from typing import Any
 
-from battle_logging import get_current_run_logger
+from battle_logging import get_run_logger
 from battle_logging import start_run_logging
 from game import _run_battle
 from game import battle_locks
 from game import battle_snapshots
 from game import battle_tasks
+from game import checkpoint_run
 from game import get_save_manager
 from game import load_map
 from game import load_party
+from game import publish_snapshot
 from game import save_map
 from game import save_party
+from game import snapshot_since
 
 from autofighter.party import Party
 from autofighter.rooms import BattleRoom
@@ -41,6 +46,13 @@ def _collect_summons(entities: list) -> dict[str, list[dict[str, Any]]]:
     return snapshots
 
 
+def _parse_seq(value: Any) -> int | None:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
 async def battle_room(run_id: str, data: dict[str, Any]) -> dict[str, Any]:
     action = data.get("action", "")
 
@@ -50,6 +62,8 @@ async def battle_room(run_id: str, data: dict[str, Any]) -> dict[str, Any]:
     if action == "snapshot":
         snap = battle_snapshots.get(run_id)
         if snap is not None:
+            if "since" in data:
+                return snapshot_since(run_id, _parse_seq(data["since"]))
             return snap
         is_restart_scenario = True
         action = ""
@@ -60,16 +74,18 @@ async def battle_room(run_id: str, data: dict[str, Any]) -> dict[str, Any]:
             task = battle_tasks[run_id]
             if not task.done():
                 task.cancel()
-            snap = battle_snapshots.get(run_id, {})
-            snap["paused"] = True
-            battle_snapshots[run_id] = snap
+            # Nothing to mark paused until the battle has published a state
+            snap = battle_snapshots.get(run_id)
+            if snap is not None:
+                snap["paused"] = True
+                publish_snapshot(run_id, snap)
         return {"result": "paused"}
 
     if action == "resume":
         snap = battle_snapshots.get(run_id)
         if snap and snap.get("paused"):
             snap["paused"] = False
-            battle_snapshots[run_id] = snap
+            publish_snapshot(run_id, snap)
             if run_id not in battle_tasks or battle_tasks[run_id].done():
                 party = await asyncio.to_thread(load_party, run_id)
                 state, rooms = await asyncio.to_thread(load_map, run_id)
@@ -88,7 +104,7 @@ async def battle_room(run_id: str, data: dict[str, Any]) -> dict[str, Any]:
                     )
 
                     async def progress(snapshot: dict[str, Any]) -> None:
-                        battle_snapshots[run_id] = snapshot
+                        publish_snapshot(run_id, snapshot)
 
                     task = asyncio.create_task(
                         _run_battle(run_id, room, foes, combat_party, {}, state, rooms, progress)
@@ -111,8 +127,7 @@ async def battle_room(run_id: str, data: dict[str, Any]) -> dict[str, Any]:
         pass
     state, rooms = await asyncio.to_thread(load_map, run_id)
     try:
-        logger = get_current_run_logger()
-        if logger is None or getattr(logger, "run_id", None) != run_id:
+        if get_run_logger(run_id) is None:
             start_run_logging(run_id)
     except Exception:
         pass
@@ -180,7 +195,7 @@ async def battle_room(run_id: str, data: dict[str, Any]) -> dict[str, Any]:
             cards=party.cards,
             rdr=party.rdr,
         )
-        battle_snapshots[run_id] = {
+        publish_snapshot(run_id, {
             "result": "battle",
             "party": [_serialize(m) for m in combat_party.members],
             "foes": [_serialize(f) for f in foes],
@@ -193,12 +208,12 @@ async def battle_room(run_id: str, data: dict[str, Any]) -> dict[str, Any]:
             "relic_choices": [],
             "enrage": {"active": False, "stacks": 0},
             "rdr": party.rdr,
-        }
+        })
         state["battle"] = False
         await asyncio.to_thread(save_map, run_id, state)
 
         async def progress(snapshot: dict[str, Any]) -> None:
-            battle_snapshots[run_id] = snapshot
+            publish_snapshot(run_id, snapshot)
 
         task = asyncio.create_task(
             _run_battle(run_id, room, foes, party, data, state, rooms, progress)
@@ -240,6 +255,8 @@ async def shop_room(run_id: str, data: dict[str, Any]) -> dict[str, Any]:
         state["awaiting_next"] = False
     await asyncio.to_thread(save_map, run_id, state)
     await asyncio.to_thread(save_party, run_id, party)
+    # Purchases and healing are checkpoints, like battle resolution
+    await checkpoint_run(run_id)
     payload = {**result}
     if next_type is not None:
         payload["next_room"] = next_type
@@ -269,22 +286,26 @@ async def rest_room(run_id: str, data: dict[str, Any]) -> dict[str, Any]:
         state["awaiting_next"] = False
     await asyncio.to_thread(save_map, run_id, state)
     await asyncio.to_thread(save_party, run_id, party)
+    # Purchases and healing are checkpoints, like battle resolution
+    await checkpoint_run(run_id)
     payload = {**result}
     if next_type is not None:
         payload["next_room"] = next_type
     return payload
 
 
-async def chat_room(run_id: str, data: dict[str, Any]) -> dict[str, Any]:
+async def _load_chat_room(run_id: str):
     state, rooms = await asyncio.to_thread(load_map, run_id)
     if not rooms or not (0 <= int(state.get("current", 0)) < len(rooms)):
         raise LookupError("run ended or room out of range")
     node = rooms[state["current"]]
     if node.room_type != "chat":
         raise ValueError("invalid room")
-    room = ChatRoom(node)
     party = await asyncio.to_thread(load_party, run_id)
-    result = await room.resolve(party, data)
+    return state, rooms, ChatRoom(node), party
+
+
+async def _finish_chat_room(run_id: str, state, rooms, party, result) -> dict[str, Any]:
     state["awaiting_next"] = True
     next_type = (
         rooms[state["current"] + 1].room_type
@@ -293,9 +314,41 @@ async def chat_room(run_id: str, data: dict[str, Any]) -> dict[str, Any]:
     )
     await asyncio.to_thread(save_map, run_id, state)
     await asyncio.to_thread(save_party, run_id, party)
+    await checkpoint_run(run_id)
     return {**result, "next_room": next_type}
 
 
+async def chat_room(run_id: str, data: dict[str, Any]) -> dict[str, Any]:
+    state, rooms, room, party = await _load_chat_room(run_id)
+    result = await room.resolve(party, data)
+    return await _finish_chat_room(run_id, state, rooms, party, result)
+
+
+async def chat_room_stream(
+    run_id: str, data: dict[str, Any]
+) -> AsyncIterator[tuple[str, Any]]:
+    """Resolve the current chat room while streaming the reply.
+
+    Validation happens before this returns, so callers can still report a
+    missing run or wrong room type as a normal error. The returned iterator
+    yields ``("delta", text)`` for each generated chunk and finally
+    ``("done", payload)`` with the same payload ``chat_room`` returns.
+    """
+    state, rooms, room, party = await _load_chat_room(run_id)
+
+    async def events() -> AsyncIterator[tuple[str, Any]]:
+        chunks: list[str] = []
+        # Closing early (client disconnect) cancels generation right away
+        async with aclosing(room.stream_reply(party, data)) as reply:
+            async for chunk in reply:
+                chunks.append(chunk)
+                yield "delta", chunk
+        result = await room.finish(party, data, "".join(chunks))
+        yield "done", await _finish_chat_room(run_id, state, rooms, party, result)
+
+    return events()
+
+
 async def boss_room(run_id: str, data: dict[str, Any]) -> dict[str, Any]:
     action = data.get("action", "")
 
@@ -305,6 +358,8 @@ async def boss_room(run_id: str, data: dict[str, Any]) -> dict[str, Any]:
     if action == "snapshot":
         snap = battle_snapshots.get(run_id)
         if snap is not None:
+            if "since" in data:
+                return snapshot_since(run_id, _parse_seq(data["since"]))
             return snap
         is_restart_scenario = True
         action = ""
@@ -312,8 +367,7 @@ async def boss_room(run_id: str, data: dict[str, Any]) -> dict[str, Any]:
 
     state, rooms = await asyncio.to_thread(load_map, run_id)
     try:
-        logger = get_current_run_logger()
-        if logger is None or getattr(logger, "run_id", None) != run_id:
+        if get_run_logger(run_id) is None:
             start_run_logging(run_id)
     except Exception:
         pass
@@ -379,7 +433,7 @@ async def boss_room(run_id: str, data: dict[str, Any]) -> dict[str, Any]:
             cards=party.cards,
             rdr=party.rdr,
         )
-        battle_snapshots[run_id] = {
+        publish_snapshot(run_id, {
             "result": "boss",
             "party": [_serialize(m) for m in combat_party.members],
             "foes": [_serialize(f) for f in foes],
@@ -392,12 +446,12 @@ async def boss_room(run_id: str, data: dict[str, Any]) -> dict[str, Any]:
             "relic_choices": [],
             "enrage": {"active": False, "stacks": 0},
             "rdr": party.rdr,
-        }
+        })
         state["battle"] = False
         await asyncio.to_thread(save_map, run_id, state)
 
         async def progress(snapshot: dict[str, Any]) -> None:
-            battle_snapshots[run_id] = snapshot
+            publish_snapshot(run_id, snapshot)
 
         task = asyncio.create_task(
             _run_battle(run_id, room, foes, party, data, state, rooms, progress)
@@ -1,22 +1,36 @@
 from __future__ import annotations
 
 import asyncio
+from collections import deque
+from collections.abc import AsyncIterator
 import hashlib
+from itertools import islice
 import json
 from pathlib import Path
 import random
+from typing import Any
 from uuid import uuid4
 
+from battle_event_log import BattlePath
+from battle_event_log import EventIndex
+from battle_event_log import find_events_file
+from battle_event_log import query_battle_events
+from battle_event_log import read_battle_events
 from battle_logging import start_run_logging
 from game import _assign_damage_type
 from game import _describe_passives
 from game import _load_player_customization
 from game import battle_snapshots
 from game import battle_tasks
+from game import checkpoint_run
+from game import discard_run
 from game import get_fernet
 from game import get_save_manager
 from game import load_map
+from game import load_party_data
 from game import save_map
+from log_retention import DEFAULT_LOGS_PATH as LOGS_PATH
+from log_retention import battle_location
 
 from autofighter.mapgen import MapGenerator
 from plugins import players as player_plugins
@@ -145,9 +159,8 @@ async def start_run(
 
 async def get_map(run_id: str) -> dict[str, object]:
     try:
-        from battle_logging import get_current_run_logger  # local import
-        logger = get_current_run_logger()
-        if logger is None or getattr(logger, "run_id", None) != run_id:
+        from battle_logging import get_run_logger  # local import
+        if get_run_logger(run_id) is None:
             start_run_logging(run_id)
     except Exception:
         pass
@@ -155,13 +168,7 @@ async def get_map(run_id: str) -> dict[str, object]:
     if not state:
         raise ValueError("run not found")
 
-    def get_party_data():
-        with get_save_manager().connection() as conn:
-            cur = conn.execute("SELECT party FROM runs WHERE id = ?", (run_id,))
-            row = cur.fetchone()
-            return json.loads(row[0]) if row and row[0] else {}
-
-    party_state = await asyncio.to_thread(get_party_data)
+    party_state = await asyncio.to_thread(load_party_data, run_id)
 
     current_index = int(state.get("current", 0))
     current_room_data = None
@@ -253,47 +260,145 @@ async def advance_room(run_id: str) -> dict[str, object]:
         )
 
     await asyncio.to_thread(save_map, run_id, state)
+    # Room transitions are a checkpoint for everything the last room changed
+    await checkpoint_run(run_id)
     return {"next_room": next_type, "current_index": state["current"]}
 
 
-async def get_battle_summary(run_id: str, index: int) -> dict[str, object] | None:
-    summary_path = (
-        Path(__file__).resolve().parents[1]
-        / "logs"
-        / "runs"
-        / run_id
-        / "battles"
-        / str(index)
-        / "summary"
-        / "battle_summary.json"
-    )
+def _summary_dir(run_id: str, index: int) -> BattlePath | None:
+    """Locate a battle's summary directory, on disk or in the run archive."""
+    location = battle_location(LOGS_PATH, run_id, index)
+    return None if location is None else location / "summary"
+
+
+def _read_summary(run_id: str, index: int) -> dict[str, object] | None:
+    summary_dir = _summary_dir(run_id, index)
+    if summary_dir is None:
+        return None
+    summary_path = summary_dir / "battle_summary.json"
     if not summary_path.exists():
         return None
-    data = await asyncio.to_thread(summary_path.read_text)
-    return json.loads(data)
-
-
-async def get_battle_events(run_id: str, index: int) -> dict[str, object] | None:
-    events_path = (
-        Path(__file__).resolve().parents[1]
-        / "logs"
-        / "runs"
-        / run_id
-        / "battles"
-        / str(index)
-        / "summary"
-        / "events.json"
+    return json.loads(summary_path.read_text())
+
+
+async def get_battle_summary(run_id: str, index: int) -> dict[str, object] | None:
+    return await asyncio.to_thread(_read_summary, run_id, index)
+
+
+def _read_events(run_id: str, index: int) -> list[dict[str, object]] | None:
+    summary_dir = _summary_dir(run_id, index)
+    return None if summary_dir is None else read_battle_events(summary_dir)
+
+
+async def get_battle_events(run_id: str, index: int) -> list[dict[str, object]] | None:
+    return await asyncio.to_thread(_read_events, run_id, index)
+
+
+def _events_dir(run_id: str, index: int) -> BattlePath | None:
+    summary_dir = _summary_dir(run_id, index)
+    if summary_dir is None or find_events_file(summary_dir) is None:
+        return None
+    return summary_dir
+
+
+def _event_page(
+    run_id: str,
+    index: int,
+    cursor: int,
+    limit: int,
+    filters: dict[str, Any],
+    tail: bool = False,
+) -> dict[str, object] | None:
+    summary_dir = _events_dir(run_id, index)
+    if summary_dir is None:
+        return None
+    if tail:
+        # The last ``limit`` matches; without filters the index locates them
+        # directly, otherwise a bounded window slides over the matches
+        event_index = EventIndex.load(summary_dir)
+        if event_index is not None and not any(v is not None for v in filters.values()):
+            matches = query_battle_events(
+                summary_dir, max(len(event_index) - limit, 0), limit
+            )
+        else:
+            matches = deque(
+                query_battle_events(summary_dir, 0, None, **filters), maxlen=limit
+            )
+        page = list(matches)
+        first = page[0][0] if page else 0
+        return {
+            "events": [event for _, event in page],
+            "cursor": first,
+            "next_cursor": None,
+        }
+    events = []
+    last = None
+    for position, event in query_battle_events(summary_dir, cursor, limit, **filters):
+        events.append(event)
+        last = position
+    next_cursor = last + 1 if last is not None and len(events) >= limit else None
+    return {"events": events, "cursor": cursor, "next_cursor": next_cursor}
+
+
+async def get_battle_events_page(
+    run_id: str,
+    index: int,
+    cursor: int = 0,
+    limit: int = 100,
+    *,
+    tail: bool = False,
+    **filters: Any,
+) -> dict[str, object] | None:
+    """Return one page of filtered events and the cursor of the next page.
+
+    ``next_cursor`` is ``None`` once no further matches remain. With ``tail``
+    the page holds the last ``limit`` matches and ``cursor`` is the position
+    of the first one, so callers can page backwards from it.
+    """
+    return await asyncio.to_thread(
+        _event_page, run_id, index, cursor, limit, filters, tail
     )
-    if not events_path.exists():
+
+
+async def stream_battle_events(
+    run_id: str, index: int, batch_size: int = 500, **filters: Any
+) -> AsyncIterator[bytes] | None:
+    """Return an NDJSON byte stream of filtered events, or ``None`` if absent.
+
+    One reader stays open for the whole stream and is advanced in batches off
+    the event loop, so each event is decoded once and memory stays bounded
+    by ``batch_size`` regardless of the log size.
+    """
+    summary_dir = await asyncio.to_thread(_events_dir, run_id, index)
+    if summary_dir is None:
         return None
-    data = await asyncio.to_thread(events_path.read_text)
-    return json.loads(data)
+    matches = query_battle_events(summary_dir, 0, None, **filters)
+
+    def next_batch() -> list[dict[str, Any]]:
+        return [event for _, event in islice(matches, batch_size)]
+
+    async def lines() -> AsyncIterator[bytes]:
+        try:
+            while True:
+                batch = await asyncio.to_thread(next_batch)
+                for event in batch:
+                    yield json.dumps(event, separators=(",", ":"), default=str).encode() + b"\n"
+                if len(batch) < batch_size:
+                    return
+        finally:
+            await asyncio.to_thread(matches.close)
+
+    return lines()
 
 
 async def wipe_save() -> None:
     def do_wipe():
+        discard_run()
         manager = get_save_manager()
+        manager.close()
         manager.db_path.unlink(missing_ok=True)
+        for suffix in ("-wal", "-shm"):
+            Path(f"{manager.db_path}{suffix}").unlink(missing_ok=True)
         manager.migrate(Path(__file__).resolve().parent.parent / "migrations")
         persona = random.choice(["lady_darkness", "lady_light"])
         with manager.connection() as conn:
@@ -322,6 +427,7 @@ async def backup_save() -> bytes:
             dmg = conn.execute("SELECT id, type FROM damage_types").fetchall()
         return {"runs": runs, "options": options, "damage_types": dmg}
 
+    await checkpoint_run()
     payload = await asyncio.to_thread(get_backup_data)
     data = json.dumps(payload)
     digest = hashlib.sha256(data.encode()).hexdigest()
@@ -343,6 +449,7 @@ async def restore_save(blob: bytes) -> None:
     payload = json.loads(data)
 
     def restore_data():
+        discard_run()
         with get_save_manager().connection() as conn:
             conn.execute("DELETE FROM runs")
             conn.execute(
@@ -0,0 +1,31 @@
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+BACKEND = Path(__file__).resolve().parents[1]
+
+
+@pytest.fixture()
+def app_module(tmp_path, monkeypatch):
+    """Load ``app.py`` against a fresh encrypted save in ``tmp_path``."""
+    monkeypatch.setenv("AF_DB_PATH", str(tmp_path / "save.db"))
+    monkeypatch.setenv("AF_DB_KEY", "testkey")
+    monkeypatch.syspath_prepend(BACKEND)
+    import game
+
+    # Drop handles cached by earlier tests so the new database path is used
+    monkeypatch.setattr(game, "SAVE_MANAGER", None)
+    monkeypatch.setattr(game, "FERNET", None)
+    spec = importlib.util.spec_from_file_location("app", BACKEND / "app.py")
+    module = importlib.util.module_from_spec(spec)
+    assert spec.loader is not None
+    spec.loader.exec_module(module)
+    module.app.testing = True
+    return module
+
+
+@pytest.fixture()
+def app_with_db(app_module, tmp_path):
+    """Return ``(app, db_path)`` for tests that only need the Quart app."""
+    return app_module.app, tmp_path / "save.db"
@@ -0,0 +1,144 @@
+import random
+
+import pytest
+
+from autofighter.action_queue import GAUGE_START
+from autofighter.action_queue import ActionQueue
+from autofighter.battle_context import BattleContext
+from autofighter.battle_context import battle_context
+from autofighter.battle_context import current_battle_context
+from autofighter.clock import SimulatedClock
+from autofighter.effects import create_stat_buff
+from autofighter.mapgen import MapNode
+from autofighter.party import Party
+from autofighter.rooms.battle import BattleRoom
+from autofighter.rooms.battle import _grant_extra_turn
+from autofighter.stats import Stats
+
+
+def _unit(uid: str, spd: int) -> Stats:
+    unit = Stats()
+    unit.id = uid
+    unit.spd = spd
+    return unit
+
+
+def _reference_order(speeds: list[int], turns: int) -> list[int]:
+    """Turn order from the original subtract-from-everyone algorithm."""
+    values = [GAUGE_START / s for s in speeds]
+    order = []
+    for _ in range(turns):
+        actor = min(range(len(values)), key=lambda i: values[i])
+        spent = values[actor]
+        values = [v - spent for v in values]
+        values[actor] = GAUGE_START / speeds[actor]
+        order.append(actor)
+    return order
+
+
+def test_timeline_matches_reference_order():
+    rng = random.Random(3)
+    speeds = [rng.randint(50, 400) for _ in range(12)]
+    units = [_unit(str(i), s) for i, s in enumerate(speeds)]
+    q = ActionQueue(units)
+    order = [int(q.next_actor().id) for _ in range(300)]
+    assert order == _reference_order(speeds, 300)
+
+
+def test_speed_change_rescales_remaining_wait():
+    fast, slow = _unit("fast", 200), _unit("slow", 100)
+    q = ActionQueue([fast, slow])
+    assert q.next_actor() is fast
+    assert slow.action_value == pytest.approx(50)
+
+    create_stat_buff(slow, name="haste", spd_mult=2.0, turns=2)
+    assert slow.base_action_value == pytest.approx(50)
+    assert slow.action_value == pytest.approx(25)
+    assert q.next_actor() is slow
+
+    slow.action_value = 0
+    assert q.action_value_of(slow) == 0
+    q.remove(slow)
+    assert slow not in q and slow.action_value == 0
+    slow.action_value = 7
+    assert slow.action_value == 7
+
+
+def test_bonus_turns_stack_and_skip_the_clock():
+    a, b = _unit("a", 100), _unit("b", 150)
+    q = ActionQueue([a, b])
+    q.grant_extra_turn(a)
+    q.grant_extra_turn(a)
+    assert [e["id"] for e in q.snapshot()][:2] == ["a", "a"]
+    assert q.next_turn() == (a, True)
+    assert q.next_turn() == (a, True)
+    assert b.action_value == pytest.approx(GAUGE_START / 150)
+    assert q.next_turn() == (b, False)
+
+
+def test_deferred_bonus_turns_follow_the_next_normal_turn():
+    a, b = _unit("a", 100), _unit("b", 150)
+    q = ActionQueue([a, b])
+    q.grant_extra_turn(a)
+    q.grant_extra_turn(b)
+    actor, bonus = q.next_turn()
+    assert (actor, bonus) == (a, True)
+    assert q.defer_bonus_turns(actor) == 2
+    assert q.bonus_actors == []
+    assert q.next_turn() == (b, False)
+    assert q.next_turn() == (a, True)
+    assert q.next_turn() == (b, True)
+    assert q.next_turn() == (a, False)
+
+
+def test_extra_turn_event_targets_active_queue():
+    with battle_context(run_id="timeline"):
+        ctx = current_battle_context()
+        a, outsider = _unit("a", 100), _unit("x", 100)
+        ctx.action_queue = ActionQueue([a])
+        _grant_extra_turn(a)
+        _grant_extra_turn(outsider)
+        assert ctx.action_queue.bonus_actors == [a]
+        assert ctx.extra_turns == {id(outsider): 1}
+
+
+def test_stale_entries_are_compacted():
+    units = [_unit(str(i), 100 + i) for i in range(4)]
+    q = ActionQueue(units)
+    for step in range(200):
+        q.set_action_value(units[step % 4], step % 7)
+        assert len(q._heap) <= 2 * len(q.combatants) + 1
+    for _ in range(50):
+        q.next_actor()
+    assert q._stale <= len(q.combatants)
+    q.remove(units[0])
+    q.remove(units[1])
+    assert len(q._heap) <= 2 * len(q.combatants) + 1
+    assert {q.next_actor().id for _ in range(10)} == {"2", "3"}
+
+
+@pytest.mark.asyncio
+async def test_fallen_party_members_leave_the_timeline(monkeypatch):
+    turns: list[str] = []
+    next_turn = ActionQueue.next_turn
+
+    def recording(self):
+        actor, bonus = next_turn(self)
+        turns.append(actor.id)
+        return actor, bonus
+
+    monkeypatch.setattr(ActionQueue, "next_turn", recording)
+    fallen = _unit("fallen", 100)
+    fallen.hp = 0
+    hero = _unit("hero", 100)
+    hero.set_base_stat("atk", 50)
+    foe = _unit("foe", 100)
+    foe.set_base_stat("max_hp", 2000)
+    foe.hp = 2000
+    room = BattleRoom(MapNode(0, "battle-normal", 1, 1, 1, 0))
+
+    with BattleContext(clock=SimulatedClock()).activate():
+        await room.resolve(Party(members=[fallen, hero]), {}, foe=foe)
+
+    assert turns.count("hero") > 2
+    assert turns.count("fallen") <= 1
@@ -187,3 +187,39 @@ def test_base_stat_modification():
     assert stats.get_base_stat("atk") == original_base_atk + 10
     assert stats.atk == original_runtime_atk + 10
 
+
+
+def test_effect_totals_track_every_mutation():
+    """Cached modifier totals stay equal to a fresh walk of the effect list."""
+    import copy
+
+    from autofighter.effects import create_stat_buff
+
+    def walk(stats, name):
+        total = 0.0
+        for effect in stats._active_effects:
+            if name in effect.stat_modifiers:
+                total += effect.stat_modifiers[name]
+        return total
+
+    stats = Stats()
+    for i in range(200):
+        stats.add_effect(
+            StatEffect(f"buff_{i}", {"atk": 0.1 * i, "defense": 1}, duration=i % 3, source=f"s{i % 4}")
+        )
+    mod = create_stat_buff(stats, name="mod", turns=2, atk_mult=1.5)
+    stats.remove_effect_by_name("buff_7")
+    stats.remove_effect_by_source("s1")
+    stats.tick_effects()
+    mod.remove()
+    # Plugins occasionally replace the list wholesale.
+    stats._active_effects = [e for e in stats._active_effects if e.name != "buff_10"]
+
+    for name in ("atk", "defense", "crit_rate"):
+        assert stats._calculate_stat_modifier(name) == walk(stats, name)
+    clone = copy.deepcopy(stats)
+    assert clone.atk == stats.atk
+
+    stats.clear_all_effects()
+    assert stats.atk == 200
+    assert stats.defense == 200
@@ -0,0 +1,108 @@
+import json
+from pathlib import Path
+
+from battle_analytics import AnalyticsIndex
+from battle_analytics import main
+from battle_logging import BattleLogger
+import log_retention
+from log_retention import LogRetentionManager
+from log_retention import RetentionPolicy
+
+from autofighter.stats import BUS
+from autofighter.stats import Stats
+
+
+def _write_summary(logs: Path, run_id: str, index: int, **fields) -> Path:
+    summary_dir = logs / "runs" / run_id / "battles" / str(index) / "summary"
+    summary_dir.mkdir(parents=True)
+    summary = {
+        "battle_id": f"{run_id}_battle_{index}",
+        "result": "victory",
+        "duration_seconds": 10.0,
+        "event_count": 5,
+        "party_relics": {},
+        "damage_by_type": {},
+        "damage_by_source": {},
+        **fields,
+    }
+    path = summary_dir / "battle_summary.json"
+    path.write_text(json.dumps(summary))
+    return path
+
+
+def test_backfill_answers_aggregate_queries(tmp_path):
+    logs = tmp_path / "logs"
+    _write_summary(
+        logs, "run_a", 1, floor=1, turns=10,
+        party_relics={"null_lantern": 1, "pocket_manual": 2},
+        damage_by_type={"player": {"Fire": 300}},
+        damage_by_source={"attack": {"player": 200}, "dot": {"player": 100}},
+    )
+    _write_summary(
+        logs, "run_a", 2, floor=1, turns=20, result="defeat",
+        party_relics={"null_lantern": 1},
+        damage_by_type={"player": {"Fire": 50}, "ally": {"Ice": 80}},
+        damage_by_source={"attack": {"player": 50, "ally": 80}},
+    )
+    _write_summary(logs, "run_b", 1, floor=2, turns=30)
+
+    index = AnalyticsIndex(tmp_path / "analytics.db")
+    assert index.backfill(logs) == {"ingested": 3, "skipped": 0, "failed": 0}
+    assert index.backfill(logs) == {"ingested": 0, "skipped": 3, "failed": 0}
+
+    relics = {row["relic_id"]: row for row in index.win_rate_by_relic()}
+    assert relics["null_lantern"]["battles"] == 2
+    assert relics["null_lantern"]["win_rate"] == 0.5
+    assert relics["pocket_manual"]["win_rate"] == 1.0
+    assert [r["relic_id"] for r in index.win_rate_by_relic(min_battles=2)] == ["null_lantern"]
+
+    floors = index.turns_by_floor()
+    assert [(f["floor"], f["battles"], f["avg_turns"]) for f in floors] == [(1, 2, 15.0), (2, 1, 30.0)]
+
+    sources = index.top_damage_sources("source")
+    assert sources[0] == {"name": "attack", "total": 330, "battles": 2}
+    assert index.top_damage_sources("damage_type", limit=1)[0]["name"] == "Fire"
+    assert index.overview()["runs"] == 2
+
+
+def test_finalize_battle_indexes_summary(tmp_path, monkeypatch, capsys):
+    monkeypatch.delenv("AF_ANALYTICS_DB", raising=False)
+    logger = BattleLogger("run_idx", 1, tmp_path)
+    logger.summary.party_relics = {"null_lantern": 1}
+    logger.summary.floor = 3
+    logger.summary.turns = 7
+    attacker = Stats()
+    attacker.id = "player"
+    target = Stats()
+    target.id = "slime"
+    BUS.emit("damage_dealt", attacker, target, 40)
+    logger.finalize_battle("victory")
+
+    index = AnalyticsIndex.for_logs(tmp_path)
+    [floor] = index.turns_by_floor()
+    assert (floor["floor"], floor["battles"], floor["avg_turns"], floor["win_rate"]) == (3, 1, 7.0, 1.0)
+    assert index.win_rate_by_relic()[0]["relic_id"] == "null_lantern"
+
+    # The backfill command sees the same summary as already indexed
+    assert main(["backfill", "--logs", str(tmp_path)]) == 0
+    assert json.loads(capsys.readouterr().out)["skipped"] == 1
+
+
+def test_backfill_reads_archived_battles(tmp_path, monkeypatch):
+    logs = tmp_path / "logs"
+    _write_summary(logs, "run_z", 1, floor=1, turns=4)
+    monkeypatch.setattr(log_retention, "_active_battles", dict)
+    policy = RetentionPolicy(archive_after=0, max_age_days=0, max_bytes=0)
+    assert LogRetentionManager(logs, policy).run_once()["battles_archived"] == 1
+    _write_summary(logs, "run_z", 2, floor=2, turns=6)
+
+    index = AnalyticsIndex(tmp_path / "analytics.db")
+    assert index.backfill(logs) == {"ingested": 2, "skipped": 0, "failed": 0}
+    assert [f["floor"] for f in index.turns_by_floor()] == [1, 2]
+    assert index.backfill(logs) == {"ingested": 0, "skipped": 2, "failed": 0}
+
+
+def test_for_logs_shares_one_index_per_database(tmp_path, monkeypatch):
+    monkeypatch.delenv("AF_ANALYTICS_DB", raising=False)
+    assert AnalyticsIndex.for_logs(tmp_path) is AnalyticsIndex.for_logs(tmp_path)
+    assert AnalyticsIndex.for_logs(tmp_path) is not AnalyticsIndex.for_logs(tmp_path / "other")
@@ -0,0 +1,58 @@
+import asyncio
+import time
+
+import pytest
+
+from autofighter.battle_context import BattleContext
+from autofighter.battle_context import battle_sleep
+from autofighter.clock import SimulatedClock
+from autofighter.mapgen import MapNode
+from autofighter.party import Party
+from autofighter.rooms.battle import TURN_PACING
+from autofighter.rooms.battle import BattleRoom
+from autofighter.stats import Stats
+
+
+def _fighter(ident: str) -> Stats:
+    fighter = Stats(hp=100)
+    fighter.set_base_stat('max_hp', 100)
+    fighter.set_base_stat('atk', 50)
+    fighter.set_base_stat('defense', 0)
+    fighter.id = ident
+    return fighter
+
+
+@pytest.mark.asyncio
+async def test_simulated_clock_skips_waits():
+    clock = SimulatedClock()
+    with BattleContext(clock=clock).activate():
+        start = time.perf_counter()
+        await battle_sleep(30)
+        elapsed = time.perf_counter() - start
+    assert clock.now() == pytest.approx(30)
+    assert elapsed < 1
+
+
+@pytest.mark.asyncio
+async def test_sim_mode_battle_resolves_without_pacing(monkeypatch):
+    real_sleep = asyncio.sleep
+    waits: list[float] = []
+
+    async def recording_sleep(delay, *args, **kwargs):
+        waits.append(delay)
+        await real_sleep(0)
+
+    monkeypatch.setattr(asyncio, "sleep", recording_sleep)
+    node = MapNode(room_id=0, room_type="battle-normal", floor=1, index=1, loop=1, pressure=0)
+    room = BattleRoom(node)
+    party = Party(members=[_fighter("p1")])
+    clock = SimulatedClock()
+
+    with BattleContext(clock=clock).activate():
+        result = await room.resolve(party, {}, foe=_fighter("f1"))
+
+    assert result["result"] == "battle"
+    # Pacing is booked on the virtual clock; nothing actually waits.
+    assert clock.now() >= TURN_PACING * 2
+    assert waits
+    assert not any(waits)
@@ -0,0 +1,146 @@
+import asyncio
+
+import battle_logging
+from battle_logging import RunLogger
+from battle_logging import end_run_logging
+from battle_logging import get_run_logger
+from battle_logging import start_battle_logging
+import pytest
+
+from autofighter.battle_context import battle_context
+from autofighter.battle_context import current_battle_context
+from autofighter.mapgen import MapNode
+from autofighter.party import Party
+from autofighter.rooms.battle import BattleRoom
+from autofighter.stats import BUS
+from autofighter.stats import Stats
+from autofighter.stats import get_enrage_percent
+from autofighter.stats import set_enrage_percent
+from autofighter.summons.manager import SummonManager
+from plugins.damage_types.wind import Wind
+from plugins.foes._base import FoeBase
+from plugins.players import player as player_mod
+
+
+@pytest.mark.asyncio
+async def test_contexts_isolate_combat_state():
+    seen: list[str] = []
+
+    async def fight(name: str, enrage: float) -> tuple[float, int, list[str]]:
+        with battle_context(run_id=name):
+            set_enrage_percent(enrage)
+            summoner = Stats()
+            summoner.id = f"{name}_summoner"
+            SummonManager.create_summon(summoner, summon_type="test")
+            BUS.subscribe("ping", lambda tag: seen.append(f"{name}:{tag}"))
+            await asyncio.sleep(0)
+            BUS.emit("extra_turn", summoner)
+            await BUS.emit_async("ping", name)
+            await asyncio.sleep(0.05)
+            return (
+                get_enrage_percent(),
+                current_battle_context().extra_turns.get(id(summoner), 0),
+                list(current_battle_context().summons),
+            )
+
+    first, second = await asyncio.gather(fight("a", 0.5), fight("b", 2.0))
+
+    assert first == (0.5, 1, ["a_summoner"])
+    assert second == (2.0, 1, ["b_summoner"])
+    assert sorted(seen) == ["a:a", "b:b"]
+    assert get_enrage_percent() == 0.0
+    assert SummonManager.get_summons("a_summoner") == []
+
+    await BUS.emit_async("ping", "global")
+    assert "a:global" not in seen
+
+
+@pytest.mark.asyncio
+async def test_battles_resolve_side_by_side(monkeypatch):
+    class DummyFoe(FoeBase):
+        id = "dummy"
+        name = "Dummy"
+
+    def make_foe(_party):
+        foe = DummyFoe()
+        foe.hp = 1
+        return foe
+
+    monkeypatch.setattr("autofighter.rooms.utils._choose_foe", make_foe)
+    monkeypatch.setattr(
+        "autofighter.rooms.utils._scale_stats", lambda *args, **kwargs: None
+    )
+
+    async def run(run_id: str) -> dict:
+        node = MapNode(
+            room_id=0, room_type="battle", floor=1, index=1, loop=1, pressure=0
+        )
+        player = player_mod.Player()
+        player.set_base_stat("atk", 1000)
+        return await BattleRoom(node).resolve(
+            Party(members=[player]), {}, run_id=run_id
+        )
+
+    results = await asyncio.gather(run("run-a"), run("run-b"))
+    assert [r["result"] for r in results] == ["battle", "battle"]
+
+
+def test_scope_unsubscribe_keeps_global_handlers():
+    seen: list[str] = []
+
+    def handler(tag):
+        seen.append(tag)
+
+    BUS.subscribe("ping_scope", handler)
+    try:
+        with battle_context(run_id="scoped"):
+            BUS.unsubscribe("ping_scope", handler)
+        BUS.emit("ping_scope", "global")
+        assert seen == ["global"]
+    finally:
+        BUS.unsubscribe("ping_scope", handler)
+
+
+def test_wind_rosters_belong_to_each_battle(monkeypatch):
+    monkeypatch.setattr(Wind, "_initialized", False)
+
+    def fighter(uid: str) -> Stats:
+        unit = Stats(damage_type=Wind())
+        unit.id = uid
+        unit.plugin_type = "foe"
+        return unit
+
+    # The first Wind is built inside a battle, like foes from ``_build_foes``
+    with battle_context(run_id="first"):
+        first = fighter("first")
+        BUS.emit("battle_start", first)
+        assert Wind._foes() == [first]
+    with battle_context(run_id="second") as ctx:
+        second = fighter("second")
+        BUS.emit("battle_start", second)
+        assert ctx.wind_foes == [second]
+        BUS.emit("battle_end", second)
+        assert ctx.wind_foes == []
+    assert Wind._foes() == []
+
+
+def test_run_loggers_are_keyed_by_run(tmp_path, monkeypatch):
+    end_run_logging()
+    monkeypatch.setattr(
+        battle_logging,
+        "RunLogger",
+        lambda run_id: RunLogger(run_id, base_logs_path=tmp_path),
+    )
+    first = battle_logging.start_run_logging("run-a")
+    second = battle_logging.start_run_logging("run-b")
+    try:
+        assert get_run_logger("run-a") is first
+        with battle_context(run_id="run-a"):
+            assert start_battle_logging() is first.current_battle_logger
+        assert second.current_battle_logger is None
+
+        end_run_logging("run-b")
+        assert get_run_logger("run-b") is None
+        assert get_run_logger("run-a") is first
+    finally:
+        end_run_logging()
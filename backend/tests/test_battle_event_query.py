@@ -0,0 +1,131 @@
+import asyncio
+import json
+from pathlib import Path
+import shutil
+import sys
+
+from battle_event_log import INDEX_FILENAME
+from battle_event_log import EventIndex
+from battle_event_log import query_battle_events
+from battle_logging import BattleLogger
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from services.run_service import start_run
+
+from autofighter.stats import BUS
+from autofighter.stats import Stats
+
+LOGS_ROOT = Path(__file__).resolve().parents[1] / "logs"
+
+
+def _log_battle(root: Path, run_id: str, compression: str | None = None) -> Path:
+    """Log 5 turns; each turn the hero hits the slime and the slime hits back."""
+    logger = BattleLogger(run_id, 1, root, compression=compression)
+    hero = Stats()
+    hero.id = "hero"
+    slime = Stats()
+    slime.id = "slime"
+    for turn in range(1, 6):
+        logger.turn = turn
+        BUS.emit("damage_dealt", hero, slime, turn * 10)
+        BUS.emit("damage_dealt", slime, hero, turn)
+        BUS.emit("heal", hero, hero, 1)
+    logger.finalize_battle("victory")
+    return root / "runs" / run_id / "battles" / "1" / "summary"
+
+
+@pytest.mark.parametrize("compression", [None, "gzip"])
+def test_query_pages_and_filters(tmp_path, compression):
+    summary_dir = _log_battle(tmp_path, f"query_{compression}", compression)
+    index = EventIndex.load(summary_dir)
+    assert len(index) == 15
+    assert [index[i][1] for i in range(0, 15, 3)] == [1, 2, 3, 4, 5]
+
+    first = list(query_battle_events(summary_dir, limit=4))
+    assert [pos for pos, _ in first] == [0, 1, 2, 3]
+    second = list(query_battle_events(summary_dir, cursor=4, limit=4))
+    assert [pos for pos, _ in second] == [4, 5, 6, 7]
+    assert second[0][1]["turn"] == 2
+
+    hits = list(
+        query_battle_events(
+            summary_dir,
+            limit=None,
+            event_type={"damage_dealt"},
+            attacker_id="hero",
+            turn_min=2,
+            turn_max=4,
+        )
+    )
+    assert [event["amount"] for _, event in hits] == [20, 30, 40]
+    assert [pos for pos, _ in hits] == [3, 6, 9]
+
+    assert list(query_battle_events(summary_dir, turn_min=9)) == []
+    assert list(query_battle_events(summary_dir, cursor=14, turn_max=2)) == []
+
+
+def test_query_scans_without_index(tmp_path):
+    summary_dir = _log_battle(tmp_path, "query_noindex")
+    (summary_dir / INDEX_FILENAME).unlink()
+    hits = list(query_battle_events(summary_dir, cursor=5, limit=2, target_id="hero"))
+    assert [pos for pos, _ in hits] == [5, 7]
+
+
+@pytest.mark.asyncio
+async def test_events_endpoint_pages_and_streams(app_module):
+    run_id = (await start_run(["player"]))["run_id"]
+    # BUS.emit defers delivery inside a running loop; log from a thread
+    await asyncio.to_thread(_log_battle, LOGS_ROOT, run_id)
+    client = app_module.app.test_client()
+    try:
+        full = await (await client.get("/battles/1/events")).get_json()
+        assert isinstance(full, list) and len(full) == 15
+
+        url = "/battles/1/events?event_type=damage_dealt&target_id=slime&limit=2"
+        page = await (await client.get(url)).get_json()
+        assert [e["amount"] for e in page["events"]] == [10, 20]
+        assert page["next_cursor"] == 4
+        page = await (await client.get(f"{url}&cursor=4&turn_max=3")).get_json()
+        assert [e["amount"] for e in page["events"]] == [30]
+        assert page["next_cursor"] is None
+
+        tail = await (await client.get("/battles/1/events?tail=1&limit=4")).get_json()
+        assert [e["turn"] for e in tail["events"]] == [4, 5, 5, 5]
+        assert tail["cursor"] == 11 and tail["next_cursor"] is None
+        url = "/battles/1/events?tail=1&limit=2&event_type=heal"
+        tail = await (await client.get(url)).get_json()
+        assert [e["turn"] for e in tail["events"]] == [4, 5]
+        assert tail["cursor"] == 11
+
+        response = await client.get("/battles/1/events?format=ndjson&event_type=heal")
+        assert response.content_type == "application/x-ndjson"
+        lines = (await response.get_data()).decode().splitlines()
+        assert [json.loads(line)["turn"] for line in lines] == [1, 2, 3, 4, 5]
+
+        missing = await client.get("/battles/2/events?limit=5")
+        assert missing.status_code == 404
+    finally:
+        shutil.rmtree(LOGS_ROOT / "runs" / run_id, ignore_errors=True)
+
+
+@pytest.mark.asyncio
+async def test_stream_keeps_one_reader_open(tmp_path, monkeypatch):
+    import battle_event_log
+    from services import run_service
+
+    summary_dir = await asyncio.to_thread(_log_battle, tmp_path, "stream_once", "gzip")
+    monkeypatch.setattr(run_service, "_summary_dir", lambda *_: summary_dir)
+    opened = []
+    real_open = battle_event_log.open_events
+
+    def counting_open(path):
+        opened.append(path)
+        return real_open(path)
+
+    monkeypatch.setattr(battle_event_log, "open_events", counting_open)
+    lines = await run_service.stream_battle_events("run", 1, batch_size=4)
+    events = [json.loads(line) async for line in lines]
+    assert len(events) == 15
+    assert len(opened) == 1
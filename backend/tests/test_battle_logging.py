@@ -4,6 +4,7 @@ import tempfile
 
 from battle_logging import BattleLogger
 from battle_logging import RunLogger
+from battle_logging import read_battle_events
 import pytest
 
 from autofighter.stats import BUS
@@ -64,7 +65,7 @@ def test_battle_logger_tracks_events(temp_logs_dir):
     # Check summary files were created
     summary_path = temp_logs_dir / "runs" / run_id / "battles" / "1" / "summary"
     assert (summary_path / "battle_summary.json").exists()
-    assert (summary_path / "events.json").exists()
+    assert (summary_path / "events.ndjson").exists()
     assert (summary_path / "human_summary.txt").exists()
 
     # Check summary content
@@ -76,8 +77,7 @@ def test_battle_logger_tracks_events(temp_logs_dir):
     assert summary["total_hits_landed"]["test_attacker"] == 1
 
     # Check events content
-    with open(summary_path / "events.json") as f:
-        events = json.load(f)
+    events = read_battle_events(summary_path)
 
     assert len(events) == 4  # 2 battle_start, 1 damage_dealt, 1 hit_landed
     event_types = [e["event_type"] for e in events]
@@ -165,3 +165,27 @@ def test_damage_dealt_defaults_to_normal_attack(temp_logs_dir):
         summary = json.load(f)
 
     assert summary["damage_by_action"]["hero"]["Normal Attack"] == 42
+
+
+def test_events_stream_to_compressed_ndjson(temp_logs_dir):
+    """Events are appended by the writer thread and only counted in memory."""
+    logger = BattleLogger("test_run_gzip", 1, temp_logs_dir, compression="gzip")
+    attacker = Stats()
+    attacker.id = "test_attacker"
+    target = Stats()
+    target.id = "test_target"
+
+    for _ in range(25):
+        BUS.emit("damage_dealt", attacker, target, 10)
+    assert logger.summary.event_count == 25
+    assert not hasattr(logger.summary, "events")
+
+    logger.finalize_battle("victory")
+
+    summary_path = temp_logs_dir / "runs" / "test_run_gzip" / "battles" / "1" / "summary"
+    assert (summary_path / "events.ndjson.gz").exists()
+    events = read_battle_events(summary_path)
+    assert [e["amount"] for e in events] == [10] * 25
+    assert events[0]["event_type"] == "damage_dealt"
+    with open(summary_path / "battle_summary.json") as f:
+        assert json.load(f)["event_count"] == 25
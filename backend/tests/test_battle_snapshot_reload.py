@@ -8,6 +8,7 @@ import pytest
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
 from game import battle_snapshots
+from game import battle_tasks
 from game import load_map
 from game import save_map
 from services.room_service import battle_room
@@ -54,3 +55,33 @@ async def test_boss_snapshot_reload_starts_battle(app_module):
     snap = await boss_room(run_id, {"action": "snapshot"})
     assert snap["result"] == "boss"
     assert run_id in battle_snapshots
+
+
+@pytest.mark.asyncio
+async def test_snapshot_since_returns_delta(app_module):
+    run_info = await start_run(["player"])
+    run_id = run_info["run_id"]
+    await battle_room(run_id, {"action": "snapshot"})
+
+    full = await battle_room(run_id, {"action": "snapshot", "since": 0})
+    assert full["full"] is True
+    assert full["result"] == "battle"
+
+    delta = await battle_room(run_id, {"action": "snapshot", "since": full["seq"]})
+    assert delta["full"] is False
+    assert delta["seq"] >= full["seq"]
+    assert set(delta["order"]) == {"party", "foes"}
+
+
+@pytest.mark.asyncio
+async def test_pause_without_snapshot_publishes_nothing(app_module):
+    run_id = "pause-before-first-snapshot"
+    task = asyncio.create_task(asyncio.sleep(60))
+    battle_tasks[run_id] = task
+    try:
+        result = await battle_room(run_id, {"action": "pause"})
+    finally:
+        battle_tasks.pop(run_id, None)
+    assert result == {"result": "paused"}
+    assert task.cancelled() or task.cancelling()
+    assert run_id not in battle_snapshots
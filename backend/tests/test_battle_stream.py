@@ -0,0 +1,137 @@
+import asyncio
+import contextlib
+import json
+from pathlib import Path
+import sys
+
+import pytest
+from quart.testing.connections import WebsocketDisconnectError
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from game import battle_snapshot_waiters
+from game import battle_snapshots
+from game import battle_tasks
+from game import publish_snapshot
+from services import battle_stream
+from services.battle_stream import follow_battle
+from services.run_service import start_run
+
+
+def _snapshot(foe_hp: int) -> dict:
+    return {
+        "result": "battle",
+        "party": [{"id": "player", "hp": 100}],
+        "foes": [{"id": "slime", "hp": foe_hp}],
+    }
+
+
+@pytest.mark.asyncio
+async def test_follow_battle_pushes_each_change_once():
+    run_id = "stream-test"
+    publish_snapshot(run_id, _snapshot(50))
+    task = asyncio.create_task(asyncio.sleep(30))
+    battle_tasks[run_id] = task
+    stream = follow_battle(run_id, keepalive=5)
+    try:
+        first = await anext(stream)
+        assert first["full"] is True
+
+        publish_snapshot(run_id, _snapshot(40))
+        delta = await anext(stream)
+        assert delta["full"] is False
+        assert delta["since"] == first["seq"]
+        assert delta["entities"]["foes"] == [{"id": "slime", "hp": 40}]
+
+        # A reader that falls behind gets one merged delta
+        publish_snapshot(run_id, _snapshot(30))
+        publish_snapshot(run_id, {**_snapshot(20), "ended": True})
+        merged = await anext(stream)
+        assert merged["since"] == delta["seq"]
+        assert merged["entities"]["foes"] == [{"id": "slime", "hp": 20}]
+        assert merged["changes"] == {"ended": True}
+
+        task.cancel()
+        battle_tasks.pop(run_id)
+        publish_snapshot(run_id, {**_snapshot(0), "ended": True})
+        final = await anext(stream)
+        assert final["entities"]["foes"] == [{"id": "slime", "hp": 0}]
+        with pytest.raises(StopAsyncIteration):
+            await anext(stream)
+    finally:
+        await stream.aclose()
+        battle_snapshots.pop(run_id, None)
+    assert run_id not in battle_snapshot_waiters
+
+
+@pytest.mark.asyncio
+async def test_follow_battle_waits_for_the_battle_task():
+    run_id = "stream-wait-test"
+    stream = follow_battle(run_id, keepalive=5, start_timeout=5)
+    try:
+        pending = asyncio.ensure_future(anext(stream))
+        await asyncio.sleep(0.05)
+        # No battle yet: the stream stays open instead of ending
+        assert not pending.done()
+
+        task = asyncio.create_task(asyncio.sleep(30))
+        battle_tasks[run_id] = task
+        publish_snapshot(run_id, _snapshot(50))
+        first = await asyncio.wait_for(pending, 1)
+        assert first["foes"] == [{"id": "slime", "hp": 50}]
+        task.cancel()
+    finally:
+        battle_tasks.pop(run_id, None)
+        await stream.aclose()
+        battle_snapshots.pop(run_id, None)
+
+
+@pytest.mark.asyncio
+async def test_follow_battle_gives_up_without_a_task():
+    stream = follow_battle("stream-no-battle", keepalive=5, start_timeout=0.05)
+    with pytest.raises(StopAsyncIteration):
+        await asyncio.wait_for(anext(stream), 1)
+
+
+@pytest.mark.asyncio
+async def test_sse_stream_resumes_from_sequence(app_module, monkeypatch):
+    monkeypatch.setattr(battle_stream, "BATTLE_START_TIMEOUT", 0.05)
+    run_id = (await start_run(["player"]))["run_id"]
+    seq = publish_snapshot(run_id, _snapshot(50))
+    publish_snapshot(run_id, _snapshot(45))
+
+    client = app_module.app.test_client()
+    response = await client.get(f"/battle/stream?since={seq}")
+    assert response.status_code == 200
+    assert response.content_type.startswith("text/event-stream")
+    body = (await response.get_data()).decode()
+    assert body.startswith(f"retry: {battle_stream.STREAM_RETRY_MS}\n\n")
+
+    events = [chunk for chunk in body.split("\n\n") if chunk.startswith("id:")]
+    assert len(events) == 1
+    data = json.loads(events[0].split("data: ", 1)[1])
+    assert data["since"] == seq
+    assert data["entities"]["foes"] == [{"id": "slime", "hp": 45}]
+    assert "event: end" in body
+    battle_snapshots.pop(run_id, None)
+
+
+@pytest.mark.asyncio
+async def test_websocket_stream_sends_snapshot_then_end(app_module, monkeypatch):
+    monkeypatch.setattr(battle_stream, "BATTLE_START_TIMEOUT", 0.05)
+    run_id = (await start_run(["player"]))["run_id"]
+    publish_snapshot(run_id, _snapshot(50))
+
+    client = app_module.app.test_client()
+    messages = []
+    async with client.websocket("/battle/ws") as ws:
+        # The server closes right after ``end``; the test client may surface
+        # that close before handing over the last queued message.
+        with contextlib.suppress(WebsocketDisconnectError):
+            while True:
+                messages.append(json.loads(await ws.receive()))
+    first = messages[0]
+    assert first["full"] is True
+    assert first["foes"] == [{"id": "slime", "hp": 50}]
+    assert messages[1:] in ([], [{"end": True}])
+    battle_snapshots.pop(run_id, None)
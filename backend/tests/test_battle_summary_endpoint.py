@@ -8,7 +8,9 @@ from autofighter.stats import Stats
 @pytest.mark.asyncio
 async def test_battle_summary_endpoint(app_with_db):
     app, _ = app_with_db
-    run_id = 'summary_run'
+    client = app.test_client()
+    start = await client.post('/ui/action', json={'action': 'start_run', 'params': {'party': ['player']}})
+    run_id = (await start.get_json())['run_id']
     logger = BattleLogger(run_id, 1)
 
     attacker = Stats()
@@ -17,11 +19,11 @@ async def test_battle_summary_endpoint(app_with_db):
     target = Stats()
     target.id = 'foe'
 
-    BUS.emit('damage_dealt', attacker, target, 42, damage_type='Fire')
+    # The logger takes the type from the attacker when none is passed
+    await BUS.emit_async('damage_dealt', attacker, target, 42)
     logger.finalize_battle('victory')
 
-    client = app.test_client()
-    resp = await client.get(f'/run/{run_id}/battles/1/summary')
+    resp = await client.get('/battles/1/summary')
     assert resp.status_code == 200
     data = await resp.get_json()
     assert data['damage_by_type']['hero']['Fire'] == 42
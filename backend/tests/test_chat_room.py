@@ -6,6 +6,7 @@ from llms.loader import ModelName
 from options import set_option
 import pytest
 
+from autofighter.mapgen import MapNode
 from autofighter.party import Party
 from autofighter.rooms.chat import ChatRoom
 from autofighter.stats import Stats
@@ -34,14 +35,15 @@ def setup_db(tmp_path, monkeypatch):
 async def test_chat_room_uses_selected_model(monkeypatch, setup_db):
     calls: dict[str, str] = {}
 
-    def fake_loader(model: str):
+    async def fake_get_llm(model: str):
         calls["model"] = model
         return FakeLLM(calls)
 
-    monkeypatch.setattr("autofighter.rooms.chat.load_llm", fake_loader)
+    monkeypatch.setattr("autofighter.rooms.chat.get_llm", fake_get_llm)
     member = Stats()
+    member.id = "player"
     party = Party(members=[member])
-    room = ChatRoom()
+    room = ChatRoom(MapNode(0, "chat", 1, 0, 1, 0))
     result = await room.resolve(party, {"message": "hi"})
     assert result["response"] == "reply"
     assert "hi" in calls["prompt"]
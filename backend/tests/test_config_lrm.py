@@ -54,3 +54,30 @@ async def test_lrm_config_endpoints(app_with_db, monkeypatch):
     data = await resp.get_json()
     assert data["response"] == "echo:hi"
     assert calls["model"] == ModelName.GEMMA.value
+
+
+@pytest.mark.asyncio
+async def test_lrm_warmup_keeps_model_resident(app_with_db, monkeypatch):
+    from llms.registry import ModelRegistry
+
+    loads = []
+
+    def fake_loader(model: str):
+        loads.append(model)
+        return FakeLLM()
+
+    monkeypatch.setattr("llms.registry._REGISTRY", ModelRegistry(load=fake_loader))
+    monkeypatch.setattr("llms.registry.model_memory_requirements", lambda name: (0, 0))
+    client = app_with_db.test_client()
+
+    resp = await client.post("/config/lrm/warmup", json={"model": ModelName.GEMMA.value})
+    data = await resp.get_json()
+    assert [m["model"] for m in data["resident"]] == [ModelName.GEMMA.value]
+
+    await client.post("/config/lrm", json={"model": ModelName.GEMMA.value})
+    resp = await client.post("/config/lrm/test", json={"prompt": "hi"})
+    assert (await resp.get_json())["response"] == "echo:hi"
+    assert loads == [ModelName.GEMMA.value]
+
+    resp = await client.post("/config/lrm/warmup", json={"model": "nope"})
+    assert resp.status_code == 400
@@ -0,0 +1,145 @@
+import copy
+
+import pytest
+
+from autofighter.effects import DamageOverTime
+from autofighter.effects import EffectManager
+from autofighter.effects import EffectStacks
+from autofighter.stats import Stats
+from autofighter.stats import set_battle_active
+from plugins.damage_types._base import DamageTypeBase
+from plugins.damage_types.generic import Generic
+
+
+@pytest.fixture(autouse=True)
+def battle_active():
+    set_battle_active(True)
+    yield
+    set_battle_active(False)
+
+
+def _target() -> Stats:
+    target = Stats(hp=1_000_000)
+    target.set_base_stat("max_hp", 1_000_000)
+    target.set_base_stat("defense", 1)
+    target.set_base_stat("dodge_odds", 0.0)
+    target.hp = target.max_hp
+    target.id = "target"
+    return target
+
+
+def _source(sid: str) -> Stats:
+    source = Stats()
+    source.set_base_stat("crit_rate", 0.0)
+    source.id = sid
+    return source
+
+
+@pytest.mark.asyncio
+async def test_tick_matches_per_stack_ticking():
+    a, b = _source("a"), _source("b")
+
+    def stacks() -> list[DamageOverTime]:
+        made = []
+        for i in range(60):
+            src = a if i % 3 else b
+            made.append(DamageOverTime("Burn", 3 + i % 2, 1 + i % 4, "burn", src))
+        return made
+
+    grouped, manual = _target(), _target()
+    mgr = EffectManager(grouped)
+    for eff in stacks():
+        mgr.add_dot(eff)
+    reference = stacks()
+
+    for _ in range(5):
+        await mgr.tick()
+        for eff in list(reference):
+            if not await eff.tick(manual):
+                reference.remove(eff)
+        assert grouped.hp == manual.hp
+        assert sorted(e.turns for e in mgr.dots) == sorted(e.turns for e in reference)
+        assert len(grouped.dots) == mgr.dots.stacks("burn") == len(reference)
+    assert grouped.hp < grouped.max_hp
+    assert not mgr.dots and grouped.dots == []
+
+
+@pytest.mark.asyncio
+async def test_interleaved_stacks_tick_in_applied_order():
+    a, b = _source("a"), _source("b")
+    order: list[str] = []
+
+    class Traced(DamageOverTime):
+        async def tick(self, target, *_):
+            order.append(f"{self.id}:{self.source.id}")
+            return await super().tick(target)
+
+    target = _target()
+    mgr = EffectManager(target)
+    applied = [("burn", a), ("poison", b), ("burn", a), ("burn", b), ("poison", b)]
+    for eid, src in applied:
+        mgr.add_dot(Traced(eid.title(), 2, 1, eid, src))
+    stacks = mgr.dots
+
+    await mgr.tick()
+    assert order == [f"{eid}:{src.id}" for eid, src in applied]
+    # Expired stacks are filtered out of the same EffectStacks object
+    assert mgr.dots is stacks
+    assert not stacks and stacks.stacks("burn") == 0 and target.dots == []
+
+
+def test_stack_counts_follow_list_mutation():
+    target = _target()
+    mgr = EffectManager(target)
+    effects = [DamageOverTime("Burn", 1, 3, "burn") for _ in range(4)]
+    for eff in effects:
+        mgr.add_dot(eff, max_stacks=3)
+    assert mgr.dots.stacks("burn") == 3
+    assert len(target.dots) == 3
+
+    mgr.dots.remove(effects[0])
+    assert mgr.dots.stacks("burn") == 2
+    mgr.add_dot(DamageOverTime("Poison", 1, 3, "poison"))
+    mgr.dots = [d for d in mgr.dots if d.id != "burn"]
+    assert isinstance(mgr.dots, EffectStacks)
+    assert mgr.dots.stacks("burn") == 0 and mgr.dots.stacks("poison") == 1
+
+    clone = copy.deepcopy(mgr.dots)
+    assert clone.stacks("poison") == 1 and len(clone) == 1
+    mgr.dots.clear()
+    assert mgr.dots.stacks("poison") == 0
+
+
+@pytest.mark.asyncio
+async def test_hooks_run_once_per_group_unless_overridden(monkeypatch):
+    calls: list[str] = []
+    base_hook = DamageTypeBase.on_dot_damage_taken
+
+    def counted(self, damage, attacker, target):
+        calls.append(type(self).__name__)
+        return base_hook(self, damage, attacker, target)
+
+    monkeypatch.setattr(DamageTypeBase, "on_dot_damage_taken", counted)
+
+    class Siphon(Generic):
+        # Overridden hooks may have side effects, so they run per stack
+        def on_party_dot_damage_taken(self, damage, attacker, target):
+            calls.append("Siphon")
+            return damage
+
+    plain, siphon = _source("plain"), _source("siphon")
+    siphon.damage_type = Siphon()
+    target = _target()
+    mgr = EffectManager(target)
+    for src in (plain, plain, plain, siphon, siphon):
+        mgr.add_dot(DamageOverTime("Burn", 4, 2, "burn", src))
+    groups = mgr.dots.groups()
+    assert [len(g) for g in groups.values()] == [3, 2]
+
+    await mgr.tick()
+    assert calls.count("Generic") == 1
+    assert calls.count("Siphon") == 4
+    assert target.damage_taken == 5 * 4 ** 2
+
+    mgr.dots.remove(mgr.dots[0])
+    assert [len(g) for g in mgr.dots.groups().values()] == [2, 2]
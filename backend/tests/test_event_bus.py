@@ -3,6 +3,8 @@ import importlib.util
 import logging
 from pathlib import Path
 
+import pytest
+
 spec = importlib.util.spec_from_file_location(
     "event_bus", Path(__file__).resolve().parents[1] / "plugins" / "event_bus.py"
 )
@@ -94,3 +96,77 @@ def test_async_callback_without_loop_avoids_runtime_error(caplog):
     messages = [record.getMessage() for record in caplog.records]
     assert any("called from sync context with no event loop" in msg for msg in messages)
     assert all("RuntimeError" not in msg for msg in messages)
+
+
+def test_emit_async_runs_sync_subscribers_inline(monkeypatch):
+    import threading
+
+    bus = EventBus()
+    seen = []
+
+    def handler(value, extra):
+        seen.append((value, extra, threading.get_ident()))
+
+    bus.subscribe("inline", handler)
+    calls = []
+    real_signature = event_bus_module.inspect.signature
+
+    def counting_signature(obj, *args, **kwargs):
+        calls.append(obj)
+        return real_signature(obj, *args, **kwargs)
+
+    monkeypatch.setattr(event_bus_module.inspect, "signature", counting_signature)
+
+    async def run() -> None:
+        await bus.emit_async("inline", 1)
+        await bus.emit_async("inline", 2, 3, 4)
+        await bus.emit_async("nobody_listens", 5)
+
+    try:
+        asyncio.run(run())
+    finally:
+        bus.unsubscribe("inline", handler)
+
+    main_thread = threading.get_ident()
+    # Args are padded/trimmed without re-inspecting the handler per delivery
+    assert seen == [(1, None, main_thread), (2, 3, main_thread)]
+    assert calls == []
+
+
+def test_subscriber_cache_sees_direct_clears():
+    bus = EventBus()
+    received = []
+    bus.subscribe("cached", received.append)
+    bus.emit("cached", 1)
+    event_bus_module.bus._subs.clear()
+    bus.emit("cached", 2)
+    assert received == [1]
+
+
+def test_event_metrics_use_bounded_histograms():
+    now = [0.0]
+    metrics = event_bus_module.EventMetrics(
+        window=60.0, slots=6, slow_capacity=3, clock=lambda: now[0]
+    )
+    for i in range(1, 1001):
+        metrics.record_event("tick", i / 1000 * 0.010)
+    for _ in range(20):
+        metrics.record_event("tick", 0.020)
+
+    stats = metrics.get_stats()["tick"]
+    assert stats["count"] == 1020
+    assert stats["max_time"] == 0.020
+    assert stats["p50"] == pytest.approx(0.005, rel=0.1)
+    assert stats["p95"] == pytest.approx(0.0095, rel=0.1)
+    assert stats["p99"] == pytest.approx(0.020, rel=0.1)
+    assert len(metrics.histograms["tick"].buckets) < 100
+    assert [e["duration"] for e in metrics.get_slow_events()] == [0.020] * 3
+
+    assert stats["window"]["count"] == 1020
+    now[0] = 30.0
+    metrics.record_event("tick", 0.001)
+    now[0] = 65.0
+    window = metrics.window_stats("tick")
+    assert window["count"] == 1
+    assert window["max_time"] == 0.001
+    assert metrics.get_stats()["tick"]["count"] == 1021
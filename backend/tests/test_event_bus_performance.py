@@ -16,20 +16,33 @@ class TestEventBusPerformance:
 
     @pytest.mark.asyncio
     async def test_async_event_yield(self):
-        """Ensure async emissions yield at least 2ms per event."""
+        """Async emissions yield to other tasks without a fixed delay."""
         async def handler(*args):
             return None
 
+        ticks = 0
+
+        async def background():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0)
+
         BUS.subscribe("yield_test", handler)
+        task = asyncio.create_task(background())
+        await asyncio.sleep(0)
 
         try:
-            event_count = 5
+            event_count = 200
             start = time.perf_counter()
             for _ in range(event_count):
                 await BUS.emit_async("yield_test", "data")
             elapsed = time.perf_counter() - start
-            assert elapsed >= event_count * 0.002
+            assert ticks >= event_count
+            # The old 2ms sleep per emission would take at least 0.4s
+            assert elapsed < event_count * 0.002
         finally:
+            task.cancel()
             BUS.unsubscribe("yield_test", handler)
 
     def test_sync_emit_with_100_subscribers(self):
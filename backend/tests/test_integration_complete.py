@@ -6,6 +6,7 @@ from pathlib import Path
 import tempfile
 
 from battle_logging import RunLogger
+from battle_logging import read_battle_events
 import pytest
 
 from autofighter.party import Party
@@ -92,7 +93,7 @@ async def test_complete_integration():
 
             summary_path = battle_path / "summary"
             assert (summary_path / "battle_summary.json").exists(), "Battle summary JSON should exist"
-            assert (summary_path / "events.json").exists(), "Events JSON should exist"
+            assert (summary_path / "events.ndjson").exists(), "Events NDJSON should exist"
             assert (summary_path / "human_summary.txt").exists(), "Human summary should exist"
 
             # Verify summary content
@@ -114,8 +115,7 @@ async def test_complete_integration():
             assert "goblin: 3" in content   # hits landed
 
             # Verify events were captured
-            with open(summary_path / "events.json") as f:
-                events = json.load(f)
+            events = read_battle_events(summary_path)
 
             # Should have battle_start (2), damage_dealt (18), hit_landed (18), heal (1) = 39 events
             assert len(events) >= 35, f"Should have many events, got {len(events)}"
@@ -0,0 +1,107 @@
+import asyncio
+from pathlib import Path
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from llms import safety
+from llms.loader import ModelName
+from llms.registry import ModelRegistry
+
+
+class FakeLLM:
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    async def generate_stream(self, text: str):
+        yield f"{self.name}:{text}"
+
+
+@pytest.fixture()
+def loads(monkeypatch):
+    monkeypatch.setattr("llms.registry.model_memory_requirements", lambda name: (0, 0))
+    monkeypatch.setattr("llms.registry.pick_device", lambda: -1)
+    calls: list[str] = []
+
+    def fake_load(name: str, **_: object) -> FakeLLM:
+        calls.append(name)
+        time.sleep(0.05)
+        return FakeLLM(name)
+
+    return calls, fake_load
+
+
+def test_models_stay_resident_and_evict_lru(loads):
+    calls, fake_load = loads
+    registry = ModelRegistry(max_resident=2, load=fake_load)
+    deepseek = registry.get(ModelName.DEEPSEEK.value)
+    assert registry.get(ModelName.DEEPSEEK.value) is deepseek
+    registry.get(ModelName.GEMMA.value)
+    registry.get(ModelName.DEEPSEEK.value)  # now most recently used
+    registry.get(ModelName.GGUF.value, gguf_path="model.gguf")
+
+    assert calls == [ModelName.DEEPSEEK.value, ModelName.GEMMA.value, ModelName.GGUF.value]
+    stats = registry.stats()
+    assert [m["model"] for m in stats["resident"]] == [ModelName.DEEPSEEK.value, ModelName.GGUF.value]
+    assert stats["resident"][1]["options"] == {"gguf_path": "model.gguf"}
+    assert (stats["hits"], stats["misses"], stats["evictions"]) == (2, 3, 1)
+
+
+def test_ram_budget_evicts_before_loading(loads, monkeypatch):
+    calls, fake_load = loads
+    registry = ModelRegistry(max_resident=4, load=fake_load)
+
+    def one_model_fits(required: int) -> None:
+        if registry.stats()["resident"]:
+            raise RuntimeError("not enough memory")
+
+    monkeypatch.setattr("llms.registry.ensure_ram", one_model_fits)
+    registry.get(ModelName.DEEPSEEK.value)
+    registry.get(ModelName.GEMMA.value)
+    assert [m["model"] for m in registry.stats()["resident"]] == [ModelName.GEMMA.value]
+
+
+def test_concurrent_requests_share_one_load(loads):
+    calls, fake_load = loads
+    registry = ModelRegistry(load=fake_load)
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(registry.get(ModelName.GEMMA.value)))
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert calls == [ModelName.GEMMA.value]
+    assert all(llm is results[0] for llm in results)
+
+    async def reuse():
+        return await registry.aget(ModelName.GEMMA.value)
+
+    assert asyncio.run(reuse()) is results[0]
+
+
+def test_memory_requirements_cached_on_disk(tmp_path, monkeypatch):
+    monkeypatch.setenv("AF_LLM_REQUIREMENTS_CACHE", str(tmp_path / "req.json"))
+    monkeypatch.setattr(safety, "_REQUIREMENTS", None)
+    queries: list[str] = []
+
+    def fake_query(model: str) -> tuple[int, int]:
+        queries.append(model)
+        return (20, 10) if model == "known" else (0, 0)
+
+    monkeypatch.setattr(safety, "_query_memory_requirements", fake_query)
+    assert safety.model_memory_requirements("known") == (20, 10)
+    assert safety.model_memory_requirements("known") == (20, 10)
+    assert safety.model_memory_requirements("offline") == (0, 0)
+    assert safety.model_memory_requirements("offline") == (0, 0)
+    assert queries == ["known", "offline", "offline"]
+
+    # A new process reads the cache file instead of the Hub
+    monkeypatch.setattr(safety, "_REQUIREMENTS", None)
+    assert safety.model_memory_requirements("known") == (20, 10)
+    assert queries == ["known", "offline", "offline"]
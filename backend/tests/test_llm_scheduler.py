@@ -0,0 +1,211 @@
+import asyncio
+
+from llms.scheduler import InferenceScheduler
+from llms.scheduler import Priority
+from llms.scheduler import SchedulerBusy
+import pytest
+
+
+class FakeLLM:
+    def __init__(self, *, supports_batch: bool = False, chunks: int = 3) -> None:
+        self.supports_batch = supports_batch
+        self.chunks = chunks
+        self.calls: list[str] = []
+        self.batches: list[list[str]] = []
+        self.active = 0
+        self.peak = 0
+        self.gate = asyncio.Event()
+        self.gate.set()
+
+    async def generate_stream(self, text: str):
+        self.calls.append(text)
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await self.gate.wait()
+            for i in range(self.chunks):
+                await asyncio.sleep(0)
+                yield f"{text}:{i} "
+        finally:
+            self.active -= 1
+
+    async def generate_batch(self, texts: list[str]) -> list[str]:
+        self.batches.append(list(texts))
+        await self.gate.wait()
+        return [f"batch:{text}" for text in texts]
+
+
+@pytest.mark.asyncio
+async def test_chat_is_served_before_queued_background_work():
+    llm = FakeLLM()
+    llm.gate.clear()
+    scheduler = InferenceScheduler(max_concurrency=1, max_tokens=0)
+
+    first = asyncio.create_task(scheduler.complete(llm, "foe-1"))
+    await asyncio.sleep(0.01)
+    assert llm.calls == ["foe-1"]
+    rest = [
+        asyncio.create_task(scheduler.complete(llm, "foe-2")),
+        asyncio.create_task(scheduler.complete(llm, "party", priority=Priority.PARTY)),
+        asyncio.create_task(scheduler.complete(llm, "chat", priority=Priority.CHAT)),
+    ]
+    await asyncio.sleep(0.01)
+    assert scheduler.stats()["pending"] == {"chat": 1, "party": 1, "background": 1}
+
+    llm.gate.set()
+    await asyncio.gather(first, *rest)
+    assert llm.calls == ["foe-1", "chat", "party", "foe-2"]
+    assert llm.peak == 1
+    assert rest[2].result() == "chat:0 chat:1 chat:2 "
+
+
+@pytest.mark.asyncio
+async def test_queued_completions_are_batched():
+    llm = FakeLLM(supports_batch=True)
+    llm.gate.clear()
+    scheduler = InferenceScheduler(max_concurrency=1, max_batch=3)
+
+    tasks = [asyncio.create_task(scheduler.complete(llm, f"p{i}")) for i in range(5)]
+    await asyncio.sleep(0.01)
+    llm.gate.set()
+    replies = await asyncio.gather(*tasks)
+
+    assert replies == [f"batch:p{i}" for i in range(5)]
+    assert llm.batches == [["p0", "p1", "p2"], ["p3", "p4"]]
+    stats = scheduler.stats()
+    assert stats["batches"] == 2
+    assert stats["batched_requests"] == 5
+    assert stats["completed"] == 5
+
+
+@pytest.mark.asyncio
+async def test_token_budget_truncates_stream():
+    llm = FakeLLM(chunks=10)
+    scheduler = InferenceScheduler(max_tokens=4)
+
+    chunks = [chunk async for chunk in scheduler.stream(llm, "hi")]
+    assert len(chunks) == 4
+    short = await scheduler.complete(llm, "hi", priority=Priority.CHAT, max_tokens=2)
+    assert short == "hi:0 hi:1 "
+    assert scheduler.stats()["truncated"] == 2
+
+
+@pytest.mark.asyncio
+async def test_background_budget_rejects_overflow():
+    llm = FakeLLM()
+    llm.gate.clear()
+    scheduler = InferenceScheduler(max_background_tokens=10)
+
+    queued = asyncio.create_task(scheduler.complete(llm, "x" * 32))
+    await asyncio.sleep(0)
+    with pytest.raises(SchedulerBusy):
+        await scheduler.complete(llm, "y" * 32)
+    # Interactive traffic is never rejected
+    chat = asyncio.create_task(scheduler.complete(llm, "z" * 64, priority=Priority.CHAT))
+    llm.gate.set()
+    await asyncio.gather(queued, chat)
+    stats = scheduler.stats()
+    assert stats["rejected"] == 1
+    assert stats["background_tokens"] == 0
+
+
+@pytest.mark.asyncio
+async def test_concurrency_cap_spans_models():
+    models = [FakeLLM() for _ in range(3)]
+    running = 0
+    peak = 0
+
+    def track(llm):
+        original = llm.generate_stream
+
+        async def generate_stream(text):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            try:
+                async for chunk in original(text):
+                    yield chunk
+            finally:
+                running -= 1
+
+        llm.generate_stream = generate_stream
+
+    for llm in models:
+        track(llm)
+    scheduler = InferenceScheduler(max_concurrency=2)
+    await asyncio.gather(
+        *(scheduler.complete(llm, f"m{i}-{j}") for i, llm in enumerate(models) for j in range(2))
+    )
+    assert peak == 2
+    assert all(llm.peak == 1 for llm in models)
+
+
+@pytest.mark.asyncio
+async def test_abandoned_stream_is_skipped():
+    llm = FakeLLM()
+    llm.gate.clear()
+    scheduler = InferenceScheduler()
+
+    blocker = asyncio.create_task(scheduler.complete(llm, "first"))
+    await asyncio.sleep(0)
+    stream = scheduler.stream(llm, "gone")
+    pending = asyncio.create_task(stream.__anext__())
+    await asyncio.sleep(0)
+    pending.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await pending
+    await stream.aclose()
+
+    llm.gate.set()
+    await blocker
+    await asyncio.sleep(0.01)
+    assert llm.calls == ["first"]
+    assert scheduler.stats()["cancelled"] == 1
+
+
+class LimitedLLM(FakeLLM):
+    supports_max_tokens = True
+
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.limits: list[int | None] = []
+
+    async def generate_stream(self, text: str, max_tokens: int | None = None):
+        self.limits.append(max_tokens)
+        async for chunk in super().generate_stream(text):
+            yield chunk
+
+    async def generate_batch(self, texts: list[str], max_tokens: int | None = None):
+        self.limits.append(max_tokens)
+        return await super().generate_batch(texts)
+
+
+@pytest.mark.asyncio
+async def test_token_budget_reaches_backend_and_counts_tokens():
+    llm = LimitedLLM(supports_batch=True)
+    llm.gate.clear()
+    scheduler = InferenceScheduler(max_tokens=64)
+
+    first = asyncio.create_task(scheduler.complete(llm, "a"))
+    await asyncio.sleep(0)
+    rest = [
+        asyncio.create_task(scheduler.complete(llm, "b")),
+        asyncio.create_task(scheduler.complete(llm, "c")),
+        asyncio.create_task(scheduler.complete(llm, "d", max_tokens=8)),
+    ]
+    await asyncio.sleep(0.01)
+    llm.gate.set()
+    await asyncio.gather(first, *rest)
+    # Jobs with different budgets are not merged into one batch
+    assert llm.batches == [["b", "c"]]
+    assert llm.limits == [64, 64, 8]
+
+    long = FakeLLM(chunks=1)
+    long.generate_stream = lambda text: _words(40)
+    reply = await InferenceScheduler(max_tokens=20).complete(long, "x")
+    assert len(reply) == 80
+
+
+async def _words(count: int):
+    for _ in range(count):
+        yield "abcdefgh"
@@ -0,0 +1,180 @@
+import json
+from pathlib import Path
+import queue
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from llms.loader import _LangChainWrapper
+from llms.streaming import iterate_in_thread
+
+
+@pytest.mark.asyncio
+async def test_first_chunk_arrives_before_generation_finishes():
+    first_seen = threading.Event()
+
+    def tokens():
+        yield "Hel"
+        # Only continues once the consumer has received the first token
+        assert first_seen.wait(timeout=5)
+        yield "lo"
+
+    chunks = []
+    async for chunk in iterate_in_thread(tokens):
+        chunks.append(chunk)
+        first_seen.set()
+    assert chunks == ["Hel", "lo"]
+
+
+@pytest.mark.asyncio
+async def test_errors_propagate_and_early_exit_stops_worker():
+    def broken():
+        yield "a"
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError, match="boom"):
+        async for _ in iterate_in_thread(broken):
+            pass
+
+    produced = []
+    finished = threading.Event()
+
+    def endless():
+        try:
+            for i in range(10_000):
+                produced.append(i)
+                yield i
+        finally:
+            finished.set()
+
+    stream = iterate_in_thread(endless, maxsize=2)
+    assert await anext(stream) == 0
+    await stream.aclose()
+    # Closing returns only once the worker thread has stopped
+    assert finished.is_set()
+    assert len(produced) < 10_000
+
+
+class StreamingLLM:
+    def stream(self, text: str):
+        yield from [text, " ", "", "world"]
+
+    def invoke(self, text: str) -> str:  # pragma: no cover - not used
+        raise AssertionError("stream should be preferred")
+
+
+class InvokeOnlyLLM:
+    def invoke(self, text: str) -> str:
+        return f"{text} world"
+
+
+class LimitedLLM:
+    def __init__(self) -> None:
+        self.kwargs: list[dict] = []
+
+    def stream(self, text: str, **kwargs):
+        self.kwargs.append(kwargs)
+        yield text
+
+    def batch(self, texts: list[str], **kwargs):
+        self.kwargs.append(kwargs)
+        return texts
+
+
+@pytest.mark.asyncio
+async def test_wrapper_passes_token_budget_to_backend():
+    backend = LimitedLLM()
+    wrapper = _LangChainWrapper(backend, token_limit=lambda n: {"max_tokens": n})
+    assert wrapper.supports_max_tokens
+    assert [c async for c in wrapper.generate_stream("hi", max_tokens=8)] == ["hi"]
+    assert await wrapper.generate_batch(["a", "b"], max_tokens=4) == ["a", "b"]
+    assert [c async for c in wrapper.generate_stream("hi")] == ["hi"]
+    assert backend.kwargs == [{"max_tokens": 8}, {"max_tokens": 4}, {}]
+
+
+class ThreadedLLM:
+    """Generates on its own thread like HF ``generate`` behind a streamer."""
+
+    def __init__(self) -> None:
+        self.finished = threading.Event()
+        self.generated = 0
+
+    def stream(self, text: str, *, stop_when):
+        out: queue.Queue = queue.Queue()
+
+        def generate() -> None:
+            while self.generated < 10_000 and not stop_when():
+                self.generated += 1
+                out.put(text)
+                time.sleep(0.001)
+            self.finished.set()
+            out.put(None)
+
+        threading.Thread(target=generate, daemon=True).start()
+        # Ends when generation does, like ``TextIteratorStreamer``
+        yield from iter(out.get, None)
+
+
+@pytest.mark.asyncio
+async def test_disconnect_stops_backend_generation():
+    backend = ThreadedLLM()
+    wrapper = _LangChainWrapper(
+        backend, stop_signal=lambda stop: {"stop_when": stop.is_set}
+    )
+    stream = wrapper.generate_stream("tok")
+    assert await anext(stream) == "tok"
+    await stream.aclose()
+    # Generation stopped on the event, and closing waited for it to do so
+    assert backend.finished.is_set()
+    assert backend.generated < 10_000
+
+
+@pytest.mark.asyncio
+async def test_wrapper_streams_when_backend_supports_it():
+    chunks = [c async for c in _LangChainWrapper(StreamingLLM()).generate_stream("hello")]
+    assert chunks == ["hello", " ", "world"]
+    chunks = [c async for c in _LangChainWrapper(InvokeOnlyLLM()).generate_stream("hello")]
+    assert chunks == ["hello world"]
+
+
+@pytest.mark.asyncio
+async def test_chat_stream_endpoint_sends_tokens_then_result(app_module, monkeypatch):
+    from game import load_map
+    from game import save_map
+    from services.run_service import start_run
+
+    run_id = (await start_run(["player"]))["run_id"]
+    state, rooms = load_map(run_id)
+    rooms[state["current"]].room_type = "chat"
+    save_map(run_id, {**state, "rooms": [r.to_dict() for r in rooms]})
+
+    class FakeLLM:
+        async def generate_stream(self, text: str):
+            for chunk in ("Hi", " there"):
+                yield chunk
+
+    async def fake_get_llm(model: str):
+        return FakeLLM()
+
+    monkeypatch.setattr("autofighter.rooms.chat.get_llm", fake_get_llm)
+
+    async def no_voice(text, sample):
+        return None
+
+    monkeypatch.setattr("autofighter.rooms.chat.voice_path", no_voice)
+
+    client = app_module.app.test_client()
+    response = await client.post("/chat/stream", json={"message": "hello"})
+    assert response.content_type.startswith("text/event-stream")
+    body = (await response.get_data()).decode()
+    events = [chunk.split("\n", 1) for chunk in body.strip().split("\n\n")]
+    tokens = [json.loads(data[6:])["delta"] for kind, data in events if kind == "event: token"]
+    assert tokens == ["Hi", " there"]
+    kind, data = events[-1]
+    assert kind == "event: done"
+    result = json.loads(data[6:])
+    assert result["response"] == "Hi there"
+    assert result["message"] == "hello"
@@ -0,0 +1,130 @@
+import asyncio
+import os
+from pathlib import Path
+import sys
+import zipfile
+
+from battle_event_log import read_battle_events
+from battle_logging import BattleLogger
+from battle_logging import RunLogger
+import log_retention
+from log_retention import ARCHIVE_NAME
+from log_retention import LogRetentionManager
+from log_retention import RetentionPolicy
+from log_retention import battle_location
+from log_retention import run_archives
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from services import run_service
+
+from autofighter.stats import BUS
+from autofighter.stats import Stats
+
+
+def _log_battle(logs: Path, run_id: str, index: int, hits: int = 3) -> None:
+    logger = BattleLogger(run_id, index, logs)
+    hero = Stats()
+    hero.id = "hero"
+    slime = Stats()
+    slime.id = "slime"
+    for turn in range(1, hits + 1):
+        logger.turn = turn
+        BUS.emit("damage_dealt", hero, slime, turn)
+    logger.finalize_battle("victory")
+
+
+def _age(path: Path, seconds: float) -> None:
+    stamp = os.path.getmtime(path) - seconds
+    for root, _, files in os.walk(path):
+        for name in files:
+            os.utime(os.path.join(root, name), (stamp, stamp))
+
+
+@pytest.fixture(autouse=True)
+def no_active_run(monkeypatch):
+    monkeypatch.setattr(log_retention, "_active_battles", dict)
+
+
+def test_idle_battles_move_into_run_archive(tmp_path, monkeypatch):
+    _log_battle(tmp_path, "run_a", 1)
+    _log_battle(tmp_path, "run_a", 2, hits=5)
+    manager = LogRetentionManager(tmp_path, RetentionPolicy(archive_after=0, max_age_days=0, max_bytes=0))
+
+    result = manager.run_once()
+    assert result["battles_archived"] == 2
+    run_path = tmp_path / "runs" / "run_a"
+    assert not any((run_path / "battles").iterdir())
+    with zipfile.ZipFile(run_path / ARCHIVE_NAME) as zf:
+        assert "2/summary/events.ndjson" in zf.namelist()
+        assert "1/raw/battle.log" in zf.namelist()
+
+    location = battle_location(tmp_path, "run_a", 2)
+    assert isinstance(location, zipfile.Path)
+    assert [e["amount"] for e in read_battle_events(location / "summary")] == [1, 2, 3, 4, 5]
+
+    # New battles keep numbering after the archived ones and roll over into a
+    # second archive; the first one is not rewritten
+    run_logger = RunLogger("run_a", tmp_path)
+    assert run_logger.battle_count == 2
+    first = (run_path / ARCHIVE_NAME).read_bytes()
+    _log_battle(tmp_path, "run_a", 3)
+    manager.run_once()
+    assert (run_path / ARCHIVE_NAME).read_bytes() == first
+    assert [p.name for p in run_archives(run_path)] == ["battles.zip", "battles.1.zip"]
+    assert isinstance(battle_location(tmp_path, "run_a", 3), zipfile.Path)
+    stats = manager.get_stats()
+    assert stats["disk"]["archived_battles"] == 3
+    assert stats["disk"]["live_battles"] == 0
+    assert stats["totals"]["battles_archived"] == 3
+
+    monkeypatch.setattr(run_service, "LOGS_PATH", tmp_path)
+    summary = asyncio.run(run_service.get_battle_summary("run_a", 1))
+    assert summary["result"] == "victory"
+    page = asyncio.run(
+        run_service.get_battle_events_page("run_a", 2, cursor=1, limit=2, turn_max=4)
+    )
+    assert [e["amount"] for e in page["events"]] == [2, 3]
+    assert page["next_cursor"] == 3
+    assert asyncio.run(run_service.get_battle_events("run_a", 9)) is None
+
+
+def test_recent_and_active_battles_stay_live(tmp_path, monkeypatch):
+    _log_battle(tmp_path, "run_b", 1)
+    _log_battle(tmp_path, "run_b", 2)
+    manager = LogRetentionManager(tmp_path, RetentionPolicy(archive_after=60, max_age_days=0, max_bytes=0))
+    assert manager.run_once()["battles_archived"] == 0
+
+    _age(tmp_path / "runs" / "run_b", 120)
+    monkeypatch.setattr(log_retention, "_active_battles", lambda: {"run_b": 2})
+    assert manager.run_once()["battles_archived"] == 1
+    assert (tmp_path / "runs" / "run_b" / "battles" / "2").is_dir()
+
+
+def test_age_and_size_budgets_drop_oldest_runs(tmp_path, monkeypatch):
+    for run_id, age in (("old", 40 * 86400), ("mid", 3 * 86400), ("new", 86400), ("live", 5 * 86400)):
+        _log_battle(tmp_path, run_id, 1, hits=50)
+        _age(tmp_path / "runs" / run_id, age)
+    monkeypatch.setattr(log_retention, "_active_battles", lambda: {"live": None})
+    manager = LogRetentionManager(tmp_path, RetentionPolicy(archive_after=0, max_age_days=30, max_bytes=0))
+    assert manager.run_once()["runs_deleted"] == ["old"]
+
+    # Budget fits roughly two of the remaining three runs; the active run is kept
+    per_run = manager.get_stats()["disk"]["total_bytes"] / 3
+    manager.policy.max_bytes = int(per_run * 2.5)
+    assert manager.run_once()["runs_deleted"] == ["mid"]
+    remaining = sorted(p.name for p in (tmp_path / "runs").iterdir())
+    assert remaining == ["live", "new"]
+    assert manager.get_stats()["totals"]["bytes_reclaimed"] > 0
+
+
+def test_every_logged_run_counts_as_active(tmp_path, monkeypatch):
+    monkeypatch.undo()
+    first = RunLogger("first", tmp_path)
+    second = RunLogger("second", tmp_path)
+    second.current_battle_logger = type("Battle", (), {"battle_index": 4})()
+    monkeypatch.setattr(
+        "battle_logging.active_run_loggers", lambda: [first, second]
+    )
+    assert log_retention._active_battles() == {"first": None, "second": 4}
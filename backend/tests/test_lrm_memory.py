@@ -34,3 +34,104 @@ async def test_foe_memory_isolated() -> None:
     h2 = f2.lrm_memory.load_memory_variables({})["history"]
     assert "growl" in h1 and "snarl" not in h1 and "roar" in h1
     assert "snarl" in h2 and "growl" not in h2 and "hiss" in h2
+
+
+class FakeDoc:
+    def __init__(self, doc_id: str, text: str) -> None:
+        self.id = doc_id
+        self.page_content = text
+
+
+class FakeStore:
+    """Minimal stand-in for the shared Chroma collection."""
+
+    def __init__(self) -> None:
+        self.rows: dict[str, tuple[str, dict]] = {}
+
+    def add_texts(self, texts, metadatas, ids):
+        for doc_id, text, meta in zip(ids, texts, metadatas):
+            self.rows[doc_id] = (text, meta)
+
+    def get(self, where, include):
+        ids = [i for i, (_, m) in self.rows.items() if m["namespace"] == where["namespace"]]
+        return {"ids": ids, "metadatas": [self.rows[i][1] for i in ids]}
+
+    def delete(self, ids):
+        for doc_id in ids:
+            self.rows.pop(doc_id, None)
+
+    def similarity_search(self, query, k, filter):
+        hits = [
+            FakeDoc(i, text)
+            for i, (text, meta) in self.rows.items()
+            if meta["namespace"] == filter["namespace"] and query in text
+        ]
+        return hits[:k]
+
+
+def test_memory_is_created_lazily(monkeypatch) -> None:
+    import copy
+
+    import llms.memory as memory
+
+    calls = []
+    monkeypatch.setattr(
+        memory, "get_shared_store", lambda: calls.append(1) or None
+    )
+    foe = FoeBase()
+    player = PlayerBase()
+    copy.deepcopy(foe)
+    copy.deepcopy(player)
+    assert foe.lrm_memory is None and player.lrm_memory is None
+    assert calls == []
+
+    player.memory.save_context({"input": "hi"}, {"output": ""})
+    assert calls == [1]
+    assert copy.deepcopy(player).lrm_memory is None
+
+
+def test_shared_store_namespaces_and_bounds(monkeypatch) -> None:
+    import llms.memory as memory
+    from llms.memory import VectorConversationMemory
+
+    store = FakeStore()
+    monkeypatch.setattr(memory, "get_shared_store", lambda: store)
+    luna = memory.memory_for("run1", "luna")
+    slime = memory.memory_for("run1", "slime")
+    assert isinstance(luna, VectorConversationMemory)
+    assert luna.namespace == "run1:luna"
+
+    luna.max_turns, luna.recent = 5, 2
+    for i in range(8):
+        luna.save_context({"input": f"q{i}"}, {"output": f"a{i}"})
+    slime.save_context({"input": "blub"}, {"output": ""})
+
+    assert len(store.rows) == 6  # five for luna, one for slime
+    history = luna.load_memory_variables({})["history"]
+    assert history == "Human: q6\nAI: a6\nHuman: q7\nAI: a7"
+    recalled = luna.load_memory_variables({"input": "q4"})["history"]
+    assert recalled.startswith("Human: q4")
+    assert "q0" not in recalled and "blub" not in recalled
+
+    # A new instance picks the namespace back up from the store
+    again = VectorConversationMemory(store, "run1:luna", max_turns=5, recent=3)
+    assert again.load_memory_variables({})["history"].startswith("Human: q5")
+    again.save_context({"input": "q8"}, {"output": "a8"})
+    assert len(store.get({"namespace": "run1:luna"}, [])["ids"]) == 5
+
+
+def test_copies_share_one_namespace_memory(monkeypatch) -> None:
+    import copy
+
+    import llms.memory as memory
+
+    store = FakeStore()
+    monkeypatch.setattr(memory, "get_shared_store", lambda: store)
+    player = PlayerBase()
+    player.id = "luna"
+    clone = copy.deepcopy(player)
+    assert clone.memory is player.memory
+    player.memory.save_context({"input": "one"}, {"output": ""})
+    clone.memory.save_context({"input": "two"}, {"output": ""})
+    seqs = sorted(meta["seq"] for _, meta in store.rows.values())
+    assert seqs == [0, 1]
@@ -0,0 +1,58 @@
+import json
+import random
+
+import pytest
+
+
+@pytest.mark.asyncio
+async def test_load_party_matches_level_up_replay(app_with_db, monkeypatch):
+    app, _ = app_with_db
+    import game
+
+    client = app.test_client()
+
+    resp = await client.post("/run/start", json={"party": ["player"]})
+    run_id = (await resp.get_json())["run_id"]
+    with game.get_save_manager().connection() as conn:
+        row = conn.execute("SELECT party FROM runs WHERE id = ?", (run_id,)).fetchone()
+        data = json.loads(row[0])
+        data["level"]["player"] = 40
+        conn.execute(
+            "UPDATE runs SET party = ? WHERE id = ?", (json.dumps(data), run_id)
+        )
+
+    random.seed(7)
+    fast = next(m for m in game.load_party(run_id).members if m.id == "player")
+    # Rolls are drawn per load, not frozen: another seed gives other stats
+    random.seed(8)
+    other = next(m for m in game.load_party(run_id).members if m.id == "player")
+    assert other.get_base_stat("max_hp") != fast.get_base_stat("max_hp")
+
+    # The reference path: the same load with ``_on_level_up`` replayed per level
+    cls = game.get_player_class("player")
+    calls = []
+    original = cls._on_level_up
+
+    def replay(self):
+        calls.append(self)
+        original(self)
+
+    monkeypatch.setattr(cls, "_on_level_up", replay)
+    random.seed(7)
+    slow = next(m for m in game.load_party(run_id).members if m.id == "player")
+    assert len(calls) == 39
+
+    assert fast.level == slow.level == 40
+    for stat in game._LEVEL_UP_STATS:
+        assert fast.get_base_stat(stat) == pytest.approx(slow.get_base_stat(stat))
+    assert fast.hp == slow.hp
+
+
+
+def test_player_class_index():
+    import game
+
+    from plugins.players.luna import Luna
+
+    assert game.get_player_class("luna") is Luna
+    assert game.get_player_class("missing") is None
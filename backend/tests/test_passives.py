@@ -74,3 +74,81 @@ async def test_room_heal_event_and_enrage(monkeypatch):
 
     assert amounts == [5]
     assert player.hp == 95
+
+
+@pytest.mark.asyncio
+async def test_dispatch_table_cached_until_passives_change():
+    calls: list[tuple] = []
+
+    class LegacyPassive:
+        plugin_type = "passive"
+        id = "legacy"
+        trigger = "turn_start"
+        created = 0
+
+        def __init__(self) -> None:
+            LegacyPassive.created += 1
+
+        async def apply(self, target) -> None:
+            calls.append(("legacy", target))
+
+    class ContextPassive:
+        plugin_type = "passive"
+        id = "context"
+        trigger = "turn_start"
+
+        async def apply(self, target, **kwargs) -> None:
+            calls.append(("context", kwargs.get("event"), kwargs.get("turn")))
+
+    registry = PassiveRegistry()
+    registry._registry = {"legacy": LegacyPassive, "context": ContextPassive}
+    player = Player()
+    player.passives = ["legacy", "context"]
+
+    await registry.trigger("turn_start", player, turn=3)
+    await registry.trigger("turn_start", player, turn=4)
+    await registry.trigger("battle_end", player)
+    assert calls == [
+        ("legacy", player),
+        ("context", "turn_start", 3),
+        ("legacy", player),
+        ("context", "turn_start", 4),
+    ]
+    # One instance per owner, reused across triggers
+    assert LegacyPassive.created == 1
+
+    player.passives.remove("legacy")
+    calls.clear()
+    await registry.trigger("turn_start", player, turn=5)
+    assert calls == [("context", "turn_start", 5)]
+
+
+@pytest.mark.asyncio
+async def test_each_stack_keeps_its_own_instance():
+    class CountingPassive:
+        plugin_type = "passive"
+        id = "counting"
+        trigger = "turn_start"
+        max_stacks = 2
+
+        def __init__(self) -> None:
+            self.seen: list[int] = []
+
+        async def apply(self, target, stack_index: int = 0, **_kwargs) -> None:
+            self.seen.append(stack_index)
+
+    registry = PassiveRegistry()
+    registry._registry = {"counting": CountingPassive}
+    player = Player()
+    player.passives = ["counting"] * 3
+
+    await registry.trigger("turn_start", player)
+    await registry.trigger("turn_start", player)
+    (_pid, _cls, stacks), = registry._handlers(player, "event:turn_start")
+    # Capped at max_stacks; state stays per stack and persists across triggers
+    assert [p.seen for p in stacks] == [[0, 0], [1, 1]]
+
+    player.passives.append("counting")
+    await registry.trigger("turn_start", player)
+    (_pid, _cls, fresh), = registry._handlers(player, "event:turn_start")
+    assert [p.seen for p in fresh] == [[0], [1]]
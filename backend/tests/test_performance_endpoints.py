@@ -1,6 +1,7 @@
 """
 Test the performance monitoring endpoints.
 """
+
 import pytest
 
 
@@ -10,7 +11,7 @@ async def test_health_endpoint(app_with_db):
     app, _ = app_with_db
 
     async with app.test_client() as client:
-        response = await client.get('/api/performance/health')
+        response = await client.get('/performance/health')
         assert response.status_code == 200
 
         data = await response.get_json()
@@ -26,7 +27,7 @@ async def test_metrics_endpoint(app_with_db):
     app, _ = app_with_db
 
     async with app.test_client() as client:
-        response = await client.get('/api/performance/metrics')
+        response = await client.get('/performance/metrics')
         assert response.status_code == 200
 
         data = await response.get_json()
@@ -49,9 +50,57 @@ async def test_clear_metrics_endpoint(app_with_db):
     app, _ = app_with_db
 
     async with app.test_client() as client:
-        response = await client.post('/api/performance/metrics/clear')
+        response = await client.post('/performance/metrics/clear')
         assert response.status_code == 200
 
         data = await response.get_json()
         assert data['status'] == 'ok'
         assert 'message' in data
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_reports_percentiles(app_with_db):
+    """Metrics expose histogram percentiles and the recent slow-event ring."""
+    app, _ = app_with_db
+    from autofighter.stats import BUS
+
+    def probe(_value):
+        pass
+
+    BUS.subscribe('perf_probe', probe)
+    BUS.clear_metrics()
+    await BUS.emit_async('perf_probe', 1)
+    BUS.unsubscribe('perf_probe', probe)
+
+    async with app.test_client() as client:
+        response = await client.get('/performance/metrics')
+        assert response.status_code == 200
+        data = await response.get_json()
+
+    probe = data['metrics']['perf_probe']
+    for key in ('count', 'avg_time', 'p50', 'p95', 'p99', 'window'):
+        assert key in probe
+    assert probe['window']['count'] == 1
+    assert isinstance(data['recent_slow_events'], list)
+
+
+@pytest.mark.asyncio
+async def test_log_retention_stats_and_compaction(app_with_db, tmp_path, monkeypatch):
+    """Retention stats appear on /performance and a pass can be triggered."""
+    app, _ = app_with_db
+    import log_retention
+
+    manager = log_retention.LogRetentionManager(
+        tmp_path, log_retention.RetentionPolicy(archive_after=0, max_age_days=0, max_bytes=0)
+    )
+    monkeypatch.setattr(log_retention, "_MANAGER", manager)
+
+    async with app.test_client() as client:
+        response = await client.post('/performance/logs/compact')
+        assert response.status_code == 200
+        data = await response.get_json()
+        assert data['stats']['totals']['passes'] == 1
+
+        metrics = await (await client.get('/performance/metrics')).get_json()
+        assert metrics['log_retention']['policy']['archive_after'] == 0
+        assert 'total_bytes' in metrics['log_retention']['disk']
@@ -0,0 +1,88 @@
+import json
+from pathlib import Path
+import sys
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from plugins import manifest
+from plugins.plugin_loader import PluginLoader
+
+WIDGET = '''
+class {cls}:
+    plugin_type = "widget"
+    id = "{pid}"
+    name = "{name}"
+    stars = {stars}
+    trigger = ["battle_start", "turn_end"]
+'''
+
+
+@pytest.fixture
+def widget_root(tmp_path, monkeypatch):
+    monkeypatch.setenv("AF_PLUGIN_MANIFEST", str(tmp_path / "manifest.json"))
+    root = tmp_path / "plugins" / "manifest_widgets"
+    root.mkdir(parents=True)
+    (root / "spark.py").write_text(WIDGET.format(cls="Spark", pid="spark", name="Spark", stars=1))
+    (root / "bolt.py").write_text(WIDGET.format(cls="Bolt", pid="bolt", name="Bolt", stars=3))
+    yield root
+    for name in list(sys.modules):
+        if name.startswith("plugins.manifest_widgets"):
+            del sys.modules[name]
+
+
+def test_manifest_serves_metadata_without_imports(widget_root, tmp_path):
+    first = PluginLoader(required=["widget"])
+    first.discover(str(widget_root))
+    data = json.loads((tmp_path / "manifest.json").read_text())
+    entry = data["roots"]["plugins/manifest_widgets"]
+    assert sorted(entry["files"]) == ["bolt.py", "spark.py"]
+    assert {p["id"] for p in entry["plugins"]} == {"spark", "bolt"}
+    del sys.modules["plugins.manifest_widgets.spark"]
+    del sys.modules["plugins.manifest_widgets.bolt"]
+
+    loader = PluginLoader(required=["widget"])
+    loader.discover(str(widget_root))
+    widgets = loader.get_plugins("widget")
+    assert sorted(widgets) == ["bolt", "spark"]
+    assert "bolt" in widgets
+    assert widgets.metadata("bolt")["trigger"] == ["battle_start", "turn_end"]
+    assert widgets.select(stars=3) == ["bolt"]
+    assert "plugins.manifest_widgets.bolt" not in sys.modules
+
+    cls = widgets["bolt"]
+    assert cls.__name__ == "Bolt" and cls.stars == 3
+    assert widgets.is_loaded("bolt") and not widgets.is_loaded("spark")
+    assert "plugins.manifest_widgets.spark" not in sys.modules
+    assert widgets.get("missing") is None
+
+
+def test_changed_sources_invalidate_manifest(widget_root):
+    PluginLoader().discover(str(widget_root))
+    (widget_root / "bolt.py").write_text(WIDGET.format(cls="Bolt", pid="bolt", name="Bolt", stars=5))
+    (widget_root / "glow.py").write_text(WIDGET.format(cls="Glow", pid="glow", name="Glow", stars=2))
+
+    assert manifest.cached_entries(widget_root) is None
+    loader = PluginLoader()
+    loader.discover(str(widget_root))
+    widgets = loader.get_plugins("widget")
+    assert widgets.metadata("bolt")["stars"] == 5
+    assert "glow" in widgets
+    # The rescan refreshed the manifest
+    assert {e["id"] for e in manifest.cached_entries(widget_root)} == {"spark", "bolt", "glow"}
+
+
+def test_build_manifest_covers_game_plugins(tmp_path, monkeypatch):
+    monkeypatch.setenv("AF_PLUGIN_MANIFEST", str(tmp_path / "manifest.json"))
+    counts = manifest.build_manifest([manifest.PLUGINS_DIR / "cards"])
+    assert counts["plugins/cards"] > 0
+
+    loader = PluginLoader(required=["card"])
+    loader.discover(str(manifest.PLUGINS_DIR / "cards"))
+    cards = loader.get_plugins("card")
+    assert len(cards) == counts["plugins/cards"]
+    meta = cards.metadata("arc_lightning")
+    assert meta["stars"] == 3 and meta["name"] == "Arc Lightning"
+    assert not cards.is_loaded("arc_lightning")
+    assert cards["arc_lightning"]().stars == 3
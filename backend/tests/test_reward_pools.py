@@ -0,0 +1,69 @@
+import random
+
+import autofighter.cards as cards_module
+from autofighter.cards import card_choices
+from autofighter.cards import card_pool
+from autofighter.party import Party
+import autofighter.relics as relics_module
+from autofighter.relics import relic_choices
+from autofighter.relics import relic_pool
+from autofighter.rooms.shop import _generate_stock
+from plugins.cards._base import CardBase
+
+
+def test_pools_match_class_stars():
+    cards = cards_module._registry()
+    for stars in range(1, 6):
+        for cid in card_pool(stars):
+            assert cards[cid]().stars == stars
+    assert sum(len(card_pool(s)) for s in range(1, 6)) == len(cards)
+
+    relics = relics_module._registry()
+    pooled = [rid for s in range(1, 6) for rid in relic_pool(s)]
+    assert "fallback_essence" not in pooled
+    assert len(pooled) == len(relics) - 1
+    assert all(relics[rid]().stars == s for s in range(1, 6) for rid in relic_pool(s))
+
+
+def test_choices_only_instantiate_sampled_plugins(monkeypatch):
+    created: list[str] = []
+    original = CardBase.__post_init__
+
+    def post_init(self):
+        created.append(self.id)
+        original(self)
+
+    monkeypatch.setattr(CardBase, "__post_init__", post_init)
+
+    owned = list(card_pool(1)[:-2])
+    party = Party(cards=owned)
+    picked = card_choices(party, 1, count=5)
+    assert sorted(c.id for c in picked) == sorted(card_pool(1)[-2:])
+    assert len(created) == 2
+
+    relics = relic_choices(Party(), 1, count=3, exclude={relic_pool(1)[0]})
+    assert len(relics) == min(3, len(relic_pool(1)) - 1)
+    assert relic_pool(1)[0] not in {r.id for r in relics}
+    assert len({r.id for r in relics}) == len(relics)
+
+
+def test_exclusion_spans_calls():
+    party = Party()
+    offered: set[str] = set()
+    for _ in range(len(card_pool(2)) + 2):
+        one = card_choices(party, 2, count=1, exclude=offered)
+        if not one:
+            break
+        assert one[0].id not in offered
+        offered.add(one[0].id)
+    assert offered == set(card_pool(2))
+
+
+def test_shop_stock_is_unique():
+    random.seed(7)
+    party = Party()
+    for _ in range(20):
+        stock = _generate_stock(party, 0)
+        ids = [(item["type"], item["id"]) for item in stock]
+        assert len(ids) == len(set(ids))
+        assert all(item["id"] != "fallback_essence" for item in stock)
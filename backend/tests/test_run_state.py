@@ -0,0 +1,121 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from autofighter.run_state import RunStateStore
+from autofighter.save_manager import SaveManager
+
+MIGRATIONS = Path(__file__).resolve().parents[1] / "migrations"
+
+
+def _manager(path: Path) -> SaveManager:
+    manager = SaveManager(path, "testkey")
+    manager.migrate(MIGRATIONS)
+    with manager.connection() as conn:
+        conn.execute(
+            "INSERT INTO runs (id, party, map) VALUES (?, ?, ?)",
+            ("run", json.dumps({"members": ["player"], "gold": 0}), json.dumps({"current": 1})),
+        )
+    return manager
+
+
+def _row(manager: SaveManager) -> tuple[dict, dict]:
+    with manager.connection() as conn:
+        party, state = conn.execute("SELECT party, map FROM runs WHERE id = 'run'").fetchone()
+    return json.loads(party), json.loads(state)
+
+
+def test_writes_wait_for_flush(tmp_path):
+    manager = _manager(tmp_path / "save.db")
+    store = RunStateStore(lambda: manager)
+
+    state = store.map("run")
+    assert state == {"current": 1}
+    state["current"] = 2
+    store.set_map("run", state)
+    store.set_party("run", {**store.party("run"), "gold": 50})
+    assert store.map("run") is state
+    assert store.is_dirty("run")
+    assert _row(manager) == ({"members": ["player"], "gold": 0}, {"current": 1})
+
+    assert store.flush("run") == 2
+    assert not store.is_dirty("run")
+    assert _row(manager) == ({"members": ["player"], "gold": 50}, {"current": 2})
+    assert store.flush() == 0
+    assert store.map("missing") is None
+
+
+def test_failed_flush_stays_dirty(tmp_path, monkeypatch):
+    manager = _manager(tmp_path / "save.db")
+    store = RunStateStore(lambda: manager)
+    store.set_map("run", {"current": 3})
+
+    def broken(*_args):
+        raise RuntimeError("disk full")
+
+    monkeypatch.setattr(RunStateStore, "_write", staticmethod(broken))
+    with pytest.raises(RuntimeError):
+        store.flush()
+    assert store.is_dirty("run")
+    monkeypatch.undo()
+    assert store.flush() == 1
+    assert _row(manager)[1] == {"current": 3}
+
+
+def test_switching_databases_flushes_pending_state(tmp_path):
+    first = _manager(tmp_path / "first.db")
+    second = _manager(tmp_path / "second.db")
+    current = [first]
+    store = RunStateStore(lambda: current[0])
+    store.set_map("run", {"current": 5})
+
+    current[0] = second
+    assert store.map("run") == {"current": 1}
+    assert _row(first)[1] == {"current": 5}
+    store.discard("run")
+    assert not store.is_dirty("run")
+
+
+@pytest.mark.asyncio
+async def test_checkpoint_serializes_before_writing(tmp_path, monkeypatch):
+    manager = _manager(tmp_path / "save.db")
+    store = RunStateStore(lambda: manager)
+    state = store.map("run")
+    state["current"] = 4
+    store.set_map("run", state)
+
+    write = RunStateStore._write
+
+    def mutate_then_write(manager, rows):
+        # The loop keeps changing the live dict while the thread writes
+        state["current"] = 99
+        return write(manager, rows)
+
+    monkeypatch.setattr(RunStateStore, "_write", staticmethod(mutate_then_write))
+    assert await store.checkpoint("run") == 1
+    assert _row(manager)[1] == {"current": 4}
+    assert await store.checkpoint("run") == 0
+
+
+def test_stale_checkpoint_does_not_overwrite_newer(tmp_path):
+    manager = _manager(tmp_path / "save.db")
+    store = RunStateStore(lambda: manager)
+    store.set_map("run", {"current": 6})
+    with store._lock:
+        older = store._take_dirty("run")
+    store.set_map("run", {"current": 7})
+    assert store.flush("run") == 1
+    store._commit(manager, older)
+    assert _row(manager)[1] == {"current": 7}
+
+
+def test_entries_of_deleted_runs_are_dropped(tmp_path):
+    manager = _manager(tmp_path / "save.db")
+    store = RunStateStore(lambda: manager)
+    with manager.connection() as conn:
+        conn.execute("DELETE FROM runs WHERE id = 'run'")
+    # e.g. a battle task saving after the run was ended
+    store.set_map("run", {"current": 2})
+    assert store.flush("run") == 1
+    assert "run" not in store._entries
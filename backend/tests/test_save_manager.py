@@ -69,3 +69,26 @@ def test_migration_filename_injection_ignored(tmp_path):
         conn.execute("INSERT INTO runs (id) VALUES ('1')")
         count = conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
     assert count == 1
+
+
+def test_connections_are_pooled_and_rolled_back(tmp_path):
+    migrations = Path(__file__).resolve().parents[1] / "migrations"
+    mgr = SaveManager(tmp_path / "save.db", "goodkey", pool_size=1)
+    mgr.migrate(migrations)
+    with mgr.connection() as first:
+        assert first.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    with mgr.connection() as second:
+        assert second is first
+        with mgr.connection() as overflow:
+            assert overflow is not first
+
+    with pytest.raises(RuntimeError):
+        with mgr.connection() as conn:
+            conn.execute("INSERT INTO runs (id, party, map) VALUES ('1', '[]', '[]')")
+            raise RuntimeError
+    with mgr.connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0] == 0
+
+    mgr.close()
+    with mgr.connection() as conn:
+        assert conn is not first
@@ -0,0 +1,50 @@
+import asyncio
+
+from autofighter.effects import DamageOverTime
+from autofighter.effects import EffectManager
+from autofighter.rooms.utils import SerializeCache
+from autofighter.stats import StatEffect
+from autofighter.stats import Stats
+
+
+def _combatant(cid: str) -> Stats:
+    obj = Stats()
+    obj.id = cid
+    obj.effect_manager = EffectManager(obj)
+    return obj
+
+
+def test_unchanged_combatants_reuse_their_snapshot():
+    serialize = SerializeCache()
+    target = _combatant("t")
+    first = serialize(target)
+    assert serialize(target) is first
+
+    target.hp -= 1
+    second = serialize(target)
+    assert second is not first
+    assert second["hp"] == target.hp
+    assert serialize(target) is second
+
+
+def test_effect_changes_refresh_the_snapshot():
+    serialize = SerializeCache()
+    target = _combatant("t")
+    source = _combatant("s")
+    first = serialize(target)
+
+    target.effect_manager.add_dot(DamageOverTime("burn", 0, 2, "burn", source))
+    with_dot = serialize(target)
+    assert with_dot is not first
+    assert with_dot["dots"][0]["turns"] == 2
+
+    # Ticking only changes the stack's remaining turns in place
+    asyncio.run(target.effect_manager.tick())
+    assert serialize(target)["dots"][0]["turns"] == 1
+
+    target.add_effect(StatEffect(name="guard", stat_modifiers={"defense": 5}, duration=2, source="s"))
+    guarded = serialize(target)
+    assert [e["name"] for e in guarded["active_effects"]] == ["guard"]
+
+    target.remove_effect_by_name("guard")
+    assert serialize(target)["active_effects"] == []
@@ -0,0 +1,52 @@
+import json
+
+from autofighter import sim
+from autofighter.stats import Stats
+from plugins.damage_types import load_damage_type
+
+
+def test_simulations_are_seeded_and_summarized():
+    config = sim.SimConfig(party=["player"])
+    outcomes = sim.run_simulations(config, [3, 4], workers=0)
+    assert [o.seed for o in outcomes] == [3, 4]
+    assert all(o.turns > 0 for o in outcomes)
+
+    again = sim.run_simulations(config, [3], workers=0)
+    assert again[0].won == outcomes[0].won
+    assert again[0].turns == outcomes[0].turns
+
+    summary = sim.summarize(outcomes)
+    assert summary["battles"] == 2
+    assert 0.0 <= summary["win_rate"] <= 1.0
+    assert summary["turns"]["min"] <= summary["turns"]["p50"] <= summary["turns"]["max"]
+    assert summary["damage_by_type"]
+
+    rows = sim.to_csv(outcomes).splitlines()
+    assert rows[0].startswith("seed,won,turns")
+    assert len(rows) == 3
+
+
+def test_cli_writes_json_report(tmp_path, capsys):
+    out = tmp_path / "report.json"
+    code = sim.main(
+        ["--party", "player", "--seeds", "1", "--workers", "0", "--battles", "--output", str(out)]
+    )
+    assert code == 0
+    report = json.loads(out.read_text())
+    assert report["config"]["party"] == ["player"]
+    assert report["summary"]["battles"] == 1
+    assert len(report["battles"]) == 1
+
+
+def test_damage_is_credited_to_the_element_of_each_hit(monkeypatch):
+    original = Stats.apply_damage
+    elements = iter(["Fire", "Ice"] * 1000)
+
+    async def switching(self, amount, attacker=None, *args, **kwargs):
+        if getattr(attacker, "id", None) == "player":
+            attacker.damage_type = load_damage_type(next(elements))
+        return await original(self, amount, attacker, *args, **kwargs)
+
+    monkeypatch.setattr(Stats, "apply_damage", switching)
+    [outcome] = sim.run_simulations(sim.SimConfig(party=["player"]), [3], workers=0)
+    assert set(outcome.damage_by_type) == {"Fire", "Ice"}
@@ -0,0 +1,97 @@
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from autofighter.snapshots import CachedEntity
+from autofighter.snapshots import SnapshotLog
+
+
+def _entity(eid: str, hp: int) -> dict:
+    return {"id": eid, "hp": hp, "max_hp": 100}
+
+
+def _snapshot(foes: list[dict], rdr: float = 1.0) -> dict:
+    return {
+        "result": "battle",
+        "party": [_entity("player", 100)],
+        "foes": foes,
+        "rdr": rdr,
+        "action_queue": [{"id": "player"}],
+    }
+
+
+def test_since_returns_only_changed_entities():
+    log = SnapshotLog()
+    base = log.record(_snapshot([_entity("slime", 50), _entity("bat", 40)]))
+
+    # Re-recording identical state does not advance the sequence
+    assert log.record(_snapshot([_entity("slime", 50), _entity("bat", 40)])) == base
+
+    seq = log.record(_snapshot([_entity("slime", 30), _entity("bat", 40)]))
+    assert seq == base + 1
+    delta = log.since(base)
+    assert delta["full"] is False
+    assert delta["entities"] == {"party": [], "foes": [_entity("slime", 30)]}
+    assert delta["changes"] == {}
+    assert delta["order"]["foes"] == ["slime", "bat"]
+
+    latest = log.record(_snapshot([_entity("bat", 40)], rdr=1.5))
+    delta = log.since(base)
+    assert delta["seq"] == latest
+    assert delta["entities"]["foes"] == []
+    assert delta["removed"] == {"party": [], "foes": ["slime"]}
+    assert delta["changes"] == {"rdr": 1.5}
+
+    assert log.since(latest)["entities"] == {"party": [], "foes": []}
+
+
+def test_unknown_sequence_gets_full_payload():
+    log = SnapshotLog()
+    snap = _snapshot([_entity("slime", 50)])
+    seq = log.record(snap)
+
+    for since in (None, 0, seq + 10):
+        full = log.since(since)
+        assert full["full"] is True
+        assert full["seq"] == seq
+        assert full["foes"] == snap["foes"]
+
+    # Sequences from an older log are never applied as deltas
+    assert SnapshotLog().since(seq)["full"] is True
+
+
+def test_dropped_keys_are_reported():
+    log = SnapshotLog()
+    seq = log.record({**_snapshot([]), "paused": True})
+    log.record(_snapshot([]))
+    assert log.since(seq)["removed_keys"] == ["paused"]
+
+
+def test_in_place_mutations_are_detected():
+    log = SnapshotLog()
+    snap = _snapshot([_entity("slime", 50)])
+    snap["enrage"] = {"active": False, "stacks": 0}
+    base = log.record(snap)
+
+    snap["foes"][0]["hp"] = 20
+    snap["enrage"]["stacks"] = 3
+    seq = log.record(snap)
+    assert seq == base + 1
+    delta = log.since(base)
+    assert delta["entities"]["foes"] == [{"id": "slime", "hp": 20, "max_hp": 100}]
+    assert delta["changes"] == {"enrage": {"active": False, "stacks": 3}}
+    assert log.record(snap) == seq
+
+
+def test_cached_entities_are_not_encoded_again():
+    log = SnapshotLog()
+    slime = CachedEntity(_entity("slime", 50))
+    base = log.record(_snapshot([slime]))
+
+    # The same cached instance is trusted as unchanged
+    assert log.record(_snapshot([slime])) == base
+
+    seq = log.record(_snapshot([CachedEntity(_entity("slime", 20))]))
+    assert seq == base + 1
+    assert log.since(base)["entities"]["foes"] == [_entity("slime", 20)]
@@ -0,0 +1,105 @@
+import asyncio
+import os
+import threading
+
+import pytest
+from tts import TTSService
+from tts import VoiceCache
+from tts import voice_key
+
+
+class FakeSynth:
+    def __init__(self, delay: float = 0.0) -> None:
+        self.calls: list[tuple[str, str | None]] = []
+        self.threads: set[str] = set()
+        self.delay = delay
+
+    def __call__(self, text: str, sample: str | None) -> bytes:
+        import time
+
+        time.sleep(self.delay)
+        self.calls.append((text, sample))
+        self.threads.add(threading.current_thread().name)
+        return f"RIFF{text}".encode() * 10
+
+
+def test_voice_key_covers_text_sample_and_model(tmp_path):
+    sample = tmp_path / "sample.wav"
+    sample.write_bytes(b"voice-a")
+    base = voice_key("hello", str(sample))
+    assert voice_key("hello", str(sample)) == base
+    assert voice_key("hello!", str(sample)) != base
+    assert voice_key("hello") != base
+    assert voice_key("hello", str(sample), model="other") != base
+    # Keys follow the sample's contents, not its path
+    copy = tmp_path / "copy.wav"
+    copy.write_bytes(b"voice-a")
+    assert voice_key("hello", str(copy)) == base
+    sample.write_bytes(b"voice-b")
+    os.utime(sample, ns=(1, 1))
+    assert voice_key("hello", str(sample)) != base
+
+
+@pytest.mark.asyncio
+async def test_repeated_lines_are_served_from_cache(tmp_path):
+    synth = FakeSynth()
+    service = TTSService(VoiceCache(tmp_path), synthesize=synth)
+
+    first = await service.voice_path("Hello there")
+    again = await service.voice_path("Hello there")
+    other = await service.voice_path("Goodbye")
+
+    assert first == again
+    assert first == f"/assets/voices/{voice_key('Hello there')}.wav"
+    assert first != other
+    assert len(synth.calls) == 2
+    assert all(name.startswith("tts") for name in synth.threads)
+    assert (tmp_path / f"{voice_key('Hello there')}.wav").exists()
+    stats = service.stats()
+    assert stats["hits"] == 1
+    assert stats["synthesized"] == 2
+    assert await service.voice_path("  ") is None
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_requests_share_one_synthesis(tmp_path):
+    synth = FakeSynth(delay=0.05)
+    service = TTSService(VoiceCache(tmp_path), synthesize=synth)
+
+    paths = await asyncio.gather(*(service.voice_path("Again") for _ in range(4)))
+    assert len(set(paths)) == 1
+    assert len(synth.calls) == 1
+    assert service.stats()["deduplicated"] == 3
+    assert service.stats()["pending"] == 0
+
+
+@pytest.mark.asyncio
+async def test_unavailable_model_returns_none(tmp_path):
+    service = TTSService(VoiceCache(tmp_path), synthesize=lambda text, sample: None)
+    assert await service.voice_path("silent") is None
+    assert service.stats()["failed"] == 1
+    assert not list(tmp_path.iterdir())
+
+
+def test_disk_budget_evicts_least_recently_used(tmp_path):
+    cache = VoiceCache(tmp_path, max_bytes=250)
+    keys = [voice_key(f"line {i}") for i in range(3)]
+    for key in keys:
+        cache.put(key, b"x" * 100)
+        os.utime(cache.path_for(key), (1, 1))
+    # Only two fit; the first one written is evicted
+    assert cache.get(keys[0]) is None
+    assert not cache.path_for(keys[0]).exists()
+
+    assert cache.get(keys[1]) is not None  # now most recently used
+    extra = voice_key("line 3")
+    cache.put(extra, b"y" * 100)
+    assert cache.get(keys[2]) is None
+    assert cache.get(keys[1]) is not None
+    assert cache.stats()["evictions"] == 2
+
+    # A fresh cache rebuilds its index from disk and ignores foreign files
+    (tmp_path / "chat.wav").write_bytes(b"legacy")
+    reopened = VoiceCache(tmp_path, max_bytes=250)
+    assert reopened.stats()["entries"] == 2
+    assert reopened.stats()["bytes"] == 200
@@ -20,9 +20,9 @@ def _use_ultimate(self):
 
 @pytest.mark.asyncio
 async def test_wind_ultimate_transfers_from_foes():
-    Wind._players.clear()
-    Wind._foes.clear()
-    Wind._pending.clear()
+    Wind._players().clear()
+    Wind._foes().clear()
+    Wind._pending().clear()
 
     player = Stats(damage_type=Wind())
     player.plugin_type = "player"
@@ -69,9 +69,9 @@ async def test_wind_ultimate_transfers_from_foes():
 
 @pytest.mark.asyncio
 async def test_wind_foe_ultimate_transfers_from_allies():
-    Wind._players.clear()
-    Wind._foes.clear()
-    Wind._pending.clear()
+    Wind._players().clear()
+    Wind._foes().clear()
+    Wind._pending().clear()
 
     foe = Stats(damage_type=Wind())
     foe.plugin_type = "foe"
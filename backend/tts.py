@@ -1,6 +1,16 @@
 from __future__ import annotations
 
+import asyncio
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import hashlib
 import io
+import logging
+import os
+from pathlib import Path
+import threading
+from typing import Callable
 from typing import Optional
 
 try:  # pragma: no cover - optional dependency
@@ -11,6 +21,8 @@ except Exception:  # pragma: no cover
     except Exception:  # pragma: no cover
         ChatterboxTTS = None  # type: ignore
 
+log = logging.getLogger(__name__)
+
 _model: ChatterboxTTS | None = None
 
 
@@ -40,3 +52,227 @@ def generate_voice(text: str, audio_prompt_path: str | None = None) -> Optional[
         return buffer.getvalue()
     except Exception:
         return None
+
+
+# -- cached synthesis ----------------------------------------------------
+#
+# Voice lines are stored under ``assets/voices/<sha256>.wav`` where the hash
+# covers the text, the voice sample's contents and the TTS model, so a line
+# is synthesised once and concurrent requests never share an output file.
+# Synthesis runs on a dedicated executor (``AF_TTS_WORKERS``, default 1)
+# instead of the event loop's default thread pool. The directory is kept
+# under ``AF_TTS_CACHE_BYTES`` (default 256 MiB) by deleting the least
+# recently used files.
+
+VOICES_DIR = Path(__file__).resolve().parent / "assets" / "voices"
+VOICES_URL = "/assets/voices"
+MODEL_ID = "chatterbox"
+_SUFFIX = ".wav"
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+@lru_cache(maxsize=64)
+def _sample_digest(path: str, mtime_ns: int, size: int) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def voice_key(text: str, audio_prompt_path: str | None = None, model: str = MODEL_ID) -> str:
+    """Return the content hash naming the voice line for these inputs."""
+    sample = ""
+    if audio_prompt_path:
+        try:
+            st = os.stat(audio_prompt_path)
+            sample = _sample_digest(audio_prompt_path, st.st_mtime_ns, st.st_size)
+        except OSError:
+            # Missing samples still get a stable key of their own
+            sample = f"path:{audio_prompt_path}"
+    payload = "\0".join((model, sample, text))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class VoiceCache:
+    """Content-addressed voice files with an LRU disk budget."""
+
+    def __init__(self, directory: Path | None = None, max_bytes: int | None = None) -> None:
+        self.directory = Path(directory or VOICES_DIR)
+        if max_bytes is None:
+            max_bytes = _env_int("AF_TTS_CACHE_BYTES", 256 << 20)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, int] | None = None
+        self._bytes = 0
+        self.evictions = 0
+
+    def _index(self) -> OrderedDict[str, int]:
+        # Built lazily from disk, oldest access first
+        if self._entries is None:
+            found = []
+            if self.directory.is_dir():
+                for path in self.directory.glob(f"*{_SUFFIX}"):
+                    if len(path.stem) != 64:
+                        continue  # not a cache entry (e.g. legacy chat.wav)
+                    try:
+                        st = path.stat()
+                    except OSError:
+                        continue
+                    found.append((st.st_mtime, path.stem, st.st_size))
+            found.sort()
+            self._entries = OrderedDict((key, size) for _, key, size in found)
+            self._bytes = sum(self._entries.values())
+        return self._entries
+
+    def path_for(self, key: str) -> Path:
+        return self.directory / f"{key}{_SUFFIX}"
+
+    def url_for(self, key: str) -> str:
+        return f"{VOICES_URL}/{key}{_SUFFIX}"
+
+    def get(self, key: str) -> Path | None:
+        """Return the cached file for ``key`` and mark it recently used."""
+        with self._lock:
+            entries = self._index()
+            if key not in entries:
+                return None
+            path = self.path_for(key)
+            try:
+                os.utime(path)
+            except OSError:
+                self._bytes -= entries.pop(key)
+                return None
+            entries.move_to_end(key)
+            return path
+
+    def put(self, key: str, audio: bytes) -> Path:
+        """Store ``audio`` atomically and evict old entries past the budget."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.path_for(key)
+        tmp = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(audio)
+        os.replace(tmp, path)
+        with self._lock:
+            entries = self._index()
+            self._bytes -= entries.pop(key, 0)
+            entries[key] = len(audio)
+            self._bytes += len(audio)
+            self._evict(keep=key)
+        return path
+
+    def _evict(self, keep: str) -> None:
+        if self.max_bytes <= 0:
+            return
+        entries = self._entries or OrderedDict()
+        while self._bytes > self.max_bytes and len(entries) > 1:
+            key, size = next(iter(entries.items()))
+            if key == keep:
+                break
+            entries.pop(key)
+            self._bytes -= size
+            self.evictions += 1
+            self.path_for(key).unlink(missing_ok=True)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            entries = self._index()
+            return {
+                "entries": len(entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "evictions": self.evictions,
+            }
+
+
+class TTSService:
+    """Serve voice lines from :class:`VoiceCache`, synthesising misses on a worker."""
+
+    def __init__(
+        self,
+        cache: VoiceCache | None = None,
+        synthesize: Callable[[str, str | None], Optional[bytes]] | None = None,
+        workers: int | None = None,
+    ) -> None:
+        self.cache = cache or VoiceCache()
+        self._synthesize = synthesize or generate_voice
+        self.workers = max(1, workers or _env_int("AF_TTS_WORKERS", 1))
+        self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="tts")
+        self._inflight: dict[str, asyncio.Future] = {}
+        self._counters = {
+            "hits": 0,
+            "misses": 0,
+            "deduplicated": 0,
+            "synthesized": 0,
+            "failed": 0,
+        }
+
+    async def voice_path(self, text: str, audio_prompt_path: str | None = None) -> str | None:
+        """Return the URL of the voiced line, or ``None`` when TTS is unavailable."""
+        if not text or not text.strip():
+            return None
+        key = voice_key(text, audio_prompt_path)
+        if self.cache.get(key) is not None:
+            self._counters["hits"] += 1
+            return self.cache.url_for(key)
+        loop = asyncio.get_running_loop()
+        pending = self._inflight.get(key)
+        if pending is not None and pending.get_loop() is loop:
+            # Same line already being synthesised; share its result
+            self._counters["deduplicated"] += 1
+            return await asyncio.shield(pending)
+        self._counters["misses"] += 1
+        future = loop.run_in_executor(
+            self._executor, self._synthesize_to_cache, key, text, audio_prompt_path
+        )
+        self._inflight[key] = future
+        try:
+            return await asyncio.shield(future)
+        finally:
+            if future.done():
+                self._inflight.pop(key, None)
+            else:
+                future.add_done_callback(lambda _: self._inflight.pop(key, None))
+
+    def _synthesize_to_cache(self, key: str, text: str, audio_prompt_path: str | None) -> str | None:
+        try:
+            audio = self._synthesize(text, audio_prompt_path)
+        except Exception:
+            log.exception("Voice synthesis failed")
+            audio = None
+        if not audio:
+            self._counters["failed"] += 1
+            return None
+        self.cache.put(key, audio)
+        self._counters["synthesized"] += 1
+        return self.cache.url_for(key)
+
+    def stats(self) -> dict[str, object]:
+        return {
+            **self._counters,
+            "pending": len(self._inflight),
+            "workers": self.workers,
+            "cache": self.cache.stats(),
+        }
+
+
+_SERVICE: TTSService | None = None
+
+
+def get_tts_service() -> TTSService:
+    """Return the process-wide TTS service."""
+    global _SERVICE
+    if _SERVICE is None:
+        _SERVICE = TTSService()
+    return _SERVICE
+
+
+async def voice_path(text: str, audio_prompt_path: str | None = None) -> str | None:
+    """Voice ``text`` through the shared service and return its asset URL."""
+    return await get_tts_service().voice_path(text, audio_prompt_path)
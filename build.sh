@@ -146,12 +146,24 @@ else
   echo "Building executable..."
   PYTHON_RUN="python3 -m"
 fi
+# Pre-build the plugin manifest so the frozen app can list plugins without importing them
+echo "Generating plugin manifest..."
+if [ "$PYTHON_RUN" = "uv run" ]; then
+  uv run python -m plugins.manifest
+else
+  python3 -m plugins.manifest
+fi
+
 DATA_ARGS="--add-data ../frontend/build"
+MANIFEST_ARGS="--add-data plugins/plugin_manifest.json"
 if [ "$PLATFORM" = "windows" ]; then
     DATA_ARGS="$DATA_ARGS;frontend"
+    MANIFEST_ARGS="$MANIFEST_ARGS;plugins"
 else
     DATA_ARGS="$DATA_ARGS:frontend"
+    MANIFEST_ARGS="$MANIFEST_ARGS:plugins"
 fi
+DATA_ARGS="$DATA_ARGS $MANIFEST_ARGS --collect-submodules plugins"
 
 OUTPUT_NAME="midori-autofighter-$VARIANT-$PLATFORM"
 if [ "$PLATFORM" = "windows" ]; then
@@ -122,10 +122,21 @@ export async function getBattleSummary(battleIndex) {
 
 /**
  * Retrieve detailed battle events for the current run.
+ * Without a query the full event list is returned. With `cursor`, `limit`
+ * or filters (`event_type`, `attacker_id`, `target_id`, `turn_min`,
+ * `turn_max`) the backend returns `{ events, cursor, next_cursor }`.
+ * `tail: 1` returns the last `limit` events, with `cursor` set to the
+ * position of the first one.
  * @param {number} battleIndex - Index of the battle to fetch
+ * @param {Object} [query] - Optional pagination and filter parameters
  */
-export async function getBattleEvents(battleIndex) {
-  return httpGet(`/battles/${battleIndex}/events`, { cache: 'no-store' });
+export async function getBattleEvents(battleIndex, query = null) {
+  const params = new URLSearchParams();
+  for (const [key, value] of Object.entries(query || {})) {
+    if (value !== null && value !== undefined && value !== '') params.set(key, String(value));
+  }
+  const qs = params.toString();
+  return httpGet(`/battles/${battleIndex}/events${qs ? `?${qs}` : ''}`, { cache: 'no-store' });
 }
 
 /**